@@ -4,20 +4,7 @@ sys.modules['sqlite3'] = sys.modules.pop('pysqlite3')
 
 import os
 import streamlit as st
-from crewai import Agent, Task, Crew, Process, LLM
-import json
-import numpy as np
-import pygame
-from pydub import AudioSegment
-from pydub.generators import Sine
-import io
-import base64
-import tempfile
-from gtts import gTTS
-import librosa
-import soundfile as sf
-import re
-from datetime import datetime
+import time
 
 # Configuração da página (DEVE ser a primeira função do Streamlit)
 st.set_page_config(
@@ -27,409 +14,325 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Importar módulos personalizados
+# Importar módulos personalizados. Os que dependem de bibliotecas pesadas
+# (music21, gTTS, pydub, numpy) são importados apenas no primeiro uso.
 try:
-    from calendario_liturgico import CalendarioLiturgico
-    from gerador_partituras import GeradorPartituras
-    from sistema_vozes import SistemaVozes
-    from sistema_favoritos import SistemaFavoritos
-    from mixer_audio import MixerAudio
+    from sistemas_sob_demanda import SistemasSobDemanda, classe_sob_demanda
+    from cache_composicoes import CacheComposicoes
+    from composicao_lote import ComposicaoLote, MOMENTOS_MISSA
+    from backends_llm import criar_backend_llm
+    from compositor import Compositor, extrair_letra_musica, texto_do_resultado
+    from composicao_estruturada import ErroComposicaoInvalida, estruturar_composicao, texto_sem_estrutura
+    from controle_llm import criar_controle_llm
+    from tarefas_segundo_plano import GerenciadorTarefas, ESTADOS_FINAIS, CONCLUIDA, CANCELADA
+    from formatos_entrega import AudioEntrega, PreviaProgressiva, FORMATOS_ENTREGA, FORMATO_DOWNLOAD_PADRAO
 except ImportError as e:
     st.error(f"Erro ao importar módulos: {str(e)}")
     st.stop()
 
-# Configurando o modelo usando a classe LLM nativa do CrewAI
+# Configurando os modelos usados pelo backend de composição (CrewAI por padrão;
+# defina COMPOSITOR_LLM_BACKEND=gravacao/replay/stub para uso offline).
+# Rascunhos usam o modelo rápido e a versão final o modelo principal,
+# cada um recorrendo ao outro em caso de erro ou tempo esgotado.
 gpt4o = 'gpt-4o-mini'
+MODELO_COMPOSICAO = "gpt-4"
+MODELO_RASCUNHO = gpt4o
+TEMPERATURA_COMPOSICAO = 0.8
 
-llm = LLM(
-    model="gpt-4",
-    temperature=0.8
-)
-
-# Inicializar sistemas
+# Inicializar sistemas (cada um é criado no primeiro acesso)
 @st.cache_resource
 def inicializar_sistemas():
-    """Inicializa todos os sistemas do compositor"""
-    return {
-        "calendario": CalendarioLiturgico(),
-        "partituras": GeradorPartituras(),
-        "vozes": SistemaVozes(),
-        "favoritos": SistemaFavoritos(),
-        "mixer": MixerAudio()
-    }
+    """Registra os sistemas do compositor"""
+    sistemas = SistemasSobDemanda({
+        "calendario": classe_sob_demanda("calendario_liturgico", "CalendarioLiturgico"),
+        "partituras": classe_sob_demanda("gerador_partituras", "GeradorPartituras"),
+        "favoritos": classe_sob_demanda("sistema_favoritos", "SistemaFavoritos"),
+        "mixer": classe_sob_demanda("mixer_audio", "MixerAudio"),
+        "instrumental": classe_sob_demanda(
+            "banco_instrumental", "BancoInstrumental",
+            os.getenv("COMPOSITOR_BANCO_INSTRUMENTAL", "banco_instrumental")
+        ),
+        "cache_voz": classe_sob_demanda(
+            "cache_voz", "CacheVoz", os.getenv("COMPOSITOR_CACHE_VOZ", "cache_voz")
+        ),
+        "cache": CacheComposicoes,
+        "tarefas": GerenciadorTarefas
+    })
+    sistemas.registrar("vozes", lambda: classe_sob_demanda(
+        "sistema_vozes", "SistemaVozes", cache_voz=sistemas["cache_voz"]
+    )())
+    sistemas.registrar("compositor", lambda: Compositor(
+        criar_backend_llm(
+            modelo=MODELO_COMPOSICAO,
+            temperatura=TEMPERATURA_COMPOSICAO,
+            modelo_rascunho=MODELO_RASCUNHO,
+            arquivo_latencias=os.path.join(sistemas["cache"].diretorio, "latencias_modelos.json")
+        ),
+        sistemas["cache"],
+        criar_controle_llm()
+    ))
+    return sistemas
 
 # Obter sistemas
 sistemas = inicializar_sistemas()
 
-# Função para gerar áudio simples baseado no tom
+# Função para configurar o agente e executar a composição
+def criar_musica(sentimentos, tom, estilo, forcar_nova=False, ao_receber_trecho=None, momento=None,
+                 modo="final"):
+    """Compõe a música com o backend de LLM configurado, usando o cache"""
+    return sistemas["compositor"].compor(
+        sentimentos, tom, estilo,
+        forcar_nova=forcar_nova,
+        ao_receber_trecho=ao_receber_trecho,
+        momento=momento,
+        modo=modo
+    )
+
+# Funções de áudio: gerador_audio (pydub, gTTS) é importado no primeiro uso
 def gerar_audio_simples(tom, estilo="tradicional"):
     """Gera um áudio simples baseado no tom selecionado"""
-    try:
-        # Mapeamento de tons para frequências (em Hz)
-        tons_freq = {
-            "C": 261.63, "C#": 277.18, "Db": 277.18,
-            "D": 293.66, "D#": 311.13, "Eb": 311.13,
-            "E": 329.63, "F": 349.23, "F#": 369.99, "Gb": 369.99,
-            "G": 392.00, "G#": 415.30, "Ab": 415.30,
-            "A": 440.00, "A#": 466.16, "Bb": 466.16,
-            "B": 493.88
-        }
-
-        freq_base = tons_freq.get(tom, 440.00)
-
-        # Criar uma progressão simples baseada no estilo
-        if estilo == "tradicional":
-            # Progressão I-V-vi-IV (muito comum em música católica)
-            acordes = [freq_base, freq_base * 1.5, freq_base * 1.68, freq_base * 1.33]
-        else:  # contemporâneo
-            # Progressão vi-IV-I-V
-            acordes = [freq_base * 1.68, freq_base * 1.33, freq_base, freq_base * 1.5]
-
-        # Gerar áudio
-        audio_final = AudioSegment.empty()
-
-        for freq in acordes:
-            # Gerar tom por 2 segundos
-            tom_audio = Sine(freq).to_audio_segment(duration=2000)
-            # Adicionar fade in/out para suavizar
-            tom_audio = tom_audio.fade_in(100).fade_out(100)
-            audio_final += tom_audio
-
-        # Converter para bytes
-        audio_bytes = io.BytesIO()
-        audio_final.export(audio_bytes, format="mp3")
-        audio_bytes.seek(0)
-
-        return audio_bytes.getvalue()
-
-    except Exception as e:
-        st.error(f"Erro ao gerar áudio: {str(e)}")
-        return None
+    from gerador_audio import gerar_audio_simples as gerar
+    return gerar(tom, estilo)
 
-# Função para extrair letra do texto gerado
-def extrair_letra_musica(texto_completo):
-    """Extrai apenas a letra da música do texto completo gerado"""
-    try:
-        # Procurar por seções de letra (versos, refrão, etc.)
-        linhas = texto_completo.split('\n')
-        letra_linhas = []
-
-        # Palavras-chave que indicam seções de letra
-        secoes_letra = ['verso', 'refrão', 'refrao', 'ponte', 'coro', 'estrofe']
-
-        capturando_letra = False
-        for linha in linhas:
-            linha_limpa = linha.strip().lower()
-
-            # Verificar se é uma seção de letra
-            if any(secao in linha_limpa for secao in secoes_letra):
-                capturando_letra = True
-                continue
-
-            # Parar se encontrar seções técnicas
-            if any(palavra in linha_limpa for palavra in ['cifra', 'acorde', 'tom:', 'bpm', 'compasso']):
-                capturando_letra = False
-                continue
-
-            # Capturar linhas de letra
-            if capturando_letra and linha.strip() and not linha.startswith('#') and not linha.startswith('*'):
-                # Remover marcações markdown
-                linha_letra = re.sub(r'\*\*([^*]+)\*\*', r'\1', linha.strip())
-                linha_letra = re.sub(r'\*([^*]+)\*', r'\1', linha_letra)
-                if linha_letra:
-                    letra_linhas.append(linha_letra)
-
-        return ' '.join(letra_linhas) if letra_linhas else "Letra não encontrada no texto gerado."
-
-    except Exception as e:
-        return f"Erro ao extrair letra: {str(e)}"
-
-# Função para gerar áudio com Text-to-Speech
-def gerar_audio_com_voz(letra, tom, estilo, velocidade=1.0):
+def gerar_audio_com_voz(letra, tom, estilo, velocidade=1.0, banco=None, cache_voz=None, modo_voz="falada"):
     """Gera áudio com voz cantando a letra em português"""
-    try:
-        # Gerar música instrumental
-        audio_instrumental = gerar_audio_simples(tom, estilo)
-        if not audio_instrumental:
-            return None
-
-        # Gerar voz com TTS
-        tts = gTTS(text=letra, lang='pt-br', slow=False)
+    from gerador_audio import gerar_audio_com_voz as gerar
+    return gerar(letra, tom, estilo, velocidade, banco, cache_voz=cache_voz, modo_voz=modo_voz)
+
+def gerar_buffer_com_voz(letra, tom, estilo, velocidade=1.0, banco=None, ao_receber_bloco=None, cache_voz=None,
+                         modo_voz="falada"):
+    """Gera áudio com voz cantando a letra em português, sem codificar"""
+    from gerador_audio import gerar_buffer_com_voz as gerar
+    return gerar(letra, tom, estilo, velocidade, banco, ao_receber_bloco, cache_voz, modo_voz)
+
+def transpor_audio(audio_bytes, tom_original, tom_novo, ao_informar=None):
+    """Muda o tom de um áudio preservando a velocidade"""
+    from gerador_audio import transpor_audio as transpor
+    return transpor(audio_bytes, tom_original, tom_novo, ao_informar)
+
+def transpor_buffer(audio_bytes, tom_original, tom_novo, ao_informar=None):
+    """Muda o tom de um áudio preservando a velocidade, sem codificar"""
+    from gerador_audio import transpor_buffer as transpor
+    return transpor(audio_bytes, tom_original, tom_novo, ao_informar)
+
+def preparar_entrega(buffer, nome_base):
+    """Embrulha o áudio final para entrega e já codifica a prévia do player"""
+    if buffer is None:
+        return None
+    entrega = AudioEntrega(buffer, nome_base)
+    entrega.previa()
+    return entrega
+
+# Tarefas executadas em segundo plano: recebem progresso(fracao, mensagem, parcial)
+# e não chamam o Streamlit, pois rodam fora da execução do script
+def tarefa_compor_musica(progresso, sentimentos, tom, estilo, forcar_nova=False, modo="final",
+                         em_tempo_real=True, salvar=False, gerar_partitura=False):
+    """Compõe, estrutura, salva e gera a partitura da música"""
+    do_cache = not forcar_nova and sistemas["compositor"].esta_em_cache(sentimentos, tom, estilo, modo=modo)
+    progresso(0.05, "Compondo a música católica...")
+
+    def ao_receber_trecho(texto_parcial):
+        progresso(mensagem="Recebendo a composição...", parcial=texto_parcial)
+
+    resultado = criar_musica(
+        sentimentos, tom, estilo,
+        forcar_nova=forcar_nova,
+        modo=modo,
+        ao_receber_trecho=ao_receber_trecho if em_tempo_real else None
+    )
+    texto = texto_do_resultado(resultado)
 
-        # Salvar TTS em arquivo temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_tts:
-            tts.save(temp_tts.name)
+    # Estruturar a composição (bloco JSON do LLM ou leitura do markdown)
+    progresso(0.85, "Organizando a estrutura da música...")
+    composicao, erro_estrutura = None, None
+    try:
+        composicao = estruturar_composicao(texto, tom, estilo)
+    except ErroComposicaoInvalida as e:
+        erro_estrutura = str(e)
 
-            # Carregar áudio da voz
-            audio_voz = AudioSegment.from_mp3(temp_tts.name)
+    if composicao and salvar:
+        sistemas["favoritos"].salvar_composicao(composicao)
 
-            # Carregar áudio instrumental
-            audio_instrumental_seg = AudioSegment.from_file(io.BytesIO(audio_instrumental))
+    # Partitura com título, BPM e cifras da composição
+    midi_bytes = None
+    if composicao and gerar_partitura:
+        progresso(0.95, "Gerando a partitura...")
+        partitura = sistemas["partituras"].gerar_partitura_da_composicao(composicao)
+        midi_bytes = sistemas["partituras"].exportar_para_midi(partitura["partitura"])
 
-            # Ajustar velocidade da voz se necessário
-            if velocidade != 1.0:
-                # Simular mudança de velocidade alterando frame rate
-                new_sample_rate = int(audio_voz.frame_rate * velocidade)
-                audio_voz = audio_voz._spawn(audio_voz.raw_data, overrides={"frame_rate": new_sample_rate})
-                audio_voz = audio_voz.set_frame_rate(audio_voz.frame_rate)
+    return {
+        "texto": texto,
+        "composicao": composicao,
+        "erro_estrutura": erro_estrutura,
+        "do_cache": do_cache,
+        "midi": midi_bytes,
+        "tom": tom,
+        "estilo": estilo
+    }
 
-            # Ajustar volumes
-            audio_instrumental_seg = audio_instrumental_seg - 10  # Diminuir volume instrumental
-            audio_voz = audio_voz + 5  # Aumentar volume da voz
+def tarefa_audio_instrumental(progresso, tom, estilo):
+    """Gera o áudio instrumental"""
+    progresso(0.1, "Carregando áudio instrumental...")
+    # Prévia e download padrão já codificados no banco: o pedido é só leitura de arquivos
+    return sistemas["instrumental"].obter_entrega(tom, estilo, f"instrumental_{tom}_{estilo}")
 
-            # Repetir instrumental se necessário para cobrir toda a voz
-            duracao_voz = len(audio_voz)
-            duracao_instrumental = len(audio_instrumental_seg)
+def tarefa_audio_com_voz(progresso, letra, tom, estilo, modo_voz="falada"):
+    """Gera o áudio com voz sobre o instrumental, publicando cada bloco pronto como prévia"""
+    if modo_voz == "cantada":
+        progresso(0.1, "Gerando voz cantada na melodia...")
+    else:
+        progresso(0.1, "Gerando áudio com voz em português...")
+    previa = PreviaProgressiva()
 
-            if duracao_voz > duracao_instrumental:
-                repeticoes = (duracao_voz // duracao_instrumental) + 1
-                audio_instrumental_seg = audio_instrumental_seg * repeticoes
+    def ao_receber_bloco(indice, bloco):
+        previa.adicionar(bloco)
+        progresso(mensagem=f"🎧 Renderizando... {previa}", parcial=previa)
 
-            # Cortar instrumental para duração da voz
-            audio_instrumental_seg = audio_instrumental_seg[:duracao_voz]
+    audio = gerar_buffer_com_voz(
+        letra, tom, estilo, banco=sistemas["instrumental"], ao_receber_bloco=ao_receber_bloco,
+        cache_voz=sistemas["cache_voz"], modo_voz=modo_voz
+    )
+    progresso(0.9, "Preparando a prévia...")
+    return preparar_entrega(audio, f"musica_com_voz_{tom}_{estilo}")
+
+def tarefa_mudar_tom(progresso, audio_bytes, tom_original, tom_novo):
+    """Muda o tom de uma música enviada pelo usuário"""
+    audio_modificado = transpor_buffer(
+        audio_bytes, tom_original, tom_novo,
+        ao_informar=lambda mensagem: progresso(mensagem=mensagem)
+    )
+    progresso(mensagem="Preparando a prévia...")
+    return {
+        "audio": preparar_entrega(audio_modificado, f"musica_modificada_{tom_novo}"),
+        "tom_original": tom_original,
+        "tom_novo": tom_novo
+    }
 
-            # Mixar voz e instrumental
-            audio_final = audio_instrumental_seg.overlay(audio_voz)
+def tarefa_mixagem(progresso, letra, tom_atual, estilo_atual, parametros, fade_duration):
+    """Gera voz e instrumental e aplica a mixagem avançada.
+
+    O áudio circula como BufferAudio entre as etapas e é codificado uma única vez, no fim.
+    """
+    progresso(0.1, "Gerando a voz...")
+    voz = sistemas["vozes"].gerar_buffer_voz(letra, "feminina_adulta")
+    progresso(0.4, "Preparando o instrumental...")
+    # Renderizado na mixagem com a duração exata da voz, terminando em cadência
+    instrumental = sistemas["instrumental"].obter_base(tom_atual, estilo_atual)
+    if voz is None or instrumental is None:
+        raise RuntimeError("Erro ao gerar áudios base")
+
+    progresso(0.6, "Aplicando mixagem profissional...")
+    mixado = sistemas["mixer"].mixar_buffers(voz, instrumental, **parametros)
+    if mixado is None:
+        raise RuntimeError("Erro na mixagem")
+
+    # Aplicar fade
+    if fade_duration > 0:
+        progresso(0.8, "Aplicando fade in/out...")
+        mixado = sistemas["mixer"].aplicar_fade(mixado, fade_duration, fade_duration)
+
+    progresso(0.9, "Analisando o áudio e preparando a prévia...")
+    return {
+        "audio": preparar_entrega(mixado, f"mixagem_{tom_atual}"),
+        "analise": sistemas["mixer"].analisar_buffer(mixado)
+    }
 
-            # Converter para bytes
-            audio_bytes = io.BytesIO()
-            audio_final.export(audio_bytes, format="mp3")
-            audio_bytes.seek(0)
+def tarefa_repertorio(progresso, itens, max_concorrencia, timeout_item, modo="final"):
+    """Compõe os cantos do repertório em paralelo, informando cada canto concluído"""
+    def compor_canto(sentimentos, tom, estilo, momento=None):
+        return criar_musica(sentimentos, tom, estilo, momento=momento, modo=modo)
+
+    lote = ComposicaoLote(compor_canto, max_concorrencia=max_concorrencia, timeout_item=timeout_item)
+    resultados = []
+    inicio = time.monotonic()
+
+    for resultado in lote.compor(itens):
+        resultado["texto"] = texto_do_resultado(resultado["texto"]) if resultado["sucesso"] else None
+        resultados.append(resultado)
+        progresso(
+            len(resultados) / len(itens),
+            f"{len(resultados)}/{len(itens)} cantos concluídos",
+            parcial=list(resultados)
+        )
 
-            # Limpar arquivo temporário
-            os.unlink(temp_tts.name)
+    return {
+        "resultados": sorted(resultados, key=lambda r: r["indice"]),
+        "duracao_segundos": time.monotonic() - inicio
+    }
 
-            return audio_bytes.getvalue()
+# Acompanhamento das tarefas na interface: o ID fica na sessão e a página
+# consulta o estado a cada execução, então nada se perde em um rerun
+def submeter_tarefa(slot, tipo, funcao, *args, descricao="", **kwargs):
+    """Submete a tarefa ao gerenciador e guarda o ID na sessão"""
+    st.session_state[f"tarefa_{slot}"] = sistemas["tarefas"].submeter(
+        tipo, funcao, *args, descricao=descricao, **kwargs
+    )
 
-    except Exception as e:
-        st.error(f"Erro ao gerar áudio com voz: {str(e)}")
+@st.fragment(run_every=0.5)
+def painel_tarefa(id_tarefa, exibir_parcial=None):
+    """Exibe o progresso da tarefa até ela terminar"""
+    tarefa = sistemas["tarefas"].obter(id_tarefa)
+    if tarefa is None or tarefa["estado"] in ESTADOS_FINAIS:
+        st.rerun()
+
+    st.progress(tarefa["progresso"], text=tarefa["mensagem"] or "⏳ Aguardando na fila...")
+    if exibir_parcial and tarefa["parcial"]:
+        exibir_parcial(tarefa["parcial"])
+
+    if st.button("✖️ Cancelar", key=f"cancelar_{id_tarefa}"):
+        sistemas["tarefas"].cancelar(id_tarefa)
+
+def acompanhar_tarefa(slot, mensagem_erro, exibir_parcial=None):
+    """Retorna (tarefa, resultado) se a tarefa do slot foi concluída.
+
+    Enquanto executa, exibe o painel de progresso; em caso de falha ou
+    cancelamento, exibe a mensagem correspondente.
+    """
+    id_tarefa = st.session_state.get(f"tarefa_{slot}")
+    tarefa = sistemas["tarefas"].obter(id_tarefa) if id_tarefa else None
+    if tarefa is None:
         return None
 
-# Função para mudar tom de música existente
-def mudar_tom_musica(audio_bytes, tom_original, tom_novo):
-    """Muda o tom de uma música preservando a velocidade e qualidade da voz"""
-    try:
-        # Verificar se as bibliotecas necessárias estão disponíveis
-        try:
-            import librosa
-            import soundfile as sf
-        except ImportError as e:
-            st.error(f"❌ Bibliotecas necessárias não encontradas: {str(e)}")
-            st.error("💡 Instale as dependências: pip install librosa soundfile")
-            return None
-
-        # Mapeamento de tons para semitons
-        tons_semitons = {
-            'C': 0, 'C#': 1, 'Db': 1, 'D': 2, 'D#': 3, 'Eb': 3,
-            'E': 4, 'F': 5, 'F#': 6, 'Gb': 6, 'G': 7, 'G#': 8,
-            'Ab': 8, 'A': 9, 'A#': 10, 'Bb': 10, 'B': 11
-        }
-
-        # Calcular diferença em semitons
-        semitom_original = tons_semitons.get(tom_original, 0)
-        semitom_novo = tons_semitons.get(tom_novo, 0)
-        diferenca_semitons = semitom_novo - semitom_original
-
-        if diferenca_semitons == 0:
-            st.info("ℹ️ Os tons são iguais. Nenhuma modificação necessária.")
-            return audio_bytes  # Sem mudança necessária
-
-        st.info(f"🎵 Alterando tom: {diferenca_semitons:+d} semitons")
-
-        # Criar arquivos temporários
-        temp_input = None
-        temp_output = None
-
-        try:
-            # Salvar áudio em arquivo temporário
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_input:
-                temp_input.write(audio_bytes)
-                temp_input.flush()
-
-                st.info("📁 Carregando áudio...")
-
-                # Carregar áudio com librosa
-                y, sr = librosa.load(temp_input.name, sr=None)
-
-                st.info(f"🎼 Processando áudio: {len(y)} samples, {sr} Hz")
-
-                # Verificar se o áudio foi carregado corretamente
-                if len(y) == 0:
-                    st.error("❌ Áudio vazio ou corrompido")
-                    return None
-
-                # Mudar tom preservando velocidade (pitch shifting)
-                st.info("🔄 Aplicando mudança de tom...")
-                y_shifted = librosa.effects.pitch_shift(y, sr=sr, n_steps=diferenca_semitons)
-
-                # Salvar resultado em arquivo temporário
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_output:
-                    sf.write(temp_output.name, y_shifted, sr)
-
-                    st.info("🎵 Convertendo para MP3...")
-
-                    # Converter de volta para AudioSegment
-                    audio_modificado = AudioSegment.from_wav(temp_output.name)
-
-                    # Converter para bytes
-                    audio_bytes_novo = io.BytesIO()
-                    audio_modificado.export(audio_bytes_novo, format="mp3")
-                    audio_bytes_novo.seek(0)
-
-                    return audio_bytes_novo.getvalue()
-
-        finally:
-            # Limpar arquivos temporários
-            try:
-                if temp_input and os.path.exists(temp_input.name):
-                    os.unlink(temp_input.name)
-                if temp_output and os.path.exists(temp_output.name):
-                    os.unlink(temp_output.name)
-            except Exception as cleanup_error:
-                st.warning(f"⚠️ Erro ao limpar arquivos temporários: {str(cleanup_error)}")
-
-    except ImportError as e:
-        st.error(f"❌ Erro de importação: {str(e)}")
-        st.error("💡 Algumas bibliotecas podem não estar instaladas no ambiente de produção.")
-        st.info("🔄 Tentando método alternativo...")
-        return mudar_tom_alternativo(audio_bytes, tom_original, tom_novo)
-
-    except Exception as e:
-        st.error(f"❌ Erro ao mudar tom da música: {str(e)}")
-        st.error(f"🔍 Tipo do erro: {type(e).__name__}")
-        st.info("🔄 Tentando método alternativo...")
-        return mudar_tom_alternativo(audio_bytes, tom_original, tom_novo)
-
-# Função alternativa para mudança de tom (usando apenas PyDub)
-def mudar_tom_alternativo(audio_bytes, tom_original, tom_novo):
-    """Método alternativo para mudança de tom usando apenas PyDub"""
-    try:
-        st.info("🔄 Usando método alternativo (PyDub)...")
-
-        # Mapeamento de tons para semitons
-        tons_semitons = {
-            'C': 0, 'C#': 1, 'Db': 1, 'D': 2, 'D#': 3, 'Eb': 3,
-            'E': 4, 'F': 5, 'F#': 6, 'Gb': 6, 'G': 7, 'G#': 8,
-            'Ab': 8, 'A': 9, 'A#': 10, 'Bb': 10, 'B': 11
-        }
-
-        # Calcular diferença em semitons
-        semitom_original = tons_semitons.get(tom_original, 0)
-        semitom_novo = tons_semitons.get(tom_novo, 0)
-        diferenca_semitons = semitom_novo - semitom_original
-
-        if diferenca_semitons == 0:
-            return audio_bytes
-
-        # Carregar áudio com PyDub
-        audio = AudioSegment.from_file(io.BytesIO(audio_bytes))
-
-        # Calcular fator de mudança de pitch (aproximação)
-        # Cada semitom = 2^(1/12) ≈ 1.059463
-        pitch_factor = 2 ** (diferenca_semitons / 12.0)
-
-        # Alterar sample rate para simular mudança de pitch
-        new_sample_rate = int(audio.frame_rate * pitch_factor)
-
-        # Aplicar mudança
-        audio_modificado = audio._spawn(
-            audio.raw_data,
-            overrides={"frame_rate": new_sample_rate}
-        ).set_frame_rate(audio.frame_rate)
-
-        # Converter para bytes
-        audio_bytes_novo = io.BytesIO()
-        audio_modificado.export(audio_bytes_novo, format="mp3")
-        audio_bytes_novo.seek(0)
-
-        st.success("✅ Tom alterado usando método alternativo!")
-        st.warning("⚠️ Nota: O método alternativo pode alterar ligeiramente a velocidade.")
-
-        return audio_bytes_novo.getvalue()
-
-    except Exception as e:
-        st.error(f"❌ Erro no método alternativo: {str(e)}")
-        st.error("💡 Tente fazer upload de um arquivo de áudio diferente.")
+    if tarefa["estado"] not in ESTADOS_FINAIS:
+        painel_tarefa(id_tarefa, exibir_parcial)
         return None
 
-# Função para configurar o agente e executar a composição
-def criar_musica(sentimentos, tom, estilo):
-    # Definindo o agente
-    agent_escritor = Agent(
-        role="Compositor de Música Católica",
-        goal="Escreva uma música católica que honre a Santíssima Trindade, a Virgem Maria e os Santos, expressando os seguintes sentimentos: {sentimentos}. A música deve estar no tom {tom} e seguir o estilo {estilo}.",
-        verbose=True,
-        memory=True,
-        llm=llm,
-        backstory="""
-            Você é um compositor católico devoto, formado em música sacra e teologia. Desde a juventude, você se dedica
-            à composição de música litúrgica e devocional, inspirado pela rica tradição musical da Igreja Católica.
-            Seu conhecimento abrange desde o canto gregoriano até a música católica contemporânea, passando pelos grandes
-            mestres como Palestrina, Bach e os compositores de música sacra moderna.
-
-            Você compreende profundamente a liturgia católica, os tempos litúrgicos, as devoções marianas e a veneração
-            aos santos. Suas composições refletem a doutrina católica, incorporando elementos da Escritura Sagrada,
-            da Tradição da Igreja e do Magistério. Você busca criar música que eleve as almas a Deus, honre Nossa Senhora
-            e inspire os fiéis em sua jornada de fé.
-
-            Sua especialidade inclui hinos marianos, cantos litúrgicos, música para adoração eucarística e canções
-            devocionais que respeitem a tradição católica enquanto tocam o coração dos fiéis contemporâneos.
-        """
-    )
+    if tarefa["estado"] == CANCELADA:
+        st.info("✖️ Tarefa cancelada.")
+        return None
 
-    # Definindo a tarefa
-    tarefa_composicao = Task(
-        description=f"""
-            Crie uma música católica inspiradora que honre a tradição da Igreja Católica. A composição deve ser adequada
-            para uso litúrgico, devocional ou em momentos de oração pessoal. A letra deve ser teologicamente sólida,
-            respeitando a doutrina católica, e a melodia deve ser adequada para o canto congregacional.
-
-            Especificações:
-            - Tom musical: {tom} (todas as cifras devem estar neste tom)
-            - Estilo musical: {estilo}
-            - Estrutura: Inclua versos, refrão e uma ponte (se apropriado para o estilo)
-            - Tom emocional: Reverente, esperançoso e espiritualmente edificante
-            - Elementos católicos: Incorporar referências à Santíssima Trindade, Virgem Maria, Santos, Eucaristia ou liturgia
-            - Tradição: Respeitar a rica tradição musical católica
-            - Sentimentos a expressar: {sentimentos}
-        """,
-        expected_output=f"""
-            - Responder, obrigatoriamente, no idioma Português Brasileiro.
-            - A letra completa da música católica, formatada em versos e refrão.
-            - Todas as cifras devem estar no tom {tom} especificado.
-            - Sugestão da melodia básica adequada ao estilo {estilo}.
-            - Cifras completas para acompanhamento instrumental no tom {tom}.
-            - Indicação de tempo litúrgico apropriado (se aplicável).
-            - Referências bíblicas ou doutrinais utilizadas.
-            - Breve descrição da intenção espiritual e uso litúrgico recomendado.
-
-            O texto formatado deve seguir as seguintes regras:
-  			1. Títulos e subtítulos devem estar em negrito, utilizando markdown.
-  			2. O conteúdo deve manter espaçamento adequado e alinhamento claro.
-  			3. Listas devem ser utilizadas para informações estruturadas.
-  			4. Preserve a estrutura musical (versos, refrões, ponte).
-  			5. O resultado deve ser apresentado em formato markdown.
-            6. Incluir seção específica com as cifras no tom {tom}.
-        """,
-        agent=agent_escritor
-    )
+    if tarefa["estado"] != CONCLUIDA:
+        st.error(mensagem_erro)
+        st.error(f"Detalhes do erro: {tarefa['erro']}")
+        return None
 
-    # Criando a tripulação
-    equipe = Crew(
-        agents=[agent_escritor],
-        tasks=[tarefa_composicao],
-        process=Process.sequential
+    return tarefa, sistemas["tarefas"].resultado(id_tarefa)
+
+def exibir_previa_progressiva(previa):
+    """Toca os trechos já renderizados enquanto o restante da música é mixado"""
+    if not isinstance(previa, PreviaProgressiva):
+        return
+    st.caption("🎧 Ouça os trechos prontos enquanto o restante é renderizado:")
+    for segmento in previa.obter_segmentos():
+        st.audio(segmento["dados"], format=segmento["mime"])
+
+def exibir_audio_entrega(entrega, rotulo_download, nome_base=None):
+    """Toca a prévia e oferece o download no formato escolhido na barra lateral.
+
+    O arquivo em qualidade total só é codificado quando o botão é clicado.
+    """
+    dados_previa, mime_previa = entrega.previa()
+    st.audio(dados_previa, format=mime_previa)
+
+    formato, bitrate = formato_download, bitrate_download
+    st.download_button(
+        label=rotulo_download,
+        data=lambda: entrega.arquivo(formato, bitrate),
+        file_name=f"{nome_base}.{FORMATOS_ENTREGA[formato]['extensao']}" if nome_base else entrega.nome_arquivo(formato),
+        mime=entrega.mime(formato),
+        on_click="ignore"
     )
 
-    # Executando a tripulação
-    result = equipe.kickoff(inputs={
-        "sentimentos": sentimentos,
-        "tom": tom,
-        "estilo": estilo
-    })
-
-    return result
-
 # Interface do Streamlit
 st.title("🎵✝️ Compositor de Música Católica")
 st.markdown("*Crie e modifique músicas católicas com IA avançada*")
@@ -494,6 +397,23 @@ estilo_map = {
 }
 estilo = estilo_map[estilo_selecionado]
 
+# Formato dos downloads; o player sempre toca uma prévia leve
+formato_download = st.sidebar.selectbox(
+    "💾 Formato de download:",
+    list(FORMATOS_ENTREGA),
+    index=list(FORMATOS_ENTREGA).index(FORMATO_DOWNLOAD_PADRAO),
+    format_func=lambda formato: FORMATOS_ENTREGA[formato]["rotulo"],
+    help="O arquivo em qualidade total é gerado apenas ao clicar em download"
+)
+bitrate_download = None
+if FORMATOS_ENTREGA[formato_download]["bitrates"]:
+    bitrate_download = st.sidebar.select_slider(
+        "📶 Taxa de bits (kbps):",
+        options=FORMATOS_ENTREGA[formato_download]["bitrates"],
+        value=FORMATOS_ENTREGA[formato_download]["bitrate_padrao"],
+        key=f"bitrate_{formato_download}"
+    )
+
 # Abas principais expandidas
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "🎵 Criar Nova Música",
@@ -533,6 +453,19 @@ with tab1:
         height=100
     )
 
+    # Rascunho rápido ou versão final (modelo escolhido pelo roteador)
+    modo_composicao = st.radio(
+        "🚀 Modo de composição:",
+        ["rascunho", "final"],
+        index=1,
+        horizontal=True,
+        format_func=lambda modo: {
+            "rascunho": f"⚡ Rascunho rápido ({MODELO_RASCUNHO})",
+            "final": f"🎯 Versão final ({MODELO_COMPOSICAO})"
+        }[modo],
+        help="O rascunho prioriza a velocidade; a versão final, a qualidade. Se um modelo falhar, o outro é usado."
+    )
+
     # Configurações avançadas
     with st.expander("🔧 Configurações Avançadas"):
         col_config1, col_config2 = st.columns(2)
@@ -540,10 +473,25 @@ with tab1:
         with col_config1:
             incluir_partituras = st.checkbox("🎼 Gerar partituras", value=True)
             incluir_cifras_detalhadas = st.checkbox("🎸 Cifras detalhadas", value=True)
+            voz_cantada = st.checkbox(
+                "🎶 Voz cantada na melodia",
+                value=False,
+                help="No áudio com voz, a letra é cantada na melodia da partitura em vez de falada"
+            )
 
         with col_config2:
             incluir_coro_satb = st.checkbox("🎭 Arranjo para coro SATB", value=False)
             salvar_automaticamente = st.checkbox("💾 Salvar automaticamente", value=True)
+            exibir_em_tempo_real = st.checkbox(
+                "⚡ Exibir composição em tempo real",
+                value=True,
+                help="Mostra o texto à medida que a IA escreve"
+            )
+            forcar_nova_composicao = st.checkbox(
+                "🔄 Forçar nova composição",
+                value=False,
+                help="Ignora o cache e pede uma composição inédita à IA"
+            )
 
 with tab2:
     st.subheader("🎼 Upload e Modificação de Música")
@@ -560,7 +508,7 @@ with tab2:
         st.success(f"✅ Arquivo carregado: {uploaded_file.name}")
 
         # Player do áudio original
-        st.audio(uploaded_file.getvalue(), format='audio/mp3')
+        st.audio(uploaded_file.getvalue(), format=uploaded_file.type or 'audio/mpeg')
 
         # Configurações para mudança de tom
         col_tom1, col_tom2 = st.columns(2)
@@ -588,40 +536,32 @@ with tab2:
         # Botão para processar
         if st.button("🔄 Mudar Tom da Música", key="mudar_tom"):
             if tom_orig_simples != tom_novo_simples:
-                with st.spinner(f"Mudando tom de {tom_original_upload} para {tom_novo_upload}..."):
-                    try:
-                        audio_modificado = mudar_tom_musica(
-                            uploaded_file.getvalue(),
-                            tom_orig_simples,
-                            tom_novo_simples
-                        )
-
-                        if audio_modificado:
-                            st.success(f"🎉 Tom alterado com sucesso de {tom_original_upload} para {tom_novo_upload}!")
-
-                            # Player do áudio modificado
-                            st.subheader("🎵 Resultado:")
-                            st.audio(audio_modificado, format='audio/mp3')
-
-                            # Botão de download
-                            st.download_button(
-                                label="⬇️ Download da Música Modificada",
-                                data=audio_modificado,
-                                file_name=f"musica_modificada_{tom_novo_simples}.mp3",
-                                mime="audio/mp3"
-                            )
-
-                            # Salvar na sessão
-                            st.session_state.musica_modificada = audio_modificado
-                            st.session_state.tom_modificado = tom_novo_simples
-                        else:
-                            st.error("❌ Erro ao modificar a música.")
-
-                    except Exception as e:
-                        st.error(f"❌ Erro ao processar: {str(e)}")
+                submeter_tarefa(
+                    "mudar_tom", "mudanca_tom", tarefa_mudar_tom,
+                    uploaded_file.getvalue(), tom_orig_simples, tom_novo_simples,
+                    descricao=f"{uploaded_file.name}: {tom_orig_simples} → {tom_novo_simples}"
+                )
             else:
                 st.warning("⚠️ Os tons original e novo são iguais. Nenhuma modificação necessária.")
 
+        concluida = acompanhar_tarefa("mudar_tom", "❌ Erro ao processar a música.")
+        if concluida:
+            _, resultado_tom = concluida
+            audio_modificado = resultado_tom["audio"]
+
+            if audio_modificado:
+                st.success(f"🎉 Tom alterado com sucesso de {resultado_tom['tom_original']} para {resultado_tom['tom_novo']}!")
+
+                # Prévia do áudio modificado e download no formato escolhido
+                st.subheader("🎵 Resultado:")
+                exibir_audio_entrega(audio_modificado, "⬇️ Download da Música Modificada")
+
+                # Salvar na sessão
+                st.session_state.musica_modificada = audio_modificado
+                st.session_state.tom_modificado = resultado_tom["tom_novo"]
+            else:
+                st.error("❌ Erro ao modificar a música.")
+
 # Informações adicionais (fora das abas)
 with st.expander("ℹ️ Informações sobre os estilos e funcionalidades"):
     st.markdown("""
@@ -655,114 +595,213 @@ with tab1:
 
 # Geração da música (aba 1)
 if gerar_musica:
-    with st.spinner("Compondo a música católica..."):
-        try:
-            resultado = criar_musica(sentimentos, tom, estilo)
-
-            st.success("🎉 Música católica composta com sucesso!")
-
-            # Processar e exibir o texto formatado
-            st.markdown("### 📜 Composição Musical")
-            if isinstance(resultado, str):
-                try:
-                    resultado_json = json.loads(resultado)
-                    texto_formatado = resultado_json.get("raw", resultado)
-                except json.JSONDecodeError:
-                    texto_formatado = resultado
-            elif isinstance(resultado, dict):
-                texto_formatado = resultado.get("raw", str(resultado))
-            else:
-                texto_formatado = str(resultado)
+    submeter_tarefa(
+        "musica", "composicao", tarefa_compor_musica,
+        sentimentos, tom, estilo,
+        forcar_nova=forcar_nova_composicao,
+        modo=modo_composicao,
+        em_tempo_real=exibir_em_tempo_real,
+        salvar=salvar_automaticamente,
+        gerar_partitura=incluir_partituras,
+        descricao=f"Música em {tom} ({estilo})"
+    )
 
-            # Exibir o texto formatado
-            st.markdown(texto_formatado)
+def exibir_composicao_parcial(texto_parcial):
+    """Exibe o texto recebido até agora, sem o bloco JSON final"""
+    st.markdown(texto_sem_estrutura(texto_parcial) + " ▌")
 
-            # Extrair letra para uso posterior
-            letra_extraida = extrair_letra_musica(texto_formatado)
+if st.session_state.get("tarefa_musica"):
+    st.markdown("### 📜 Composição Musical")
+concluida = acompanhar_tarefa(
+    "musica", "❌ Ocorreu um erro ao compor a música.", exibir_composicao_parcial
+)
+if concluida:
+    tarefa_musica, resultado_musica = concluida
+    composicao = resultado_musica["composicao"]
+    texto_formatado = resultado_musica["texto"]
+
+    if resultado_musica["erro_estrutura"]:
+        st.warning(f"⚠️ Não foi possível identificar a estrutura da música: {resultado_musica['erro_estrutura']}")
+
+    # Exibir o texto formatado final, sem o bloco JSON
+    st.markdown(texto_sem_estrutura(texto_formatado))
+    if composicao:
+        st.caption(
+            f"🎼 {composicao.titulo} • {len(composicao.secoes)} seções • {composicao.bpm} BPM"
+            + (f" • {composicao.uso_liturgico}" if composicao.uso_liturgico else "")
+        )
+
+    st.success("🎉 Música católica composta com sucesso!")
+    if resultado_musica["do_cache"]:
+        st.info("⚡ Composição recuperada do cache. Marque \"Forçar nova composição\" para gerar outra.")
 
-            # Salvar resultado na sessão para uso posterior
-            st.session_state.ultima_musica = texto_formatado
-            st.session_state.ultima_letra = letra_extraida
-            st.session_state.ultimo_tom = tom
-            st.session_state.ultimo_estilo = estilo
+    if resultado_musica["midi"]:
+        st.download_button(
+            label="⬇️ Download da Partitura (MIDI)",
+            data=resultado_musica["midi"],
+            file_name=f"{composicao.titulo}.mid",
+            mime="audio/midi"
+        )
 
-        except Exception as e:
-            st.error("❌ Ocorreu um erro ao compor a música.")
-            st.error(f"Detalhes do erro: {str(e)}")
+    # Salvar resultado na sessão para uso posterior (uma vez por tarefa)
+    if st.session_state.get("tarefa_musica_aplicada") != tarefa_musica["id"]:
+        st.session_state.ultima_musica = texto_formatado
+        st.session_state.ultima_composicao = composicao
+        st.session_state.ultima_letra = (
+            composicao.letra_texto("\n") if composicao else "Letra não encontrada no texto gerado."
+        )
+        st.session_state.ultimo_tom = resultado_musica["tom"]
+        st.session_state.ultimo_estilo = resultado_musica["estilo"]
+        st.session_state.tarefa_musica_aplicada = tarefa_musica["id"]
 
 # Geração de áudio instrumental (aba 1)
 if gerar_audio_instrumental:
     if 'ultima_musica' not in st.session_state:
         st.warning("⚠️ Primeiro gere uma música antes de criar o áudio!")
     else:
-        with st.spinner("Gerando áudio instrumental..."):
-            try:
-                audio_bytes = gerar_audio_simples(
-                    st.session_state.get('ultimo_tom', tom),
-                    st.session_state.get('ultimo_estilo', estilo)
-                )
-
-                if audio_bytes:
-                    st.success("🎶 Áudio instrumental gerado com sucesso!")
+        submeter_tarefa(
+            "instrumental", "audio_instrumental", tarefa_audio_instrumental,
+            st.session_state.get('ultimo_tom', tom),
+            st.session_state.get('ultimo_estilo', estilo),
+            descricao="Áudio instrumental"
+        )
 
-                    # Player de áudio
-                    st.audio(audio_bytes, format='audio/mp3')
+concluida = acompanhar_tarefa("instrumental", "❌ Ocorreu um erro ao gerar o áudio instrumental.")
+if concluida:
+    _, entrega = concluida
 
-                    # Botão de download
-                    st.download_button(
-                        label="⬇️ Download do Áudio Instrumental",
-                        data=audio_bytes,
-                        file_name=f"instrumental_{tom}_{estilo}.mp3",
-                        mime="audio/mp3"
-                    )
-                else:
-                    st.error("❌ Erro ao gerar o áudio instrumental.")
+    if entrega:
+        st.success("🎶 Áudio instrumental gerado com sucesso!")
 
-            except Exception as e:
-                st.error("❌ Ocorreu um erro ao gerar o áudio instrumental.")
-                st.error(f"Detalhes do erro: {str(e)}")
+        # Prévia no player e download no formato escolhido
+        exibir_audio_entrega(entrega, "⬇️ Download do Áudio Instrumental")
+    else:
+        st.error("❌ Erro ao gerar o áudio instrumental.")
 
 # Geração de áudio com voz (aba 1)
 if gerar_audio_com_letra:
     if 'ultima_letra' not in st.session_state:
         st.warning("⚠️ Primeiro gere uma música antes de criar o áudio com voz!")
     else:
-        with st.spinner("Gerando áudio com voz em português..."):
-            try:
-                letra = st.session_state.get('ultima_letra', '')
-
-                if not letra or letra == "Letra não encontrada no texto gerado.":
-                    st.error("❌ Letra não encontrada. Tente gerar a música novamente.")
-                else:
-                    # Mostrar letra que será cantada
-                    with st.expander("📝 Letra que será cantada:"):
-                        st.write(letra)
-
-                    audio_bytes = gerar_audio_com_voz(
-                        letra,
-                        st.session_state.get('ultimo_tom', tom),
-                        st.session_state.get('ultimo_estilo', estilo)
-                    )
-
-                    if audio_bytes:
-                        st.success("🎤 Áudio com voz gerado com sucesso!")
-
-                        # Player de áudio
-                        st.audio(audio_bytes, format='audio/mp3')
-
-                        # Botão de download
-                        st.download_button(
-                            label="⬇️ Download do Áudio com Voz",
-                            data=audio_bytes,
-                            file_name=f"musica_com_voz_{tom}_{estilo}.mp3",
-                            mime="audio/mp3"
-                        )
-                    else:
-                        st.error("❌ Erro ao gerar o áudio com voz.")
-
-            except Exception as e:
-                st.error("❌ Ocorreu um erro ao gerar o áudio com voz.")
-                st.error(f"Detalhes do erro: {str(e)}")
+        letra = st.session_state.get('ultima_letra', '')
+
+        if not letra or letra == "Letra não encontrada no texto gerado.":
+            st.error("❌ Letra não encontrada. Tente gerar a música novamente.")
+        else:
+            submeter_tarefa(
+                "voz", "audio_com_voz", tarefa_audio_com_voz,
+                st.session_state.get('ultima_composicao') or letra,
+                st.session_state.get('ultimo_tom', tom),
+                st.session_state.get('ultimo_estilo', estilo),
+                "cantada" if voz_cantada else "falada",
+                descricao="Áudio com voz"
+            )
+
+concluida = acompanhar_tarefa(
+    "voz", "❌ Ocorreu um erro ao gerar o áudio com voz.", exibir_parcial=exibir_previa_progressiva
+)
+if concluida:
+    _, entrega = concluida
+
+    # Mostrar letra que será cantada
+    with st.expander("📝 Letra cantada:"):
+        # Quebra de linha do markdown para manter um verso por linha
+        st.write(st.session_state.get('ultima_letra', '').replace("\n", "  \n"))
+
+    if entrega:
+        st.success("🎤 Áudio com voz gerado com sucesso!")
+
+        # Prévia no player e download no formato escolhido
+        exibir_audio_entrega(entrega, "⬇️ Download do Áudio com Voz")
+    else:
+        st.error("❌ Erro ao gerar o áudio com voz.")
+
+# Repertório completo da Missa (aba 1)
+with tab1:
+    with st.expander("⛪ Repertório Completo da Missa"):
+        st.write("Componha todos os cantos da celebração de uma só vez. As composições são feitas em paralelo.")
+
+        itens_padrao = [
+            {"momento": momento, "sentimentos": temas, "tom": tom, "estilo": estilo}
+            for momento, temas in MOMENTOS_MISSA.items()
+        ]
+        itens_repertorio = st.data_editor(
+            itens_padrao,
+            num_rows="dynamic",
+            use_container_width=True,
+            key="itens_repertorio",
+            column_config={
+                "momento": st.column_config.TextColumn("Momento", required=True),
+                "sentimentos": st.column_config.TextColumn("Sentimentos / Temas", width="large"),
+                "tom": st.column_config.SelectboxColumn(
+                    "Tom", options=[tom_map.get(t, t) for t in tons_disponiveis], required=True
+                ),
+                "estilo": st.column_config.SelectboxColumn(
+                    "Estilo", options=list(estilo_map.values()), required=True
+                )
+            }
+        )
+
+        col_lote1, col_lote2 = st.columns(2)
+        with col_lote1:
+            max_concorrencia_lote = st.slider("🔀 Composições simultâneas", 1, 6, 3)
+        with col_lote2:
+            timeout_item_lote = st.slider("⏱️ Tempo limite por canto (s)", 30, 300, 180, step=30)
+
+        compor_repertorio = st.button("⛪ Compor Repertório", use_container_width=True)
+
+    if compor_repertorio:
+        itens_validos = [
+            item for item in itens_repertorio
+            if item.get("momento") and item.get("tom") and item.get("estilo")
+        ]
+
+        if not itens_validos:
+            st.warning("⚠️ Adicione ao menos um canto ao repertório.")
+        else:
+            submeter_tarefa(
+                "repertorio", "repertorio", tarefa_repertorio,
+                itens_validos, max_concorrencia_lote, timeout_item_lote, modo_composicao,
+                descricao=f"Repertório com {len(itens_validos)} cantos"
+            )
+
+    def exibir_canto(resultado):
+        """Exibe um canto do repertório (ou o erro da sua composição)"""
+        st.markdown(f"#### {resultado['momento']}")
+        if resultado["sucesso"]:
+            st.caption(f"{resultado['tom']} • {resultado['estilo']} • {resultado['duracao_segundos']:.1f}s")
+            st.markdown(texto_sem_estrutura(resultado["texto"]))
+        else:
+            st.error(f"❌ {resultado['erro']}")
+
+    def exibir_repertorio_parcial(resultados):
+        """Exibe os cantos concluídos até agora, na ordem da celebração"""
+        for resultado in sorted(resultados, key=lambda r: r["indice"]):
+            exibir_canto(resultado)
+
+    if st.session_state.get("tarefa_repertorio"):
+        st.markdown("### ⛪ Repertório da Celebração")
+    concluida = acompanhar_tarefa(
+        "repertorio", "❌ Ocorreu um erro ao compor o repertório.", exibir_repertorio_parcial
+    )
+    if concluida:
+        tarefa_repertorio_atual, resultado_repertorio = concluida
+        for resultado in resultado_repertorio["resultados"]:
+            exibir_canto(resultado)
+
+        st.success(f"🎉 Repertório composto em {resultado_repertorio['duracao_segundos']:.1f}s!")
+        if st.session_state.get("tarefa_repertorio_aplicada") != tarefa_repertorio_atual["id"]:
+            st.session_state.ultimo_repertorio = [
+                {
+                    "momento": resultado["momento"],
+                    "texto": resultado["texto"],
+                    "letra": extrair_letra_musica(resultado["texto"]),
+                    "tom": resultado["tom"],
+                    "estilo": resultado["estilo"]
+                }
+                for resultado in resultado_repertorio["resultados"] if resultado["sucesso"]
+            ]
+            st.session_state.tarefa_repertorio_aplicada = tarefa_repertorio_atual["id"]
 
 # Aba 3: Favoritos e Playlists
 with tab3:
@@ -883,75 +922,53 @@ with tab4:
 
         # Botão para aplicar mixagem
         if st.button("🎚️ Aplicar Mixagem Avançada", type="primary"):
-            with st.spinner("Aplicando mixagem profissional..."):
-                try:
-                    # Gerar áudios base se não existirem
-                    letra = st.session_state.get('ultima_letra', '')
-                    tom_atual = st.session_state.get('ultimo_tom', 'C')
-                    estilo_atual = st.session_state.get('ultimo_estilo', 'tradicional')
-
-                    # Gerar áudio da voz
-                    audio_voz = sistemas["vozes"].gerar_audio_com_voz(letra, "feminina_adulta")
-                    audio_instrumental = gerar_audio_simples(tom_atual, estilo_atual)
-
-                    if audio_voz and audio_instrumental:
-                        # Aplicar mixagem personalizada
-                        audio_mixado = sistemas["mixer"].mixagem_personalizada(
-                            audio_voz, audio_instrumental,
-                            volume_voz=volume_voz,
-                            volume_instrumental=volume_instrumental,
-                            eq_voz_low=eq_voz_low,
-                            eq_voz_mid=eq_voz_mid,
-                            eq_voz_high=eq_voz_high,
-                            reverb_amount=reverb_amount,
-                            compressor_threshold=compressor
-                        )
-
-                        if audio_mixado:
-                            # Aplicar fade
-                            if fade_duration > 0:
-                                audio_final = sistemas["mixer"].criar_fade_in_out(
-                                    audio_mixado, fade_duration, fade_duration
-                                )
-                            else:
-                                audio_final = audio_mixado
-
-                            st.success("🎉 Mixagem aplicada com sucesso!")
-
-                            # Player
-                            st.audio(audio_final, format='audio/mp3')
-
-                            # Download
-                            st.download_button(
-                                label="⬇️ Download da Mixagem",
-                                data=audio_final,
-                                file_name=f"mixagem_{ambiente_selecionado}_{tom_atual}.mp3",
-                                mime="audio/mp3"
-                            )
-
-                            # Análise do áudio
-                            analise = sistemas["mixer"].analisar_audio(audio_final)
-                            if analise:
-                                with st.expander("📊 Análise do Áudio"):
-                                    col_analise1, col_analise2 = st.columns(2)
-                                    with col_analise1:
-                                        st.metric("Duração", f"{analise['duracao_segundos']:.1f}s")
-                                        st.metric("Volume Médio", f"{analise['volume_medio_db']:.1f} dB")
-                                    with col_analise2:
-                                        st.metric("Pico Máximo", f"{analise['pico_db']:.1f} dB")
-                                        st.metric("Sample Rate", f"{analise['sample_rate']} Hz")
-
-                                    if analise['recomendacoes']:
-                                        st.warning("⚠️ Recomendações:")
-                                        for rec in analise['recomendacoes']:
-                                            st.write(f"• {rec}")
-                        else:
-                            st.error("❌ Erro na mixagem")
-                    else:
-                        st.error("❌ Erro ao gerar áudios base")
-
-                except Exception as e:
-                    st.error(f"❌ Erro na mixagem: {str(e)}")
+            submeter_tarefa(
+                "mixagem", "mixagem", tarefa_mixagem,
+                st.session_state.get('ultima_composicao') or st.session_state.get('ultima_letra', ''),
+                st.session_state.get('ultimo_tom', 'C'),
+                st.session_state.get('ultimo_estilo', 'tradicional'),
+                {
+                    "volume_voz": volume_voz,
+                    "volume_instrumental": volume_instrumental,
+                    "eq_voz_low": eq_voz_low,
+                    "eq_voz_mid": eq_voz_mid,
+                    "eq_voz_high": eq_voz_high,
+                    "reverb_amount": reverb_amount,
+                    "compressor_threshold": compressor
+                },
+                fade_duration,
+                descricao=f"Mixagem ({ambiente_selecionado})"
+            )
+
+        concluida = acompanhar_tarefa("mixagem", "❌ Erro na mixagem.")
+        if concluida:
+            _, resultado_mixagem = concluida
+            audio_final = resultado_mixagem["audio"]
+            tom_atual = st.session_state.get('ultimo_tom', 'C')
+
+            st.success("🎉 Mixagem aplicada com sucesso!")
+
+            # Prévia no player e download no formato escolhido
+            exibir_audio_entrega(
+                audio_final, "⬇️ Download da Mixagem", nome_base=f"mixagem_{ambiente_selecionado}_{tom_atual}"
+            )
+
+            # Análise do áudio
+            analise = resultado_mixagem["analise"]
+            if analise:
+                with st.expander("📊 Análise do Áudio"):
+                    col_analise1, col_analise2 = st.columns(2)
+                    with col_analise1:
+                        st.metric("Duração", f"{analise['duracao_segundos']:.1f}s")
+                        st.metric("Volume Médio", f"{analise['volume_medio_db']:.1f} dB")
+                    with col_analise2:
+                        st.metric("Pico Máximo", f"{analise['pico_db']:.1f} dB")
+                        st.metric("Sample Rate", f"{analise['sample_rate']} Hz")
+
+                    if analise['recomendacoes']:
+                        st.warning("⚠️ Recomendações:")
+                        for rec in analise['recomendacoes']:
+                            st.write(f"• {rec}")
     else:
         st.warning("⚠️ Primeiro crie uma música na aba 'Criar Nova Música' para usar o mixer.")
 
@@ -977,6 +994,114 @@ with tab5:
     with col_stat4:
         st.metric("🎨 Estilo Favorito", stats['estilo_mais_usado'][0])
 
+    # Cache de composições
+    stats_cache = sistemas["cache"].obter_estatisticas()
+    with st.expander("🗄️ Cache de Composições"):
+        col_cache1, col_cache2, col_cache3 = st.columns(3)
+        with col_cache1:
+            st.metric("Composições em cache", stats_cache['total_entradas'])
+        with col_cache2:
+            st.metric("Acertos / Falhas", f"{stats_cache['acertos']} / {stats_cache['falhas']}")
+        with col_cache3:
+            st.metric("Taxa de acerto", f"{stats_cache['taxa_acerto']:.0%}")
+
+        if st.button("🗑️ Limpar cache", key="limpar_cache_composicoes"):
+            sistemas["cache"].limpar()
+            st.success("Cache de composições limpo!")
+
+    # Banco instrumental (só consultado depois do primeiro uso, para não carregá-lo à toa)
+    if sistemas.carregado("instrumental"):
+        stats_banco = sistemas["instrumental"].obter_estatisticas()
+        with st.expander("🎹 Banco Instrumental"):
+            col_banco1, col_banco2, col_banco3 = st.columns(3)
+            with col_banco1:
+                st.metric("Áudios no banco", stats_banco['total_entradas'])
+            with col_banco2:
+                st.metric("Leituras / Renderizações", f"{stats_banco['acertos']} / {stats_banco['renderizacoes']}")
+            with col_banco3:
+                st.metric("Tamanho", f"{stats_banco['total_bytes'] / 1024 / 1024:.1f} MB")
+
+    # Cache de voz (só consultado depois do primeiro uso)
+    if sistemas.carregado("cache_voz"):
+        stats_voz = sistemas["cache_voz"].obter_estatisticas()
+        with st.expander("🗣️ Cache de Voz"):
+            col_voz1, col_voz2, col_voz3 = st.columns(3)
+            with col_voz1:
+                st.metric("Frases em cache", stats_voz['total_entradas'])
+            with col_voz2:
+                st.metric("Acertos / Sínteses", f"{stats_voz['acertos'] + stats_voz['coalescidas']} / {stats_voz['sinteses']}")
+            with col_voz3:
+                st.metric("Taxa de acerto", f"{stats_voz['taxa_acerto']:.0%}")
+
+            from backends_tts import obter_backend_tts
+            st.caption(f"Backend de TTS: {obter_backend_tts().nome} (COMPOSITOR_TTS_BACKEND)")
+
+            if st.button("🗑️ Limpar cache de voz", key="limpar_cache_voz"):
+                sistemas["cache_voz"].limpar()
+                st.success("Cache de voz limpo!")
+
+    # Chamadas ao LLM
+    stats_llm = sistemas["compositor"].controle.obter_estatisticas()
+    with st.expander("🚦 Chamadas ao LLM"):
+        col_llm1, col_llm2, col_llm3 = st.columns(3)
+        with col_llm1:
+            st.metric("Chamadas executadas", stats_llm['executadas'])
+        with col_llm2:
+            st.metric(
+                "Pedidos coalescidos", stats_llm['coalescidas'],
+                help="Pedidos idênticos simultâneos que aproveitaram uma chamada já em andamento"
+            )
+        with col_llm3:
+            st.metric("Repetições por limite de taxa", stats_llm['repeticoes_limite_taxa'])
+        st.caption(
+            f"Em andamento: {stats_llm['em_andamento']} • limite de {stats_llm['max_concorrentes']} simultâneas • "
+            f"coalescência: {stats_llm['taxa_coalescencia']:.0%}"
+        )
+
+    # Latência por modelo (apenas com o backend roteado)
+    obter_latencias = getattr(sistemas["compositor"].backend, "obter_estatisticas", None)
+    if obter_latencias:
+        with st.expander("⏱️ Latência por Modelo"):
+            st.dataframe(
+                [
+                    {
+                        "Modelo": modelo,
+                        "Amostras": dados["amostras"],
+                        "p50 (s)": round(dados["p50_segundos"], 1),
+                        "p95 (s)": round(dados["p95_segundos"], 1),
+                        "Sucessos": dados["sucessos"],
+                        "Erros": dados["erros"],
+                        "Tempo esgotado": dados["timeouts"],
+                        "Como alternativa": dados["fallbacks"]
+                    }
+                    for modelo, dados in obter_latencias().items()
+                ],
+                use_container_width=True
+            )
+
+    # Tarefas em segundo plano
+    with st.expander("⚙️ Tarefas em Segundo Plano"):
+        stats_tarefas = sistemas["tarefas"].obter_estatisticas()
+        col_tarefa1, col_tarefa2, col_tarefa3 = st.columns(3)
+        with col_tarefa1:
+            st.metric("Em andamento", stats_tarefas["pendente"] + stats_tarefas["executando"])
+        with col_tarefa2:
+            st.metric("Concluídas", stats_tarefas["concluida"])
+        with col_tarefa3:
+            st.metric("Com falha", stats_tarefas["falhou"] + stats_tarefas["interrompida"])
+
+        for tarefa in sistemas["tarefas"].listar(limite=10):
+            st.write(
+                f"• **{tarefa['descricao'] or tarefa['tipo']}** - {tarefa['estado']} "
+                f"({tarefa['progresso']:.0%}) em {tarefa['data_criacao'][:16].replace('T', ' ')}"
+            )
+
+    # Carregamento dos sistemas sob demanda
+    with st.expander("💤 Carregamento dos Sistemas"):
+        for nome, tempo in sorted(sistemas.obter_tempos_carregamento().items(), key=lambda item: -item[1]):
+            st.write(f"• **{nome}**: {tempo * 1000:.0f}ms")
+        st.caption("Sistemas não listados ainda não foram usados nesta sessão do servidor.")
+
     # Informações litúrgicas
     st.write("### 📅 Informações Litúrgicas")
     col_lit1, col_lit2 = st.columns(2)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Armazenamento em Disco
+Gravação atômica de arquivos e índice JSON com remoção das entradas menos
+usadas recentemente (LRU), compartilhados pelos caches de composições e de
+voz, pelo banco instrumental e pelas tarefas em segundo plano
+"""
+
+import json
+import os
+import tempfile
+
+def escrever_atomico(caminho, conteudo):
+    """Grava bytes (ou texto, em UTF-8) de forma atômica: arquivo temporário no mesmo diretório + rename"""
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode('utf-8')
+    fd, caminho_temp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(caminho)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(conteudo)
+        os.replace(caminho_temp, caminho)
+    except Exception:
+        if os.path.exists(caminho_temp):
+            os.unlink(caminho_temp)
+        raise
+
+def carregar_indice(caminho, versao=None, descricao="índice"):
+    """Conteúdo do índice JSON, ou None se ausente, ilegível ou de outra versão"""
+    try:
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                indice = json.load(f)
+            if versao is None or indice.get("versao") == versao:
+                return indice
+    except Exception as e:
+        print(f"Erro ao carregar {descricao}: {str(e)}")
+    return None
+
+def salvar_indice(caminho, indice):
+    """Grava o índice JSON de forma atômica"""
+    escrever_atomico(caminho, json.dumps(indice, ensure_ascii=False, indent=2))
+
+def remover_excedentes_lru(entradas, caminho_entrada, max_bytes, max_entradas=None, minimo_entradas=0):
+    """Remove as entradas menos usadas recentemente enquanto algum limite for excedido.
+
+    entradas: dicionário chave -> {"ultimo_acesso", "tamanho_bytes", ...},
+    alterado no lugar; o arquivo de cada entrada removida (caminho_entrada(chave))
+    é apagado. minimo_entradas são mantidas mesmo acima do limite de bytes.
+    Retorna as chaves removidas.
+    """
+    ordem_lru = sorted(entradas, key=lambda c: entradas[c]["ultimo_acesso"])
+    total_bytes = sum(e["tamanho_bytes"] for e in entradas.values())
+    removidas = []
+
+    while len(ordem_lru) > minimo_entradas and (
+        total_bytes > max_bytes or (max_entradas is not None and len(entradas) > max_entradas)
+    ):
+        chave = ordem_lru.pop(0)
+        caminho = caminho_entrada(chave)
+        total_bytes -= entradas[chave]["tamanho_bytes"]
+        del entradas[chave]
+        removidas.append(chave)
+
+        try:
+            os.unlink(caminho)
+        except OSError:
+            pass
+
+    return removidas
+
+# Teste básico
+if __name__ == "__main__":
+    diretorio = tempfile.mkdtemp()
+    caminho_indice = os.path.join(diretorio, "indice.json")
+    entradas = {
+        f"frase{i}": {"ultimo_acesso": f"2024-01-0{i + 1}", "tamanho_bytes": 100}
+        for i in range(3)
+    }
+
+    print("Removidas:", remover_excedentes_lru(entradas, lambda c: os.path.join(diretorio, c), max_bytes=150))
+    salvar_indice(caminho_indice, {"versao": "1", "entradas": entradas})
+    print("Índice recarregado:", carregar_indice(caminho_indice, versao="1"))
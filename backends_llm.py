@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+Backends de LLM para Composição
+Permite compor com o CrewAI, gravar respostas reais em fixtures e
+reproduzi-las offline (com latência artificial) para testes e benchmarks
+"""
+
+import json
+import math
+import os
+import time
+import hashlib
+import threading
+from collections import deque
+from datetime import datetime
+
+from armazenamento import escrever_atomico
+from cache_composicoes import CacheComposicoes
+from composicao_estruturada import FORMATO_JSON_COMPOSICAO, estruturar_markdown
+
+# Composição usada pelo backend stub quando não há fixture disponível
+COMPOSICAO_EXEMPLO = """**Título:** Ave Maria da Esperança
+
+**Verso 1:**
+Maria, Mãe de Jesus
+Estrela da manhã
+Guia-nos com tua luz
+Na jornada cristã
+
+**Refrão:**
+Ave Maria, cheia de graça
+O Senhor é contigo
+Bendita és tu entre as mulheres
+E bendito é o fruto do teu ventre
+
+**Verso 2:**
+Rainha do céu e da terra
+Mãe da divina misericórdia
+Intercede por nós pecadores
+Agora e na hora da nossa morte
+
+**Cifras no tom {tom}:** {cifras}
+
+**Tempo:** Andante (72 BPM)
+
+**Uso litúrgico:** Festas Marianas, estilo {estilo}
+"""
+
+# Modos de composição: modelos em ordem de preferência, cada um com o seu
+# tempo limite (s) por tentativa. No rascunho, vence o modelo com menor
+# latência medida.
+MODOS_COMPOSICAO = {
+    "rascunho": {
+        "modelos": [{"modelo": "gpt-4o-mini", "timeout": 15}, {"modelo": "gpt-4", "timeout": 120}],
+        "preferir_mais_rapido": True
+    },
+    "final": {
+        "modelos": [{"modelo": "gpt-4", "timeout": 120}, {"modelo": "gpt-4o-mini", "timeout": 30}],
+        "preferir_mais_rapido": False
+    }
+}
+
+# Amostras de latência necessárias antes de reordenar os modelos
+MIN_AMOSTRAS_ROTEAMENTO = 5
+
+def percentil(valores, p):
+    """Percentil pelo método do posto mais próximo"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p * len(ordenados) / 100) - 1))
+    return ordenados[indice]
+
+class BackendLLM:
+    """Interface comum dos backends de composição"""
+
+    nome = "base"
+
+    def __init__(self, modelo="", temperatura=0.0):
+        self.modelo = modelo
+        self.temperatura = temperatura
+
+    def compor(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        """Retorna o texto markdown da composição.
+
+        Se ao_receber_trecho for informado, é chamado com o texto acumulado
+        a cada trecho recebido. O modo ("rascunho" ou "final") só é usado
+        por backends que escolhem o modelo por pedido.
+        """
+        raise NotImplementedError
+
+    def modelo_para(self, modo=None):
+        """Modelo usado para o modo (identifica a composição no cache)"""
+        return self.modelo
+
+    def compor_com_modelo(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        """Compõe e retorna (texto, modelo que respondeu).
+
+        Backends que recorrem a outro modelo em caso de falha informam o
+        modelo usado de fato, que pode não ser o preferido do modo.
+        """
+        return self.compor(sentimentos, tom, estilo, momento, ao_receber_trecho, modo), self.modelo_para(modo)
+
+class BackendCrewAI(BackendLLM):
+    """Backend real: compõe com um agente CrewAI"""
+
+    nome = "crewai"
+
+    def __init__(self, modelo="gpt-4", temperatura=0.8):
+        super().__init__(modelo, temperatura)
+        self._llm = None
+
+    @property
+    def llm(self):
+        """Cria o LLM do CrewAI na primeira utilização"""
+        if self._llm is None:
+            from crewai import LLM
+            self._llm = LLM(model=self.modelo, temperature=self.temperatura)
+        return self._llm
+
+    @staticmethod
+    def _texto_parcial_visivel(texto_parcial):
+        """Remove o raciocínio do agente e mantém apenas a resposta em andamento"""
+        marcador = "Final Answer:"
+        if marcador in texto_parcial:
+            return texto_parcial.split(marcador, 1)[1].lstrip()
+        return texto_parcial
+
+    def compor(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        """Compõe executando a tripulação do CrewAI"""
+        from crewai import Agent, Task, Crew, Process
+
+        llm = self.llm
+
+        # Definindo o agente
+        agent_escritor = Agent(
+            role="Compositor de Música Católica",
+            goal="Escreva uma música católica que honre a Santíssima Trindade, a Virgem Maria e os Santos, expressando os seguintes sentimentos: {sentimentos}. A música deve estar no tom {tom} e seguir o estilo {estilo}.",
+            verbose=True,
+            memory=True,
+            llm=llm,
+            backstory="""
+                Você é um compositor católico devoto, formado em música sacra e teologia. Desde a juventude, você se dedica
+                à composição de música litúrgica e devocional, inspirado pela rica tradição musical da Igreja Católica.
+                Seu conhecimento abrange desde o canto gregoriano até a música católica contemporânea, passando pelos grandes
+                mestres como Palestrina, Bach e os compositores de música sacra moderna.
+
+                Você compreende profundamente a liturgia católica, os tempos litúrgicos, as devoções marianas e a veneração
+                aos santos. Suas composições refletem a doutrina católica, incorporando elementos da Escritura Sagrada,
+                da Tradição da Igreja e do Magistério. Você busca criar música que eleve as almas a Deus, honre Nossa Senhora
+                e inspire os fiéis em sua jornada de fé.
+
+                Sua especialidade inclui hinos marianos, cantos litúrgicos, música para adoração eucarística e canções
+                devocionais que respeitem a tradição católica enquanto tocam o coração dos fiéis contemporâneos.
+            """
+        )
+
+        # Definindo a tarefa
+        tarefa_composicao = Task(
+            description=f"""
+                Crie uma música católica inspiradora que honre a tradição da Igreja Católica. A composição deve ser adequada
+                para uso litúrgico, devocional ou em momentos de oração pessoal. A letra deve ser teologicamente sólida,
+                respeitando a doutrina católica, e a melodia deve ser adequada para o canto congregacional.
+
+                Especificações:
+                - Tom musical: {tom} (todas as cifras devem estar neste tom)
+                - Estilo musical: {estilo}
+                - Estrutura: Inclua versos, refrão e uma ponte (se apropriado para o estilo)
+                - Tom emocional: Reverente, esperançoso e espiritualmente edificante
+                - Elementos católicos: Incorporar referências à Santíssima Trindade, Virgem Maria, Santos, Eucaristia ou liturgia
+                - Tradição: Respeitar a rica tradição musical católica
+                - Sentimentos a expressar: {sentimentos}
+                {f"- Momento da celebração: {momento} (o canto deve servir a este momento da Missa)" if momento else ""}
+            """,
+            expected_output=f"""
+                - Responder, obrigatoriamente, no idioma Português Brasileiro.
+                - A letra completa da música católica, formatada em versos e refrão.
+                - Todas as cifras devem estar no tom {tom} especificado.
+                - Sugestão da melodia básica adequada ao estilo {estilo}.
+                - Cifras completas para acompanhamento instrumental no tom {tom}.
+                - Indicação de tempo litúrgico apropriado (se aplicável).
+                - Referências bíblicas ou doutrinais utilizadas.
+                - Breve descrição da intenção espiritual e uso litúrgico recomendado.
+
+                O texto formatado deve seguir as seguintes regras:
+      			1. Títulos e subtítulos devem estar em negrito, utilizando markdown.
+      			2. O conteúdo deve manter espaçamento adequado e alinhamento claro.
+      			3. Listas devem ser utilizadas para informações estruturadas.
+      			4. Preserve a estrutura musical (versos, refrões, ponte).
+      			5. O resultado deve ser apresentado em formato markdown.
+                6. Incluir seção específica com as cifras no tom {tom}.
+                7. Ao final, repetir título, seções da letra (com as cifras de cada linha), BPM e uso litúrgico
+                   em um único bloco JSON, exatamente neste formato:
+{FORMATO_JSON_COMPOSICAO}
+            """,
+            agent=agent_escritor
+        )
+
+        # Criando a tripulação
+        equipe = Crew(
+            agents=[agent_escritor],
+            tasks=[tarefa_composicao],
+            process=Process.sequential,
+            stream=ao_receber_trecho is not None
+        )
+
+        # Executando a tripulação
+        result = equipe.kickoff(inputs={
+            "sentimentos": sentimentos,
+            "tom": tom,
+            "estilo": estilo
+        })
+
+        # Repassar os trechos conforme chegam e aguardar o resultado final
+        if ao_receber_trecho:
+            texto_parcial = ""
+            for trecho in result:
+                texto_parcial += trecho.content
+                ao_receber_trecho(self._texto_parcial_visivel(texto_parcial))
+            result = result.result
+
+        return getattr(result, "raw", None) or str(result)
+
+def chave_fixture(sentimentos, tom, estilo, momento=None):
+    """Gera o nome de fixture para os parâmetros de uma composição"""
+    conteudo = {
+        "sentimentos": CacheComposicoes.normalizar_texto(sentimentos),
+        "tom": CacheComposicoes.normalizar_texto(tom),
+        "estilo": CacheComposicoes.normalizar_texto(estilo),
+        "momento": CacheComposicoes.normalizar_texto(momento or "")
+    }
+    serializado = json.dumps(conteudo, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()[:16]
+
+class BackendGravacao(BackendLLM):
+    """Backend de gravação: repassa para um backend real e salva cada resposta em fixture"""
+
+    nome = "gravacao"
+
+    def __init__(self, backend_real, diretorio="benchmarks/fixtures"):
+        super().__init__(backend_real.modelo, backend_real.temperatura)
+        self.backend_real = backend_real
+        self.diretorio = diretorio
+        os.makedirs(self.diretorio, exist_ok=True)
+
+    def compor(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        """Compõe com o backend real e grava a resposta"""
+        return self.compor_com_modelo(sentimentos, tom, estilo, momento, ao_receber_trecho, modo)[0]
+
+    def compor_com_modelo(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        """Compõe com o backend real e grava a resposta com o modelo que respondeu"""
+        inicio = time.monotonic()
+        texto, modelo = self.backend_real.compor_com_modelo(sentimentos, tom, estilo, momento, ao_receber_trecho, modo)
+        duracao = time.monotonic() - inicio
+
+        fixture = {
+            "entradas": {
+                "sentimentos": sentimentos,
+                "tom": tom,
+                "estilo": estilo,
+                "momento": momento
+            },
+            "texto": texto,
+            "modelo": modelo,
+            "temperatura": self.temperatura,
+            "duracao_segundos": round(duracao, 3),
+            "data_gravacao": datetime.now().isoformat()
+        }
+
+        try:
+            caminho = os.path.join(self.diretorio, f"{chave_fixture(sentimentos, tom, estilo, momento)}.json")
+            with open(caminho, 'w', encoding='utf-8') as f:
+                json.dump(fixture, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Erro ao gravar fixture: {str(e)}")
+
+        return texto, modelo
+
+    def modelo_para(self, modo=None):
+        """Modelo do backend real para o modo"""
+        return self.backend_real.modelo_para(modo)
+
+class BackendStub(BackendLLM):
+    """Backend stub: devolve uma composição fixa com latência artificial"""
+
+    nome = "stub"
+
+    def __init__(self, latencia_segundos=0.0, latencia_primeiro_trecho=None, tamanho_trecho=12):
+        """
+        latencia_segundos: duração total simulada da chamada
+        latencia_primeiro_trecho: tempo até o primeiro trecho (padrão: 20% do total)
+        tamanho_trecho: caracteres por trecho no modo streaming
+        """
+        super().__init__(modelo="stub", temperatura=0.0)
+        self.latencia_segundos = latencia_segundos
+        self.latencia_primeiro_trecho = (
+            latencia_primeiro_trecho if latencia_primeiro_trecho is not None else latencia_segundos * 0.2
+        )
+        self.tamanho_trecho = max(1, tamanho_trecho)
+
+    def _texto_para(self, sentimentos, tom, estilo, momento=None):
+        """Retorna o texto canônico para os parâmetros"""
+        cifras = {
+            "C": "C - G - Am - F", "D": "D - A - Bm - G", "E": "E - B - C#m - A",
+            "F": "F - C - Dm - Bb", "G": "G - D - Em - C", "A": "A - E - F#m - D"
+        }
+        progressao = cifras.get(tom, "I - V - vi - IV")
+        markdown = COMPOSICAO_EXEMPLO.format(tom=tom, estilo=estilo, cifras=progressao)
+        return f"{markdown}\n{self._bloco_estrutura(markdown, progressao, estilo)}\n"
+
+    @staticmethod
+    def _bloco_estrutura(markdown, progressao, estilo):
+        """Monta o bloco JSON final, como pedido ao LLM real"""
+        composicao = estruturar_markdown(markdown)
+        acordes = progressao.split(" - ")
+        estrutura = {
+            "titulo": composicao.titulo,
+            "secoes": [
+                {
+                    "tipo": secao.tipo,
+                    "rotulo": secao.nome,
+                    "linhas": secao.linhas,
+                    "cifras": [acordes[i % len(acordes)] for i in range(len(secao.linhas))]
+                }
+                for secao in composicao.secoes
+            ],
+            "bpm": composicao.bpm,
+            "uso_liturgico": f"Festas Marianas, estilo {estilo}"
+        }
+        return f"```json\n{json.dumps(estrutura, ensure_ascii=False, indent=2)}\n```"
+
+    def _entregar(self, texto, ao_receber_trecho=None, latencia_segundos=None, latencia_primeiro_trecho=None):
+        """Simula a latência do LLM, em streaming ou de uma só vez.
+
+        As latências informadas valem só para esta entrega (padrão: as do backend).
+        """
+        if latencia_segundos is None:
+            latencia_segundos = self.latencia_segundos
+        if latencia_primeiro_trecho is None:
+            latencia_primeiro_trecho = self.latencia_primeiro_trecho
+
+        if not ao_receber_trecho:
+            if latencia_segundos > 0:
+                time.sleep(latencia_segundos)
+            return texto
+
+        trechos = [texto[i:i + self.tamanho_trecho] for i in range(0, len(texto), self.tamanho_trecho)]
+        if latencia_primeiro_trecho > 0:
+            time.sleep(latencia_primeiro_trecho)
+
+        restante = max(0.0, latencia_segundos - latencia_primeiro_trecho)
+        intervalo = restante / len(trechos) if trechos else 0.0
+
+        texto_parcial = ""
+        for trecho in trechos:
+            texto_parcial += trecho
+            ao_receber_trecho(texto_parcial)
+            if intervalo > 0:
+                time.sleep(intervalo)
+
+        return texto
+
+    def compor(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        """Devolve a composição fixa"""
+        return self._entregar(self._texto_para(sentimentos, tom, estilo, momento), ao_receber_trecho)
+
+class BackendReplay(BackendStub):
+    """Backend de replay: reproduz fixtures gravadas com latência configurável"""
+
+    nome = "replay"
+
+    def __init__(self, diretorio="benchmarks/fixtures", latencia_segundos=None, estrito=False, **kwargs):
+        """
+        latencia_segundos: None reproduz a duração registrada na fixture
+        estrito: se True, falha quando não há fixture para os parâmetros
+        """
+        super().__init__(latencia_segundos=latencia_segundos or 0.0, **kwargs)
+        self.modelo = "replay"
+        self.diretorio = diretorio
+        self.latencia_gravada = latencia_segundos is None
+        self.estrito = estrito
+
+    def _carregar_fixture(self, sentimentos, tom, estilo, momento=None):
+        """Carrega a fixture correspondente, se existir"""
+        caminho = os.path.join(self.diretorio, f"{chave_fixture(sentimentos, tom, estilo, momento)}.json")
+        if not os.path.exists(caminho):
+            return None
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def compor(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        """Reproduz a fixture gravada ou, sem fixture, a composição fixa"""
+        fixture = self._carregar_fixture(sentimentos, tom, estilo, momento)
+
+        if fixture is None:
+            if self.estrito:
+                raise KeyError(f"Nenhuma fixture gravada para {sentimentos!r} / {tom} / {estilo}")
+            return super().compor(sentimentos, tom, estilo, momento, ao_receber_trecho)
+
+        if not self.latencia_gravada:
+            return self._entregar(fixture["texto"], ao_receber_trecho)
+
+        # Duração da própria fixture, sem alterar o backend compartilhado entre threads
+        latencia = fixture.get("duracao_segundos", 0.0)
+        return self._entregar(fixture["texto"], ao_receber_trecho, latencia, latencia * 0.2)
+
+class _ErroDoOuvinte(Exception):
+    """Exceção lançada por quem recebe os trechos (ex.: cancelamento da tarefa)"""
+
+    def __init__(self, erro):
+        super().__init__(str(erro))
+        self.erro = erro
+
+class BackendRoteado(BackendLLM):
+    """Backend que escolhe o modelo por pedido e recorre ao outro em caso de falha"""
+
+    nome = "roteado"
+
+    def __init__(self, backends, modos=None, janela_latencias=200, arquivo_latencias=None):
+        """
+        backends: dicionário modelo -> backend
+        modos: configuração dos modos (padrão: MODOS_COMPOSICAO)
+        janela_latencias: amostras de latência mantidas por modelo
+        arquivo_latencias: JSON onde as latências são persistidas (opcional)
+        """
+        self.backends = backends
+        self.modos = modos or MODOS_COMPOSICAO
+        backend_final = self.backends[self.modelo_para("final")]
+        super().__init__(backend_final.modelo, backend_final.temperatura)
+
+        self.arquivo_latencias = arquivo_latencias
+        self._lock = threading.Lock()
+        self.latencias = {modelo: deque(maxlen=janela_latencias) for modelo in backends}
+        self.contadores = {
+            modelo: {"sucessos": 0, "erros": 0, "timeouts": 0, "fallbacks": 0}
+            for modelo in backends
+        }
+        self._carregar_latencias()
+
+    def _config(self, modo=None):
+        """Configuração do modo (modo desconhecido usa o final)"""
+        return self.modos.get(modo or "final", self.modos["final"])
+
+    def _carregar_latencias(self):
+        """Carrega as latências registradas em execuções anteriores"""
+        if not self.arquivo_latencias or not os.path.exists(self.arquivo_latencias):
+            return
+        try:
+            with open(self.arquivo_latencias, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            for modelo, registro in dados.items():
+                if modelo in self.latencias:
+                    self.latencias[modelo].extend(registro.get("latencias", []))
+                    self.contadores[modelo].update(registro.get("contadores", {}))
+        except Exception as e:
+            print(f"Erro ao carregar latências dos modelos: {str(e)}")
+
+    def _salvar_latencias(self):
+        """Persiste as latências (chamado com o lock adquirido)"""
+        if not self.arquivo_latencias:
+            return
+        dados = {
+            modelo: {"latencias": list(self.latencias[modelo]), "contadores": self.contadores[modelo]}
+            for modelo in self.backends
+        }
+        try:
+            escrever_atomico(self.arquivo_latencias, json.dumps(dados))
+        except Exception as e:
+            print(f"Erro ao salvar latências dos modelos: {str(e)}")
+
+    def _registrar(self, modelo, resultado, duracao=None, fallback=False):
+        """Registra o resultado de uma tentativa"""
+        with self._lock:
+            self.contadores[modelo][resultado] += 1
+            if fallback:
+                self.contadores[modelo]["fallbacks"] += 1
+            if duracao is not None:
+                self.latencias[modelo].append(round(duracao, 3))
+            self._salvar_latencias()
+
+    def modelo_para(self, modo=None):
+        """Modelo preferido do modo"""
+        return self._config(modo)["modelos"][0]["modelo"]
+
+    def timeouts(self, modo=None):
+        """Tempo limite (s) de cada modelo do modo"""
+        return {entrada["modelo"]: entrada["timeout"] for entrada in self._config(modo)["modelos"]}
+
+    def ordem_modelos(self, modo=None):
+        """Modelos a tentar, em ordem; no rascunho, o mais rápido (p50) primeiro"""
+        config = self._config(modo)
+        modelos = [entrada["modelo"] for entrada in config["modelos"] if entrada["modelo"] in self.backends]
+
+        if config.get("preferir_mais_rapido"):
+            with self._lock:
+                latencias = {modelo: list(self.latencias[modelo]) for modelo in modelos}
+            if all(len(valores) >= MIN_AMOSTRAS_ROTEAMENTO for valores in latencias.values()):
+                modelos.sort(key=lambda modelo: percentil(latencias[modelo], 50))
+
+        return modelos
+
+    def _compor_com_timeout(self, backend, timeout, argumentos, ao_receber_trecho):
+        """Executa o backend em uma thread, desistindo após o tempo limite"""
+        resultado = {}
+        concluido = threading.Event()
+        ativo = [True]
+
+        def repassar(texto_parcial):
+            # Trechos de uma tentativa abandonada não chegam mais à interface
+            if not ativo[0]:
+                return
+            try:
+                ao_receber_trecho(texto_parcial)
+            except Exception as e:
+                resultado["erro_ouvinte"] = e
+                raise
+
+        def executar():
+            try:
+                resultado["texto"] = backend.compor(*argumentos, repassar if ao_receber_trecho else None)
+            except Exception as e:
+                resultado["erro"] = e
+            finally:
+                concluido.set()
+
+        threading.Thread(target=executar, daemon=True, name=f"llm-{backend.modelo}").start()
+
+        if not concluido.wait(timeout):
+            ativo[0] = False
+            raise TimeoutError(f"{backend.modelo} não respondeu em {timeout}s")
+        if "erro_ouvinte" in resultado:
+            raise _ErroDoOuvinte(resultado["erro_ouvinte"])
+        if "erro" in resultado:
+            raise resultado["erro"]
+        return resultado["texto"]
+
+    def compor(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        """Compõe com o modelo do modo, recorrendo ao próximo em caso de tempo esgotado ou erro"""
+        return self.compor_com_modelo(sentimentos, tom, estilo, momento, ao_receber_trecho, modo)[0]
+
+    def compor_com_modelo(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        """Compõe como em compor e informa qual modelo concluiu a composição"""
+        timeouts = self.timeouts(modo)
+        falhas = []
+        ultimo_erro = None
+
+        for posicao, modelo in enumerate(self.ordem_modelos(modo)):
+            inicio = time.monotonic()
+            try:
+                texto = self._compor_com_timeout(
+                    self.backends[modelo], timeouts[modelo],
+                    (sentimentos, tom, estilo, momento), ao_receber_trecho
+                )
+            except _ErroDoOuvinte as e:
+                raise e.erro
+            except TimeoutError as e:
+                self._registrar(modelo, "timeouts")
+                falhas.append(str(e))
+                ultimo_erro = e
+            except Exception as e:
+                self._registrar(modelo, "erros")
+                falhas.append(f"{modelo}: {str(e)}")
+                ultimo_erro = e
+            else:
+                self._registrar(modelo, "sucessos", time.monotonic() - inicio, fallback=posicao > 0)
+                return texto, modelo
+
+            print(f"Falha no modelo {modelo}, tentando o próximo: {falhas[-1]}")
+
+        raise RuntimeError(f"Nenhum modelo concluiu a composição ({'; '.join(falhas)})") from ultimo_erro
+
+    def obter_estatisticas(self):
+        """Retorna p50/p95 de latência e contadores por modelo"""
+        with self._lock:
+            return {
+                modelo: {
+                    "amostras": len(self.latencias[modelo]),
+                    "p50_segundos": percentil(list(self.latencias[modelo]), 50),
+                    "p95_segundos": percentil(list(self.latencias[modelo]), 95),
+                    **self.contadores[modelo]
+                }
+                for modelo in self.backends
+            }
+
+def criar_backend_llm(tipo=None, modelo="gpt-4", temperatura=0.8, modelo_rascunho=None,
+                      arquivo_latencias=None):
+    """Cria o backend de composição.
+
+    O tipo vem do argumento ou da variável COMPOSITOR_LLM_BACKEND:
+    "crewai" (padrão), "gravacao", "replay" ou "stub". Diretório de fixtures
+    e latência artificial vêm de COMPOSITOR_FIXTURES_DIR e
+    COMPOSITOR_LATENCIA_LLM. Com modelo_rascunho, o CrewAI é roteado entre
+    os dois modelos (rascunho rápido / versão final).
+    """
+    tipo = (tipo or os.getenv("COMPOSITOR_LLM_BACKEND", "crewai")).lower()
+    diretorio = os.getenv("COMPOSITOR_FIXTURES_DIR", "benchmarks/fixtures")
+    latencia = os.getenv("COMPOSITOR_LATENCIA_LLM")
+    latencia = float(latencia) if latencia else None
+
+    def backend_crewai():
+        if not modelo_rascunho or modelo_rascunho == modelo:
+            return BackendCrewAI(modelo, temperatura)
+        def rota(modo, *modelos):
+            # Os modelos escolhidos herdam o tempo limite da posição no modo padrão
+            config = MODOS_COMPOSICAO[modo]
+            return dict(config, modelos=[dict(entrada, modelo=m) for entrada, m in zip(config["modelos"], modelos)])
+
+        modos = {"rascunho": rota("rascunho", modelo_rascunho, modelo), "final": rota("final", modelo, modelo_rascunho)}
+        return BackendRoteado(
+            {m: BackendCrewAI(m, temperatura) for m in (modelo, modelo_rascunho)},
+            modos, arquivo_latencias=arquivo_latencias
+        )
+
+    if tipo == "gravacao":
+        return BackendGravacao(backend_crewai(), diretorio)
+    if tipo == "replay":
+        return BackendReplay(diretorio, latencia_segundos=latencia)
+    if tipo == "stub":
+        return BackendStub(latencia_segundos=latencia or 0.0)
+    return backend_crewai()
+
+# Teste básico
+if __name__ == "__main__":
+    backend = BackendStub(latencia_segundos=1.0)
+
+    print("🤖 BACKENDS DE LLM")
+    print("=" * 30)
+
+    inicio = time.monotonic()
+    primeiro = []
+    texto = backend.compor(
+        "esperança", "G", "mariano",
+        ao_receber_trecho=lambda parcial: primeiro or primeiro.append(time.monotonic() - inicio)
+    )
+    print(f"Primeiro trecho: {primeiro[0]:.2f}s")
+    print(f"Composição completa: {time.monotonic() - inicio:.2f}s ({len(texto)} caracteres)")
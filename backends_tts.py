@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Backends de TTS para as Vozes
+Permite sintetizar a voz pelo serviço do gTTS (rede), por um sintetizador
+local (espeak-ng, sem rede) ou por um stub determinístico para testes e
+benchmarks, escolhido por implantação em COMPOSITOR_TTS_BACKEND.
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from cliente_tts import ErroTTS, obter_cliente_tts
+
+# Executáveis do sintetizador local, em ordem de preferência
+EXECUTAVEIS_ESPEAK = ("espeak-ng", "espeak")
+
+# Vozes do espeak-ng para os idiomas usados pelo gTTS
+VOZES_ESPEAK = {"pt-br": "pt-br", "pt": "pt", "en": "en", "es": "es", "la": "la"}
+
+class BackendTTS:
+    """Interface comum dos backends de TTS"""
+
+    nome = "base"
+    # Formato dos bytes devolvidos por sintetizar (guardados assim no CacheVoz)
+    formato = "mp3"
+
+    def __init__(self, max_paralelas=1):
+        self.max_paralelas = max(1, int(max_paralelas))
+
+    @property
+    def perfil(self):
+        """Identifica a voz produzida, para a chave do CacheVoz"""
+        return self.nome
+
+    def sintetizar(self, texto, lang="pt-br", slow=False):
+        """Retorna o áudio codificado (no formato do backend) de uma frase"""
+        raise NotImplementedError
+
+class BackendGTTS(BackendTTS):
+    """Backend gTTS: serviço de voz do Google Translate, via ClienteTTS"""
+
+    nome = "gtts"
+    formato = "mp3"
+
+    def __init__(self, cliente=None):
+        self.cliente = cliente or obter_cliente_tts()
+        super().__init__(max_paralelas=self.cliente.max_conexoes)
+
+    def sintetizar(self, texto, lang="pt-br", slow=False):
+        return self.cliente.sintetizar_mp3(texto, lang, slow)
+
+def localizar_espeak():
+    """Caminho do espeak-ng (ou espeak) instalado, ou None"""
+    for executavel in EXECUTAVEIS_ESPEAK:
+        caminho = shutil.which(executavel)
+        if caminho:
+            return caminho
+    return None
+
+class BackendEspeak(BackendTTS):
+    """Backend local: espeak-ng em subprocesso, WAV pela saída padrão, sem rede"""
+
+    nome = "espeak"
+    formato = "wav"
+
+    def __init__(self, executavel=None, palavras_por_minuto=160, palavras_por_minuto_lento=110,
+                 max_paralelas=None, timeout=30.0):
+        """
+        executavel: caminho do espeak-ng (padrão: o encontrado no PATH)
+        palavras_por_minuto / palavras_por_minuto_lento: velocidade normal e com slow=True
+        max_paralelas: frases sintetizadas ao mesmo tempo (padrão: núcleos da máquina)
+        """
+        self.executavel = executavel or localizar_espeak()
+        if not self.executavel:
+            raise ErroTTS("espeak-ng não encontrado; instale-o ou use outro COMPOSITOR_TTS_BACKEND")
+        self.palavras_por_minuto = int(palavras_por_minuto)
+        self.palavras_por_minuto_lento = int(palavras_por_minuto_lento)
+        self.timeout = timeout
+        super().__init__(max_paralelas=max_paralelas or os.cpu_count() or 1)
+
+    @property
+    def perfil(self):
+        return f"espeak-{self.palavras_por_minuto}-{self.palavras_por_minuto_lento}"
+
+    def sintetizar(self, texto, lang="pt-br", slow=False):
+        velocidade = self.palavras_por_minuto_lento if slow else self.palavras_por_minuto
+        comando = [
+            self.executavel, "-v", VOZES_ESPEAK.get(str(lang).lower(), lang),
+            "-s", str(velocidade), "-b", "1", "--stdout", "--stdin"
+        ]
+        try:
+            # O texto vai pela entrada padrão, para que frases iniciadas por "-" não virem opções
+            resultado = subprocess.run(comando, input=str(texto).encode("utf-8"), capture_output=True,
+                                       timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise ErroTTS(f"falha ao executar o espeak-ng: {str(e)}")
+        if resultado.returncode != 0 or not resultado.stdout:
+            erro = resultado.stderr.decode("utf-8", errors="replace").strip()
+            raise ErroTTS(f"espeak-ng terminou com código {resultado.returncode}: {erro}")
+        return resultado.stdout
+
+class BackendStubTTS(BackendTTS):
+    """Backend stub: tom determinado pelo texto, com duração proporcional a ele.
+
+    O mesmo texto sempre produz os mesmos bytes; a latência artificial por
+    frase imita o custo de um serviço real nos benchmarks.
+    """
+
+    nome = "stub"
+    formato = "wav"
+
+    def __init__(self, latencia_segundos=0.0, segundos_por_caractere=0.06, taxa_amostragem=24000,
+                 max_paralelas=4):
+        super().__init__(max_paralelas=max_paralelas)
+        self.latencia_segundos = latencia_segundos
+        self.segundos_por_caractere = segundos_por_caractere
+        self.taxa_amostragem = taxa_amostragem
+        self._lock = threading.Lock()
+        self.frases_sintetizadas = 0
+
+    @property
+    def perfil(self):
+        return f"stub-{self.segundos_por_caractere}-{self.taxa_amostragem}"
+
+    def amostras(self, texto, slow=False):
+        """Amostras float32 da frase: harmônicos de uma fundamental tirada do texto,
+        moduladas em sílabas (4 por segundo)"""
+        semente = zlib.crc32(str(texto).encode("utf-8"))
+        segundos = max(0.2, len(str(texto)) * self.segundos_por_caractere * (1.5 if slow else 1.0))
+        t = np.arange(int(segundos * self.taxa_amostragem), dtype=np.float32) / self.taxa_amostragem
+
+        fundamental = 110.0 + semente % 110
+        sinal = sum(np.sin(2 * np.pi * fundamental * harmonico * t) / harmonico for harmonico in range(1, 5))
+        silabas = 0.5 - 0.5 * np.cos(2 * np.pi * 4.0 * t)
+        return (0.3 * sinal * silabas).astype(np.float32)
+
+    def sintetizar(self, texto, lang="pt-br", slow=False):
+        from buffer_audio import BufferAudio
+
+        if self.latencia_segundos:
+            time.sleep(self.latencia_segundos)
+        with self._lock:
+            self.frases_sintetizadas += 1
+        return BufferAudio(self.amostras(texto, slow), self.taxa_amostragem).codificar("wav")
+
+def criar_backend_tts(tipo=None):
+    """Cria o backend de TTS.
+
+    O tipo vem do argumento ou da variável COMPOSITOR_TTS_BACKEND: "gtts"
+    (padrão), "espeak" ou "stub". A latência artificial do stub vem de
+    COMPOSITOR_LATENCIA_TTS. Pedido o espeak sem o espeak-ng instalado, levanta
+    ErroTTS em vez de recorrer ao gTTS, que usaria a rede.
+    """
+    tipo = (tipo or os.getenv("COMPOSITOR_TTS_BACKEND", "gtts")).lower()
+    latencia = os.getenv("COMPOSITOR_LATENCIA_TTS")
+
+    if tipo == "stub":
+        return BackendStubTTS(latencia_segundos=float(latencia) if latencia else 0.0)
+    if tipo == "espeak":
+        return BackendEspeak()
+    return BackendGTTS()
+
+_lock_padrao = threading.Lock()
+_backend_padrao = None
+
+def obter_backend_tts():
+    """Backend de TTS da implantação, compartilhado pelo processo (criado no primeiro uso)"""
+    global _backend_padrao
+    with _lock_padrao:
+        if _backend_padrao is None:
+            _backend_padrao = criar_backend_tts()
+        return _backend_padrao
+
+class SintetizadorFrases:
+    """Classe que sintetiza as frases de uma letra em paralelo, na ordem original"""
+
+    def __init__(self, backend=None, max_paralelas=None):
+        self.backend = backend or obter_backend_tts()
+        self.max_paralelas = max(1, int(max_paralelas or self.backend.max_paralelas))
+
+    def sintetizar(self, frases, lang="pt-br", slow=False, cache_voz=None, ao_medir_frase=None):
+        """Áudio de cada frase, na ordem recebida; frases repetidas são sintetizadas uma vez.
+
+        cache_voz: CacheVoz opcional (só as frases ausentes vão ao backend;
+        as entradas são separadas pelo perfil do backend).
+        ao_medir_frase(medida) recebe, para cada frase distinta, um dicionário
+        com frase, segundos e do_cache, na ordem das frases.
+        """
+        distintas = list(dict.fromkeys(frases))
+
+        def sintetizar_frase(frase):
+            inicio = time.perf_counter()
+            pedidas = []
+
+            def pedir():
+                pedidas.append(frase)
+                return self.backend.sintetizar(frase, lang, slow)
+
+            if cache_voz is None:
+                dados = pedir()
+            else:
+                dados = cache_voz.obter_ou_sintetizar(
+                    frase, lang, slow, self.backend.perfil, pedir, self.backend.formato
+                )
+            medida = {"frase": frase, "segundos": time.perf_counter() - inicio, "do_cache": not pedidas}
+            return dados, medida
+
+        if len(distintas) <= 1:
+            resultados = [sintetizar_frase(frase) for frase in distintas]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_paralelas, len(distintas)),
+                                    thread_name_prefix="tts-frase") as executor:
+                # map devolve na ordem das frases, qualquer que seja a ordem de conclusão
+                resultados = list(executor.map(sintetizar_frase, distintas))
+
+        audios = {}
+        for frase, (dados, medida) in zip(distintas, resultados):
+            audios[frase] = dados
+            if ao_medir_frase:
+                ao_medir_frase(medida)
+        return [audios[frase] for frase in frases]
+
+# Teste básico
+if __name__ == "__main__":
+    print("🗣️ BACKENDS DE TTS")
+    print("=" * 30)
+
+    backend = criar_backend_tts(os.getenv("COMPOSITOR_TTS_BACKEND", "stub"))
+    frases = ["Cantai ao Senhor um canto novo", "Aleluia, aleluia", "Ele fez maravilhas", "Aleluia, aleluia"]
+    try:
+        audios = SintetizadorFrases(backend).sintetizar(
+            frases, ao_medir_frase=lambda m: print(f"  {m['segundos'] * 1000:6.0f}ms  {m['frase']}")
+        )
+        print(f"✅ {backend.nome}: {len(audios)} frases, {sum(len(a) for a in audios)} bytes ({backend.formato})")
+    except ErroTTS as e:
+        print(f"❌ {str(e)}")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Banco Instrumental
+Bases instrumentais pré-renderizadas em disco, uma por combinação de tom,
+progressão, taxa de amostragem e formato, descritas em um manifesto e lidas
+por mapeamento de memória. Além das amostras, guarda a prévia do player e o
+download no formato padrão já codificados, de modo que o pedido de uma base
+instrumental é só a leitura de arquivos. Pode ser pré-aquecido na construção
+do container:
+
+    python banco_instrumental.py --pre-aquecer --formatos pcm previa mp3
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import mmap
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from armazenamento import carregar_indice, escrever_atomico, salvar_indice
+from buffer_audio import BufferAudio
+from config import ESTILOS_CATOLICOS
+from formatos_entrega import (
+    AudioEntrega, FORMATOS_ENTREGA, FORMATO_DOWNLOAD_PADRAO, PERFIL_PREVIA, codificar_previa, normalizar_bitrate
+)
+from gerador_audio import TONS_FREQUENCIAS
+from sintetizador_acordes import (
+    VERSAO_SINTETIZADOR, TAXA_AMOSTRAGEM_PADRAO, DURACAO_ACORDE_PADRAO, BaseInstrumental,
+    sintetizar_progressao, progressao_do_estilo, para_audio_segment
+)
+
+# Tons e estilos oferecidos na interface
+TONS_BANCO = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+ESTILOS_BANCO = list(ESTILOS_CATOLICOS)
+
+# "pcm" guarda as amostras float32 (.npy); "previa" a prévia do player (PERFIL_PREVIA);
+# os demais são formatos de entrega, na taxa de bits padrão do download
+FORMATO_PCM = "pcm"
+FORMATO_PREVIA = "previa"
+FORMATOS_PADRAO = (FORMATO_PCM, FORMATO_PREVIA, FORMATO_DOWNLOAD_PADRAO)
+
+class BancoInstrumental:
+    """Classe que guarda e entrega as bases instrumentais pré-renderizadas"""
+
+    def __init__(self, diretorio="banco_instrumental", duracao_acorde=DURACAO_ACORDE_PADRAO,
+                 taxa_amostragem=TAXA_AMOSTRAGEM_PADRAO):
+        self.diretorio = diretorio
+        self.duracao_acorde = duracao_acorde
+        self.taxa_amostragem = taxa_amostragem
+        self.arquivo_manifesto = os.path.join(diretorio, "manifesto.json")
+        self._lock = threading.Lock()
+        self._locks_renderizacao = {}
+        self.estatisticas = {"acertos": 0, "renderizacoes": 0, "segundos_renderizando": 0.0}
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.manifesto = carregar_indice(
+            self.arquivo_manifesto, VERSAO_SINTETIZADOR, "manifesto do banco instrumental"
+        ) or {"versao": VERSAO_SINTETIZADOR, "entradas": {}}
+
+    def _salvar_manifesto(self):
+        """Salva o manifesto no disco (chamado com o lock adquirido)"""
+        salvar_indice(self.arquivo_manifesto, self.manifesto)
+
+    def chave(self, tom, estilo, formato, taxa_amostragem=None):
+        """Chave do áudio renderizado; estilos com a mesma progressão compartilham a chave"""
+        conteudo = {
+            "frequencia": round(TONS_FREQUENCIAS.get(tom, 440.00), 2),
+            "graus": progressao_do_estilo(estilo),
+            "duracao_acorde": float(self.duracao_acorde),
+            "taxa_amostragem": int(taxa_amostragem or self.taxa_amostragem),
+            "formato": formato,
+            "versao_sintetizador": VERSAO_SINTETIZADOR
+        }
+        # A codificação também identifica o arquivo: mudar o perfil da prévia ou o bitrate gera outro
+        if formato == FORMATO_PREVIA:
+            conteudo["perfil"] = PERFIL_PREVIA
+        elif formato != FORMATO_PCM:
+            conteudo["bitrate_kbps"] = normalizar_bitrate(formato)
+        serializado = json.dumps(conteudo, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(serializado.encode('utf-8')).hexdigest()[:32]
+
+    def _caminho(self, chave, formato):
+        if formato == FORMATO_PCM:
+            extensao = "npy"
+        elif formato == FORMATO_PREVIA:
+            extensao = f"previa.{FORMATOS_ENTREGA[PERFIL_PREVIA['formato']]['extensao']}"
+        else:
+            extensao = formato
+        return os.path.join(self.diretorio, f"{chave}.{extensao}")
+
+    def _garantir(self, tom, estilo, formato, taxa_amostragem):
+        """Renderiza o áudio se ainda não estiver no banco e retorna o caminho do arquivo"""
+        taxa_amostragem = int(taxa_amostragem or self.taxa_amostragem)
+        chave = self.chave(tom, estilo, formato, taxa_amostragem)
+        caminho = self._caminho(chave, formato)
+
+        with self._lock:
+            if chave in self.manifesto["entradas"] and os.path.exists(caminho):
+                self.estatisticas["acertos"] += 1
+                return caminho
+            lock_renderizacao = self._locks_renderizacao.setdefault(chave, threading.Lock())
+
+        # Pedidos simultâneos da mesma chave renderizam uma única vez
+        with lock_renderizacao:
+            with self._lock:
+                if chave in self.manifesto["entradas"] and os.path.exists(caminho):
+                    self.estatisticas["acertos"] += 1
+                    return caminho
+
+            inicio = time.perf_counter()
+            amostras = sintetizar_progressao(
+                TONS_FREQUENCIAS.get(tom, 440.00), progressao_do_estilo(estilo),
+                duracao_acorde=self.duracao_acorde, taxa_amostragem=taxa_amostragem
+            )
+            if formato == FORMATO_PCM:
+                conteudo = _npy_bytes(amostras)
+            elif formato == FORMATO_PREVIA:
+                conteudo, _ = codificar_previa(BufferAudio(amostras, taxa_amostragem))
+            else:
+                # Os mesmos bytes que AudioEntrega.arquivo produziria para o download
+                conteudo = BufferAudio(amostras, taxa_amostragem).codificar(formato, normalizar_bitrate(formato))
+            escrever_atomico(caminho, conteudo)
+            duracao = time.perf_counter() - inicio
+
+            with self._lock:
+                self.manifesto["entradas"][chave] = {
+                    "arquivo": os.path.basename(caminho),
+                    "tom": tom,
+                    "graus": progressao_do_estilo(estilo),
+                    "formato": formato,
+                    "taxa_amostragem": taxa_amostragem,
+                    "duracao_ms": int(len(amostras) * 1000 / taxa_amostragem),
+                    "tamanho_bytes": len(conteudo),
+                    "data_criacao": datetime.now().isoformat()
+                }
+                self.estatisticas["renderizacoes"] += 1
+                self.estatisticas["segundos_renderizando"] += duracao
+                self._salvar_manifesto()
+                self._locks_renderizacao.pop(chave, None)
+            return caminho
+
+    def obter_bytes(self, tom, estilo="tradicional", formato=FORMATO_DOWNLOAD_PADRAO, taxa_amostragem=None):
+        """Bytes da base instrumental no formato indicado ou "previa" (renderizada no primeiro pedido)"""
+        caminho = self._garantir(tom, estilo, formato, taxa_amostragem)
+        with open(caminho, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                return mapa[:]
+
+    def obter_amostras(self, tom, estilo="tradicional", taxa_amostragem=None):
+        """Amostras float32 da base instrumental, mapeadas em memória (somente leitura)"""
+        caminho = self._garantir(tom, estilo, FORMATO_PCM, taxa_amostragem)
+        return np.load(caminho, mmap_mode='r')
+
+    def obter_buffer(self, tom, estilo="tradicional", taxa_amostragem=None):
+        """Base instrumental como BufferAudio, sem decodificação"""
+        taxa_amostragem = int(taxa_amostragem or self.taxa_amostragem)
+        return BufferAudio(self.obter_amostras(tom, estilo, taxa_amostragem), taxa_amostragem)
+
+    def obter_audio_segment(self, tom, estilo="tradicional", taxa_amostragem=None):
+        """Base instrumental como AudioSegment, a partir das amostras do banco"""
+        taxa_amostragem = int(taxa_amostragem or self.taxa_amostragem)
+        return para_audio_segment(self.obter_amostras(tom, estilo, taxa_amostragem), taxa_amostragem)
+
+    def obter_entrega(self, tom, estilo="tradicional", nome_base=None, taxa_amostragem=None):
+        """AudioEntrega da base com a prévia e o download padrão lidos do banco, sem codificar.
+
+        Outros formatos de download são codificados no clique, a partir das amostras.
+        """
+        entrega = AudioEntrega(self.obter_buffer(tom, estilo, taxa_amostragem),
+                               nome_base or f"instrumental_{tom}_{estilo}")
+        entrega.guardar_previa(self.obter_bytes(tom, estilo, FORMATO_PREVIA, taxa_amostragem),
+                               FORMATOS_ENTREGA[PERFIL_PREVIA["formato"]]["mime"])
+        entrega.guardar_arquivo(self.obter_bytes(tom, estilo, FORMATO_DOWNLOAD_PADRAO, taxa_amostragem),
+                                FORMATO_DOWNLOAD_PADRAO)
+        return entrega
+
+    def obter_base(self, tom, estilo="tradicional", taxa_amostragem=None):
+        """Base com a configuração do banco, para renderizar sob medida (durações variam, não vão ao disco)"""
+        return BaseInstrumental(
+            TONS_FREQUENCIAS.get(tom, 440.00), tuple(progressao_do_estilo(estilo)),
+            self.duracao_acorde, int(taxa_amostragem or self.taxa_amostragem)
+        )
+
+    def pre_aquecer(self, tons=None, estilos=None, formatos=FORMATOS_PADRAO, taxas_amostragem=None,
+                    ao_informar=None):
+        """Renderiza todas as combinações ainda ausentes; retorna quantas foram criadas"""
+        combinacoes = [
+            (tom, estilo, formato, taxa)
+            for tom in (tons or TONS_BANCO)
+            for estilo in (estilos or ESTILOS_BANCO)
+            for formato in formatos
+            for taxa in (taxas_amostragem or [self.taxa_amostragem])
+        ]
+        antes = self.estatisticas["renderizacoes"]
+
+        for indice, (tom, estilo, formato, taxa) in enumerate(combinacoes, 1):
+            self._garantir(tom, estilo, formato, taxa)
+            if ao_informar:
+                ao_informar(indice, len(combinacoes), f"{tom} {estilo} {formato} {taxa} Hz")
+
+        return self.estatisticas["renderizacoes"] - antes
+
+    def limpar(self):
+        """Remove todos os áudios do banco"""
+        with self._lock:
+            for entrada in self.manifesto["entradas"].values():
+                try:
+                    os.unlink(os.path.join(self.diretorio, entrada["arquivo"]))
+                except OSError:
+                    pass
+            self.manifesto = {"versao": VERSAO_SINTETIZADOR, "entradas": {}}
+            self._salvar_manifesto()
+
+    def obter_estatisticas(self):
+        """Retorna ocupação do banco e contadores de acertos e renderizações"""
+        with self._lock:
+            entradas = self.manifesto["entradas"].values()
+            estatisticas = dict(self.estatisticas)
+            estatisticas["total_entradas"] = len(self.manifesto["entradas"])
+            estatisticas["total_bytes"] = sum(entrada["tamanho_bytes"] for entrada in entradas)
+        return estatisticas
+
+def _npy_bytes(amostras):
+    """Serializa as amostras no formato .npy (lido depois com mmap_mode)"""
+    buffer = io.BytesIO()
+    np.save(buffer, amostras)
+    return buffer.getvalue()
+
+def main():
+    """Pré-aquecimento do banco pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Banco de bases instrumentais pré-renderizadas")
+    parser.add_argument("--diretorio", default=os.getenv("COMPOSITOR_BANCO_INSTRUMENTAL", "banco_instrumental"))
+    parser.add_argument("--pre-aquecer", action="store_true", help="renderiza todas as combinações de tom e estilo")
+    parser.add_argument("--formatos", nargs="+", default=list(FORMATOS_PADRAO))
+    parser.add_argument("--taxas-amostragem", nargs="+", type=int, default=[TAXA_AMOSTRAGEM_PADRAO])
+    args = parser.parse_args()
+
+    banco = BancoInstrumental(args.diretorio)
+
+    print("🎹 BANCO INSTRUMENTAL")
+    print("=" * 30)
+
+    if args.pre_aquecer:
+        inicio = time.perf_counter()
+        criadas = banco.pre_aquecer(formatos=args.formatos, taxas_amostragem=args.taxas_amostragem)
+        print(f"Renderizadas: {criadas} em {time.perf_counter() - inicio:.1f}s")
+
+    estatisticas = banco.obter_estatisticas()
+    print(f"Entradas: {estatisticas['total_entradas']}")
+    print(f"Tamanho: {estatisticas['total_bytes'] / 1024 / 1024:.1f} MB")
+
+if __name__ == "__main__":
+    main()
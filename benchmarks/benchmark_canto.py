@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Voz Cantada
+Mede o tempo para cantar um hino inteiro na melodia do GeradorPartituras:
+o caminho sílaba por sílaba (um AudioSegment por sílaba, altura com
+librosa.yin, librosa.effects.time_stretch e pitch_shift em cada uma) contra
+voz_cantada (todas as linhas em uma análise e uma ressíntese vetorizadas).
+O TTS é o backend stub, sem acesso à rede; o tempo de síntese não entra.
+
+Uso:
+    python benchmarks/benchmark_canto.py --estrofes 1 4 8 --execucoes 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+
+from backends_tts import BackendStubTTS
+from buffer_audio import BufferAudio
+from voz_cantada import MULTIPLO_FIM_DE_LINHA, cantar, notas_da_melodia, silabas
+
+ESTROFE = [
+    "Cantai ao Senhor um canto novo",
+    "Cantai ao Senhor, terra inteira",
+    "Anunciai dia a dia a sua salvação",
+    "Aleluia, aleluia"
+]
+
+def canto_por_silaba(linhas, letra, frequencias, duracoes):
+    """Caminho ingênuo: cada sílaba (divisão igual da linha) processada e concatenada separadamente"""
+    import librosa
+
+    taxa = linhas[0].taxa_amostragem
+    audio = AudioSegment.empty()
+    indice = 0
+    for linha, texto in zip(linhas, letra):
+        num_silabas = max(1, len(silabas(texto)))
+        for numero, trecho in enumerate(np.array_split(linha.amostras, num_silabas)):
+            nota = indice % len(frequencias)
+            duracao = duracoes[nota] * (MULTIPLO_FIM_DE_LINHA if numero == num_silabas - 1 else 1.0)
+            f0 = float(np.median(librosa.yin(trecho, fmin=70, fmax=400, sr=taxa, frame_length=1024)))
+            oitava = np.round(np.log2(f0 / frequencias[nota]))
+            semitons = 12 * np.log2(frequencias[nota] * 2 ** oitava / f0)
+            trecho = librosa.effects.time_stretch(trecho, rate=len(trecho) / (duracao * taxa))
+            trecho = librosa.effects.pitch_shift(trecho, sr=taxa, n_steps=float(semitons))
+            audio += BufferAudio(trecho.astype(np.float32), taxa).para_audio_segment()
+            indice += 1
+    return audio
+
+def canto_vetorizado(linhas, letra, frequencias, duracoes):
+    """voz_cantada: todas as sílabas em uma passada"""
+    return cantar([linha.amostras for linha in linhas], linhas[0].taxa_amostragem, frequencias, duracoes,
+                  [len(silabas(texto)) for texto in letra])
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da voz cantada")
+    parser.add_argument("--estrofes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--execucoes", type=int, default=3)
+    parser.add_argument("--tom", default="G")
+    parser.add_argument("--estilo", default="mariano")
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    backend = BackendStubTTS()
+    frequencias, duracoes = notas_da_melodia(args.tom, args.estilo)
+
+    print("🎶 BENCHMARK DA VOZ CANTADA")
+    print("=" * 30)
+    print(f"{'estrofes':>8}{'sílabas':>9}{'método':>14}{'média':>11}{'p50':>11}{'duração':>10}")
+
+    relatorio = {"execucoes": args.execucoes, "tom": args.tom, "estilo": args.estilo, "resultados": []}
+    for num_estrofes in args.estrofes:
+        letra = ESTROFE * num_estrofes
+        linhas = [BufferAudio.de_bytes(backend.sintetizar(texto), backend.formato) for texto in letra]
+        num_silabas = sum(len(silabas(texto)) for texto in letra)
+
+        for nome, funcao in (("por_silaba", canto_por_silaba), ("vetorizado", canto_vetorizado)):
+            tempos = []
+            for _ in range(args.execucoes):
+                inicio = time.perf_counter()
+                resultado = funcao(linhas, letra, frequencias, duracoes)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            duracao = BufferAudio.de_audio(resultado).duracao_segundos if nome == "por_silaba" \
+                else len(resultado) / linhas[0].taxa_amostragem
+
+            relatorio["resultados"].append({
+                "estrofes": num_estrofes,
+                "silabas": num_silabas,
+                "metodo": nome,
+                "media_ms": statistics.mean(tempos),
+                "p50_ms": statistics.median(tempos),
+                "duracao_segundos": duracao
+            })
+            print(f"{num_estrofes:>8}{num_silabas:>9}{nome:>14}{statistics.mean(tempos):>9.1f}ms"
+                  f"{statistics.median(tempos):>9.1f}ms{duracao:>9.1f}s")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Codec de Áudio
+Compara codificação e decodificação no próprio processo (libsndfile) com o
+caminho do pydub (um subprocesso do ffmpeg por chamada), e mede codificações
+MP3 simultâneas, cada uma na thread de quem pede.
+
+Uso:
+    python benchmarks/benchmark_codec.py --execucoes 10 --segundos 30
+    python benchmarks/benchmark_codec.py --simultaneas 8 --saida-json codec.json
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+
+import codec_audio
+from buffer_audio import BufferAudio
+from gerador_audio import TONS_FREQUENCIAS
+from sintetizador_acordes import progressao_do_estilo, sintetizar_progressao
+
+def codificar_pydub(buffer, formato):
+    """Caminho anterior: AudioSegment.export (ffmpeg, exceto WAV)"""
+    saida = io.BytesIO()
+    buffer.para_audio_segment().export(saida, format=formato)
+    return saida.getvalue()
+
+def decodificar_pydub(dados, formato):
+    """Caminho anterior: AudioSegment.from_file (ffmpeg, exceto WAV)"""
+    return AudioSegment.from_file(io.BytesIO(dados), format=formato)
+
+def medir(funcao, execucoes):
+    """p50 (ms) das execuções, ou None se o caminho não estiver disponível"""
+    tempos = []
+    try:
+        funcao()  # aquecimento
+        for _ in range(execucoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+    except Exception as e:
+        print(f"  indisponível: {type(e).__name__}: {str(e)[:80]}")
+        return None
+    return statistics.median(tempos)
+
+def medir_simultaneas(buffer, simultaneas):
+    """Tempo total (ms) de N codificações MP3 disparadas ao mesmo tempo"""
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=simultaneas) as executor:
+        list(executor.map(lambda _: buffer.codificar("mp3"), range(simultaneas)))
+    return (time.perf_counter() - inicio) * 1000
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark do codec de áudio")
+    parser.add_argument("--execucoes", type=int, default=5)
+    parser.add_argument("--segundos", type=float, default=30.0, help="duração do áudio de teste")
+    parser.add_argument("--simultaneas", type=int, default=4, help="codificações MP3 simultâneas")
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    # Base instrumental repetida até a duração pedida
+    graus = progressao_do_estilo("tradicional")
+    repeticoes = max(1, int(round(args.segundos / (2.0 * len(graus)))))
+    amostras = sintetizar_progressao(TONS_FREQUENCIAS["G"], graus * repeticoes)
+    buffer = BufferAudio(amostras, 44100)
+
+    print("🎚️ BENCHMARK DO CODEC DE ÁUDIO")
+    print("=" * 30)
+    print(f"Áudio de {buffer.duracao_segundos:.0f}s, {args.execucoes} execuções (p50 em ms)")
+    print(f"Formatos no processo: {', '.join(codec_audio.obter_estatisticas()['formatos_no_processo'])}")
+
+    relatorio = {"segundos_audio": buffer.duracao_segundos, "formatos": {}}
+    for formato in codec_audio.FORMATOS_SOUNDFILE:
+        print(f"\n{formato}:")
+        dados = buffer.codificar(formato)
+        relatorio["formatos"][formato] = {
+            "codificar_no_processo": medir(lambda: buffer.codificar(formato), args.execucoes),
+            "codificar_pydub": medir(lambda: codificar_pydub(buffer, formato), args.execucoes),
+            "decodificar_no_processo": medir(lambda: BufferAudio.de_bytes(dados), args.execucoes),
+            "decodificar_pydub": medir(lambda: decodificar_pydub(dados, formato), args.execucoes)
+        }
+        for caminho, tempo in relatorio["formatos"][formato].items():
+            print(f"  {caminho:<26}{'—' if tempo is None else f'{tempo:.1f}':>8}")
+
+    serial = medir_simultaneas(buffer, 1) * args.simultaneas
+    paralelo = medir_simultaneas(buffer, args.simultaneas)
+    relatorio["mp3_simultaneas"] = {
+        "quantidade": args.simultaneas,
+        "serial_estimado_ms": serial,
+        "simultaneas_ms": paralelo
+    }
+    print(f"\n{args.simultaneas} MP3 simultâneos: {paralelo:.0f}ms vs {serial:.0f}ms em série")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+if __name__ == "__main__":
+    main()
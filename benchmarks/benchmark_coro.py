@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Coro Virtual
+Compara o coro antigo, com uma síntese de TTS, ajustes de voz e overlay
+por voz, com o coro derivado de uma única síntese (coro_virtual), para
+coros de tamanhos diferentes. O TTS é o backend stub com latência
+artificial por frase, sem acesso à rede.
+
+Uso:
+    python benchmarks/benchmark_coro.py --vozes 2 8 16 --latencia-tts 0.3
+    python benchmarks/benchmark_coro.py --execucoes 5 --saida-json coro.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+from pydub.effects import normalize
+
+from backends_tts import BackendStubTTS
+from gerador_audio import sintetizar_buffer_voz
+from sistema_vozes import SistemaVozes
+
+LETRA = """Cantai ao Senhor um canto novo
+Cantai ao Senhor, terra inteira
+Aleluia, aleluia
+Anunciai dia a dia a sua salvação
+Aleluia, aleluia"""
+
+def coro_por_voz(vozes, backend, num_vozes, tipo_coro="coro_misto", delay_entre_vozes=500):
+    """Implementação anterior: TTS, ajustes e overlay para cada voz do coro"""
+    naipes = vozes.configuracoes_coro[tipo_coro]
+    audio_final = None
+    for i in range(num_vozes):
+        config_voz = vozes.tipos_voz[naipes[i % len(naipes)]]
+        audio = sintetizar_buffer_voz(LETRA, config_voz["lang"], config_voz["slow"], backend_tts=backend)
+        audio = vozes._aplicar_ajustes_voz(audio, config_voz, 1.0).para_audio_segment()
+        audio = AudioSegment.silent(duration=delay_entre_vozes * (i % len(naipes))) + audio
+        if audio_final is None:
+            audio_final = audio
+            continue
+        duracao_maxima = max(len(audio_final), len(audio))
+        audio_final += AudioSegment.silent(duracao_maxima - len(audio_final))
+        audio += AudioSegment.silent(duracao_maxima - len(audio))
+        audio_final = audio_final.overlay(audio - 3)
+    return normalize(audio_final)
+
+def coro_uma_sintese(vozes, backend, num_vozes, tipo_coro="coro_misto"):
+    """Coro derivado de uma única síntese (SistemaVozes.gerar_buffer_coro)"""
+    return vozes.gerar_buffer_coro(LETRA, tipo_coro, num_vozes=num_vozes, semente=1)
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark do coro virtual")
+    parser.add_argument("--vozes", type=int, nargs="+", default=[2, 8, 16])
+    parser.add_argument("--execucoes", type=int, default=3)
+    parser.add_argument("--latencia-tts", type=float, default=0.3, help="latência artificial por frase (s)")
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    backend = BackendStubTTS(latencia_segundos=args.latencia_tts)
+    vozes = SistemaVozes(backend_tts=backend)
+
+    print("🎶 BENCHMARK DO CORO VIRTUAL")
+    print("=" * 30)
+    print(f"{'vozes':>6}{'método':>18}{'média':>11}{'p50':>11}{'sínteses':>10}")
+
+    relatorio = {"execucoes": args.execucoes, "latencia_tts": args.latencia_tts, "resultados": []}
+    for num_vozes in args.vozes:
+        for nome, funcao in (("por_voz", coro_por_voz), ("uma_sintese", coro_uma_sintese)):
+            tempos = []
+            sinteses_antes = backend.frases_sintetizadas
+            for _ in range(args.execucoes):
+                inicio = time.perf_counter()
+                funcao(vozes, backend, num_vozes)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            sinteses = (backend.frases_sintetizadas - sinteses_antes) / args.execucoes
+
+            relatorio["resultados"].append({
+                "vozes": num_vozes,
+                "metodo": nome,
+                "media_ms": statistics.mean(tempos),
+                "p50_ms": statistics.median(tempos),
+                "sinteses_por_coro": sinteses
+            })
+            print(f"{num_vozes:>6}{nome:>18}{statistics.mean(tempos):>9.1f}ms"
+                  f"{statistics.median(tempos):>9.1f}ms{sinteses:>10.0f}")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Base com Duração Exata
+Compara duas formas de cobrir a voz com o instrumental: repetir a progressão
+renderizada e cortar na duração da voz (implementação anterior, com pydub)
+e renderizar a base sob medida, terminando em cadência (sintetizador_acordes),
+convertida para AudioSegment como na mixagem ou mantida em float32 como na
+renderização progressiva. Mede tempo e pico de memória alocada (tracemalloc).
+
+Uso:
+    python benchmarks/benchmark_duracao.py --segundos 60 180 600
+    python benchmarks/benchmark_duracao.py --execucoes 10 --saida-json duracao.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gerador_audio import base_instrumental, gerar_instrumental
+
+def repetir_e_cortar(tom, estilo, segundos):
+    """Implementação anterior: progressão repetida além da voz e cortada em seguida"""
+    instrumental = gerar_instrumental(tom, estilo)
+    duracao_voz = int(segundos * 1000)
+    repeticoes = (duracao_voz // len(instrumental)) + 1
+    return (instrumental * repeticoes)[:duracao_voz]
+
+def sob_medida(tom, estilo, segundos):
+    """Base renderizada com a duração exata, convertida para AudioSegment como na mixagem"""
+    return base_instrumental(tom, estilo).para_duracao(segundos).para_audio_segment()
+
+def sob_medida_float32(tom, estilo, segundos):
+    """Base sob medida em float32, como usada pela renderização progressiva (sem AudioSegment)"""
+    return base_instrumental(tom, estilo).para_duracao(segundos)
+
+def medir(funcao, execucoes, *args):
+    """Tempos (ms) de cada execução e pico de memória (MB) da última"""
+    tempos = []
+    for _ in range(execucoes):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return tempos, pico / 1024 / 1024
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da base instrumental com duração exata")
+    parser.add_argument("--segundos", type=float, nargs="+", default=[60, 180, 600])
+    parser.add_argument("--execucoes", type=int, default=5)
+    parser.add_argument("--tom", default="G")
+    parser.add_argument("--estilo", default="tradicional")
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    print("⏱️ BENCHMARK DA BASE COM DURAÇÃO EXATA")
+    print("=" * 30)
+    print(f"{'duração':>9}{'método':>20}{'média':>11}{'p50':>11}{'pico':>11}")
+
+    relatorio = {"execucoes": args.execucoes, "resultados": []}
+    for segundos in args.segundos:
+        for nome, funcao in (("repetir_e_cortar", repetir_e_cortar), ("sob_medida", sob_medida),
+                             ("sob_medida_float32", sob_medida_float32)):
+            tempos, pico_mb = medir(funcao, args.execucoes, args.tom, args.estilo, segundos)
+            relatorio["resultados"].append({
+                "segundos": segundos,
+                "metodo": nome,
+                "media_ms": statistics.mean(tempos),
+                "p50_ms": statistics.median(tempos),
+                "pico_mb": pico_mb
+            })
+            print(f"{segundos:>8.0f}s{nome:>20}{statistics.mean(tempos):>9.1f}ms"
+                  f"{statistics.median(tempos):>9.1f}ms{pico_mb:>9.1f}MB")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos Formatos de Entrega
+Mede tamanho e tempo de codificação da prévia do player em comparação com
+cada formato de download em qualidade total.
+
+Uso:
+    python benchmarks/benchmark_entrega.py --execucoes 5 --segundos 60
+    python benchmarks/benchmark_entrega.py --saida-json entrega.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from buffer_audio import BufferAudio
+from formatos_entrega import FORMATOS_ENTREGA, PERFIL_PREVIA, codificar_previa, normalizar_bitrate
+from gerador_audio import TONS_FREQUENCIAS
+from sintetizador_acordes import progressao_do_estilo, sintetizar_progressao
+
+def medir(funcao, execucoes):
+    """p50 (ms) das execuções e o tamanho em bytes do resultado"""
+    dados = funcao()  # aquecimento
+    tempos = []
+    for _ in range(execucoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), len(dados)
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark dos formatos de entrega")
+    parser.add_argument("--execucoes", type=int, default=5)
+    parser.add_argument("--segundos", type=float, default=60.0, help="duração do áudio de teste")
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    # Mixagem estéreo típica: base instrumental repetida até a duração pedida
+    graus = progressao_do_estilo("tradicional")
+    repeticoes = max(1, int(round(args.segundos / (2.0 * len(graus)))))
+    mono = sintetizar_progressao(TONS_FREQUENCIAS["G"], graus * repeticoes)
+    buffer = BufferAudio(mono[:, None].repeat(2, axis=1), 44100)
+
+    print("📦 BENCHMARK DOS FORMATOS DE ENTREGA")
+    print("=" * 30)
+    print(f"Áudio estéreo de {buffer.duracao_segundos:.0f}s, {args.execucoes} execuções (p50)")
+
+    relatorio = {"segundos_audio": buffer.duracao_segundos, "previa": {}, "downloads": {}}
+
+    tempo, tamanho = medir(lambda: codificar_previa(buffer)[0], args.execucoes)
+    relatorio["previa"] = {"perfil": PERFIL_PREVIA, "ms": tempo, "bytes": tamanho}
+    print(f"\n{'prévia':<22}{tempo:>8.1f}ms{tamanho / 1024:>10.0f} KB")
+
+    for formato, info in FORMATOS_ENTREGA.items():
+        bitrate = normalizar_bitrate(formato)
+        tempo, tamanho = medir(lambda: buffer.codificar(formato, bitrate), args.execucoes)
+        relatorio["downloads"][formato] = {"bitrate_kbps": bitrate, "ms": tempo, "bytes": tamanho}
+        rotulo = f"{formato} {bitrate} kbps" if bitrate else formato
+        print(f"{rotulo:<22}{tempo:>8.1f}ms{tamanho / 1024:>10.0f} KB")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Importação e Inicialização
+Mede o tempo de importação de cada dependência e módulo do projeto
+(python -X importtime) e o tempo até a primeira renderização da página,
+listando quais dependências pesadas já foram carregadas nesse momento.
+
+Uso:
+    python benchmarks/benchmark_importacao.py
+    python benchmarks/benchmark_importacao.py --saida benchmarks/RELATORIO_IMPORTACAO.md
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependências de terceiros com custo de importação relevante
+DEPENDENCIAS = ["streamlit", "crewai", "librosa", "music21", "pygame", "gtts", "pydub", "soundfile", "numpy"]
+
+# Módulos do projeto
+MODULOS_PROJETO = [
+    "calendario_liturgico", "sistema_favoritos", "cache_composicoes", "composicao_lote",
+    "composicao_estruturada", "backends_llm", "compositor", "controle_llm",
+    "tarefas_segundo_plano", "gerador_audio", "sistema_vozes", "mixer_audio", "gerador_partituras"
+]
+
+# Script executado em um processo novo para medir a primeira renderização
+SCRIPT_PRIMEIRA_RENDERIZACAO = """
+import json, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({caminho!r}, default_timeout=300)
+app.run()
+duracao = time.perf_counter() - inicio
+pesadas = [m for m in {dependencias!r} if m != "streamlit" and m in sys.modules]
+print(json.dumps({{"segundos": duracao, "excecoes": len(app.exception), "carregadas": pesadas}}))
+"""
+
+def analisar_importtime(saida, modulo):
+    """Extrai o tempo cumulativo (ms) do módulo na saída de -X importtime"""
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        partes = [parte.strip() for parte in linha[len("import time:"):].split("|")]
+        if len(partes) == 3 and partes[2] == modulo:
+            return int(partes[1]) / 1000
+    return None
+
+def medir_importacao(modulo, repeticoes=3):
+    """Menor tempo cumulativo de importação do módulo em processos novos"""
+    tempos = []
+    for _ in range(repeticoes):
+        processo = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+            cwd=DIRETORIO_PROJETO, capture_output=True, text=True
+        )
+        if processo.returncode != 0:
+            return None
+        tempo = analisar_importtime(processo.stderr, modulo)
+        if tempo is not None:
+            tempos.append(tempo)
+    return min(tempos) if tempos else None
+
+def medir_primeira_renderizacao(repeticoes=3):
+    """Tempo até a primeira renderização do AgentCompose com o backend stub"""
+    script = SCRIPT_PRIMEIRA_RENDERIZACAO.format(
+        caminho=os.path.join(DIRETORIO_PROJETO, "AgentCompose.py"),
+        dependencias=DEPENDENCIAS
+    )
+    ambiente = dict(os.environ, COMPOSITOR_LLM_BACKEND="stub")
+    medicoes = []
+
+    for _ in range(repeticoes):
+        processo = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=DIRETORIO_PROJETO, capture_output=True, text=True, env=ambiente
+        )
+        if processo.returncode != 0:
+            raise RuntimeError(f"falha ao renderizar o app: {processo.stderr[-500:]}")
+        medicoes.append(json.loads(processo.stdout.strip().splitlines()[-1]))
+
+    return min(medicoes, key=lambda medicao: medicao["segundos"])
+
+def gerar_relatorio(repeticoes=3):
+    """Executa todas as medições"""
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeticoes": repeticoes,
+        "dependencias": {modulo: medir_importacao(modulo, repeticoes) for modulo in DEPENDENCIAS},
+        "modulos_projeto": {modulo: medir_importacao(modulo, repeticoes) for modulo in MODULOS_PROJETO},
+        "primeira_renderizacao": medir_primeira_renderizacao(repeticoes)
+    }
+
+def formatar_markdown(relatorio):
+    """Formata o relatório em markdown"""
+    def tabela(tempos):
+        linhas = ["| Módulo | Importação (ms) |", "|---|---:|"]
+        for modulo, tempo in sorted(tempos.items(), key=lambda item: -(item[1] or 0)):
+            linhas.append(f"| `{modulo}` | {'indisponível' if tempo is None else f'{tempo:.0f}'} |")
+        return "\n".join(linhas)
+
+    renderizacao = relatorio["primeira_renderizacao"]
+    carregadas = ", ".join(f"`{m}`" for m in renderizacao["carregadas"]) or "nenhuma"
+
+    return f"""# Relatório de Importação e Inicialização
+
+Gerado por `python benchmarks/benchmark_importacao.py --saida benchmarks/RELATORIO_IMPORTACAO.md`
+em {relatorio['data']} (Python {relatorio['python']}, menor de {relatorio['repeticoes']} execuções,
+cada uma em um processo novo com `python -X importtime`).
+
+## Primeira renderização
+
+- Tempo até a página renderizada (AppTest, backend stub): **{renderizacao['segundos']:.2f}s**
+- Exceções na renderização: {renderizacao['excecoes']}
+- Dependências pesadas já carregadas: {carregadas}
+
+## Dependências
+
+{tabela(relatorio['dependencias'])}
+
+## Módulos do projeto
+
+Tempo cumulativo, incluindo as dependências que cada módulo importa no topo.
+
+{tabela(relatorio['modulos_projeto'])}
+"""
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark de importação do Compositor de Música Católica")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções por medição (vale a menor)")
+    parser.add_argument("--saida", help="grava o relatório neste arquivo markdown")
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    relatorio = gerar_relatorio(args.repeticoes)
+    markdown = formatar_markdown(relatorio)
+    print(markdown)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(markdown)
+        print(f"💾 Relatório salvo em {args.saida}")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+if __name__ == "__main__":
+    main()
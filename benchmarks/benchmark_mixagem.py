@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Mixagem de N Vozes
+Compara a mixagem anterior (AudioSegment.silent para alinhar e overlay a
+cada voz, copiando a mixagem inteira por voz) com mixagem.mixar_amostras
+(todas as vozes somadas em um array float32 pré-alocado e normalizadas
+uma vez), para números de vozes diferentes.
+
+Uso:
+    python benchmarks/benchmark_mixagem.py --vozes 2 8 16 32 --segundos 30
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+from pydub.effects import normalize
+
+from buffer_audio import BufferAudio
+from mixagem import mixar_amostras
+
+TAXA = 24000
+PICO = 10 ** (-0.1 / 20)
+ATRASO_MS = 500
+GANHO_DB = -3
+
+def vozes_sinteticas(num_vozes, segundos):
+    """Tons levemente desafinados, no lugar das vozes do coro"""
+    t = np.arange(int(segundos * TAXA), dtype=np.float32) / TAXA
+    return [(0.3 * np.sin(2 * np.pi * (220 + 2 * indice) * t)).astype(np.float32) for indice in range(num_vozes)]
+
+def mixagem_overlay(vozes):
+    """Implementação anterior: silêncio para alinhar e overlay voz a voz"""
+    segmentos = [BufferAudio(voz, TAXA).para_audio_segment() for voz in vozes]
+    audio_final = None
+    for indice, audio in enumerate(segmentos):
+        audio = AudioSegment.silent(duration=ATRASO_MS * indice, frame_rate=TAXA) + audio
+        if audio_final is None:
+            audio_final = audio
+            continue
+        duracao_maxima = max(len(audio_final), len(audio))
+        audio_final += AudioSegment.silent(duracao_maxima - len(audio_final), frame_rate=TAXA)
+        audio += AudioSegment.silent(duracao_maxima - len(audio), frame_rate=TAXA)
+        audio_final = audio_final.overlay(audio + GANHO_DB)
+    return BufferAudio.de_audio_segment(normalize(audio_final))
+
+def mixagem_numpy(vozes):
+    """mixagem.mixar_amostras: uma soma em array pré-alocado e uma normalização"""
+    inicios = [ATRASO_MS * TAXA // 1000 * indice for indice in range(len(vozes))]
+    ganhos = [1.0] + [10 ** (GANHO_DB / 20)] * (len(vozes) - 1)
+    return BufferAudio(mixar_amostras(vozes, inicios, ganhos, pico=PICO), TAXA)
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da mixagem de N vozes")
+    parser.add_argument("--vozes", type=int, nargs="+", default=[2, 8, 16, 32])
+    parser.add_argument("--segundos", type=float, default=30.0)
+    parser.add_argument("--execucoes", type=int, default=3)
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    print("🎛️ BENCHMARK DA MIXAGEM DE N VOZES")
+    print("=" * 30)
+    print(f"{'vozes':>6}{'método':>12}{'média':>11}{'p50':>11}{'duração':>10}")
+
+    relatorio = {"segundos": args.segundos, "execucoes": args.execucoes, "resultados": []}
+    for num_vozes in args.vozes:
+        vozes = vozes_sinteticas(num_vozes, args.segundos)
+        for nome, funcao in (("overlay", mixagem_overlay), ("numpy", mixagem_numpy)):
+            tempos = []
+            for _ in range(args.execucoes):
+                inicio = time.perf_counter()
+                mixagem = funcao(vozes)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+
+            relatorio["resultados"].append({
+                "vozes": num_vozes,
+                "metodo": nome,
+                "media_ms": statistics.mean(tempos),
+                "p50_ms": statistics.median(tempos),
+                "duracao_segundos": mixagem.duracao_segundos
+            })
+            print(f"{num_vozes:>6}{nome:>12}{statistics.mean(tempos):>9.1f}ms"
+                  f"{statistics.median(tempos):>9.1f}ms{mixagem.duracao_segundos:>9.1f}s")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Pipeline Completo
+Mede o tempo de cada etapa (compor, extrair, TTS, instrumental, mixar,
+codificar, salvar) usando o backend de LLM em replay/stub, sem gastar API.
+
+Uso:
+    python benchmarks/benchmark_pipeline.py --execucoes 20 --latencia-llm 0.5
+    python benchmarks/benchmark_pipeline.py --backend replay --tts nenhum --formato wav
+    python benchmarks/benchmark_pipeline.py --tts stub --formato wav
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends_llm import BackendReplay, BackendStub, percentil
+from backends_tts import criar_backend_tts
+from cache_composicoes import CacheComposicoes
+from compositor import Compositor, extrair_letra_musica
+from gerador_audio import gerar_instrumental, sintetizar_voz, mixar_voz_instrumental, exportar_audio
+from sistema_favoritos import SistemaFavoritos
+
+ETAPAS = ["compor", "extrair", "tts", "instrumental", "mixar", "codificar", "salvar"]
+
+class BenchmarkPipeline:
+    """Executa o pipeline completo medindo cada etapa"""
+
+    def __init__(self, backend, diretorio_trabalho, tts="gtts", formato="mp3"):
+        self.compositor = Compositor(backend, CacheComposicoes(os.path.join(diretorio_trabalho, "cache")))
+        self.favoritos = SistemaFavoritos(os.path.join(diretorio_trabalho, "favoritos.json"))
+        self.tts = tts
+        self.backend_tts = criar_backend_tts(tts) if tts != "nenhum" else None
+        self.formato = formato
+        self.tempos = {etapa: [] for etapa in ETAPAS}
+        self.falhas = {etapa: 0 for etapa in ETAPAS}
+
+    def _medir(self, etapa, funcao, *args, **kwargs):
+        """Executa uma etapa registrando sua duração"""
+        inicio = time.perf_counter()
+        try:
+            resultado = funcao(*args, **kwargs)
+        except Exception as e:
+            self.falhas[etapa] += 1
+            raise RuntimeError(f"etapa '{etapa}' falhou: {str(e)}") from e
+        self.tempos[etapa].append(time.perf_counter() - inicio)
+        return resultado
+
+    def _voz_silenciosa(self, letra):
+        """Substitui o TTS por silêncio com duração estimada pela letra"""
+        from pydub import AudioSegment
+        return AudioSegment.silent(duration=max(1000, len(letra) * 60))
+
+    def executar_uma_vez(self, sentimentos, tom, estilo):
+        """Executa o pipeline completo uma vez"""
+        texto = self._medir("compor", self.compositor.compor, sentimentos, tom, estilo, forcar_nova=True)
+        letra = self._medir("extrair", extrair_letra_musica, texto)
+
+        if self.backend_tts is not None:
+            audio_voz = self._medir("tts", sintetizar_voz, letra, backend_tts=self.backend_tts)
+        else:
+            audio_voz = self._voz_silenciosa(letra)
+
+        audio_instrumental = self._medir(
+            "instrumental", gerar_instrumental, tom, estilo, duracao_segundos=len(audio_voz) / 1000
+        )
+        audio_final = self._medir("mixar", mixar_voz_instrumental, audio_voz, audio_instrumental)
+        audio_bytes = self._medir("codificar", exportar_audio, audio_final, self.formato)
+        self._medir(
+            "salvar", self.favoritos.salvar_musica,
+            "Benchmark", letra, tom, estilo, audio_bytes=audio_bytes, tipo_audio="com_voz"
+        )
+
+    def executar(self, execucoes, sentimentos, tom, estilo):
+        """Executa o pipeline várias vezes e retorna o relatório"""
+        erros = []
+        inicio = time.perf_counter()
+
+        for _ in range(execucoes):
+            try:
+                self.executar_uma_vez(sentimentos, tom, estilo)
+            except RuntimeError as e:
+                erros.append(str(e))
+
+        return self.relatorio(execucoes, time.perf_counter() - inicio, erros)
+
+    def relatorio(self, execucoes, duracao_total, erros):
+        """Monta o relatório com estatísticas por etapa (em ms)"""
+        etapas = {}
+        for etapa in ETAPAS:
+            valores = [t * 1000 for t in self.tempos[etapa]]
+            etapas[etapa] = {
+                "amostras": len(valores),
+                "falhas": self.falhas[etapa],
+                "media_ms": statistics.mean(valores) if valores else 0.0,
+                "p50_ms": percentil(valores, 50),
+                "p95_ms": percentil(valores, 95),
+                "min_ms": min(valores) if valores else 0.0,
+                "max_ms": max(valores) if valores else 0.0
+            }
+
+        return {
+            "execucoes": execucoes,
+            "duracao_total_s": duracao_total,
+            "tts": self.tts,
+            "formato": self.formato,
+            "etapas": etapas,
+            "erros": sorted(set(erros))
+        }
+
+def imprimir_relatorio(relatorio):
+    """Imprime o relatório em formato de tabela"""
+    print(f"\n📊 {relatorio['execucoes']} execuções em {relatorio['duracao_total_s']:.2f}s "
+          f"(TTS: {relatorio['tts']}, formato: {relatorio['formato']})")
+    print(f"{'Etapa':<14}{'n':>5}{'média':>11}{'p50':>11}{'p95':>11}{'mín':>11}{'máx':>11}")
+    print("-" * 74)
+
+    for etapa, dados in relatorio["etapas"].items():
+        if not dados["amostras"]:
+            status = "pulada" if not dados["falhas"] else f"{dados['falhas']} falha(s)"
+            print(f"{etapa:<14}{0:>5}   {status}")
+            continue
+        print(f"{etapa:<14}{dados['amostras']:>5}"
+              f"{dados['media_ms']:>9.1f}ms{dados['p50_ms']:>9.1f}ms{dados['p95_ms']:>9.1f}ms"
+              f"{dados['min_ms']:>9.1f}ms{dados['max_ms']:>9.1f}ms")
+
+    for erro in relatorio["erros"]:
+        print(f"⚠️ {erro}")
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline do Compositor de Música Católica")
+    parser.add_argument("--execucoes", type=int, default=10, help="número de execuções do pipeline")
+    parser.add_argument("--backend", choices=["stub", "replay"], default="stub", help="backend de LLM offline")
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"),
+                        help="diretório de fixtures para o modo replay")
+    parser.add_argument("--latencia-llm", type=float, default=0.0,
+                        help="latência artificial do LLM em segundos (replay: padrão é a latência gravada)")
+    parser.add_argument("--tts", choices=["gtts", "espeak", "stub", "nenhum"], default="gtts",
+                        help="backend de TTS ('gtts' requer rede; 'stub' é determinístico e local); "
+                             "'nenhum' substitui o TTS por silêncio de duração estimada")
+    parser.add_argument("--formato", default="mp3", help="formato de codificação (mp3 requer ffmpeg)")
+    parser.add_argument("--sentimentos", default="gratidão, esperança, devoção mariana")
+    parser.add_argument("--tom", default="G")
+    parser.add_argument("--estilo", default="tradicional")
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    if args.backend == "replay":
+        backend = BackendReplay(args.fixtures, latencia_segundos=args.latencia_llm or None)
+    else:
+        backend = BackendStub(latencia_segundos=args.latencia_llm)
+
+    diretorio_trabalho = tempfile.mkdtemp(prefix="benchmark_compositor_")
+    try:
+        benchmark = BenchmarkPipeline(backend, diretorio_trabalho, tts=args.tts, formato=args.formato)
+        relatorio = benchmark.executar(args.execucoes, args.sentimentos, args.tom, args.estilo)
+    finally:
+        shutil.rmtree(diretorio_trabalho, ignore_errors=True)
+
+    imprimir_relatorio(relatorio)
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Relatório salvo em {args.saida_json}")
+
+    return not relatorio["erros"]
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Renderização Progressiva
+Mede quanto tempo leva até o primeiro áudio audível (prévia pronta para o
+player) em um hino de várias estrofes: renderização inteira (uma síntese da
+letra toda, mixagem e codificação) contra a renderização em blocos.
+
+O TTS é simulado (sem rede) com latência fixa por pedido mais um custo por
+caractere, próximo do observado com o gTTS.
+
+Uso:
+    python benchmarks/benchmark_progressivo.py --estrofes 5
+    python benchmarks/benchmark_progressivo.py --estrofes 10 --latencia-tts 0.8 --saida-json progressivo.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from buffer_audio import BufferAudio
+from formatos_entrega import codificar_previa
+from gerador_audio import TONS_FREQUENCIAS
+from renderizacao_progressiva import RenderizadorProgressivo, trechos_para_voz
+from sintetizador_acordes import BaseInstrumental, progressao_do_estilo
+
+ESTROFE = ("Senhor, que estais no meio de nós, escutai a voz do vosso povo reunido, "
+           "que canta a vossa glória e espera a vossa misericórdia")
+
+def criar_tts_simulado(latencia, segundos_por_caractere):
+    """TTS falso: espera como a rede e devolve voz (senoide) a 24 kHz com a duração da leitura"""
+    def sintetizar(texto):
+        time.sleep(latencia + len(texto) * segundos_por_caractere)
+        t = np.arange(int(24000 * len(texto) * 0.06), dtype=np.float32) / 24000
+        return BufferAudio(0.3 * np.sin(2 * np.pi * 220 * t), 24000)
+    return sintetizar
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da renderização progressiva")
+    parser.add_argument("--estrofes", type=int, default=5)
+    parser.add_argument("--latencia-tts", type=float, default=0.6, help="latência fixa por pedido (s)")
+    parser.add_argument("--custo-caractere", type=float, default=0.002, help="custo por caractere (s)")
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    instrumental = BaseInstrumental(TONS_FREQUENCIAS["G"], tuple(progressao_do_estilo("tradicional")))
+    letra = "\n\n".join(f"{ESTROFE} ({numero})" for numero in range(1, args.estrofes + 1))
+    sintetizar = criar_tts_simulado(args.latencia_tts, args.custo_caractere)
+    codificar_previa(instrumental.para_duracao(5.0))  # aquece scipy e o pool de MP3
+
+    print("⏩ BENCHMARK DA RENDERIZAÇÃO PROGRESSIVA")
+    print("=" * 30)
+
+    # Renderização inteira: a letra toda em um pedido, um bloco só
+    inicio = time.perf_counter()
+    inteira = RenderizadorProgressivo(instrumental, sintetizar, segundos_bloco=3600).renderizar([letra.replace("\n\n", " ")])
+    codificar_previa(inteira)
+    primeiro_inteira = total_inteira = time.perf_counter() - inicio
+
+    # Renderização em blocos: o primeiro bloco toca assim que sua prévia fica pronta
+    inicio = time.perf_counter()
+    primeiro_progressiva = None
+    renderizador = RenderizadorProgressivo(instrumental, sintetizar)
+    for bloco in renderizador.blocos(trechos_para_voz(letra)):
+        codificar_previa(bloco)
+        if primeiro_progressiva is None:
+            primeiro_progressiva = time.perf_counter() - inicio
+    total_progressiva = time.perf_counter() - inicio
+
+    relatorio = {
+        "estrofes": args.estrofes,
+        "segundos_musica": inteira.duracao_segundos,
+        "inteira": {"primeiro_audio_s": primeiro_inteira, "total_s": total_inteira},
+        "progressiva": {
+            "primeiro_audio_s": primeiro_progressiva,
+            "total_s": total_progressiva,
+            "blocos": renderizador.estatisticas["blocos"]
+        }
+    }
+
+    print(f"Música de {inteira.duracao_segundos:.0f}s ({args.estrofes} estrofes)")
+    print(f"{'':<14}{'1º áudio':>10}{'total':>10}")
+    print(f"{'inteira':<14}{primeiro_inteira:>9.2f}s{total_inteira:>9.2f}s")
+    print(f"{'progressiva':<14}{primeiro_progressiva:>9.2f}s{total_progressiva:>9.2f}s"
+          f"  ({renderizador.estatisticas['blocos']} blocos)")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Salmo Responsorial
+Compara a montagem anterior (solista e coro renderizados um depois do
+outro para cada estrofe, unidos por AudioSegment) com
+SistemaVozes.gerar_buffer_responsorial (estrofes e resposta ao mesmo
+tempo, resposta renderizada uma vez e unida no float32). O TTS é o
+backend stub com latência artificial por frase, sem acesso à rede.
+
+Uso:
+    python benchmarks/benchmark_responsorial.py --estrofes 1 4 8 --latencia-tts 0.3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+
+from backends_tts import BackendStubTTS
+from buffer_audio import BufferAudio
+from sistema_vozes import SistemaVozes
+
+ESTROFE = "O Senhor é o pastor que me conduz\nPara as águas repousantes me encaminha"
+RESPOSTA = "O Senhor é o pastor que me conduz, não me falta coisa alguma"
+
+def responsorial_sequencial(vozes, num_estrofes):
+    """Implementação anterior, repetida por estrofe: solista, depois coro, unidos por AudioSegment"""
+    audio_final = AudioSegment.empty()
+    for indice in range(num_estrofes):
+        solista = vozes.gerar_buffer_voz(f"{ESTROFE} {indice + 1}", "solene")
+        assembleia = vozes.gerar_buffer_coro(RESPOSTA, "coro_misto")
+        if indice:
+            audio_final += AudioSegment.silent(duration=1000)
+        audio_final += solista.para_audio_segment() + AudioSegment.silent(duration=1000)
+        audio_final += assembleia.para_audio_segment()
+    return BufferAudio.de_audio_segment(audio_final)
+
+def responsorial_simultaneo(vozes, num_estrofes):
+    """SistemaVozes.gerar_buffer_responsorial"""
+    estrofes = [f"{ESTROFE} {indice + 1}" for indice in range(num_estrofes)]
+    return vozes.gerar_buffer_responsorial(estrofes, RESPOSTA)
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark do salmo responsorial")
+    parser.add_argument("--estrofes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--execucoes", type=int, default=3)
+    parser.add_argument("--latencia-tts", type=float, default=0.3, help="latência artificial por frase (s)")
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    backend = BackendStubTTS(latencia_segundos=args.latencia_tts)
+    vozes = SistemaVozes(backend_tts=backend)
+    # Aquecimento (importação do scipy.signal)
+    responsorial_simultaneo(vozes, 1)
+
+    print("📖 BENCHMARK DO SALMO RESPONSORIAL")
+    print("=" * 30)
+    print(f"{'estrofes':>8}{'método':>14}{'média':>11}{'p50':>11}{'sínteses':>10}{'duração':>10}")
+
+    relatorio = {"execucoes": args.execucoes, "latencia_tts": args.latencia_tts, "resultados": []}
+    for num_estrofes in args.estrofes:
+        for nome, funcao in (("sequencial", responsorial_sequencial), ("simultaneo", responsorial_simultaneo)):
+            tempos = []
+            sinteses_antes = backend.frases_sintetizadas
+            for _ in range(args.execucoes):
+                inicio = time.perf_counter()
+                salmo = funcao(vozes, num_estrofes)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            sinteses = (backend.frases_sintetizadas - sinteses_antes) / args.execucoes
+
+            relatorio["resultados"].append({
+                "estrofes": num_estrofes,
+                "metodo": nome,
+                "media_ms": statistics.mean(tempos),
+                "p50_ms": statistics.median(tempos),
+                "sinteses_por_salmo": sinteses,
+                "duracao_segundos": salmo.duracao_segundos
+            })
+            print(f"{num_estrofes:>8}{nome:>14}{statistics.mean(tempos):>9.1f}ms"
+                  f"{statistics.median(tempos):>9.1f}ms{sinteses:>10.0f}{salmo.duracao_segundos:>9.1f}s")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+if __name__ == "__main__":
+    main()
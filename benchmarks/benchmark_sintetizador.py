@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Sintetizador de Acordes
+Compara a geração da base instrumental com o sintetizador vetorizado
+(NumPy, buffer float32) e com a implementação anterior (tons Sine do
+pydub concatenados um a um).
+
+Uso:
+    python benchmarks/benchmark_sintetizador.py --execucoes 20
+    python benchmarks/benchmark_sintetizador.py --duracao-acorde 4 --taxa-amostragem 22050
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from gerador_audio import TONS_FREQUENCIAS
+from sintetizador_acordes import progressao_do_estilo, sintetizar_progressao, para_audio_segment
+
+def instrumental_pydub(tom, estilo, duracao_acorde, taxa_amostragem):
+    """Implementação anterior: um tom Sine por acorde, com fades e concatenação"""
+    freq_base = TONS_FREQUENCIAS.get(tom, 440.00)
+    if estilo == "tradicional":
+        acordes = [freq_base, freq_base * 1.5, freq_base * 1.68, freq_base * 1.33]
+    else:
+        acordes = [freq_base * 1.68, freq_base * 1.33, freq_base, freq_base * 1.5]
+
+    audio_final = AudioSegment.empty()
+    for freq in acordes:
+        tom_audio = Sine(freq, sample_rate=taxa_amostragem).to_audio_segment(duration=duracao_acorde * 1000)
+        audio_final += tom_audio.fade_in(100).fade_out(100)
+    return audio_final
+
+def instrumental_numpy(tom, estilo, duracao_acorde, taxa_amostragem):
+    """Sintetizador vetorizado, convertido para AudioSegment como no app"""
+    amostras = sintetizar_progressao(
+        TONS_FREQUENCIAS.get(tom, 440.00), progressao_do_estilo(estilo),
+        duracao_acorde=duracao_acorde, taxa_amostragem=taxa_amostragem
+    )
+    return para_audio_segment(amostras, taxa_amostragem)
+
+def medir(funcao, execucoes, *args):
+    """Tempos (ms) de cada execução"""
+    tempos = []
+    for _ in range(execucoes):
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark do sintetizador de acordes")
+    parser.add_argument("--execucoes", type=int, default=10)
+    parser.add_argument("--duracao-acorde", type=float, default=2.0, help="segundos por acorde")
+    parser.add_argument("--taxa-amostragem", type=int, default=44100)
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    parametros = ("C", "tradicional", args.duracao_acorde, args.taxa_amostragem)
+    relatorio = {}
+    for nome, funcao in (("pydub (anterior)", instrumental_pydub), ("numpy", instrumental_numpy)):
+        funcao(*parametros)  # aquecimento
+        tempos = medir(funcao, args.execucoes, *parametros)
+        relatorio[nome] = {
+            "media_ms": statistics.mean(tempos),
+            "p50_ms": statistics.median(tempos),
+            "min_ms": min(tempos),
+            "max_ms": max(tempos)
+        }
+
+    print("🎹 BENCHMARK DO SINTETIZADOR")
+    print("=" * 30)
+    print(f"{args.execucoes} execuções, {args.duracao_acorde}s por acorde, {args.taxa_amostragem} Hz")
+    print(f"{'implementação':<18}{'média':>10}{'p50':>10}{'mín':>10}{'máx':>10}")
+    for nome, tempos in relatorio.items():
+        print(f"{nome:<18}" + "".join(f"{tempos[campo]:>10.1f}" for campo in ("media_ms", "p50_ms", "min_ms", "max_ms")))
+
+    aceleracao = relatorio["pydub (anterior)"]["p50_ms"] / relatorio["numpy"]["p50_ms"]
+    relatorio["aceleracao_p50"] = aceleracao
+    print(f"\nAceleração (p50): {aceleracao:.1f}x")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Transformação de Voz
+Compara, para cada tipo de voz do SistemaVozes, os ajustes anteriores
+(frame_rate reescrito duas vezes no AudioSegment, altura e velocidade
+acopladas, 5% por semitom, normalize do pydub) com transformacao_voz
+(vocoder de fase + uma reamostragem sobre float32, semitons exatos).
+Mede o tempo e a altura e a duração obtidas em uma voz sintética.
+
+Uso:
+    python benchmarks/benchmark_transformacao_voz.py --segundos 30 --execucoes 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub.effects import normalize
+
+from buffer_audio import BufferAudio
+from sistema_vozes import SistemaVozes
+
+TAXA = 24000
+FREQUENCIA_VOZ = 220.0
+
+def ajustes_frame_rate(buffer, config_voz):
+    """Implementação anterior: velocidade e altura simuladas mudando o frame_rate"""
+    audio = buffer.para_audio_segment()
+    audio_processado = audio
+    velocidade = config_voz["speed_adjust"]
+    if velocidade != 1.0:
+        audio_processado = audio_processado._spawn(
+            audio_processado.raw_data, overrides={"frame_rate": int(audio.frame_rate * velocidade)}
+        ).set_frame_rate(audio.frame_rate)
+    if config_voz["pitch_adjust"] != 0:
+        fator = 1.0 + (config_voz["pitch_adjust"] * 0.05)
+        audio_processado = audio_processado._spawn(
+            audio_processado.raw_data, overrides={"frame_rate": int(audio_processado.frame_rate * fator)}
+        ).set_frame_rate(audio.frame_rate)
+    return BufferAudio.de_audio_segment(normalize(audio_processado))
+
+def voz_sintetica(segundos):
+    """Tom com harmônicos em sílabas, no lugar da voz do TTS"""
+    t = np.arange(int(segundos * TAXA), dtype=np.float32) / TAXA
+    sinal = sum(np.sin(2 * np.pi * FREQUENCIA_VOZ * h * t) / h for h in range(1, 4))
+    return BufferAudio((0.3 * sinal * (0.5 - 0.5 * np.cos(2 * np.pi * 4 * t))).astype(np.float32), TAXA)
+
+def altura_em_semitons(buffer):
+    """Altura da fundamental em relação à voz original"""
+    trecho = buffer.amostras[:TAXA * 4]
+    espectro = np.abs(np.fft.rfft(trecho * np.hanning(len(trecho))))
+    frequencias = np.fft.rfftfreq(len(trecho), 1 / buffer.taxa_amostragem)
+    faixa = (frequencias > 100) & (frequencias < 400)
+    return 12 * np.log2(frequencias[faixa][np.argmax(espectro[faixa])] / FREQUENCIA_VOZ)
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da transformação de voz")
+    parser.add_argument("--segundos", type=float, default=30.0)
+    parser.add_argument("--execucoes", type=int, default=5)
+    parser.add_argument("--saida-json", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    vozes = SistemaVozes()
+    voz = voz_sintetica(args.segundos)
+    # Aquecimento (importação do scipy.signal)
+    vozes._aplicar_ajustes_voz(voz, vozes.tipos_voz["infantil"])
+
+    print("🎚️ BENCHMARK DA TRANSFORMAÇÃO DE VOZ")
+    print("=" * 30)
+    print(f"{'tipo de voz':<18}{'alvo':>12}{'método':>14}{'média':>11}{'altura':>10}{'duração':>10}")
+
+    relatorio = {"segundos": args.segundos, "execucoes": args.execucoes, "resultados": []}
+    for tipo_voz, config_voz in vozes.tipos_voz.items():
+        alvo = f"{config_voz['pitch_adjust']:+d}st x{config_voz['speed_adjust']}"
+        for nome, funcao in (("frame_rate", lambda: ajustes_frame_rate(voz, config_voz)),
+                             ("vocoder", lambda: vozes._aplicar_ajustes_voz(voz, config_voz))):
+            tempos = []
+            for _ in range(args.execucoes):
+                inicio = time.perf_counter()
+                resultado = funcao()
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            semitons = altura_em_semitons(resultado)
+            duracao = resultado.duracao_segundos / voz.duracao_segundos
+
+            relatorio["resultados"].append({
+                "tipo_voz": tipo_voz,
+                "metodo": nome,
+                "media_ms": statistics.mean(tempos),
+                "p50_ms": statistics.median(tempos),
+                "semitons_obtidos": float(semitons),
+                "duracao_relativa": duracao
+            })
+            print(f"{tipo_voz:<18}{alvo:>12}{nome:>14}{statistics.mean(tempos):>9.1f}ms"
+                  f"{semitons:>+8.2f}st{duracao:>9.2f}x")
+
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.saida_json}")
+
+if __name__ == "__main__":
+    main()
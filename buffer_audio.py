@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Buffer de Áudio
+Representação interna do áudio (amostras float32 + taxa de amostragem) usada
+entre as etapas do pipeline. A decodificação acontece ao receber áudio de
+fora (TTS, upload) e a codificação apenas na entrega (codificar), ambas pelo
+codec_audio
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from pydub import AudioSegment
+
+import codec_audio
+
+@dataclass
+class BufferAudio:
+    """Amostras float32 em [-1, 1]: formato (n,) para mono ou (n, canais)"""
+
+    amostras: np.ndarray
+    taxa_amostragem: int = 44100
+
+    def __post_init__(self):
+        self.amostras = np.asarray(self.amostras, dtype=np.float32)
+        self.taxa_amostragem = int(self.taxa_amostragem)
+
+    @property
+    def canais(self):
+        return 1 if self.amostras.ndim == 1 else self.amostras.shape[1]
+
+    @property
+    def duracao_segundos(self):
+        return len(self.amostras) / self.taxa_amostragem
+
+    def __len__(self):
+        """Duração em milissegundos, como em AudioSegment"""
+        return int(len(self.amostras) * 1000 / self.taxa_amostragem)
+
+    @classmethod
+    def de_audio_segment(cls, segmento):
+        """Converte um AudioSegment (qualquer largura de amostra) em buffer"""
+        inteiros = np.array(segmento.get_array_of_samples())
+        amostras = inteiros.astype(np.float32) / float(1 << (8 * segmento.sample_width - 1))
+        if segmento.channels > 1:
+            amostras = amostras.reshape(-1, segmento.channels)
+        return cls(amostras, segmento.frame_rate)
+
+    @classmethod
+    def de_bytes(cls, dados, formato=None):
+        """Decodifica áudio recebido de fora do pipeline (mp3, wav...), no próprio processo"""
+        amostras, taxa_amostragem = codec_audio.decodificar_bytes(dados, formato)
+        return cls(amostras, taxa_amostragem)
+
+    @classmethod
+    def de_audio(cls, audio):
+        """Aceita BufferAudio, AudioSegment ou bytes codificados"""
+        if isinstance(audio, cls):
+            return audio
+        if isinstance(audio, AudioSegment):
+            return cls.de_audio_segment(audio)
+        return cls.de_bytes(audio)
+
+    @classmethod
+    def concatenar(cls, buffers):
+        """Junta os buffers em sequência, na taxa do primeiro (em mono se os canais diferirem)"""
+        buffers = [cls.de_audio(buffer) for buffer in buffers]
+        if not buffers:
+            return cls(np.zeros(0, dtype=np.float32))
+        taxa_amostragem = buffers[0].taxa_amostragem
+        if len({buffer.canais for buffer in buffers}) > 1:
+            buffers = [buffer.para_mono() for buffer in buffers]
+        return cls(
+            np.concatenate([buffer.reamostrar(taxa_amostragem).amostras for buffer in buffers]), taxa_amostragem
+        )
+
+    def para_audio_segment(self):
+        """Converte para AudioSegment PCM 16 bits (sem subprocessos)"""
+        pcm = np.clip(np.round(self.amostras * 32768), -32768, 32767).astype("<i2")
+        return AudioSegment(pcm.tobytes(), frame_rate=self.taxa_amostragem, sample_width=2, channels=self.canais)
+
+    def para_mono(self):
+        """Média dos canais (o próprio buffer se já for mono)"""
+        if self.canais == 1:
+            return self
+        return BufferAudio(self.amostras.mean(axis=1), self.taxa_amostragem)
+
+    def reamostrar(self, taxa_amostragem):
+        """Buffer na taxa de amostragem indicada"""
+        if int(taxa_amostragem) == self.taxa_amostragem:
+            return self
+        return BufferAudio(
+            codec_audio.reamostrar(self.amostras, self.taxa_amostragem, int(taxa_amostragem)), taxa_amostragem
+        )
+
+    def codificar(self, formato="mp3", bitrate_kbps=None):
+        """Codifica para o formato de entrega; deve ser chamado uma única vez, na saída"""
+        return codec_audio.codificar_amostras(self.amostras, self.taxa_amostragem, formato, bitrate_kbps)
+
+# Teste básico
+if __name__ == "__main__":
+    print("🔈 BUFFER DE ÁUDIO")
+    print("=" * 30)
+
+    t = np.arange(44100, dtype=np.float32) / 44100
+    buffer = BufferAudio(0.5 * np.sin(2 * np.pi * 440 * t), 44100)
+    print(f"Duração: {len(buffer)}ms, canais: {buffer.canais}")
+
+    wav = buffer.codificar("wav")
+    print(f"✅ WAV codificado: {len(wav)} bytes")
+    print(f"Ida e volta: {len(BufferAudio.de_bytes(wav))}ms")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Cache de Composições
+Armazena em disco as composições geradas pelo LLM, com política LRU
+"""
+
+import json
+import os
+import re
+import hashlib
+import threading
+import unicodedata
+from datetime import datetime
+
+from armazenamento import carregar_indice, escrever_atomico, remover_excedentes_lru, salvar_indice
+
+# Versão do prompt de composição; altere quando o texto do Agent/Task mudar
+# para que composições antigas não sejam reaproveitadas
+VERSAO_PROMPT = "2"
+
+class CacheComposicoes:
+    """Classe para gerenciar o cache persistente de composições"""
+
+    def __init__(self, diretorio="cache_composicoes", max_entradas=200, max_megabytes=50):
+        self.diretorio = diretorio
+        self.max_entradas = max_entradas
+        self.max_bytes = int(max_megabytes * 1024 * 1024)
+        self.arquivo_indice = os.path.join(diretorio, "indice.json")
+        self._lock = threading.Lock()
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.indice = carregar_indice(self.arquivo_indice, descricao="índice do cache")
+
+        # Estrutura padrão do índice
+        if not self.indice:
+            self.indice = {
+                "entradas": {},
+                "estatisticas": {
+                    "acertos": 0,
+                    "falhas": 0
+                }
+            }
+
+    def _salvar_indice(self):
+        """Salva o índice do cache no disco"""
+        try:
+            salvar_indice(self.arquivo_indice, self.indice)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar índice do cache: {str(e)}")
+            return False
+
+    def _caminho_entrada(self, chave):
+        """Retorna o caminho do arquivo de uma entrada"""
+        return os.path.join(self.diretorio, f"{chave}.md")
+
+    @staticmethod
+    def normalizar_texto(texto):
+        """Normaliza uma entrada do prompt (acentos, caixa, espaços e vírgulas)"""
+        texto = unicodedata.normalize("NFC", str(texto)).lower().strip()
+        texto = re.sub(r'\s+', ' ', texto)
+        texto = re.sub(r'\s*,\s*', ', ', texto)
+        return texto.strip(', ')
+
+    def gerar_chave(self, sentimentos, tom, estilo, modelo, temperatura, momento=None):
+        """Gera a chave de conteúdo para uma composição"""
+        conteudo = {
+            "sentimentos": self.normalizar_texto(sentimentos),
+            "tom": self.normalizar_texto(tom),
+            "estilo": self.normalizar_texto(estilo),
+            "modelo": str(modelo),
+            "temperatura": f"{float(temperatura):.3f}",
+            "versao_prompt": VERSAO_PROMPT
+        }
+        if momento:
+            conteudo["momento"] = self.normalizar_texto(momento)
+        serializado = json.dumps(conteudo, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+    def contem(self, chave):
+        """Verifica se a chave está no cache sem alterar estatísticas"""
+        with self._lock:
+            return chave in self.indice["entradas"]
+
+    def obter(self, chave):
+        """Retorna a composição em cache ou None"""
+        with self._lock:
+            entrada = self.indice["entradas"].get(chave)
+            texto = None
+
+            if entrada:
+                try:
+                    with open(self._caminho_entrada(chave), 'r', encoding='utf-8') as f:
+                        texto = f.read()
+                except Exception as e:
+                    print(f"Erro ao ler composição do cache: {str(e)}")
+                    del self.indice["entradas"][chave]
+
+            if texto is None:
+                self.indice["estatisticas"]["falhas"] += 1
+            else:
+                self.indice["estatisticas"]["acertos"] += 1
+                entrada["ultimo_acesso"] = datetime.now().isoformat()
+                entrada["acessos"] = entrada.get("acessos", 0) + 1
+
+            self._salvar_indice()
+            return texto
+
+    def salvar(self, chave, texto, metadados=None):
+        """Salva uma composição no cache"""
+        with self._lock:
+            try:
+                escrever_atomico(self._caminho_entrada(chave), texto)
+
+                agora = datetime.now().isoformat()
+                self.indice["entradas"][chave] = {
+                    "tamanho_bytes": len(texto.encode('utf-8')),
+                    "data_criacao": agora,
+                    "ultimo_acesso": agora,
+                    "acessos": 0,
+                    "metadados": metadados or {}
+                }
+
+                self._remover_excedentes()
+                return self._salvar_indice()
+
+            except Exception as e:
+                print(f"Erro ao salvar composição no cache: {str(e)}")
+                return False
+
+    def _remover_excedentes(self):
+        """Remove as entradas menos usadas recentemente acima dos limites"""
+        remover_excedentes_lru(
+            self.indice["entradas"], self._caminho_entrada,
+            self.max_bytes, max_entradas=self.max_entradas
+        )
+
+    def remover(self, chave):
+        """Remove uma composição do cache"""
+        with self._lock:
+            if chave not in self.indice["entradas"]:
+                return False
+
+            del self.indice["entradas"][chave]
+            try:
+                os.unlink(self._caminho_entrada(chave))
+            except OSError:
+                pass
+            return self._salvar_indice()
+
+    def limpar(self):
+        """Remove todas as composições e zera as estatísticas"""
+        with self._lock:
+            for chave in list(self.indice["entradas"]):
+                try:
+                    os.unlink(self._caminho_entrada(chave))
+                except OSError:
+                    pass
+
+            self.indice = {
+                "entradas": {},
+                "estatisticas": {
+                    "acertos": 0,
+                    "falhas": 0
+                }
+            }
+            return self._salvar_indice()
+
+    def obter_estatisticas(self):
+        """Retorna contadores de acertos/falhas e ocupação do cache"""
+        with self._lock:
+            acertos = self.indice["estatisticas"]["acertos"]
+            falhas = self.indice["estatisticas"]["falhas"]
+            total_consultas = acertos + falhas
+
+            return {
+                "acertos": acertos,
+                "falhas": falhas,
+                "taxa_acerto": acertos / total_consultas if total_consultas else 0.0,
+                "total_entradas": len(self.indice["entradas"]),
+                "total_bytes": sum(e["tamanho_bytes"] for e in self.indice["entradas"].values()),
+                "max_entradas": self.max_entradas,
+                "max_bytes": self.max_bytes
+            }
+
+# Função de conveniência
+def criar_cache_composicoes():
+    """Retorna uma instância do cache de composições"""
+    return CacheComposicoes()
+
+# Teste básico
+if __name__ == "__main__":
+    cache = CacheComposicoes()
+
+    print("🗄️ CACHE DE COMPOSIÇÕES")
+    print("=" * 30)
+
+    chave = cache.gerar_chave("gratidão, esperança", "G", "mariano", "gpt-4", 0.8)
+    print(f"Chave de exemplo: {chave[:16]}...")
+
+    estatisticas = cache.obter_estatisticas()
+    print(f"Entradas: {estatisticas['total_entradas']}")
+    print(f"Acertos: {estatisticas['acertos']}")
+    print(f"Falhas: {estatisticas['falhas']}")
+    print(f"Taxa de acerto: {estatisticas['taxa_acerto']:.0%}")
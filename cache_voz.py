@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Cache de Voz
+Guarda em disco o áudio do TTS frase a frase (como recebido do backend, com a
+extensão do formato do backend), com
+chave pelo texto, idioma, leitura lenta e perfil de voz (backend de TTS).
+Refrões repetidos e novas renderizações da mesma música não voltam a chamar
+o serviço de TTS.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import unicodedata
+from datetime import datetime
+
+from armazenamento import carregar_indice, escrever_atomico, remover_excedentes_lru, salvar_indice
+
+# Versão do formato das entradas; altere para descartar o áudio já guardado
+VERSAO_CACHE_VOZ = "1"
+
+def frases_para_voz(texto):
+    """Divide o texto em frases sintetizadas (e guardadas) separadamente: uma por linha"""
+    frases = (" ".join(linha.split()) for linha in str(texto).splitlines())
+    return [frase for frase in frases if frase]
+
+class CacheVoz:
+    """Classe para gerenciar o cache persistente do áudio sintetizado por frase"""
+
+    def __init__(self, diretorio="cache_voz", max_megabytes=200):
+        self.diretorio = diretorio
+        self.max_bytes = int(max_megabytes * 1024 * 1024)
+        self.arquivo_indice = os.path.join(diretorio, "indice.json")
+        self._lock = threading.Lock()
+        self._locks_sintese = {}
+        self.estatisticas = {"acertos": 0, "sinteses": 0, "coalescidas": 0}
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.indice = carregar_indice(self.arquivo_indice, VERSAO_CACHE_VOZ, "índice do cache de voz") or {
+            "versao": VERSAO_CACHE_VOZ, "entradas": {}
+        }
+
+    def _caminho_entrada(self, chave, formato=None):
+        """Arquivo da entrada; sem formato, usa o registrado no índice"""
+        if formato is None:
+            formato = self.indice["entradas"].get(chave, {}).get("formato", "mp3")
+        return os.path.join(self.diretorio, f"{chave}.{formato}")
+
+    @staticmethod
+    def normalizar_texto(texto):
+        """Normaliza a frase (Unicode e espaços); caixa e pontuação mudam a leitura e são mantidas"""
+        return " ".join(unicodedata.normalize("NFC", str(texto)).split())
+
+    def gerar_chave(self, texto, lang="pt-br", slow=False, perfil="gtts"):
+        """Chave de conteúdo da frase para o idioma, a velocidade de leitura e o perfil de voz"""
+        conteudo = {
+            "texto": self.normalizar_texto(texto),
+            "lang": str(lang).lower(),
+            "slow": bool(slow),
+            "perfil": str(perfil),
+            "versao": VERSAO_CACHE_VOZ
+        }
+        serializado = json.dumps(conteudo, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(serializado.encode('utf-8')).hexdigest()[:32]
+
+    def _ler(self, chave):
+        """Bytes da entrada, ou None (chamado com o lock adquirido).
+
+        O último acesso fica só em memória e vai para o disco na próxima
+        gravação, para que um acerto não custe uma escrita.
+        """
+        entrada = self.indice["entradas"].get(chave)
+        if not entrada:
+            return None
+        try:
+            with open(self._caminho_entrada(chave), 'rb') as f:
+                dados = f.read()
+        except OSError:
+            del self.indice["entradas"][chave]
+            return None
+        entrada["ultimo_acesso"] = datetime.now().isoformat()
+        return dados
+
+    def obter(self, chave):
+        """Retorna o áudio guardado ou None"""
+        with self._lock:
+            dados = self._ler(chave)
+            if dados is not None:
+                self.estatisticas["acertos"] += 1
+            return dados
+
+    def salvar(self, chave, dados, texto="", formato="mp3"):
+        """Guarda o áudio de uma frase, no formato do backend que o produziu"""
+        with self._lock:
+            try:
+                escrever_atomico(self._caminho_entrada(chave, formato), dados)
+                agora = datetime.now().isoformat()
+                self.indice["entradas"][chave] = {
+                    "texto": self.normalizar_texto(texto)[:80],
+                    "formato": formato,
+                    "tamanho_bytes": len(dados),
+                    "data_criacao": agora,
+                    "ultimo_acesso": agora
+                }
+                self._remover_excedentes()
+                salvar_indice(self.arquivo_indice, self.indice)
+                return True
+            except Exception as e:
+                print(f"Erro ao salvar voz no cache: {str(e)}")
+                return False
+
+    def obter_ou_sintetizar(self, texto, lang, slow, perfil, sintetizar, formato="mp3"):
+        """Áudio da frase: do cache, ou de sintetizar() (sem argumentos) no primeiro pedido.
+
+        Pedidos simultâneos da mesma frase sintetizam uma única vez.
+        """
+        chave = self.gerar_chave(texto, lang, slow, perfil)
+        with self._lock:
+            dados = self._ler(chave)
+            if dados is not None:
+                self.estatisticas["acertos"] += 1
+                return dados
+            lock_sintese = self._locks_sintese.setdefault(chave, threading.Lock())
+
+        with lock_sintese:
+            with self._lock:
+                dados = self._ler(chave)
+                if dados is not None:
+                    self.estatisticas["coalescidas"] += 1
+                    return dados
+
+            try:
+                dados = sintetizar()
+                with self._lock:
+                    self.estatisticas["sinteses"] += 1
+                self.salvar(chave, dados, texto, formato)
+                return dados
+            finally:
+                # Também na falha: o próximo pedido da frase tenta de novo com um lock novo
+                with self._lock:
+                    self._locks_sintese.pop(chave, None)
+
+    def _remover_excedentes(self):
+        """Remove as frases menos usadas recentemente acima do limite de tamanho"""
+        remover_excedentes_lru(self.indice["entradas"], self._caminho_entrada, self.max_bytes, minimo_entradas=1)
+
+    def limpar(self):
+        """Remove todo o áudio guardado"""
+        with self._lock:
+            for chave in list(self.indice["entradas"]):
+                try:
+                    os.unlink(self._caminho_entrada(chave))
+                except OSError:
+                    pass
+            self.indice = {"versao": VERSAO_CACHE_VOZ, "entradas": {}}
+            salvar_indice(self.arquivo_indice, self.indice)
+
+    def obter_estatisticas(self):
+        """Retorna ocupação do cache e contadores de acertos e sínteses"""
+        with self._lock:
+            estatisticas = dict(self.estatisticas)
+            consultas = estatisticas["acertos"] + estatisticas["coalescidas"] + estatisticas["sinteses"]
+            estatisticas["taxa_acerto"] = (consultas - estatisticas["sinteses"]) / consultas if consultas else 0.0
+            estatisticas["total_entradas"] = len(self.indice["entradas"])
+            estatisticas["total_bytes"] = sum(e["tamanho_bytes"] for e in self.indice["entradas"].values())
+        return estatisticas
+
+# Teste básico
+if __name__ == "__main__":
+    cache = CacheVoz(tempfile.mkdtemp())
+
+    print("🗣️ CACHE DE VOZ")
+    print("=" * 30)
+
+    letra = "Aleluia, aleluia\nCantai ao Senhor\nAleluia, aleluia"
+    for frase in frases_para_voz(letra):
+        cache.obter_ou_sintetizar(frase, "pt-br", False, "gtts", lambda: frase.encode("utf-8"))
+
+    print(cache.obter_estatisticas())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Cliente de TTS
+Fala com o serviço de voz do Google Translate (o mesmo protocolo do gTTS)
+por uma única sessão HTTP com conexões reaproveitadas, repetindo pedidos com
+espera exponencial em falhas transitórias. É usado pelo BackendGTTS
+(backends_tts), que sintetiza as frases de uma letra em paralelo.
+"""
+
+import base64
+import os
+import random
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+URL_TTS_GOOGLE = "https://translate.google.{tld}/_/TranslateWebserverUi/data/batchexecute"
+
+# Conexões HTTP abertas ao mesmo tempo (e frases sintetizadas em paralelo)
+MAX_CONEXOES_PADRAO = int(os.getenv("COMPOSITOR_TTS_SIMULTANEAS", "4"))
+
+# Respostas que valem uma nova tentativa
+STATUS_TRANSITORIOS = (429, 500, 502, 503, 504)
+
+_AUDIO_RESPOSTA = re.compile(r'jQ1olc","\[\\"(.*?)\\"]')
+
+class ErroTTS(Exception):
+    """Falha do serviço de TTS (após as tentativas, ou não transitória)"""
+
+class ClienteTTS:
+    """Classe que envia os pedidos de voz por uma sessão HTTP compartilhada entre threads"""
+
+    def __init__(self, url=None, tld="com", max_conexoes=MAX_CONEXOES_PADRAO, max_tentativas=3,
+                 espera_inicial=0.5, espera_maxima=8.0, timeout=15.0, dormir=time.sleep):
+        """
+        url: endereço do serviço (padrão: COMPOSITOR_URL_TTS ou o Google Translate do tld)
+        max_conexoes: conexões mantidas abertas; pedidos além disso esperam uma livre
+        max_tentativas / espera_inicial / espera_maxima: repetição em falhas transitórias (s)
+        """
+        self.url = url or os.getenv("COMPOSITOR_URL_TTS") or URL_TTS_GOOGLE.format(tld=tld)
+        self.max_conexoes = max(1, int(max_conexoes))
+        self.max_tentativas = max(1, int(max_tentativas))
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.timeout = timeout
+        self._dormir = dormir
+        self._lock = threading.Lock()
+        self.estatisticas = {"pedidos": 0, "repeticoes": 0, "falhas": 0}
+
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_conexoes, pool_block=True)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+
+    def _contar(self, contador):
+        with self._lock:
+            self.estatisticas[contador] += 1
+
+    @staticmethod
+    def _corpos(texto, lang, slow):
+        """Corpos dos pedidos, montados pelo gTTS (que divide textos longos em partes)"""
+        from gtts import gTTS
+
+        tts = gTTS(text=texto, lang=lang, slow=slow)
+        return tts.get_bodies(), tts.GOOGLE_TTS_HEADERS
+
+    def _enviar(self, corpo, cabecalhos):
+        """Envia um pedido, repetindo em falhas transitórias; retorna o texto da resposta"""
+        for tentativa in range(1, self.max_tentativas + 1):
+            self._contar("pedidos")
+            try:
+                resposta = self.sessao.post(self.url, data=corpo, headers=cabecalhos, timeout=self.timeout)
+                if resposta.status_code not in STATUS_TRANSITORIOS:
+                    if resposta.status_code >= 400:
+                        self._contar("falhas")
+                        raise ErroTTS(f"serviço de TTS respondeu {resposta.status_code}")
+                    return resposta.text
+                erro = ErroTTS(f"serviço de TTS respondeu {resposta.status_code}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                erro = ErroTTS(f"falha de conexão com o serviço de TTS: {str(e)}")
+
+            if tentativa == self.max_tentativas:
+                self._contar("falhas")
+                raise erro
+            self._contar("repeticoes")
+            espera = min(self.espera_maxima, self.espera_inicial * (2 ** (tentativa - 1)))
+            self._dormir(espera * random.uniform(0.5, 1.0))
+
+    def sintetizar_mp3(self, texto, lang="pt-br", slow=False):
+        """MP3 do texto (as partes de textos longos são pedidas em sequência e unidas)"""
+        corpos, cabecalhos = self._corpos(texto, lang, slow)
+        partes = []
+        for corpo in corpos:
+            encontrados = _AUDIO_RESPOSTA.findall(self._enviar(corpo, cabecalhos))
+            if not encontrados:
+                self._contar("falhas")
+                raise ErroTTS("resposta do serviço de TTS sem áudio")
+            partes.extend(base64.b64decode(audio) for audio in encontrados)
+        return b"".join(partes)
+
+    def obter_estatisticas(self):
+        """Retorna contadores de pedidos, repetições e falhas"""
+        with self._lock:
+            estatisticas = dict(self.estatisticas)
+        estatisticas["max_conexoes"] = self.max_conexoes
+        return estatisticas
+
+    def fechar(self):
+        """Fecha as conexões abertas"""
+        self.sessao.close()
+
+_lock_padrao = threading.Lock()
+_cliente_padrao = None
+
+def obter_cliente_tts():
+    """Cliente de TTS compartilhado pelo processo (criado no primeiro uso)"""
+    global _cliente_padrao
+    with _lock_padrao:
+        if _cliente_padrao is None:
+            _cliente_padrao = ClienteTTS()
+        return _cliente_padrao
+
+# Teste básico
+if __name__ == "__main__":
+    print("🗣️ CLIENTE DE TTS")
+    print("=" * 30)
+
+    cliente = obter_cliente_tts()
+    try:
+        inicio = time.perf_counter()
+        dados = cliente.sintetizar_mp3("Cantai ao Senhor um canto novo")
+        print(f"✅ {len(dados)} bytes em {(time.perf_counter() - inicio) * 1000:.0f}ms")
+    except ErroTTS as e:
+        print(f"❌ {str(e)}")
+    print(cliente.obter_estatisticas())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Codec de Áudio
+Codificação e decodificação no próprio processo via libsndfile (soundfile):
+WAV, FLAC, OGG (Vorbis e Opus) e MP3, na thread de quem pede (a libsndfile
+roda sem o GIL, então codificações simultâneas usam núcleos diferentes).
+O pydub (um subprocesso do ffmpeg por chamada) é usado apenas quando a
+libsndfile instalada não suporta o formato.
+"""
+
+import io
+import math
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import soundfile as sf
+except (ImportError, OSError):  # libsndfile ausente
+    sf = None
+
+# formato de entrega -> (formato, subtipo) da libsndfile
+FORMATOS_SOUNDFILE = {
+    "wav": ("WAV", "PCM_16"),
+    "flac": ("FLAC", "PCM_16"),
+    "ogg": ("OGG", "VORBIS"),
+    "opus": ("OGG", "OPUS"),
+    "mp3": ("MP3", "MPEG_LAYER_III")
+}
+
+BITRATE_MP3_PADRAO = 192
+BITRATE_OPUS_PADRAO = 128
+
+# O Opus só aceita estas taxas; outras são reamostradas para 48 kHz
+TAXAS_OPUS = (8000, 12000, 16000, 24000, 48000)
+
+QUADROS_POR_BLOCO = 65536
+
+_lock = threading.Lock()
+_estatisticas = {
+    "codificacoes_soundfile": 0,
+    "codificacoes_pydub": 0,
+    "decodificacoes_soundfile": 0,
+    "decodificacoes_pydub": 0
+}
+
+def _contar(contador):
+    with _lock:
+        _estatisticas[contador] += 1
+
+@lru_cache(maxsize=None)
+def suporta_soundfile(formato):
+    """Verifica se a libsndfile instalada codifica o formato no próprio processo"""
+    if sf is None or formato not in FORMATOS_SOUNDFILE:
+        return False
+    formato_sf, subtipo = FORMATOS_SOUNDFILE[formato]
+    return formato_sf in sf.available_formats() and subtipo in sf.available_subtypes(formato_sf)
+
+def _nivel_compressao_mp3(bitrate_kbps):
+    """Converte kbps no nível de compressão da libsndfile (0 = 320 kbps, 1 = 32 kbps)"""
+    return min(0.99, max(0.0, (320 - bitrate_kbps) / 288))
+
+def _nivel_compressao_opus(bitrate_kbps, canais):
+    """Converte kbps no nível de compressão da libsndfile (0 = 256 kbps, 1 = 6 kbps por canal)"""
+    return min(1.0, max(0.0, (256 - bitrate_kbps / canais) / 250))
+
+def reamostrar(amostras, taxa_origem, taxa_destino):
+    """Reamostra amostras float32 ((n,) ou (n, canais)) para outra taxa"""
+    if taxa_origem == taxa_destino or len(amostras) == 0:
+        return amostras
+    try:
+        from scipy.signal import resample_poly
+    except ImportError:  # interpolação linear quando o scipy não está instalado
+        posicoes = np.arange(int(len(amostras) * taxa_destino / taxa_origem)) * (taxa_origem / taxa_destino)
+        indices = np.arange(len(amostras))
+        if amostras.ndim == 1:
+            return np.interp(posicoes, indices, amostras).astype(np.float32)
+        return np.stack([np.interp(posicoes, indices, canal) for canal in amostras.T], axis=1).astype(np.float32)
+
+    divisor = math.gcd(int(taxa_origem), int(taxa_destino))
+    return resample_poly(amostras, taxa_destino // divisor, taxa_origem // divisor, axis=0).astype(np.float32)
+
+def _codificar_soundfile(amostras, taxa_amostragem, formato, bitrate_kbps=None):
+    """Codifica com a libsndfile, sem subprocessos"""
+    formato_sf, subtipo = FORMATOS_SOUNDFILE[formato]
+    opcoes = {}
+    if formato == "mp3":
+        opcoes = {
+            "bitrate_mode": "CONSTANT",
+            "compression_level": _nivel_compressao_mp3(bitrate_kbps or BITRATE_MP3_PADRAO)
+        }
+    elif formato == "opus":
+        if taxa_amostragem not in TAXAS_OPUS:
+            amostras, taxa_amostragem = reamostrar(amostras, taxa_amostragem, 48000), 48000
+        canais = 1 if amostras.ndim == 1 else amostras.shape[1]
+        opcoes = {"compression_level": _nivel_compressao_opus(bitrate_kbps or BITRATE_OPUS_PADRAO, canais)}
+
+    # Escrita em blocos: a libsndfile derruba o processo ao receber um áudio
+    # longo (~1 min) de uma vez no codificador Vorbis
+    saida = io.BytesIO()
+    canais = 1 if amostras.ndim == 1 else amostras.shape[1]
+    with sf.SoundFile(saida, 'w', taxa_amostragem, canais, format=formato_sf, subtype=subtipo, **opcoes) as arquivo:
+        for inicio in range(0, len(amostras), QUADROS_POR_BLOCO):
+            arquivo.write(amostras[inicio:inicio + QUADROS_POR_BLOCO])
+    return saida.getvalue()
+
+def _codificar_pydub(amostras, taxa_amostragem, formato, bitrate_kbps=None):
+    """Codifica pelo pydub (ffmpeg), usado quando a libsndfile não suporta o formato"""
+    from buffer_audio import BufferAudio
+
+    saida = io.BytesIO()
+    bitrate = f"{bitrate_kbps}k" if bitrate_kbps else None
+    BufferAudio(amostras, taxa_amostragem).para_audio_segment().export(saida, format=formato, bitrate=bitrate)
+    return saida.getvalue()
+
+def codificar_amostras(amostras, taxa_amostragem, formato="mp3", bitrate_kbps=None):
+    """Codifica amostras float32 ((n,) ou (n, canais)) no formato indicado"""
+    if suporta_soundfile(formato):
+        _contar("codificacoes_soundfile")
+        return _codificar_soundfile(amostras, taxa_amostragem, formato, bitrate_kbps)
+
+    _contar("codificacoes_pydub")
+    return _codificar_pydub(amostras, taxa_amostragem, formato, bitrate_kbps)
+
+def decodificar_arquivo(arquivo, formato=None):
+    """Decodifica um arquivo aberto (ex.: BytesIO) desde o início.
+
+    Tenta a libsndfile (que identifica o formato pelo conteúdo) e recorre ao
+    pydub para formatos que ela não lê, como AAC/M4A.
+    """
+    if sf is not None:
+        try:
+            arquivo.seek(0)
+            amostras, taxa_amostragem = sf.read(arquivo, dtype="float32")
+            _contar("decodificacoes_soundfile")
+            return amostras, taxa_amostragem
+        except (RuntimeError, TypeError, ValueError) as e:
+            print(f"libsndfile não decodificou o áudio ({str(e)}), usando pydub")
+
+    from pydub import AudioSegment
+    from buffer_audio import BufferAudio
+
+    arquivo.seek(0)
+    buffer = BufferAudio.de_audio_segment(AudioSegment.from_file(arquivo, format=formato))
+    _contar("decodificacoes_pydub")
+    return buffer.amostras, buffer.taxa_amostragem
+
+def decodificar_bytes(dados, formato=None):
+    """Decodifica áudio em amostras float32 e taxa de amostragem"""
+    return decodificar_arquivo(io.BytesIO(dados), formato)
+
+def obter_estatisticas():
+    """Quantas codificações/decodificações passaram por cada caminho"""
+    with _lock:
+        estatisticas = dict(_estatisticas)
+    estatisticas["formatos_no_processo"] = [formato for formato in FORMATOS_SOUNDFILE if suporta_soundfile(formato)]
+    return estatisticas
+
+# Teste básico
+if __name__ == "__main__":
+    print("🎚️ CODEC DE ÁUDIO")
+    print("=" * 30)
+
+    t = np.arange(44100, dtype=np.float32) / 44100
+    amostras = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+    for formato in FORMATOS_SOUNDFILE:
+        try:
+            dados = codificar_amostras(amostras, 44100, formato)
+            print(f"✅ {formato}: {len(dados)} bytes")
+        except Exception as e:
+            print(f"❌ {formato}: {str(e)}")
+
+    print(obter_estatisticas())
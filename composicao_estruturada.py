@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Composição Estruturada
+Representa a música composta (título, seções, cifras, BPM e uso litúrgico)
+como objeto tipado, validado a partir do bloco JSON pedido ao LLM
+"""
+
+import json
+import re
+import unicodedata
+from dataclasses import dataclass, field, asdict
+
+# Tipos de seção aceitos e seus nomes para exibição
+TIPOS_SECAO = {
+    "verso": "Verso",
+    "estrofe": "Estrofe",
+    "refrao": "Refrão",
+    "ponte": "Ponte",
+    "coro": "Coro",
+    "antifona": "Antífona",
+    "introducao": "Introdução",
+    "final": "Final"
+}
+
+BPM_PADRAO = 80
+
+# Formato pedido ao LLM ao final da resposta em markdown
+FORMATO_JSON_COMPOSICAO = """```json
+{
+  "titulo": "Título da música",
+  "secoes": [
+    {"tipo": "verso", "rotulo": "Verso 1", "linhas": ["primeira linha", "segunda linha"], "cifras": ["G D", "Em C"]},
+    {"tipo": "refrao", "rotulo": "Refrão", "linhas": ["..."], "cifras": ["..."]}
+  ],
+  "bpm": 72,
+  "uso_liturgico": "Comunhão, Tempo Comum"
+}
+```"""
+
+class ErroComposicaoInvalida(ValueError):
+    """Erro de validação da estrutura da composição"""
+
+@dataclass
+class SecaoMusica:
+    """Seção da música (verso, refrão, ponte...) com letra e cifras"""
+
+    tipo: str
+    linhas: list
+    cifras: list = field(default_factory=list)
+    rotulo: str = ""
+
+    @property
+    def nome(self):
+        """Nome da seção para exibição"""
+        return self.rotulo or TIPOS_SECAO.get(self.tipo, self.tipo.title())
+
+@dataclass
+class ComposicaoEstruturada:
+    """Composição musical completa em formato tipado"""
+
+    titulo: str
+    secoes: list
+    bpm: int = BPM_PADRAO
+    uso_liturgico: str = ""
+    tom: str = ""
+    estilo: str = ""
+    texto_markdown: str = ""
+    estruturada_pelo_llm: bool = True
+
+    def linhas_letra(self):
+        """Todas as linhas da letra, na ordem das seções"""
+        return [linha for secao in self.secoes for linha in secao.linhas]
+
+    def letra_texto(self, separador=" "):
+        """Letra completa como texto (para TTS e biblioteca)"""
+        return separador.join(self.linhas_letra())
+
+    def cifras_texto(self):
+        """Cifras de todas as seções, uma seção por linha"""
+        return "\n".join(
+            f"{secao.nome}: {' | '.join(secao.cifras)}"
+            for secao in self.secoes if secao.cifras
+        )
+
+    def para_dict(self):
+        """Converte para dicionário serializável em JSON"""
+        return asdict(self)
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Cria a composição a partir de um dicionário (já validado)"""
+        dados = dict(dados)
+        dados["secoes"] = [SecaoMusica(**secao) for secao in dados.get("secoes", [])]
+        return cls(**dados)
+
+def texto_para_voz(letra):
+    """Aceita texto ou ComposicaoEstruturada e retorna o texto a ser cantado, uma linha por verso"""
+    if isinstance(letra, ComposicaoEstruturada):
+        return letra.letra_texto("\n")
+    return letra
+
+def _normalizar_tipo(tipo):
+    """Normaliza o tipo de seção (sem acentos, minúsculo, sem número)"""
+    tipo = unicodedata.normalize("NFKD", str(tipo)).encode("ascii", "ignore").decode().lower()
+    tipo = re.sub(r'[^a-z]', '', tipo)
+    return tipo
+
+def validar_composicao(dados, tom="", estilo="", texto_markdown=""):
+    """Valida o dicionário vindo do LLM e retorna a ComposicaoEstruturada"""
+    if not isinstance(dados, dict):
+        raise ErroComposicaoInvalida("a estrutura deve ser um objeto JSON")
+
+    titulo = dados.get("titulo")
+    if not isinstance(titulo, str) or not titulo.strip():
+        raise ErroComposicaoInvalida("campo 'titulo' ausente ou vazio")
+
+    secoes_brutas = dados.get("secoes")
+    if not isinstance(secoes_brutas, list) or not secoes_brutas:
+        raise ErroComposicaoInvalida("campo 'secoes' deve ser uma lista não vazia")
+
+    secoes = []
+    for posicao, secao in enumerate(secoes_brutas, start=1):
+        if not isinstance(secao, dict):
+            raise ErroComposicaoInvalida(f"seção {posicao} não é um objeto")
+
+        tipo = _normalizar_tipo(secao.get("tipo", ""))
+        if tipo not in TIPOS_SECAO:
+            raise ErroComposicaoInvalida(f"seção {posicao}: tipo '{secao.get('tipo')}' desconhecido")
+
+        linhas = secao.get("linhas")
+        if not isinstance(linhas, list) or not all(isinstance(l, str) for l in linhas):
+            raise ErroComposicaoInvalida(f"seção {posicao}: 'linhas' deve ser uma lista de textos")
+        linhas = [l.strip() for l in linhas if l.strip()]
+        if not linhas:
+            raise ErroComposicaoInvalida(f"seção {posicao}: sem linhas de letra")
+
+        cifras = secao.get("cifras") or []
+        if not isinstance(cifras, list) or not all(isinstance(c, str) for c in cifras):
+            raise ErroComposicaoInvalida(f"seção {posicao}: 'cifras' deve ser uma lista de textos")
+
+        secoes.append(SecaoMusica(
+            tipo=tipo,
+            linhas=linhas,
+            cifras=[c.strip() for c in cifras if c.strip()],
+            rotulo=str(secao.get("rotulo") or "").strip()
+        ))
+
+    try:
+        bpm = int(dados.get("bpm") or BPM_PADRAO)
+    except (TypeError, ValueError):
+        raise ErroComposicaoInvalida(f"campo 'bpm' inválido: {dados.get('bpm')!r}")
+    if not 30 <= bpm <= 240:
+        raise ErroComposicaoInvalida(f"campo 'bpm' fora da faixa 30-240: {bpm}")
+
+    return ComposicaoEstruturada(
+        titulo=titulo.strip(),
+        secoes=secoes,
+        bpm=bpm,
+        uso_liturgico=str(dados.get("uso_liturgico") or "").strip(),
+        tom=tom,
+        estilo=estilo,
+        texto_markdown=texto_markdown,
+        estruturada_pelo_llm=True
+    )
+
+def texto_sem_estrutura(texto):
+    """Remove do markdown o bloco JSON final (completo ou ainda em streaming)"""
+    posicao = texto.rfind("```json")
+    return texto[:posicao].rstrip() if posicao != -1 else texto
+
+def _extrair_bloco_json(texto):
+    """Retorna o conteúdo do último bloco ```json do texto"""
+    blocos = re.findall(r'```json\s*(.*?)```', texto, flags=re.DOTALL)
+    return blocos[-1] if blocos else None
+
+# Padrões usados na leitura do markdown quando não há bloco JSON válido
+_PADRAO_CIFRA = re.compile(r'^[A-G][#b]?(m|maj7|m7|7|sus[24]|dim|º|°|aug|add9|9)*(/[A-G][#b]?)?$')
+_PADRAO_BPM = re.compile(r'(\d{2,3})\s*bpm', re.IGNORECASE)
+_PADRAO_TITULO = re.compile(r'^t[íi]tulo[^:]*:\s*(.+)$', re.IGNORECASE)
+_PALAVRAS_TECNICAS = ['cifra', 'acorde', 'tom:', 'bpm', 'compasso', 'referência', 'intenção', 'uso litúrgico']
+
+def _linha_de_cifras(linha):
+    """Verifica se a linha contém apenas acordes"""
+    tokens = [t for t in re.split(r'[\s\-|]+', linha.strip()) if t]
+    return bool(tokens) and all(_PADRAO_CIFRA.match(t) for t in tokens)
+
+def _limpar_markdown(linha):
+    """Remove marcações markdown de uma linha"""
+    linha = re.sub(r'\*\*([^*]+)\*\*', r'\1', linha.strip())
+    linha = re.sub(r'\*([^*]+)\*', r'\1', linha)
+    return linha.strip(' *_#>').strip()
+
+def _eh_cabecalho(linha):
+    """Verifica se a linha tem formatação de cabeçalho"""
+    linha = linha.strip()
+    return linha.startswith(('#', '**', '[')) or linha.endswith((':', ':**', ']'))
+
+def _tipo_do_cabecalho(linha):
+    """Retorna o tipo de seção se a linha for um cabeçalho de seção"""
+    if not _eh_cabecalho(linha):
+        return None
+    limpa = _limpar_markdown(linha).strip('[]').rstrip(':').strip()
+    if not limpa or len(limpa) > 40:
+        return None
+    tipo = _normalizar_tipo(limpa.split()[0]) if limpa.split() else ""
+    return tipo if tipo in TIPOS_SECAO else None
+
+def estruturar_markdown(texto, tom="", estilo=""):
+    """Constrói a estrutura a partir do markdown (quando o LLM não enviou JSON)"""
+    titulo = ""
+    secoes = []
+    secao_atual = None
+
+    for linha in texto.split('\n'):
+        if not linha.strip():
+            continue
+
+        correspondencia_titulo = _PADRAO_TITULO.match(re.sub(r'[*_]+', '', linha).strip().lstrip('#').strip())
+        if correspondencia_titulo and not titulo:
+            titulo = correspondencia_titulo.group(1).strip()
+            continue
+
+        tipo = _tipo_do_cabecalho(linha)
+        if tipo:
+            secao_atual = SecaoMusica(tipo=tipo, linhas=[], rotulo=_limpar_markdown(linha).rstrip(':'))
+            secoes.append(secao_atual)
+            continue
+
+        # Cabeçalhos de outras seções (cifras, referências...) encerram a letra
+        linha_minuscula = linha.strip().lower()
+        if linha.lstrip().startswith(('#', '**')) or any(p in linha_minuscula for p in _PALAVRAS_TECNICAS):
+            secao_atual = None
+            continue
+
+        if secao_atual is None:
+            continue
+
+        if _linha_de_cifras(linha):
+            secao_atual.cifras.append(linha.strip())
+        else:
+            linha_letra = _limpar_markdown(linha)
+            if linha_letra:
+                secao_atual.linhas.append(linha_letra)
+
+    secoes = [secao for secao in secoes if secao.linhas]
+    if not secoes:
+        raise ErroComposicaoInvalida("nenhuma seção de letra encontrada no texto")
+
+    bpm_encontrado = _PADRAO_BPM.search(texto)
+    bpm = int(bpm_encontrado.group(1)) if bpm_encontrado else BPM_PADRAO
+
+    return ComposicaoEstruturada(
+        titulo=titulo or "Música Católica",
+        secoes=secoes,
+        bpm=bpm if 30 <= bpm <= 240 else BPM_PADRAO,
+        tom=tom,
+        estilo=estilo,
+        texto_markdown=texto_sem_estrutura(texto),
+        estruturada_pelo_llm=False
+    )
+
+def estruturar_composicao(texto, tom="", estilo=""):
+    """Obtém a ComposicaoEstruturada do texto do LLM.
+
+    Usa o bloco JSON validado; se ausente ou inválido, lê o markdown.
+    Lança ErroComposicaoInvalida quando nenhuma letra é encontrada.
+    """
+    texto_markdown = texto_sem_estrutura(texto)
+    bloco = _extrair_bloco_json(texto)
+
+    if bloco:
+        try:
+            return validar_composicao(json.loads(bloco), tom, estilo, texto_markdown)
+        except (json.JSONDecodeError, ErroComposicaoInvalida) as e:
+            print(f"Estrutura JSON inválida, lendo o markdown: {str(e)}")
+
+    return estruturar_markdown(texto, tom, estilo)
+
+# Teste básico
+if __name__ == "__main__":
+    from backends_llm import BackendStub
+
+    print("🧩 COMPOSIÇÃO ESTRUTURADA")
+    print("=" * 30)
+
+    composicao = estruturar_composicao(BackendStub().compor("paz", "G", "mariano"), "G", "mariano")
+    print(f"Título: {composicao.titulo}")
+    print(f"BPM: {composicao.bpm}")
+    for secao in composicao.secoes:
+        print(f"  - {secao.nome}: {len(secao.linhas)} linhas, cifras {secao.cifras}")
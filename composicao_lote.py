@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Composição em Lote
+Compõe o repertório completo de uma celebração com chamadas concorrentes
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Momentos da Missa e temas sugeridos para cada um
+MOMENTOS_MISSA = {
+    "Entrada": "acolhida, alegria, comunidade reunida",
+    "Ato Penitencial": "perdão, misericórdia, conversão",
+    "Glória": "louvor, glória a Deus, Santíssima Trindade",
+    "Ofertório": "oferta, pão e vinho, entrega da vida",
+    "Comunhão": "Eucaristia, unidade, Corpo de Cristo",
+    "Final": "envio, missão, Virgem Maria"
+}
+
+class ComposicaoLote:
+    """Classe para compor vários cantos concorrentemente"""
+
+    def __init__(self, funcao_composicao, max_concorrencia=3, timeout_item=180):
+        """
+        funcao_composicao: chamada como funcao_composicao(sentimentos, tom, estilo, momento=...)
+        max_concorrencia: número máximo de composições simultâneas
+        timeout_item: tempo máximo (s) de cada composição, contado a partir do seu início
+        """
+        self.funcao_composicao = funcao_composicao
+        self.max_concorrencia = max(1, int(max_concorrencia))
+        self.timeout_item = timeout_item
+
+    def criar_itens_missa(self, tom, estilo, momentos=None):
+        """Cria a lista de itens para os momentos da Missa com os temas sugeridos"""
+        momentos = momentos or list(MOMENTOS_MISSA.keys())
+        return [
+            {
+                "momento": momento,
+                "sentimentos": MOMENTOS_MISSA.get(momento, ""),
+                "tom": tom,
+                "estilo": estilo
+            }
+            for momento in momentos
+        ]
+
+    def _executar_item(self, indice, item, inicios):
+        """Executa a composição de um item registrando o horário de início"""
+        inicios[indice] = time.monotonic()
+        return self.funcao_composicao(
+            item["sentimentos"],
+            item["tom"],
+            item["estilo"],
+            momento=item.get("momento")
+        )
+
+    def _resultado(self, indice, item, inicio, texto=None, erro=None):
+        """Monta o dicionário de resultado de um item"""
+        return {
+            "indice": indice,
+            "momento": item.get("momento", f"Canto {indice + 1}"),
+            "tom": item["tom"],
+            "estilo": item["estilo"],
+            "sucesso": erro is None,
+            "texto": texto,
+            "erro": erro,
+            "duracao_segundos": time.monotonic() - inicio if inicio else 0.0
+        }
+
+    def compor(self, itens):
+        """Compõe todos os itens, gerando cada resultado assim que fica pronto.
+
+        Uma composição que excede timeout_item é reportada como erro; a thread
+        correspondente não pode ser interrompida e termina em segundo plano.
+        """
+        if not itens:
+            return
+
+        inicios = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_concorrencia)
+
+        try:
+            pendentes = {
+                executor.submit(self._executar_item, indice, item, inicios): indice
+                for indice, item in enumerate(itens)
+            }
+
+            while pendentes:
+                concluidos, _ = wait(list(pendentes), timeout=0.5, return_when=FIRST_COMPLETED)
+
+                for futuro in concluidos:
+                    indice = pendentes.pop(futuro)
+                    try:
+                        texto = futuro.result()
+                        yield self._resultado(indice, itens[indice], inicios.get(indice), texto=texto)
+                    except Exception as e:
+                        yield self._resultado(indice, itens[indice], inicios.get(indice), erro=str(e))
+
+                # Verificar itens em execução que excederam o tempo limite
+                if self.timeout_item:
+                    agora = time.monotonic()
+                    for futuro, indice in list(pendentes.items()):
+                        inicio = inicios.get(indice)
+                        if inicio and agora - inicio > self.timeout_item:
+                            del pendentes[futuro]
+                            yield self._resultado(
+                                indice, itens[indice], inicio,
+                                erro=f"Tempo limite de {self.timeout_item}s excedido"
+                            )
+
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def compor_tudo(self, itens):
+        """Compõe todos os itens e retorna os resultados na ordem original"""
+        resultados = list(self.compor(itens))
+        return sorted(resultados, key=lambda r: r["indice"])
+
+# Função de conveniência
+def criar_composicao_lote(funcao_composicao, max_concorrencia=3, timeout_item=180):
+    """Retorna uma instância de composição em lote"""
+    return ComposicaoLote(funcao_composicao, max_concorrencia, timeout_item)
+
+# Teste básico
+if __name__ == "__main__":
+    import random
+
+    def composicao_simulada(sentimentos, tom, estilo, momento=None):
+        time.sleep(random.uniform(0.5, 1.5))
+        return f"**{momento}** em {tom} ({estilo}): {sentimentos}"
+
+    lote = ComposicaoLote(composicao_simulada, max_concorrencia=6)
+
+    print("⛪ COMPOSIÇÃO EM LOTE")
+    print("=" * 30)
+
+    inicio = time.monotonic()
+    for resultado in lote.compor(lote.criar_itens_missa("G", "litúrgico")):
+        print(f"✅ {resultado['momento']}: {resultado['duracao_segundos']:.2f}s")
+
+    print(f"\nTempo total: {time.monotonic() - inicio:.2f}s")
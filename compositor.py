@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Núcleo do Compositor
+Composição via backend de LLM com cache e extração da letra, sem dependência da interface
+"""
+
+import json
+import re
+
+from cache_composicoes import CacheComposicoes
+from composicao_estruturada import ErroComposicaoInvalida, estruturar_composicao
+from controle_llm import ControleChamadasLLM
+
+class Compositor:
+    """Classe que coordena backend de LLM, cache e controle de chamadas"""
+
+    def __init__(self, backend, cache=None, controle=None):
+        self.backend = backend
+        self.cache = cache if cache is not None else CacheComposicoes()
+        self.controle = controle if controle is not None else ControleChamadasLLM()
+
+    def chave(self, sentimentos, tom, estilo, momento=None, modo=None, modelo=None):
+        """Retorna a chave de cache para os parâmetros e o modelo (padrão: o preferido do modo)"""
+        return self.cache.gerar_chave(
+            sentimentos, tom, estilo,
+            modelo or self.backend.modelo_para(modo), self.backend.temperatura, momento
+        )
+
+    def esta_em_cache(self, sentimentos, tom, estilo, momento=None, modo=None):
+        """Verifica se a composição já está no cache"""
+        return self.cache.contem(self.chave(sentimentos, tom, estilo, momento, modo))
+
+    def compor(self, sentimentos, tom, estilo, forcar_nova=False, ao_receber_trecho=None, momento=None,
+               modo=None):
+        """Compõe a música, reaproveitando o cache salvo quando possível.
+
+        Se ao_receber_trecho for informado, a saída do LLM é transmitida em
+        streaming e a função é chamada com o texto acumulado a cada trecho.
+        O momento (ex.: "Comunhão") direciona o canto para uma parte da Missa.
+        O modo ("rascunho" ou "final") escolhe o modelo em backends roteados.
+        Pedidos idênticos simultâneos compartilham uma única chamada ao LLM.
+        """
+        chave = self.chave(sentimentos, tom, estilo, momento, modo)
+
+        if not forcar_nova:
+            texto_cache = self.cache.obter(chave)
+            if texto_cache is not None:
+                if ao_receber_trecho:
+                    ao_receber_trecho(texto_cache)
+                return texto_cache
+
+        def compor_e_salvar(repassar_trecho):
+            texto, modelo = self.backend.compor_com_modelo(sentimentos, tom, estilo, momento, repassar_trecho, modo)
+
+            # Salvar no cache antes de liberar os pedidos em espera, sob a chave do
+            # modelo que respondeu (uma alternativa não ocupa a chave do preferido)
+            self.cache.salvar(self.chave(sentimentos, tom, estilo, momento, modelo=modelo), texto, {
+                "tom": tom,
+                "estilo": estilo,
+                "momento": momento,
+                "modo": modo,
+                "modelo": modelo
+            })
+            return texto
+
+        return self.controle.executar(chave, compor_e_salvar, ao_receber_trecho)
+
+# Função para obter o texto de um resultado do CrewAI
+def texto_do_resultado(resultado):
+    """Converte o resultado da composição (str, dict ou CrewOutput) em texto"""
+    if isinstance(resultado, str):
+        try:
+            resultado_json = json.loads(resultado)
+            return resultado_json.get("raw", resultado) if isinstance(resultado_json, dict) else resultado
+        except json.JSONDecodeError:
+            return resultado
+    elif isinstance(resultado, dict):
+        return resultado.get("raw", str(resultado))
+    return getattr(resultado, "raw", None) or str(resultado)
+
+# Função para extrair letra do texto gerado
+def extrair_letra_musica(texto_completo):
+    """Extrai apenas a letra da música do texto completo gerado"""
+    # Preferir a estrutura enviada pelo LLM (ou lida do markdown)
+    try:
+        return estruturar_composicao(texto_completo).letra_texto()
+    except ErroComposicaoInvalida:
+        pass
+
+    try:
+        # Procurar por seções de letra (versos, refrão, etc.)
+        linhas = texto_completo.split('\n')
+        letra_linhas = []
+
+        # Palavras-chave que indicam seções de letra
+        secoes_letra = ['verso', 'refrão', 'refrao', 'ponte', 'coro', 'estrofe']
+
+        capturando_letra = False
+        for linha in linhas:
+            linha_limpa = linha.strip().lower()
+
+            # Verificar se é uma seção de letra
+            if any(secao in linha_limpa for secao in secoes_letra):
+                capturando_letra = True
+                continue
+
+            # Parar se encontrar seções técnicas
+            if any(palavra in linha_limpa for palavra in ['cifra', 'acorde', 'tom:', 'bpm', 'compasso']):
+                capturando_letra = False
+                continue
+
+            # Capturar linhas de letra
+            if capturando_letra and linha.strip() and not linha.startswith('#') and not linha.startswith('*'):
+                # Remover marcações markdown
+                linha_letra = re.sub(r'\*\*([^*]+)\*\*', r'\1', linha.strip())
+                linha_letra = re.sub(r'\*([^*]+)\*', r'\1', linha_letra)
+                if linha_letra:
+                    letra_linhas.append(linha_letra)
+
+        return ' '.join(letra_linhas) if letra_linhas else "Letra não encontrada no texto gerado."
+
+    except Exception as e:
+        return f"Erro ao extrair letra: {str(e)}"
+
+# Teste básico
+if __name__ == "__main__":
+    from backends_llm import BackendStub
+
+    compositor = Compositor(BackendStub(latencia_segundos=0.5))
+
+    print("🎵 NÚCLEO DO COMPOSITOR")
+    print("=" * 30)
+
+    texto = compositor.compor("esperança", "G", "mariano", forcar_nova=True)
+    print(f"Composição: {len(texto)} caracteres")
+    print(f"Letra: {extrair_letra_musica(texto)[:60]}...")
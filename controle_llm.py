@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Controle de Chamadas ao LLM
+Agrupa pedidos idênticos simultâneos em uma única chamada (single-flight),
+limita as chamadas concorrentes e repete com espera exponencial quando o
+provedor recusa por limite de taxa
+"""
+
+import os
+import random
+import threading
+import time
+
+def eh_limite_taxa(erro):
+    """Verifica se o erro (ou sua causa) é de limite de taxa do provedor"""
+    while erro is not None:
+        nome = type(erro).__name__.lower()
+        mensagem = str(erro).lower()
+        if "ratelimit" in nome or "rate limit" in mensagem or "rate_limit" in mensagem or "429" in mensagem:
+            return True
+        erro = erro.__cause__ or erro.__context__
+    return False
+
+class _Assinante:
+    """Pedido que aguarda uma chamada compartilhada"""
+
+    def __init__(self, ao_receber_trecho=None):
+        self.ao_receber_trecho = ao_receber_trecho
+        self.erro = None
+        self.liberado = threading.Event()
+
+class _ChamadaEmAndamento:
+    """Chamada em execução compartilhada pelos pedidos idênticos"""
+
+    def __init__(self):
+        self.resultado = None
+        self.erro = None
+        self.assinantes = []
+        self.ultimo_parcial = None
+        self.abandono = None
+
+class ControleChamadasLLM:
+    """Classe que coordena as chamadas ao LLM feitas pelo compositor"""
+
+    def __init__(self, max_concorrentes=4, max_tentativas=4, espera_inicial=2.0, espera_maxima=30.0,
+                 dormir=time.sleep):
+        """
+        max_concorrentes: chamadas ao LLM executadas ao mesmo tempo
+        max_tentativas: tentativas por chamada quando há limite de taxa
+        espera_inicial / espera_maxima: espera exponencial entre tentativas (s)
+        """
+        self.max_concorrentes = max_concorrentes
+        self.max_tentativas = max(1, max_tentativas)
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self._dormir = dormir
+        self._semaforo = threading.BoundedSemaphore(max_concorrentes)
+        self._lock = threading.Lock()
+        self._chamadas = {}
+        self.estatisticas = {
+            "executadas": 0,
+            "coalescidas": 0,
+            "repeticoes_limite_taxa": 0,
+            "falhas": 0,
+            "espera_semaforo_segundos": 0.0
+        }
+
+    def executar(self, chave, funcao, ao_receber_trecho=None):
+        """Executa funcao(repassar_trecho) uma única vez por chave em andamento.
+
+        Pedidos com a mesma chave feitos enquanto a chamada executa aguardam
+        e recebem o mesmo resultado (ou a mesma exceção). Os trechos em
+        streaming são repassados a todos os pedidos que informaram
+        ao_receber_trecho, mesmo que o primeiro pedido não tenha informado.
+        Se o ao_receber_trecho de um pedido lançar uma exceção (ex.:
+        cancelamento), só esse pedido a recebe e deixa de acompanhar a
+        chamada, que continua enquanto restar algum pedido.
+        """
+        assinante = _Assinante(ao_receber_trecho)
+        with self._lock:
+            chamada = self._chamadas.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = _ChamadaEmAndamento()
+                self._chamadas[chave] = chamada
+            else:
+                self.estatisticas["coalescidas"] += 1
+            chamada.assinantes.append(assinante)
+            parcial = chamada.ultimo_parcial
+
+        if not lider:
+            if ao_receber_trecho and parcial is not None:
+                try:
+                    ao_receber_trecho(parcial)
+                except Exception as e:
+                    self._desligar(chave, chamada, assinante, e)
+            assinante.liberado.wait()
+            return self._resultado_do_pedido(chamada, assinante)
+
+        def repassar(texto_parcial):
+            with self._lock:
+                chamada.ultimo_parcial = texto_parcial
+                assinantes = [a for a in chamada.assinantes if a.ao_receber_trecho]
+
+            for ouvinte in assinantes:
+                try:
+                    ouvinte.ao_receber_trecho(texto_parcial)
+                except Exception as e:
+                    self._desligar(chave, chamada, ouvinte, e)
+
+            # Sem nenhum pedido aguardando, a chamada ao LLM é interrompida
+            if chamada.abandono is not None:
+                raise chamada.abandono
+
+        try:
+            chamada.resultado = self._executar_com_limites(funcao, repassar)
+        except Exception as e:
+            chamada.erro = e
+            with self._lock:
+                self.estatisticas["falhas"] += 1
+        finally:
+            with self._lock:
+                if self._chamadas.get(chave) is chamada:
+                    del self._chamadas[chave]
+                assinantes = list(chamada.assinantes)
+            for restante in assinantes:
+                restante.liberado.set()
+
+        return self._resultado_do_pedido(chamada, assinante)
+
+    def _desligar(self, chave, chamada, assinante, erro):
+        """Retira o pedido da chamada compartilhada, liberando-o com o seu erro"""
+        with self._lock:
+            if assinante in chamada.assinantes:
+                chamada.assinantes.remove(assinante)
+            assinante.erro = erro
+            if not chamada.assinantes:
+                chamada.abandono = erro
+                # Novos pedidos iguais não se juntam a uma chamada abandonada
+                if self._chamadas.get(chave) is chamada:
+                    del self._chamadas[chave]
+        assinante.liberado.set()
+
+    @staticmethod
+    def _resultado_do_pedido(chamada, assinante):
+        """Resultado da chamada para o pedido, ou o erro do próprio pedido"""
+        if assinante.erro is not None:
+            raise assinante.erro
+        if chamada.erro is not None:
+            raise chamada.erro
+        return chamada.resultado
+
+    def _executar_com_limites(self, funcao, ao_receber_trecho):
+        """Executa respeitando o semáforo e repetindo em caso de limite de taxa"""
+        for tentativa in range(1, self.max_tentativas + 1):
+            inicio_espera = time.monotonic()
+            with self._semaforo:
+                with self._lock:
+                    self.estatisticas["espera_semaforo_segundos"] += time.monotonic() - inicio_espera
+                    self.estatisticas["executadas"] += 1
+                try:
+                    return funcao(ao_receber_trecho)
+                except Exception as e:
+                    if tentativa == self.max_tentativas or not eh_limite_taxa(e):
+                        raise
+                    espera = self._calcular_espera(tentativa, e)
+
+            # Aguardar fora do semáforo para não bloquear outras chamadas
+            with self._lock:
+                self.estatisticas["repeticoes_limite_taxa"] += 1
+            print(f"Limite de taxa do LLM atingido; nova tentativa em {espera:.1f}s")
+            self._dormir(espera)
+
+    def _calcular_espera(self, tentativa, erro):
+        """Espera exponencial com variação aleatória, respeitando retry_after"""
+        retry_after = getattr(erro, "retry_after", None)
+        if isinstance(retry_after, (int, float)) and retry_after > 0:
+            return min(self.espera_maxima, float(retry_after))
+
+        espera = min(self.espera_maxima, self.espera_inicial * (2 ** (tentativa - 1)))
+        return espera * random.uniform(0.5, 1.0)
+
+    def obter_estatisticas(self):
+        """Retorna contadores de chamadas executadas e coalescidas"""
+        with self._lock:
+            estatisticas = dict(self.estatisticas)
+            estatisticas["em_andamento"] = len(self._chamadas)
+
+        pedidos = estatisticas["executadas"] - estatisticas["repeticoes_limite_taxa"] + estatisticas["coalescidas"]
+        estatisticas["taxa_coalescencia"] = estatisticas["coalescidas"] / pedidos if pedidos else 0.0
+        estatisticas["max_concorrentes"] = self.max_concorrentes
+        return estatisticas
+
+# Função de conveniência
+def criar_controle_llm():
+    """Cria o controle usando COMPOSITOR_MAX_CHAMADAS_LLM como limite de concorrência"""
+    return ControleChamadasLLM(max_concorrentes=int(os.getenv("COMPOSITOR_MAX_CHAMADAS_LLM", "4")))
+
+# Teste básico
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    controle = ControleChamadasLLM(max_concorrentes=2)
+
+    print("🚦 CONTROLE DE CHAMADAS AO LLM")
+    print("=" * 30)
+
+    def compor(ao_receber_trecho):
+        time.sleep(0.5)
+        return "composição"
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        list(executor.map(lambda _: controle.executar("mesmo pedido", compor), range(20)))
+
+    estatisticas = controle.obter_estatisticas()
+    print(f"Executadas: {estatisticas['executadas']}")
+    print(f"Coalescidas: {estatisticas['coalescidas']}")
+    print(f"Taxa de coalescência: {estatisticas['taxa_coalescencia']:.0%}")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Coro Virtual
+Deriva as vozes de um coro de uma única voz sintetizada: cada integrante é
+a mesma voz com altura própria (tipo de voz + desafinação em cents), timbre
+mais claro ou mais escuro (aproximação do deslocamento de formantes), entrada
+levemente adiantada ou atrasada e ganho próprio, tudo em NumPy. A altura do
+naipe é deslocada uma vez, sem mudar a duração (transformacao_voz), então os
+naipes cantam juntos; só a desafinação mexe levemente no tempo. As variações
+vêm de um gerador com semente opcional, então o mesmo coro sai idêntico.
+"""
+
+from dataclasses import dataclass
+from fractions import Fraction
+
+import numpy as np
+
+import codec_audio
+from mixagem import mixar_amostras
+from transformacao_voz import transformar_voz
+
+# Variações entre os integrantes de um mesmo naipe
+DESAFINACAO_CENTS = 12.0
+MICRO_ATRASO_SEGUNDOS = 0.035
+VARIACAO_GANHO_DB = 1.5
+VARIACAO_TIMBRE = 0.08
+
+# Timbre por semitom do tipo de voz (vozes graves mais escuras) e limite
+TIMBRE_POR_SEMITOM = 0.05
+TIMBRE_MAXIMO = 0.45
+
+# Maior denominador da razão da desafinação (passos de ~2 cents perto de 1)
+DENOMINADOR_DESAFINACAO = 1000
+
+# Pico do coro mixado (-0,1 dBFS, como o normalize do pydub)
+PICO_CORO = 10 ** (-0.1 / 20)
+
+@dataclass(frozen=True)
+class IntegranteCoro:
+    """Como um integrante deriva da voz sintetizada"""
+
+    semitons_naipe: float  # altura do naipe, com a duração preservada
+    fator_altura: float    # desafinação: > 1 mais agudo (e levemente mais curto), < 1 mais grave
+    timbre: float          # > 0 mais claro, < 0 mais escuro
+    atraso_amostras: int
+    ganho: float
+
+def planejar_coro(semitons_naipes, num_vozes, taxa_amostragem, atraso_naipe_segundos=0.0, semente=None):
+    """Integrantes do coro, distribuídos pelos naipes em rodízio.
+
+    semitons_naipes: deslocamento de altura de cada naipe (pitch_adjust do tipo de voz)
+    atraso_naipe_segundos: entrada escalonada de cada naipe (efeito de cânone)
+    semente: com o mesmo valor, as variações (e o coro) são sempre as mesmas
+    """
+    gerador = np.random.default_rng(semente)
+    integrantes = []
+    for indice in range(max(1, int(num_vozes))):
+        naipe = indice % len(semitons_naipes)
+        semitons = semitons_naipes[naipe]
+        desafinacao = gerador.uniform(-DESAFINACAO_CENTS, DESAFINACAO_CENTS) / 100
+        timbre = np.clip(semitons * TIMBRE_POR_SEMITOM, -TIMBRE_MAXIMO, TIMBRE_MAXIMO)
+        timbre += gerador.uniform(-VARIACAO_TIMBRE, VARIACAO_TIMBRE)
+        atraso = naipe * atraso_naipe_segundos + gerador.uniform(0.0, MICRO_ATRASO_SEGUNDOS)
+        ganho_db = gerador.uniform(-VARIACAO_GANHO_DB, VARIACAO_GANHO_DB)
+
+        integrantes.append(IntegranteCoro(
+            semitons_naipe=float(semitons),
+            fator_altura=float(2 ** (desafinacao / 12)),
+            timbre=float(timbre),
+            atraso_amostras=int(round(atraso * taxa_amostragem)),
+            ganho=float(10 ** (ganho_db / 20))
+        ))
+    return integrantes
+
+def _razao_desafinacao(integrante):
+    """Razão da reamostragem polifásica da desafinação do integrante"""
+    return Fraction(integrante.fator_altura).limit_denominator(DENOMINADOR_DESAFINACAO)
+
+def _comprimento_derivado(num_amostras, integrante):
+    """Amostras da voz do integrante derivada de uma voz (do naipe) com num_amostras"""
+    razao = _razao_desafinacao(integrante)
+    if num_amostras < 2 or razao == 1:
+        return num_amostras
+    return -(-num_amostras * razao.denominator // razao.numerator)
+
+def derivar_voz(amostras, integrante):
+    """Voz de um integrante a partir da voz do seu naipe: desafinação por reamostragem
+    polifásica e filtro de timbre de 2 coeficientes"""
+    amostras = np.asarray(amostras, dtype=np.float32)
+    if len(amostras) < 2:
+        return amostras.copy()
+
+    # A desafinação (poucos cents) muda altura e duração juntas, em menos de 1%
+    razao = _razao_desafinacao(integrante)
+    voz = codec_audio.reamostrar(amostras, razao.numerator, razao.denominator)
+    voz = voz.copy() if razao == 1 else voz
+
+    # y = x + timbre * (x - x[n-1]): reforça (timbre > 0) ou suaviza (< 0) os agudos
+    anterior = np.empty_like(voz)
+    anterior[0] = 0.0
+    anterior[1:] = voz[:-1]
+    voz += np.float32(integrante.timbre) * (voz - anterior)
+    return voz
+
+def vozes_dos_naipes(amostras, integrantes):
+    """Voz de cada naipe ({semitons: amostras}): altura deslocada sem mudar a duração,
+    calculada uma vez por naipe e compartilhada pelos seus integrantes"""
+    amostras = np.asarray(amostras, dtype=np.float32)
+    return {
+        semitons: transformar_voz(amostras, semitons, 1.0)
+        for semitons in dict.fromkeys(integrante.semitons_naipe for integrante in integrantes)
+    }
+
+def renderizar_coro(amostras, integrantes):
+    """Soma os integrantes derivados da mesma voz em um buffer float32 mono normalizado"""
+    naipes = vozes_dos_naipes(amostras, integrantes)
+    total = max(integrante.atraso_amostras + _comprimento_derivado(len(naipes[integrante.semitons_naipe]), integrante)
+                for integrante in integrantes)
+    # Um integrante derivado por vez, somado direto na mixagem
+    return mixar_amostras(
+        (derivar_voz(naipes[integrante.semitons_naipe], integrante) for integrante in integrantes),
+        [integrante.atraso_amostras for integrante in integrantes],
+        [integrante.ganho for integrante in integrantes], total, pico=PICO_CORO
+    )
+
+# Teste básico
+if __name__ == "__main__":
+    import time
+
+    print("🎶 CORO VIRTUAL")
+    print("=" * 30)
+
+    taxa = 24000
+    t = np.arange(10 * taxa, dtype=np.float32) / taxa
+    voz = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    for num_vozes in (1, 2, 8, 16):
+        inicio = time.perf_counter()
+        coro = renderizar_coro(voz, planejar_coro([0, -3], num_vozes, taxa, 0.5, semente=7))
+        print(f"  {num_vozes:>2} vozes: {(time.perf_counter() - inicio) * 1000:6.1f}ms, {len(coro) / taxa:.2f}s")
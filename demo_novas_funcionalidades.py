@@ -71,8 +71,7 @@ def demo_text_to_speech():
     
     try:
         from gtts import gTTS
-        import tempfile
-        import os
+        import io
         
         print(f"📝 Texto para conversão: {letra_teste}")
         print("⏳ Gerando áudio com TTS...")
@@ -80,23 +79,17 @@ def demo_text_to_speech():
         # Gerar TTS
         tts = gTTS(text=letra_teste, lang='pt-br', slow=False)
         
-        # Salvar em arquivo temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-            tts.save(temp_file.name)
-            
-            # Verificar se o arquivo foi criado
-            if os.path.exists(temp_file.name):
-                file_size = os.path.getsize(temp_file.name)
-                print(f"✅ Áudio TTS gerado com sucesso!")
-                print(f"📊 Tamanho do arquivo: {file_size} bytes")
-                print(f"💾 Arquivo temporário: {temp_file.name}")
-                
-                # Limpar arquivo temporário
-                os.unlink(temp_file.name)
-                return True
-            else:
-                print("❌ Arquivo TTS não foi criado")
-                return False
+        # Receber o MP3 em memória, sem arquivo temporário
+        audio_mp3 = io.BytesIO()
+        tts.write_to_fp(audio_mp3)
+        
+        if audio_mp3.tell() > 0:
+            print(f"✅ Áudio TTS gerado com sucesso!")
+            print(f"📊 Tamanho do áudio: {audio_mp3.tell()} bytes")
+            return True
+        else:
+            print("❌ Áudio TTS não foi gerado")
+            return False
                 
     except Exception as e:
         print(f"❌ Erro no TTS: {str(e)}")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Formatos de Entrega
+Negocia o formato em que o áudio sai do pipeline: uma prévia leve (mono,
+22,05 kHz, MP3 de baixa taxa) para o player, codificada assim que o áudio fica
+pronto, e o arquivo em qualidade total no formato escolhido pelo usuário,
+codificado apenas quando o download é pedido.
+
+Não importa as bibliotecas de áudio no carregamento, para que a interface
+possa montar o seletor de formato antes do primeiro áudio.
+"""
+
+import threading
+
+# formato -> rótulo, mime, extensão, taxas de bits oferecidas (None = sem perdas) e padrão
+FORMATOS_ENTREGA = {
+    "mp3": {
+        "rotulo": "MP3",
+        "mime": "audio/mpeg",
+        "extensao": "mp3",
+        "bitrates": [96, 128, 192, 256, 320],
+        "bitrate_padrao": 192
+    },
+    "opus": {
+        "rotulo": "OGG Opus",
+        "mime": "audio/ogg",
+        "extensao": "opus",
+        "bitrates": [48, 64, 96, 128, 192],
+        "bitrate_padrao": 128
+    },
+    "ogg": {
+        "rotulo": "OGG Vorbis",
+        "mime": "audio/ogg",
+        "extensao": "ogg",
+        "bitrates": None,
+        "bitrate_padrao": None
+    },
+    "flac": {
+        "rotulo": "FLAC (sem perdas)",
+        "mime": "audio/flac",
+        "extensao": "flac",
+        "bitrates": None,
+        "bitrate_padrao": None
+    },
+    "wav": {
+        "rotulo": "WAV (sem compressão)",
+        "mime": "audio/wav",
+        "extensao": "wav",
+        "bitrates": None,
+        "bitrate_padrao": None
+    }
+}
+
+FORMATO_DOWNLOAD_PADRAO = "mp3"
+
+# Prévia do player: o MP3 é tocado por todos os navegadores; em mono, a
+# 22,05 kHz (metade de 44,1 kHz, reamostragem barata) e 48 kbps, codifica
+# bem mais rápido que o arquivo final e ocupa uma fração do tamanho
+PERFIL_PREVIA = {"formato": "mp3", "bitrate_kbps": 48, "taxa_amostragem": 22050, "mono": True}
+
+def normalizar_bitrate(formato, bitrate_kbps=None):
+    """Taxa de bits válida para o formato (None nos formatos sem taxa configurável)"""
+    info = FORMATOS_ENTREGA[formato]
+    if not info["bitrates"]:
+        return None
+    return int(bitrate_kbps or info["bitrate_padrao"])
+
+def codificar_previa(buffer, perfil=None):
+    """Codifica a prévia de escuta; retorna (bytes, mime)"""
+    perfil = perfil or PERFIL_PREVIA
+    if perfil.get("mono"):
+        buffer = buffer.para_mono()
+    buffer = buffer.reamostrar(perfil["taxa_amostragem"])
+    dados = buffer.codificar(perfil["formato"], perfil.get("bitrate_kbps"))
+    return dados, FORMATOS_ENTREGA[perfil["formato"]]["mime"]
+
+class AudioEntrega:
+    """Classe que guarda o áudio final e entrega a prévia e os arquivos de download.
+
+    Cada codificação é feita uma única vez e reaproveitada nas execuções
+    seguintes da página.
+    """
+
+    def __init__(self, buffer, nome_base="audio", perfil_previa=None):
+        from buffer_audio import BufferAudio
+
+        self.buffer = BufferAudio.de_audio(buffer)
+        self.nome_base = nome_base
+        self.perfil_previa = perfil_previa or PERFIL_PREVIA
+        self._codificados = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        del estado["_lock"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+    def _memorizar(self, chave, codificar):
+        with self._lock:
+            if chave not in self._codificados:
+                self._codificados[chave] = codificar()
+            return self._codificados[chave]
+
+    def guardar_previa(self, dados, mime):
+        """Usa uma prévia já codificada (ex.: lida do banco instrumental)"""
+        with self._lock:
+            self._codificados[("previa",)] = (dados, mime)
+
+    def guardar_arquivo(self, dados, formato=FORMATO_DOWNLOAD_PADRAO, bitrate_kbps=None):
+        """Usa um arquivo de download já codificado no formato e taxa de bits indicados"""
+        with self._lock:
+            self._codificados[(formato, normalizar_bitrate(formato, bitrate_kbps))] = dados
+
+    def previa(self):
+        """Prévia leve para o player; retorna (bytes, mime)"""
+        return self._memorizar(("previa",), lambda: codificar_previa(self.buffer, self.perfil_previa))
+
+    def arquivo(self, formato=FORMATO_DOWNLOAD_PADRAO, bitrate_kbps=None):
+        """Bytes em qualidade total no formato e taxa de bits indicados"""
+        bitrate_kbps = normalizar_bitrate(formato, bitrate_kbps)
+        return self._memorizar(
+            (formato, bitrate_kbps), lambda: self.buffer.codificar(formato, bitrate_kbps)
+        )
+
+    def nome_arquivo(self, formato=FORMATO_DOWNLOAD_PADRAO):
+        return f"{self.nome_base}.{FORMATOS_ENTREGA[formato]['extensao']}"
+
+    @staticmethod
+    def mime(formato=FORMATO_DOWNLOAD_PADRAO):
+        return FORMATOS_ENTREGA[formato]["mime"]
+
+class PreviaProgressiva:
+    """Prévias dos blocos já renderizados de um áudio ainda em produção.
+
+    Vai no campo parcial da tarefa em segundo plano; no estado gravado em
+    disco aparece apenas o resumo (str).
+    """
+
+    def __init__(self, perfil=None):
+        self.perfil = perfil or PERFIL_PREVIA
+        self._segmentos = []
+        self._lock = threading.Lock()
+
+    def adicionar(self, bloco):
+        """Codifica a prévia de mais um bloco (BufferAudio)"""
+        dados, mime = codificar_previa(bloco, self.perfil)
+        with self._lock:
+            inicio = sum(segmento["duracao_segundos"] for segmento in self._segmentos)
+            self._segmentos.append({
+                "dados": dados,
+                "mime": mime,
+                "inicio_segundos": inicio,
+                "duracao_segundos": bloco.duracao_segundos
+            })
+
+    def obter_segmentos(self):
+        with self._lock:
+            return list(self._segmentos)
+
+    @property
+    def duracao_segundos(self):
+        with self._lock:
+            return sum(segmento["duracao_segundos"] for segmento in self._segmentos)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._segmentos)
+
+    def __str__(self):
+        return f"{len(self)} trechos prontos ({self.duracao_segundos:.0f}s)"
+
+# Teste básico
+if __name__ == "__main__":
+    import time
+
+    import numpy as np
+
+    from buffer_audio import BufferAudio
+
+    print("📦 FORMATOS DE ENTREGA")
+    print("=" * 30)
+
+    t = np.arange(44100 * 10, dtype=np.float32) / 44100
+    entrega = AudioEntrega(BufferAudio(0.5 * np.sin(2 * np.pi * 440 * t), 44100), "teste")
+
+    inicio = time.perf_counter()
+    dados, mime = entrega.previa()
+    print(f"Prévia ({mime}): {len(dados)} bytes em {(time.perf_counter() - inicio) * 1000:.0f}ms")
+
+    for formato in FORMATOS_ENTREGA:
+        inicio = time.perf_counter()
+        dados = entrega.arquivo(formato)
+        print(f"{entrega.nome_arquivo(formato)}: {len(dados)} bytes em {(time.perf_counter() - inicio) * 1000:.0f}ms")
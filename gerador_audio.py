@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Gerador de Áudio
+Base instrumental, voz por Text-to-Speech (falada ou cantada na melodia)
+e mixagem simples das duas
+"""
+
+from dataclasses import replace
+
+from buffer_audio import BufferAudio
+from cache_voz import frases_para_voz
+from backends_tts import SintetizadorFrases, obter_backend_tts
+from composicao_estruturada import BPM_PADRAO, texto_para_voz
+from renderizacao_progressiva import RenderizadorProgressivo, SEGUNDOS_BLOCO_PADRAO, trechos_para_voz
+from sintetizador_acordes import (
+    TAXA_AMOSTRAGEM_PADRAO, DURACAO_ACORDE_PADRAO, BaseInstrumental,
+    sintetizar_progressao, progressao_do_estilo, para_audio_segment, instrumental_com_duracao
+)
+
+# Mapeamento de tons para frequências (em Hz)
+TONS_FREQUENCIAS = {
+    "C": 261.63, "C#": 277.18, "Db": 277.18,
+    "D": 293.66, "D#": 311.13, "Eb": 311.13,
+    "E": 329.63, "F": 349.23, "F#": 369.99, "Gb": 369.99,
+    "G": 392.00, "G#": 415.30, "Ab": 415.30,
+    "A": 440.00, "A#": 466.16, "Bb": 466.16,
+    "B": 493.88
+}
+
+# Mapeamento de tons para semitons
+TONS_SEMITONS = {
+    'C': 0, 'C#': 1, 'Db': 1, 'D': 2, 'D#': 3, 'Eb': 3,
+    'E': 4, 'F': 5, 'F#': 6, 'Gb': 6, 'G': 7, 'G#': 8,
+    'Ab': 8, 'A': 9, 'A#': 10, 'Bb': 10, 'B': 11
+}
+
+def base_instrumental(tom, estilo="tradicional", duracao_acorde=DURACAO_ACORDE_PADRAO,
+                      taxa_amostragem=TAXA_AMOSTRAGEM_PADRAO):
+    """Base instrumental do tom e estilo, renderizada sob medida para cada duração"""
+    return BaseInstrumental(
+        TONS_FREQUENCIAS.get(tom, 440.00), tuple(progressao_do_estilo(estilo)), duracao_acorde, taxa_amostragem
+    )
+
+def gerar_instrumental(tom, estilo="tradicional", duracao_acorde=DURACAO_ACORDE_PADRAO,
+                       taxa_amostragem=TAXA_AMOSTRAGEM_PADRAO, duracao_segundos=None, limites_secoes=None):
+    """Gera a base instrumental (progressão de acordes do estilo) como AudioSegment.
+
+    Sem duracao_segundos, toca a progressão uma vez; com ela, tem exatamente
+    essa duração e termina em cadência (limites_secoes em segundos).
+    """
+    if duracao_segundos is not None:
+        base = base_instrumental(tom, estilo, duracao_acorde, taxa_amostragem)
+        return base.para_duracao(duracao_segundos, limites_secoes).para_audio_segment()
+
+    amostras = sintetizar_progressao(
+        TONS_FREQUENCIAS.get(tom, 440.00), progressao_do_estilo(estilo),
+        duracao_acorde=duracao_acorde, taxa_amostragem=taxa_amostragem
+    )
+    return para_audio_segment(amostras, taxa_amostragem)
+
+def exportar_audio(audio, formato="mp3"):
+    """Converte um AudioSegment para bytes no formato indicado (codificado no próprio processo)"""
+    return BufferAudio.de_audio_segment(audio).codificar(formato)
+
+def gerar_audio_simples(tom, estilo="tradicional", duracao_acorde=DURACAO_ACORDE_PADRAO,
+                        taxa_amostragem=TAXA_AMOSTRAGEM_PADRAO):
+    """Gera um áudio simples baseado no tom selecionado"""
+    try:
+        return exportar_audio(gerar_instrumental(tom, estilo, duracao_acorde, taxa_amostragem))
+
+    except Exception as e:
+        print(f"Erro ao gerar áudio: {str(e)}")
+        return None
+
+def sintetizar_buffer_voz(letra, lang='pt-br', slow=False, cache_voz=None, ao_medir_frase=None,
+                          backend_tts=None):
+    """Gera a voz da letra por Text-to-Speech e retorna um BufferAudio.
+
+    A letra (texto ou ComposicaoEstruturada) é sintetizada linha a linha,
+    com as linhas em paralelo e o áudio recebido e decodificado em memória
+    (cada linha repetida, como o refrão, é sintetizada e decodificada uma vez).
+    cache_voz: CacheVoz opcional; só as linhas ausentes dele vão ao backend.
+    ao_medir_frase(medida) recebe a latência de cada linha distinta.
+    backend_tts: BackendTTS (padrão: o da implantação, em COMPOSITOR_TTS_BACKEND).
+    """
+    frases = frases_para_voz(texto_para_voz(letra))
+    linhas = _sintetizar_linhas(frases, lang, slow, cache_voz, ao_medir_frase, backend_tts)
+    return BufferAudio.concatenar(linhas)
+
+def _sintetizar_linhas(frases, lang, slow, cache_voz, ao_medir_frase, backend_tts):
+    """BufferAudio de cada frase, na ordem (frases repetidas decodificadas uma vez)"""
+    backend_tts = backend_tts or obter_backend_tts()
+    audios = SintetizadorFrases(backend_tts).sintetizar(frases, lang, slow, cache_voz, ao_medir_frase)
+
+    decodificadas = {}
+    for frase, dados in zip(frases, audios):
+        if frase not in decodificadas:
+            decodificadas[frase] = BufferAudio.de_bytes(dados, backend_tts.formato)
+    return [decodificadas[frase] for frase in frases]
+
+def cantar_buffer_voz(letra, tom, estilo, bpm=BPM_PADRAO, lang='pt-br', cache_voz=None, backend_tts=None):
+    """Gera a voz da letra cantando a melodia do tom e estilo (GeradorPartituras) como BufferAudio.
+
+    A letra pode ser texto ou ComposicaoEstruturada. Cada linha é
+    sintetizada como na voz falada; as sílabas seguem as notas
+    da melodia, com cada nota durando um tempo de bpm (voz_cantada).
+    """
+    from voz_cantada import cantar, notas_da_melodia, silabas
+
+    frases = frases_para_voz(texto_para_voz(letra))
+    linhas = [linha.para_mono() for linha in _sintetizar_linhas(frases, lang, False, cache_voz, None, backend_tts)]
+    if not linhas:
+        return BufferAudio.concatenar(linhas)
+
+    frequencias, duracoes = notas_da_melodia(tom, estilo, float(bpm))
+    taxa_amostragem = linhas[0].taxa_amostragem
+    amostras = cantar(
+        [linha.reamostrar(taxa_amostragem).amostras for linha in linhas], taxa_amostragem,
+        frequencias, duracoes, [len(silabas(frase)) for frase in frases]
+    )
+    return BufferAudio(amostras, taxa_amostragem)
+
+def sintetizar_voz(letra, lang='pt-br', slow=False, cache_voz=None, backend_tts=None):
+    """Gera a voz da letra por Text-to-Speech e retorna um AudioSegment"""
+    return sintetizar_buffer_voz(letra, lang, slow, cache_voz, backend_tts=backend_tts).para_audio_segment()
+
+def mixar_voz_instrumental(audio_voz, audio_instrumental_seg, velocidade=1.0):
+    """Mixa voz e instrumental com a duração da voz.
+
+    audio_instrumental_seg: BaseInstrumental (renderizada sob medida) ou
+    áudio já renderizado, repetido ciclicamente se for mais curto que a voz.
+    """
+    # Ajustar velocidade da voz se necessário
+    if velocidade != 1.0:
+        # Simular mudança de velocidade alterando frame rate
+        new_sample_rate = int(audio_voz.frame_rate * velocidade)
+        audio_voz = audio_voz._spawn(audio_voz.raw_data, overrides={"frame_rate": new_sample_rate})
+        audio_voz = audio_voz.set_frame_rate(audio_voz.frame_rate)
+
+    # Instrumental com exatamente a duração da voz
+    duracao_voz = audio_voz.frame_count() / audio_voz.frame_rate
+    audio_instrumental_seg = instrumental_com_duracao(audio_instrumental_seg, duracao_voz).para_audio_segment()
+
+    # Ajustar volumes
+    audio_instrumental_seg = audio_instrumental_seg - 10  # Diminuir volume instrumental
+    audio_voz = audio_voz + 5  # Aumentar volume da voz
+
+    # Mixar voz e instrumental
+    return audio_instrumental_seg.overlay(audio_voz)
+
+def _bpm_da_letra(letra):
+    """Andamento da composição estruturada (BPM_PADRAO para texto)"""
+    return float(getattr(letra, "bpm", None) or BPM_PADRAO)
+
+def _base_da_voz(tom, estilo, banco, bpm=None):
+    """Base do banco (ou padrão); com bpm, um acorde por compasso de 4 tempos, junto da melodia cantada"""
+    instrumental = banco.obter_base(tom, estilo) if banco is not None else base_instrumental(tom, estilo)
+    if bpm is not None:
+        instrumental = replace(instrumental, duracao_acorde=4 * 60.0 / bpm)
+    return instrumental
+
+def gerar_buffer_progressivo(letra, tom, estilo, velocidade=1.0, banco=None, ao_receber_bloco=None,
+                             segundos_bloco=SEGUNDOS_BLOCO_PADRAO, cache_voz=None, modo_voz="falada"):
+    """Renderiza o áudio com voz em blocos, um trecho da letra por vez.
+
+    ao_receber_bloco(indice, bloco) recebe cada bloco (BufferAudio) assim que
+    fica pronto; o retorno é o BufferAudio completo.
+    """
+    if modo_voz == "cantada":
+        # A velocidade muda o andamento da melodia, não a altura da voz
+        bpm = _bpm_da_letra(letra) * velocidade
+        instrumental = _base_da_voz(tom, estilo, banco, bpm)
+        renderizador = RenderizadorProgressivo(
+            instrumental, lambda trecho: cantar_buffer_voz(trecho, tom, estilo, bpm, cache_voz=cache_voz),
+            segundos_bloco=segundos_bloco
+        )
+    else:
+        renderizador = RenderizadorProgressivo(
+            _base_da_voz(tom, estilo, banco), lambda trecho: sintetizar_buffer_voz(trecho, cache_voz=cache_voz),
+            segundos_bloco=segundos_bloco, velocidade=velocidade
+        )
+    return renderizador.renderizar(trechos_para_voz(letra), ao_receber_bloco)
+
+def gerar_buffer_com_voz(letra, tom, estilo, velocidade=1.0, banco=None, ao_receber_bloco=None, cache_voz=None,
+                         modo_voz="falada"):
+    """Gera o áudio com voz cantando a letra (texto ou ComposicaoEstruturada) como BufferAudio.
+
+    banco: BancoInstrumental opcional cuja configuração (duração dos acordes,
+    taxa de amostragem) define a base, renderizada com a duração da voz.
+    ao_receber_bloco: ativa a renderização progressiva; recebe (indice, bloco)
+    a cada bloco pronto, antes de a música inteira ser mixada. Nesse modo os
+    erros (inclusive os lançados pelo próprio ao_receber_bloco) são propagados.
+    cache_voz: CacheVoz opcional, para sintetizar apenas as linhas ainda não guardadas.
+    modo_voz: "falada" (voz do TTS sobre a base) ou "cantada" (voz na melodia do
+    tom e estilo, no BPM da composição multiplicado pela velocidade, com um
+    acorde da base por compasso).
+    """
+    if ao_receber_bloco is not None:
+        return gerar_buffer_progressivo(letra, tom, estilo, velocidade, banco, ao_receber_bloco, cache_voz=cache_voz,
+                                        modo_voz=modo_voz)
+
+    try:
+        if modo_voz == "cantada":
+            bpm = _bpm_da_letra(letra) * velocidade
+            audio_voz = cantar_buffer_voz(texto_para_voz(letra), tom, estilo, bpm, cache_voz=cache_voz)
+            audio_final = mixar_voz_instrumental(audio_voz.para_audio_segment(), _base_da_voz(tom, estilo, banco, bpm))
+        else:
+            audio_voz = sintetizar_voz(texto_para_voz(letra), cache_voz=cache_voz)
+            audio_final = mixar_voz_instrumental(audio_voz, _base_da_voz(tom, estilo, banco), velocidade)
+        return BufferAudio.de_audio_segment(audio_final)
+
+    except Exception as e:
+        print(f"Erro ao gerar áudio com voz: {str(e)}")
+        return None
+
+def gerar_audio_com_voz(letra, tom, estilo, velocidade=1.0, banco=None, formato="mp3", cache_voz=None,
+                        modo_voz="falada"):
+    """Gera áudio com voz cantando a letra em português, codificado no formato indicado"""
+    buffer = gerar_buffer_com_voz(letra, tom, estilo, velocidade, banco, cache_voz=cache_voz, modo_voz=modo_voz)
+    return buffer.codificar(formato) if buffer is not None else None
+
+def _transpor_librosa(audio_bytes, diferenca_semitons, informar):
+    """Muda o tom com librosa preservando a velocidade"""
+    import librosa
+
+    informar("📁 Carregando áudio...")
+    buffer = BufferAudio.de_bytes(audio_bytes)
+    y = buffer.amostras if buffer.canais == 1 else buffer.amostras.mean(axis=1)
+    if len(y) == 0:
+        raise ValueError("Áudio vazio ou corrompido")
+
+    sr = buffer.taxa_amostragem
+    informar(f"🔄 Aplicando mudança de tom ({len(y)} samples, {sr} Hz)...")
+    y_shifted = librosa.effects.pitch_shift(y, sr=sr, n_steps=diferenca_semitons)
+
+    return BufferAudio(y_shifted, sr)
+
+def _transpor_pydub(audio_bytes, diferenca_semitons):
+    """Muda o tom alterando a taxa de amostragem (altera levemente a velocidade)"""
+    audio = BufferAudio.de_bytes(audio_bytes).para_audio_segment()
+
+    # Cada semitom = 2^(1/12) ≈ 1.059463
+    pitch_factor = 2 ** (diferenca_semitons / 12.0)
+    new_sample_rate = int(audio.frame_rate * pitch_factor)
+
+    audio_modificado = audio._spawn(
+        audio.raw_data,
+        overrides={"frame_rate": new_sample_rate}
+    ).set_frame_rate(audio.frame_rate)
+
+    return BufferAudio.de_audio_segment(audio_modificado)
+
+def transpor_buffer(audio_bytes, tom_original, tom_novo, ao_informar=None):
+    """Muda o tom de um áudio preservando a velocidade e qualidade da voz.
+
+    Usa librosa; se falhar, recorre ao método alternativo do PyDub.
+    ao_informar recebe mensagens de andamento. Retorna BufferAudio ou None.
+    """
+    informar = ao_informar or print
+
+    diferenca_semitons = TONS_SEMITONS.get(tom_novo, 0) - TONS_SEMITONS.get(tom_original, 0)
+    if diferenca_semitons == 0:
+        informar("ℹ️ Os tons são iguais. Nenhuma modificação necessária.")
+        return BufferAudio.de_bytes(audio_bytes)
+
+    informar(f"🎵 Alterando tom: {diferenca_semitons:+d} semitons")
+
+    try:
+        return _transpor_librosa(audio_bytes, diferenca_semitons, informar)
+    except Exception as e:
+        informar(f"🔄 Erro ao mudar tom ({type(e).__name__}: {str(e)}), usando método alternativo (PyDub)...")
+
+    try:
+        return _transpor_pydub(audio_bytes, diferenca_semitons)
+    except Exception as e:
+        print(f"Erro no método alternativo de mudança de tom: {str(e)}")
+        return None
+
+def transpor_audio(audio_bytes, tom_original, tom_novo, ao_informar=None, formato="mp3"):
+    """Muda o tom de um áudio e o codifica no formato indicado; retorna bytes ou None"""
+    if TONS_SEMITONS.get(tom_novo, 0) == TONS_SEMITONS.get(tom_original, 0):
+        (ao_informar or print)("ℹ️ Os tons são iguais. Nenhuma modificação necessária.")
+        return audio_bytes
+    buffer = transpor_buffer(audio_bytes, tom_original, tom_novo, ao_informar)
+    return buffer.codificar(formato) if buffer is not None else None
+
+# Teste básico
+if __name__ == "__main__":
+    print("🔊 GERADOR DE ÁUDIO")
+    print("=" * 30)
+
+    instrumental = gerar_instrumental("C", "tradicional")
+    print(f"Instrumental: {len(instrumental)}ms, {instrumental.frame_rate}Hz")
+
+    wav = exportar_audio(instrumental, "wav")
+    print(f"✅ WAV exportado: {len(wav)} bytes")
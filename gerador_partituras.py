@@ -33,7 +33,7 @@ class GeradorPartituras:
             "vii": [6, 1, 3]   # Sensível
         }
     
-    def criar_partitura_basica(self, tom, estilo, letra="", titulo="Música Católica"):
+    def criar_partitura_basica(self, tom, estilo, letra="", titulo="Música Católica", bpm=80):
         """Cria uma partitura básica com melodia e acordes"""
         
         # Criar stream principal
@@ -47,7 +47,7 @@ class GeradorPartituras:
         # Configurações básicas
         partitura.append(meter.TimeSignature('4/4'))
         partitura.append(key.KeySignature(self._obter_armadura(tom)))
-        partitura.append(tempo.TempoIndication(number=80))
+        partitura.append(tempo.MetronomeMark(number=bpm))
         
         # Criar parte da melodia
         parte_melodia = stream.Part()
@@ -214,11 +214,11 @@ class GeradorPartituras:
             print(f"Erro ao exportar MIDI: {str(e)}")
             return None
     
-    def gerar_partitura_completa(self, tom, estilo, titulo="Música Católica", letra=""):
+    def gerar_partitura_completa(self, tom, estilo, titulo="Música Católica", letra="", bpm=80):
         """Gera partitura completa com todas as informações"""
         
         # Criar partitura
-        partitura = self.criar_partitura_basica(tom, estilo, letra, titulo)
+        partitura = self.criar_partitura_basica(tom, estilo, letra, titulo, bpm)
         
         # Gerar cifras
         cifras = self.gerar_cifras_simplificadas(tom, estilo)
@@ -231,7 +231,7 @@ class GeradorPartituras:
             "cifras": " - ".join(cifras),
             "progressao": " - ".join(self.progressoes_acordes.get(estilo, [])),
             "compasso": "4/4",
-            "andamento": "80 BPM"
+            "andamento": f"{bpm} BPM"
         }
         
         return {
@@ -240,7 +240,25 @@ class GeradorPartituras:
             "info": info
         }
     
-    def criar_partitura_coral_satb(self, tom, estilo, titulo="Música Católica"):
+    def gerar_partitura_da_composicao(self, composicao):
+        """Gera partitura completa a partir de uma ComposicaoEstruturada"""
+        
+        resultado = self.gerar_partitura_completa(
+            composicao.tom,
+            composicao.estilo,
+            titulo=composicao.titulo,
+            letra=composicao.letra_texto("\n"),
+            bpm=composicao.bpm
+        )
+        
+        # Cifras escritas pelo compositor, seção por seção
+        resultado["info"]["secoes"] = [secao.nome for secao in composicao.secoes]
+        if composicao.cifras_texto():
+            resultado["info"]["cifras_composicao"] = composicao.cifras_texto()
+        
+        return resultado
+    
+    def criar_partitura_coral_satb(self, tom, estilo, titulo="Música Católica", bpm=80):
         """Cria partitura para coral SATB (Soprano, Alto, Tenor, Baixo)"""
         
         partitura = stream.Score()
@@ -253,7 +271,7 @@ class GeradorPartituras:
         # Configurações
         partitura.append(meter.TimeSignature('4/4'))
         partitura.append(key.KeySignature(self._obter_armadura(tom)))
-        partitura.append(tempo.TempoIndication(number=80))
+        partitura.append(tempo.MetronomeMark(number=bpm))
         
         # Criar partes SATB
         soprano = stream.Part()
@@ -306,6 +324,12 @@ class GeradorPartituras:
         partitura.append(baixo)
         
         return partitura
+    
+    def criar_partitura_satb_da_composicao(self, composicao):
+        """Cria a partitura SATB com o tom, estilo, título e BPM de uma ComposicaoEstruturada"""
+        return self.criar_partitura_coral_satb(
+            composicao.tom, composicao.estilo, titulo=composicao.titulo, bpm=composicao.bpm
+        )
 
 # Função de conveniência
 def criar_gerador_partituras():
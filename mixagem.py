@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Mixagem
+Soma N vozes (ou faixas) em posições e ganhos próprios em um único array
+float32 pré-alocado, com uma normalização opcional ao final. Cada voz é
+somada só no seu trecho, então o custo cresce com o total de amostras das
+vozes, não com o número de vozes vezes a duração da mixagem. É o laço
+interno do coro virtual, do SistemaVozes e do MixerAudio.
+"""
+
+import numpy as np
+
+from buffer_audio import BufferAudio
+
+def ganho_linear(db):
+    """Ganho em dB (como o + do AudioSegment) como fator float32"""
+    return np.float32(10 ** (db / 20))
+
+def mixar_amostras(vozes, inicios=None, ganhos=None, comprimento=None, pico=None):
+    """Soma as vozes (float32, mono ou (amostras, canais)) em um array float32.
+
+    inicios: posição de cada voz, em amostras (padrão: 0)
+    ganhos: fator linear de cada voz (padrão: 1)
+    comprimento: amostras da mixagem; o que passar dele é cortado. Sem ele,
+        vai até o fim da última voz (e as vozes são materializadas antes)
+    pico: se indicado, a mixagem é normalizada uma vez para esse pico
+    Vozes mono entram em todos os canais de uma mixagem estéreo.
+    """
+    if comprimento is None or isinstance(vozes, (list, tuple)):
+        vozes = [np.asarray(voz, dtype=np.float32) for voz in vozes]
+        inicios = [0] * len(vozes) if inicios is None else [int(inicio) for inicio in inicios]
+        canais = max((voz.shape[1] for voz in vozes if voz.ndim > 1), default=1)
+        if comprimento is None:
+            comprimento = max((inicio + len(voz) for inicio, voz in zip(inicios, vozes)), default=0)
+    else:
+        # Vozes geradas sob demanda: só uma por vez na memória (mono)
+        canais = 1
+        inicios = None if inicios is None else [int(inicio) for inicio in inicios]
+
+    mixagem = np.zeros((comprimento, canais) if canais > 1 else comprimento, dtype=np.float32)
+    for indice, voz in enumerate(vozes):
+        voz = np.asarray(voz, dtype=np.float32)
+        inicio = 0 if inicios is None else inicios[indice]
+        fim = min(comprimento, inicio + len(voz))
+        if fim <= inicio:
+            continue
+        trecho = voz[:fim - inicio]
+        if canais > 1 and trecho.ndim == 1:
+            trecho = trecho[:, None]
+        ganho = np.float32(1.0 if ganhos is None else ganhos[indice])
+        if ganho == 1:
+            mixagem[inicio:fim] += trecho
+        else:
+            mixagem[inicio:fim] += ganho * trecho
+
+    if pico is not None:
+        maximo = float(np.max(np.abs(mixagem))) if mixagem.size else 0.0
+        if maximo > 0:
+            mixagem *= np.float32(pico / maximo)
+    return mixagem
+
+def mixar_buffers(buffers, inicios_segundos=None, ganhos_db=None, duracao_segundos=None, pico=None):
+    """Mixa BufferAudio (ou AudioSegment/bytes) na taxa do primeiro; retorna BufferAudio.
+
+    inicios_segundos e ganhos_db por faixa; duracao_segundos corta ou completa
+    com silêncio (padrão: até o fim da última faixa).
+    """
+    buffers = [BufferAudio.de_audio(buffer) for buffer in buffers]
+    if not buffers:
+        return BufferAudio(np.zeros(0, dtype=np.float32))
+    taxa_amostragem = buffers[0].taxa_amostragem
+    amostras = [buffer.reamostrar(taxa_amostragem).amostras for buffer in buffers]
+    inicios = None if inicios_segundos is None else [round(s * taxa_amostragem) for s in inicios_segundos]
+    ganhos = None if ganhos_db is None else [ganho_linear(db) for db in ganhos_db]
+    comprimento = None if duracao_segundos is None else round(duracao_segundos * taxa_amostragem)
+    return BufferAudio(mixar_amostras(amostras, inicios, ganhos, comprimento, pico), taxa_amostragem)
+
+# Teste básico
+if __name__ == "__main__":
+    import time
+
+    print("🎛️ MIXAGEM")
+    print("=" * 30)
+
+    taxa = 24000
+    t = np.arange(30 * taxa, dtype=np.float32) / taxa
+    voz = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    for num_vozes in (2, 16, 64):
+        inicio = time.perf_counter()
+        mixagem = mixar_amostras([voz] * num_vozes, [i * taxa // 10 for i in range(num_vozes)],
+                                 [0.7] * num_vozes, pico=0.99)
+        print(f"  {num_vozes:>3} vozes: {(time.perf_counter() - inicio) * 1000:6.1f}ms, "
+              f"{len(mixagem) / taxa:.1f}s")
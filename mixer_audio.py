@@ -4,14 +4,16 @@ Mixer de Áudio Avançado
 Controles profissionais de áudio para música católica
 """
 
-from pydub import AudioSegment
 from pydub.effects import normalize, compress_dynamic_range, low_pass_filter, high_pass_filter
 from pydub.generators import Sine, WhiteNoise
 import numpy as np
-import io
 import tempfile
 import os
 
+from buffer_audio import BufferAudio
+from mixagem import mixar_buffers
+from sintetizador_acordes import instrumental_com_duracao
+
 class MixerAudio:
     """Classe para mixagem avançada de áudio"""
     
@@ -107,17 +109,22 @@ class MixerAudio:
             }
         }
     
-    def aplicar_preset_estilo(self, audio_voz_bytes, audio_instrumental_bytes, estilo):
-        """Aplica preset de mixagem baseado no estilo católico"""
+    def mixar_buffers_com_preset(self, audio_voz, audio_instrumental, estilo):
+        """Aplica preset de mixagem baseado no estilo católico e retorna um BufferAudio.
+
+        audio_voz pode ser BufferAudio ou bytes codificados; audio_instrumental
+        também pode ser uma BaseInstrumental, renderizada com a duração da voz.
+        """
         try:
             if estilo not in self.presets_estilo:
                 estilo = "tradicional"
             
             preset = self.presets_estilo[estilo]
             
-            # Carregar áudios
-            seg_voz = AudioSegment.from_file(io.BytesIO(audio_voz_bytes))
-            seg_instrumental = AudioSegment.from_file(io.BytesIO(audio_instrumental_bytes))
+            # Carregar áudios (instrumental já com a duração da voz)
+            buffer_voz = BufferAudio.de_audio(audio_voz)
+            seg_voz = buffer_voz.para_audio_segment()
+            seg_instrumental = instrumental_com_duracao(audio_instrumental, buffer_voz.duracao_segundos).para_audio_segment()
             
             # Aplicar volumes
             seg_voz = seg_voz + preset["volume_voz"]
@@ -144,29 +151,34 @@ class MixerAudio:
             audio_final = self._aplicar_compressao(audio_final, preset_ambiente["compressor_threshold"])
             
             # Normalizar
-            audio_final = normalize(audio_final)
-            
-            # Converter para bytes
-            audio_bytes = io.BytesIO()
-            audio_final.export(audio_bytes, format="mp3")
-            audio_bytes.seek(0)
-            
-            return audio_bytes.getvalue()
+            return BufferAudio.de_audio_segment(normalize(audio_final))
             
         except Exception as e:
             print(f"Erro ao aplicar preset de estilo: {str(e)}")
             return None
     
-    def mixagem_personalizada(self, audio_voz_bytes, audio_instrumental_bytes,
-                            volume_voz=5, volume_instrumental=-8,
-                            eq_voz_low=0, eq_voz_mid=2, eq_voz_high=1,
-                            eq_inst_low=0, eq_inst_mid=0, eq_inst_high=0,
-                            reverb_amount=0.15, compressor_threshold=-18):
-        """Mixagem com controles personalizados"""
+    def aplicar_preset_estilo(self, audio_voz_bytes, audio_instrumental_bytes, estilo):
+        """Aplica preset de mixagem baseado no estilo católico (retorna MP3)"""
+        return self._codificar(
+            self.mixar_buffers_com_preset(audio_voz_bytes, audio_instrumental_bytes, estilo),
+            "preset de estilo"
+        )
+    
+    def mixar_buffers(self, audio_voz, audio_instrumental,
+                      volume_voz=5, volume_instrumental=-8,
+                      eq_voz_low=0, eq_voz_mid=2, eq_voz_high=1,
+                      eq_inst_low=0, eq_inst_mid=0, eq_inst_high=0,
+                      reverb_amount=0.15, compressor_threshold=-18):
+        """Mixagem com controles personalizados, retornando um BufferAudio.
+
+        audio_voz pode ser BufferAudio ou bytes codificados; audio_instrumental
+        também pode ser uma BaseInstrumental, renderizada com a duração da voz.
+        """
         try:
-            # Carregar áudios
-            seg_voz = AudioSegment.from_file(io.BytesIO(audio_voz_bytes))
-            seg_instrumental = AudioSegment.from_file(io.BytesIO(audio_instrumental_bytes))
+            # Carregar áudios (instrumental já com a duração da voz)
+            buffer_voz = BufferAudio.de_audio(audio_voz)
+            seg_voz = buffer_voz.para_audio_segment()
+            seg_instrumental = instrumental_com_duracao(audio_instrumental, buffer_voz.duracao_segundos).para_audio_segment()
             
             # Aplicar volumes
             seg_voz = seg_voz + volume_voz
@@ -189,19 +201,37 @@ class MixerAudio:
                 audio_final = self._aplicar_compressao(audio_final, compressor_threshold)
             
             # Normalizar
-            audio_final = normalize(audio_final)
-            
-            # Converter para bytes
-            audio_bytes = io.BytesIO()
-            audio_final.export(audio_bytes, format="mp3")
-            audio_bytes.seek(0)
-            
-            return audio_bytes.getvalue()
+            return BufferAudio.de_audio_segment(normalize(audio_final))
             
         except Exception as e:
             print(f"Erro na mixagem personalizada: {str(e)}")
             return None
     
+    def mixagem_personalizada(self, audio_voz_bytes, audio_instrumental_bytes,
+                            volume_voz=5, volume_instrumental=-8,
+                            eq_voz_low=0, eq_voz_mid=2, eq_voz_high=1,
+                            eq_inst_low=0, eq_inst_mid=0, eq_inst_high=0,
+                            reverb_amount=0.15, compressor_threshold=-18):
+        """Mixagem com controles personalizados (retorna MP3)"""
+        buffer = self.mixar_buffers(
+            audio_voz_bytes, audio_instrumental_bytes,
+            volume_voz, volume_instrumental,
+            eq_voz_low, eq_voz_mid, eq_voz_high,
+            eq_inst_low, eq_inst_mid, eq_inst_high,
+            reverb_amount, compressor_threshold
+        )
+        return self._codificar(buffer, "mixagem personalizada")
+    
+    def _codificar(self, buffer, contexto, formato="mp3"):
+        """Codifica o resultado para entrega, retornando None em caso de erro"""
+        if buffer is None:
+            return None
+        try:
+            return buffer.codificar(formato)
+        except Exception as e:
+            print(f"Erro ao codificar {contexto}: {str(e)}")
+            return None
+    
     def _aplicar_eq_basico(self, audio, low_gain, mid_gain, high_gain):
         """Aplica equalização básica de 3 bandas"""
         try:
@@ -212,8 +242,7 @@ class MixerAudio:
                 if low_gain > 0:
                     # Boost nos graves
                     audio_low = low_pass_filter(audio, 250)
-                    audio_low = audio_low + (low_gain * 2)
-                    audio_processado = audio_processado.overlay(audio_low - 10)
+                    audio_processado = self._sobrepor(audio_processado, audio_low, low_gain * 2 - 10)
                 else:
                     # Cut nos graves
                     audio_processado = high_pass_filter(audio_processado, 100)
@@ -223,8 +252,7 @@ class MixerAudio:
                 if high_gain > 0:
                     # Boost nos agudos
                     audio_high = high_pass_filter(audio, 4000)
-                    audio_high = audio_high + (high_gain * 2)
-                    audio_processado = audio_processado.overlay(audio_high - 10)
+                    audio_processado = self._sobrepor(audio_processado, audio_high, high_gain * 2 - 10)
                 else:
                     # Cut nos agudos
                     audio_processado = low_pass_filter(audio_processado, 8000)
@@ -261,21 +289,11 @@ class MixerAudio:
             # Simular reverb com delay e feedback
             delay_ms = int(50 + (wet_amount * 200))  # 50-250ms de delay
             
-            # Criar versão com delay
-            audio_delay = AudioSegment.silent(duration=delay_ms) + audio
-            audio_delay = audio_delay - (20 - int(wet_amount * 15))  # Reduzir volume do delay
-            
-            # Mixar original com delay
-            duracao_maxima = max(len(audio), len(audio_delay))
-            
-            if len(audio) < duracao_maxima:
-                audio += AudioSegment.silent(duracao_maxima - len(audio))
-            if len(audio_delay) < duracao_maxima:
-                audio_delay += AudioSegment.silent(duracao_maxima - len(audio_delay))
-            
-            audio_com_reverb = audio.overlay(audio_delay)
-            
-            return audio_com_reverb
+            # Mixar original com a versão atrasada e mais baixa (até o fim do delay)
+            return mixar_buffers(
+                [audio, audio], inicios_segundos=[0, delay_ms / 1000],
+                ganhos_db=[0, -(20 - int(wet_amount * 15))]
+            ).para_audio_segment()
             
         except Exception as e:
             print(f"Erro ao aplicar reverb personalizado: {str(e)}")
@@ -298,48 +316,50 @@ class MixerAudio:
             print(f"Erro ao aplicar compressão: {str(e)}")
             return audio
     
+    def _sobrepor(self, audio, camada, ganho_db):
+        """Soma a camada ao áudio com o ganho indicado, na duração do áudio"""
+        return mixar_buffers(
+            [audio, camada], ganhos_db=[0, ganho_db], duracao_segundos=audio.frame_count() / audio.frame_rate
+        ).para_audio_segment()
+    
     def _mixar_audios(self, audio_voz, audio_instrumental):
-        """Mixa dois áudios ajustando durações"""
+        """Mixa dois áudios com a duração da voz (o instrumental já chega com ela)"""
         try:
-            duracao_voz = len(audio_voz)
-            duracao_instrumental = len(audio_instrumental)
-            
-            # Ajustar duração do instrumental
-            if duracao_voz > duracao_instrumental:
-                # Repetir instrumental se necessário
-                repeticoes = (duracao_voz // duracao_instrumental) + 1
-                audio_instrumental = audio_instrumental * repeticoes
-            
-            # Cortar instrumental para duração da voz
-            audio_instrumental = audio_instrumental[:duracao_voz]
-            
-            # Mixar
-            audio_final = audio_instrumental.overlay(audio_voz)
-            
-            return audio_final
+            # Instrumental cortado (ou completado com silêncio) na duração da voz
+            return mixar_buffers(
+                [audio_instrumental, audio_voz], duracao_segundos=audio_voz.frame_count() / audio_voz.frame_rate
+            ).para_audio_segment()
             
         except Exception as e:
             print(f"Erro ao mixar áudios: {str(e)}")
             return audio_voz
     
-    def criar_fade_in_out(self, audio_bytes, fade_in_ms=1000, fade_out_ms=1000):
-        """Aplica fade in e fade out"""
+    def aplicar_fade(self, audio, fade_in_ms=1000, fade_out_ms=1000):
+        """Aplica fade in e fade out a um BufferAudio (ou bytes), retornando BufferAudio"""
         try:
-            audio = AudioSegment.from_file(io.BytesIO(audio_bytes))
-            
-            # Aplicar fades
-            audio_com_fade = audio.fade_in(fade_in_ms).fade_out(fade_out_ms)
-            
-            # Converter para bytes
-            audio_bytes_resultado = io.BytesIO()
-            audio_com_fade.export(audio_bytes_resultado, format="mp3")
-            audio_bytes_resultado.seek(0)
-            
-            return audio_bytes_resultado.getvalue()
+            buffer = BufferAudio.de_audio(audio)
+            total = len(buffer.amostras)
+            entrada = min(total, int(buffer.taxa_amostragem * fade_in_ms / 1000))
+            saida = min(total, int(buffer.taxa_amostragem * fade_out_ms / 1000))
+            
+            # Rampas lineares de ganho, como o fade do pydub
+            ganho = np.ones(total, dtype=np.float32)
+            if entrada > 0:
+                ganho[:entrada] = np.linspace(0.0, 1.0, entrada, endpoint=False, dtype=np.float32)
+            if saida > 0:
+                ganho[total - saida:] *= np.linspace(1.0, 0.0, saida, endpoint=False, dtype=np.float32)
+            if buffer.canais > 1:
+                ganho = ganho[:, None]
+            
+            return BufferAudio(buffer.amostras * ganho, buffer.taxa_amostragem)
             
         except Exception as e:
             print(f"Erro ao aplicar fade: {str(e)}")
-            return audio_bytes
+            return audio if isinstance(audio, BufferAudio) else None
+    
+    def criar_fade_in_out(self, audio_bytes, fade_in_ms=1000, fade_out_ms=1000):
+        """Aplica fade in e fade out a áudio codificado (retorna MP3)"""
+        return self._codificar(self.aplicar_fade(audio_bytes, fade_in_ms, fade_out_ms), "fade") or audio_bytes
     
     def obter_presets_disponiveis(self):
         """Retorna presets disponíveis"""
@@ -354,18 +374,22 @@ class MixerAudio:
             }
         }
     
-    def analisar_audio(self, audio_bytes):
-        """Analisa características do áudio"""
+    def analisar_buffer(self, audio):
+        """Analisa características de um BufferAudio (ou bytes), sem decodificar de novo"""
         try:
-            audio = AudioSegment.from_file(io.BytesIO(audio_bytes))
+            buffer = BufferAudio.de_audio(audio)
+            amostras = buffer.amostras
+            rms = float(np.sqrt(np.mean(np.square(amostras, dtype=np.float64)))) if amostras.size else 0.0
+            pico = float(np.max(np.abs(amostras))) if amostras.size else 0.0
+            duracao_ms = len(buffer)
             
             analise = {
-                "duracao_segundos": len(audio) / 1000,
-                "volume_medio_db": audio.dBFS,
-                "pico_db": audio.max_dBFS,
-                "canais": audio.channels,
-                "sample_rate": audio.frame_rate,
-                "formato_recomendado": "mp3" if len(audio) > 30000 else "wav"
+                "duracao_segundos": duracao_ms / 1000,
+                "volume_medio_db": 20 * np.log10(rms) if rms > 0 else -float("inf"),
+                "pico_db": 20 * np.log10(pico) if pico > 0 else -float("inf"),
+                "canais": buffer.canais,
+                "sample_rate": buffer.taxa_amostragem,
+                "formato_recomendado": "mp3" if duracao_ms > 30000 else "wav"
             }
             
             # Recomendações baseadas na análise
@@ -386,6 +410,10 @@ class MixerAudio:
         except Exception as e:
             print(f"Erro ao analisar áudio: {str(e)}")
             return None
+    
+    def analisar_audio(self, audio_bytes):
+        """Analisa características do áudio codificado"""
+        return self.analisar_buffer(audio_bytes)
 
 # Função de conveniência
 def criar_mixer_audio():
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Renderização Progressiva
+Mixa voz e instrumental em blocos de tamanho fixo (voz sintetizada por
+trecho da letra, base renderizada sob medida para cada trecho, sobreposição,
+ganho e fades), entregando cada bloco assim que fica pronto. As vozes dos
+trechos seguintes são sintetizadas enquanto os blocos dos anteriores são
+mixados, e um trecho nunca espera pela síntese do próximo para ser
+entregue, então o primeiro verso pode ser ouvido em poucos segundos,
+qualquer que seja o tamanho da música.
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import codec_audio
+from buffer_audio import BufferAudio
+from composicao_estruturada import ComposicaoEstruturada
+
+SEGUNDOS_BLOCO_PADRAO = 8.0
+SINTESES_SIMULTANEAS_PADRAO = 2
+
+# Mesmos ganhos da mixagem simples (mixar_voz_instrumental)
+GANHO_VOZ_DB = 5.0
+GANHO_INSTRUMENTAL_DB = -10.0
+FADE_MS = 500
+
+def trechos_para_voz(letra):
+    """Divide a letra em trechos sintetizados separadamente.
+
+    ComposicaoEstruturada: um trecho por seção. Texto: um trecho por estrofe
+    (separadas por linha em branco) ou, sem estrofes, por linha.
+    """
+    if isinstance(letra, ComposicaoEstruturada):
+        trechos = [" ".join(secao.linhas) for secao in letra.secoes]
+    else:
+        trechos = re.split(r'\n\s*\n', str(letra).strip())
+        if len(trechos) == 1:
+            trechos = str(letra).splitlines()
+        trechos = [" ".join(trecho.split()) for trecho in trechos]
+    return [trecho for trecho in trechos if trecho.strip()]
+
+def _ganho(db):
+    return np.float32(10 ** (db / 20))
+
+class RenderizadorProgressivo:
+    """Classe que mixa voz e instrumental bloco a bloco"""
+
+    def __init__(self, instrumental, sintetizar_trecho, segundos_bloco=SEGUNDOS_BLOCO_PADRAO, velocidade=1.0,
+                 ganho_voz_db=GANHO_VOZ_DB, ganho_instrumental_db=GANHO_INSTRUMENTAL_DB, fade_ms=FADE_MS,
+                 sinteses_simultaneas=SINTESES_SIMULTANEAS_PADRAO):
+        """
+        instrumental: BaseInstrumental, renderizada com a duração da voz de cada
+            trecho (meia cadência ao fim dos trechos, cadência final no último)
+        sintetizar_trecho: função texto -> BufferAudio com a voz do trecho
+        segundos_bloco: duração dos blocos entregues (menores apenas no fim de um
+            trecho cuja continuação ainda está sendo sintetizada, e no fim da música)
+        velocidade: fator de velocidade da voz (altera também a altura, como na mixagem simples)
+        sinteses_simultaneas: trechos sintetizados ao mesmo tempo, à frente da mixagem
+        """
+        self.instrumental = instrumental
+        self.sintetizar_trecho = sintetizar_trecho
+        self.taxa_amostragem = self.instrumental.taxa_amostragem
+        self.amostras_bloco = max(1, int(segundos_bloco * self.taxa_amostragem))
+        self.velocidade = velocidade
+        self.ganho_voz = _ganho(ganho_voz_db)
+        self.ganho_instrumental = _ganho(ganho_instrumental_db)
+        self.amostras_fade = int(self.taxa_amostragem * fade_ms / 1000)
+        self.sinteses_simultaneas = max(1, int(sinteses_simultaneas))
+        self.estatisticas = {"blocos": 0, "segundos_primeiro_bloco": None, "segundos_total": None}
+
+    def _preparar_trecho(self, texto, final):
+        """Sintetiza a voz do trecho, na taxa e no ganho da mixagem, e a base com a mesma
+        duração (roda na thread de síntese); retorna (voz, base)"""
+        voz = BufferAudio.de_audio(self.sintetizar_trecho(texto)).para_mono()
+        # Tocar a voz a velocidade x equivale a tratá-la como gravada a taxa * velocidade
+        taxa_voz = int(voz.taxa_amostragem * self.velocidade)
+        voz = codec_audio.reamostrar(voz.amostras, taxa_voz, self.taxa_amostragem) * self.ganho_voz
+        base = self.instrumental.renderizar(len(voz), final=final) * self.ganho_instrumental
+        return voz, base
+
+    def _mixar_bloco(self, voz, base, posicao, fim=None):
+        """Sobrepõe voz e base a partir de posicao (em amostras) e aplica os fades.
+
+        fim: total de amostras da música, quando já conhecido (último trecho recebido)
+        """
+        indices = np.arange(posicao, posicao + len(voz))
+        bloco = base + voz
+
+        # Rampas lineares calculadas pela posição absoluta, para que os fades
+        # atravessem blocos sem emendas
+        ganho = np.ones(len(bloco), dtype=np.float32)
+        if self.amostras_fade > 0:
+            ganho = np.minimum(ganho, indices / self.amostras_fade)
+            if fim is not None:
+                ganho = np.minimum(ganho, (fim - indices) / min(fim, self.amostras_fade))
+        ganho = ganho.astype(np.float32)
+        if bloco.ndim > 1:
+            ganho = ganho[:, None]
+
+        return BufferAudio(np.clip(bloco * ganho, -1.0, 1.0), self.taxa_amostragem)
+
+    def blocos(self, trechos):
+        """Gera os blocos mixados (BufferAudio) na ordem, conforme ficam prontos"""
+        inicio = time.perf_counter()
+        self.estatisticas = {"blocos": 0, "segundos_primeiro_bloco": None, "segundos_total": None}
+
+        # A síntese segue em outras threads enquanto esta mixa e entrega os blocos prontos
+        executor = ThreadPoolExecutor(max_workers=self.sinteses_simultaneas, thread_name_prefix="voz-progressiva")
+        try:
+            futuros = [
+                executor.submit(self._preparar_trecho, trecho, indice == len(trechos) - 1)
+                for indice, trecho in enumerate(trechos)
+            ]
+            pendente = np.zeros(0, dtype=np.float32)
+            pendente_base = np.zeros(0, dtype=np.float32)
+            posicao = 0
+
+            for indice, futuro in enumerate(futuros):
+                voz, base = futuro.result()
+                pendente = np.concatenate([pendente, voz])
+                pendente_base = np.concatenate([pendente_base, base])
+                ultimo_trecho = indice == len(futuros) - 1
+                # Se a voz do próximo trecho ainda não chegou, o resto deste sai em um
+                # bloco menor em vez de esperar por ela
+                esvaziar = ultimo_trecho or not futuros[indice + 1].done()
+
+                while len(pendente) >= self.amostras_bloco or (esvaziar and len(pendente) > 0):
+                    fim = posicao + len(pendente) if ultimo_trecho else None
+                    voz, pendente = pendente[:self.amostras_bloco], pendente[self.amostras_bloco:]
+                    base, pendente_base = pendente_base[:self.amostras_bloco], pendente_base[self.amostras_bloco:]
+                    bloco = self._mixar_bloco(voz, base, posicao, fim)
+                    posicao += len(voz)
+
+                    self.estatisticas["blocos"] += 1
+                    if self.estatisticas["segundos_primeiro_bloco"] is None:
+                        self.estatisticas["segundos_primeiro_bloco"] = time.perf_counter() - inicio
+                    yield bloco
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.estatisticas["segundos_total"] = time.perf_counter() - inicio
+
+    def renderizar(self, trechos, ao_receber_bloco=None):
+        """Renderiza a música inteira; ao_receber_bloco(indice, bloco) é chamado a cada bloco pronto.
+
+        Retorna o BufferAudio completo, montado ao final a partir dos blocos.
+        """
+        blocos = []
+        for indice, bloco in enumerate(self.blocos(trechos)):
+            blocos.append(bloco.amostras)
+            if ao_receber_bloco:
+                ao_receber_bloco(indice, bloco)
+
+        if not blocos:
+            return None
+        return BufferAudio(np.concatenate(blocos), self.taxa_amostragem)
+
+# Teste básico
+if __name__ == "__main__":
+    print("⏩ RENDERIZAÇÃO PROGRESSIVA")
+    print("=" * 30)
+
+    from sintetizador_acordes import BaseInstrumental, progressao_do_estilo
+
+    def voz_simulada(texto):
+        """Tom puro com a duração aproximada da leitura do texto"""
+        time.sleep(0.5)
+        t = np.arange(int(24000 * len(texto) / 15), dtype=np.float32) / 24000
+        return BufferAudio(0.3 * np.sin(2 * np.pi * 220 * t), 24000)
+
+    instrumental = BaseInstrumental(392.00, tuple(progressao_do_estilo("tradicional")))
+    letra = "\n\n".join(f"Estrofe {n}: Senhor, tende piedade de nós, Cristo, tende piedade" for n in range(1, 6))
+    renderizador = RenderizadorProgressivo(instrumental, voz_simulada)
+
+    audio = renderizador.renderizar(
+        trechos_para_voz(letra),
+        ao_receber_bloco=lambda indice, bloco: print(f"  bloco {indice}: {len(bloco)}ms")
+    )
+    print(f"Total: {len(audio)}ms")
+    print(renderizador.estatisticas)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Sintetizador de Acordes
+Renderiza progressões de acordes (tríades com baixo, em temperamento igual)
+com envelope em uma única passada vetorizada do NumPy, gerando um buffer
+float32 mono. A base também pode ser renderizada sob medida para uma
+duração exata, com cadência ao fim de cada seção e da música
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from buffer_audio import BufferAudio
+
+# Versão da síntese; altere quando o som gerado mudar para que áudios
+# pré-renderizados (banco instrumental) sejam refeitos
+VERSAO_SINTETIZADOR = "1"
+
+TAXA_AMOSTRAGEM_PADRAO = 44100
+DURACAO_ACORDE_PADRAO = 2.0
+
+# Graus da escala maior: (semitons acima da tônica, qualidade da tríade)
+GRAUS = {
+    "I": (0, "maior"), "ii": (2, "menor"), "iii": (4, "menor"),
+    "IV": (5, "maior"), "V": (7, "maior"), "vi": (9, "menor")
+}
+
+# Intervalos da tríade em semitons (fundamental, terça, quinta)
+TRIADES = {
+    "maior": (0, 4, 7),
+    "menor": (0, 3, 7)
+}
+
+# Progressões por estilo (estilos sem progressão própria usam a contemporânea)
+PROGRESSOES = {
+    "tradicional": ["I", "V", "vi", "IV"],  # muito comum em música católica
+    "contemporâneo": ["vi", "IV", "I", "V"]
+}
+
+# Amplitude relativa de cada voz do acorde: baixo (uma oitava abaixo), fundamental, terça, quinta
+AMPLITUDES_VOZES = (0.45, 0.30, 0.25, 0.25)
+
+# Harmônicos somados a cada nota (múltiplo da frequência, amplitude relativa)
+HARMONICOS = ((1, 1.0), (2, 0.25), (3, 0.08))
+
+# Cadências das renderizações com duração exata: meia cadência (repouso na
+# dominante) ao fim de cada seção e cadência perfeita (V-I) no fim da música
+CADENCIA_SECAO = ("V",)
+CADENCIA_FINAL = ("V", "I")
+
+def frequencia_semitons(frequencia_base, semitons):
+    """Frequência em temperamento igual a tantos semitons da base"""
+    return frequencia_base * 2.0 ** (semitons / 12.0)
+
+def progressao_do_estilo(estilo):
+    """Graus da progressão usada pelo estilo"""
+    return PROGRESSOES.get(estilo, PROGRESSOES["contemporâneo"])
+
+def frequencias_acorde(frequencia_tonica, grau):
+    """Frequências (Hz) do baixo, fundamental, terça e quinta do acorde do grau"""
+    fundamental, qualidade = GRAUS[grau]
+    return [frequencia_semitons(frequencia_tonica, fundamental - 12)] + [
+        frequencia_semitons(frequencia_tonica, fundamental + intervalo)
+        for intervalo in TRIADES[qualidade]
+    ]
+
+def envelope_acorde(amostras, taxa_amostragem, ataque=0.04, decaimento=0.4, sustentacao=0.7, liberacao=0.25):
+    """Envelope ADSR (float32) de um acorde com o número de amostras indicado"""
+    t = np.arange(amostras, dtype=np.float32) / taxa_amostragem
+    duracao = amostras / taxa_amostragem
+    ataque = min(ataque, duracao / 4)
+    liberacao = min(liberacao, duracao / 4)
+
+    envelope = sustentacao + (1.0 - sustentacao) * np.exp(-np.maximum(t - ataque, 0.0) / decaimento)
+    envelope *= np.clip(t / ataque, 0.0, 1.0) if ataque > 0 else 1.0
+    envelope *= np.clip((duracao - t) / liberacao, 0.0, 1.0) if liberacao > 0 else 1.0
+    return envelope.astype(np.float32)
+
+def _renderizar_acordes(frequencias, amostras_acorde, taxa_amostragem, final=False):
+    """Renderiza acordes de mesma duração: (acordes, vozes) Hz -> (acordes, amostras), sem normalizar.
+
+    final: o acorde ressoa e se extingue na segunda metade, encerrando a música
+    """
+    # (acordes, vozes) -> (acordes, vozes, harmônicos)
+    multiplos = np.array([multiplo for multiplo, _ in HARMONICOS], dtype=np.float32)
+    pesos = np.array([peso for _, peso in HARMONICOS], dtype=np.float32)
+    parciais = frequencias[:, :, None] * multiplos
+    # Harmônicos acima de Nyquist são descartados para não gerar aliasing
+    amplitudes = np.array(AMPLITUDES_VOZES, dtype=np.float32)[None, :, None] * pesos
+    amplitudes = np.where(parciais < taxa_amostragem / 2, amplitudes, 0.0).astype(np.float32)
+
+    # Cada acorde começa com fase zero; o envelope zera nas bordas, evitando estalos
+    t = np.arange(amostras_acorde, dtype=np.float32) / np.float32(taxa_amostragem)
+    fases = (2 * np.pi * parciais).reshape(-1, 1) * t
+    ondas = np.sin(fases, dtype=np.float32).reshape(len(frequencias), -1, amostras_acorde)
+    acordes = np.einsum("avt,av->at", ondas, amplitudes.reshape(len(frequencias), -1))
+    acordes *= envelope_acorde(amostras_acorde, taxa_amostragem)
+    if final:
+        metade = amostras_acorde // 2
+        acordes[:, amostras_acorde - metade:] *= np.linspace(1.0, 0.0, metade, dtype=np.float32) ** 2
+    return acordes
+
+def _normalizar(sinal, volume):
+    pico = float(np.max(np.abs(sinal))) if len(sinal) else 0.0
+    if pico > 0:
+        sinal *= np.float32(volume / pico)
+    return sinal.astype(np.float32, copy=False)
+
+def sintetizar_progressao(frequencia_tonica, graus, duracao_acorde=DURACAO_ACORDE_PADRAO,
+                          taxa_amostragem=TAXA_AMOSTRAGEM_PADRAO, volume=0.5):
+    """Renderiza a progressão inteira em um buffer float32 mono (pico = volume)"""
+    amostras_acorde = int(round(duracao_acorde * taxa_amostragem))
+    if not graus or amostras_acorde <= 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frequencias = np.array([frequencias_acorde(frequencia_tonica, grau) for grau in graus], dtype=np.float32)
+    sinal = _renderizar_acordes(frequencias, amostras_acorde, taxa_amostragem).reshape(-1)
+    return _normalizar(sinal, volume)
+
+def planejar_acordes(graus, total_amostras, amostras_acorde, limites_secoes=None, final=True):
+    """Distribui a progressão por exatamente total_amostras; retorna [(grau, inicio, amostras)].
+
+    Cada seção (delimitada pelos limites_secoes, em amostras) recomeça a
+    progressão, tem o número inteiro de acordes mais próximo da duração
+    nominal (com durações iguais entre si) e termina em meia cadência; a
+    última termina em cadência perfeita se final for verdadeiro.
+    """
+    if total_amostras <= 0 or not graus:
+        return []
+
+    limites = sorted({int(limite) for limite in (limites_secoes or []) if 0 < limite < total_amostras})
+    fronteiras = [0] + limites + [int(total_amostras)]
+    plano = []
+
+    for indice, (inicio, fim) in enumerate(zip(fronteiras, fronteiras[1:])):
+        quantidade = max(1, int(round((fim - inicio) / max(1, amostras_acorde))))
+        sequencia = [graus[posicao % len(graus)] for posicao in range(quantidade)]
+        ultima_secao = indice == len(fronteiras) - 2
+        cadencia = list(CADENCIA_FINAL if ultima_secao and final else CADENCIA_SECAO)[-quantidade:]
+        sequencia[quantidade - len(cadencia):] = cadencia
+
+        bordas = np.linspace(inicio, fim, quantidade + 1).round().astype(int)
+        plano.extend(
+            (grau, int(comeco), int(termino - comeco))
+            for grau, comeco, termino in zip(sequencia, bordas, bordas[1:])
+        )
+    return plano
+
+def sintetizar_com_duracao(frequencia_tonica, graus, total_amostras, duracao_acorde=DURACAO_ACORDE_PADRAO,
+                           taxa_amostragem=TAXA_AMOSTRAGEM_PADRAO, volume=0.5, limites_secoes=None, final=True):
+    """Renderiza a base com exatamente total_amostras amostras, terminando em cadência.
+
+    Cada acorde distinto (grau, duração, final) é renderizado uma única vez,
+    na mesma passada vetorizada de sintetizar_progressao, e copiado para
+    todas as suas posições; o custo não cresce com o número de repetições.
+    """
+    sinal = np.zeros(max(0, int(total_amostras)), dtype=np.float32)
+    plano = planejar_acordes(
+        graus, len(sinal), int(round(duracao_acorde * taxa_amostragem)), limites_secoes, final
+    )
+
+    # (duração, final) -> grau -> posições
+    grupos = {}
+    for indice, (grau, inicio, amostras) in enumerate(plano):
+        encerra = final and indice == len(plano) - 1
+        grupos.setdefault((amostras, encerra), {}).setdefault(grau, []).append(inicio)
+
+    renderizados = []
+    for (amostras, encerra), posicoes in grupos.items():
+        frequencias = np.array([frequencias_acorde(frequencia_tonica, grau) for grau in posicoes], dtype=np.float32)
+        acordes = _renderizar_acordes(frequencias, amostras, taxa_amostragem, final=encerra)
+        renderizados.append((amostras, posicoes.values(), acordes))
+
+    # Os acordes não se sobrepõem: o pico da base é o maior pico entre os
+    # acordes distintos, e a normalização dispensa uma passada pelo sinal inteiro
+    pico = max((float(np.max(np.abs(acordes))) for _, _, acordes in renderizados), default=0.0)
+    escala = np.float32(volume / pico) if pico > 0 else np.float32(1.0)
+    for amostras, posicoes, acordes in renderizados:
+        acordes *= escala
+        for inicios, acorde in zip(posicoes, acordes):
+            for inicio in inicios:
+                sinal[inicio:inicio + amostras] = acorde
+
+    return sinal
+
+@dataclass(frozen=True)
+class BaseInstrumental:
+    """Progressão de um tom e estilo, renderizada sob medida para cada duração pedida"""
+
+    frequencia_tonica: float
+    graus: tuple
+    duracao_acorde: float = DURACAO_ACORDE_PADRAO
+    taxa_amostragem: int = TAXA_AMOSTRAGEM_PADRAO
+    volume: float = 0.5
+
+    def renderizar(self, total_amostras, limites_secoes=None, final=True):
+        """Amostras float32 mono com exatamente total_amostras (limites em amostras)"""
+        return sintetizar_com_duracao(
+            self.frequencia_tonica, list(self.graus), total_amostras, self.duracao_acorde,
+            self.taxa_amostragem, self.volume, limites_secoes, final
+        )
+
+    def para_duracao(self, duracao_segundos, limites_secoes=None, final=True):
+        """BufferAudio com a duração indicada (limites das seções em segundos)"""
+        limites = [int(round(limite * self.taxa_amostragem)) for limite in (limites_secoes or [])]
+        total = int(round(duracao_segundos * self.taxa_amostragem))
+        return BufferAudio(self.renderizar(total, limites, final), self.taxa_amostragem)
+
+def instrumental_com_duracao(instrumental, duracao_segundos):
+    """BufferAudio do instrumental com exatamente a duração indicada.
+
+    BaseInstrumental é sintetizada sob medida; áudio já renderizado (buffer,
+    AudioSegment ou bytes) é repetido ciclicamente até a duração, sem criar
+    cópias maiores que o resultado.
+    """
+    if isinstance(instrumental, BaseInstrumental):
+        return instrumental.para_duracao(duracao_segundos)
+
+    buffer = BufferAudio.de_audio(instrumental)
+    total = int(round(duracao_segundos * buffer.taxa_amostragem))
+    if len(buffer.amostras) == 0:
+        return BufferAudio(np.zeros((total,) + buffer.amostras.shape[1:], dtype=np.float32), buffer.taxa_amostragem)
+    indices = np.arange(total) % len(buffer.amostras)
+    return BufferAudio(buffer.amostras[indices], buffer.taxa_amostragem)
+
+def para_audio_segment(amostras, taxa_amostragem=TAXA_AMOSTRAGEM_PADRAO):
+    """Converte um buffer float32 mono em AudioSegment PCM 16 bits"""
+    return BufferAudio(amostras, taxa_amostragem).para_audio_segment()
+
+# Teste básico
+if __name__ == "__main__":
+    import time
+
+    print("🎹 SINTETIZADOR DE ACORDES")
+    print("=" * 30)
+
+    inicio = time.perf_counter()
+    sinal = sintetizar_progressao(261.63, progressao_do_estilo("tradicional"))
+    duracao = time.perf_counter() - inicio
+
+    print(f"Progressão: {' - '.join(progressao_do_estilo('tradicional'))}")
+    print(f"Amostras: {len(sinal)} ({len(sinal) / TAXA_AMOSTRAGEM_PADRAO:.1f}s, {sinal.dtype})")
+    print(f"Renderizado em {duracao * 1000:.1f}ms")
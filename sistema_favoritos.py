@@ -99,6 +99,26 @@ class SistemaFavoritos:
             print(f"Erro ao salvar música: {str(e)}")
             return None
     
+    def salvar_composicao(self, composicao, audio_bytes=None, tipo_audio="instrumental"):
+        """Salva uma ComposicaoEstruturada, guardando a estrutura nos metadados"""
+        estrutura = composicao.para_dict()
+        estrutura.pop("texto_markdown", None)
+        
+        return self.salvar_musica(
+            composicao.titulo,
+            composicao.letra_texto("\n"),
+            composicao.tom,
+            composicao.estilo,
+            cifras=composicao.cifras_texto(),
+            audio_bytes=audio_bytes,
+            tipo_audio=tipo_audio,
+            metadados_extras={
+                "bpm": composicao.bpm,
+                "uso_liturgico": composicao.uso_liturgico,
+                "estrutura": estrutura
+            }
+        )
+    
     def obter_musica(self, id_musica):
         """Obtém uma música pelo ID"""
         musica = self.dados["musicas"].get(id_musica)
@@ -4,18 +4,46 @@ Sistema de Múltiplas Vozes
 Gerencia diferentes tipos de voz para Text-to-Speech
 """
 
-from gtts import gTTS
-import tempfile
-import os
-import io
-from pydub import AudioSegment
-from pydub.effects import speedup, normalize
-import random
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from buffer_audio import BufferAudio
+from composicao_estruturada import texto_para_voz
+from coro_virtual import planejar_coro, renderizar_coro
+from gerador_audio import sintetizar_buffer_voz
+from mixagem import mixar_buffers
+from sintetizador_acordes import instrumental_com_duracao
+from transformacao_voz import normalizar_pico, transformar_voz
+
+# Estrofes e resposta de um responsorial renderizadas ao mesmo tempo
+RENDERIZACOES_SIMULTANEAS = 8
+
+def _estrofes(texto_solista):
+    """Estrofes do solista: lista de textos, ou texto com estrofes separadas por linha em branco"""
+    if isinstance(texto_solista, (list, tuple)):
+        estrofes = [texto_para_voz(estrofe) for estrofe in texto_solista]
+    else:
+        estrofes = re.split(r'\n\s*\n', str(texto_para_voz(texto_solista)).strip())
+    return [estrofe.strip() for estrofe in estrofes if str(estrofe).strip()]
 
 class SistemaVozes:
     """Classe para gerenciar múltiplas vozes de TTS"""
     
-    def __init__(self):
+    def __init__(self, cache_voz=None, janela_latencias=200, backend_tts=None):
+        # CacheVoz opcional: guarda o TTS bruto por linha, antes dos ajustes de
+        # cada tipo de voz, então as vozes de um coro compartilham as entradas
+        self.cache_voz = cache_voz
+        # BackendTTS (gTTS, espeak-ng local ou stub); None usa o da implantação
+        self.backend_tts = backend_tts
+        # Latência das últimas frases sintetizadas (cada linha é pedida em paralelo)
+        self.latencias_frases = deque(maxlen=janela_latencias)
+        self._lock_latencias = threading.Lock()
+        # pitch_adjust em semitons e speed_adjust como razão de velocidade,
+        # aplicados de forma independente (transformacao_voz)
         self.tipos_voz = {
             "feminina_adulta": {
                 "lang": "pt-br",
@@ -71,178 +99,169 @@ class SistemaVozes:
             "solista_liturgico": ["solene"]
         }
     
-    def gerar_audio_com_voz(self, texto, tipo_voz="feminina_adulta", velocidade_custom=None):
-        """Gera áudio com tipo de voz específico"""
+    def gerar_buffer_voz(self, texto, tipo_voz="feminina_adulta", velocidade_custom=None):
+        """Gera a voz como BufferAudio, sem codificar (texto ou ComposicaoEstruturada)"""
         try:
+            texto = texto_para_voz(texto)
             if tipo_voz not in self.tipos_voz:
                 tipo_voz = "feminina_adulta"
             
             config_voz = self.tipos_voz[tipo_voz]
             
-            # Gerar TTS básico
-            tts = gTTS(
-                text=texto,
-                lang=config_voz["lang"],
-                slow=config_voz["slow"]
+            # Gerar TTS básico (em memória, sem arquivo temporário)
+            buffer = sintetizar_buffer_voz(
+                texto, config_voz["lang"], config_voz["slow"], self.cache_voz,
+                ao_medir_frase=self._registrar_latencia, backend_tts=self.backend_tts
             )
             
-            # Salvar em arquivo temporário
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-                tts.save(temp_file.name)
-                
-                # Carregar áudio
-                audio = AudioSegment.from_mp3(temp_file.name)
-                
-                # Aplicar ajustes de voz
-                audio_processado = self._aplicar_ajustes_voz(audio, config_voz, velocidade_custom)
-                
-                # Converter para bytes
-                audio_bytes = io.BytesIO()
-                audio_processado.export(audio_bytes, format="mp3")
-                audio_bytes.seek(0)
-                
-                # Limpar arquivo temporário
-                os.unlink(temp_file.name)
-                
-                return audio_bytes.getvalue()
+            # Aplicar ajustes de voz (uma passada sobre o float32, sem AudioSegment)
+            return self._aplicar_ajustes_voz(buffer, config_voz, velocidade_custom)
                 
         except Exception as e:
             print(f"Erro ao gerar áudio com voz {tipo_voz}: {str(e)}")
             return None
     
-    def _aplicar_ajustes_voz(self, audio, config_voz, velocidade_custom=None):
-        """Aplica ajustes de pitch e velocidade ao áudio"""
+    def _registrar_latencia(self, medida):
+        with self._lock_latencias:
+            self.latencias_frases.append(medida)
+    
+    def obter_latencias_frases(self):
+        """Resumo da latência (ms) das últimas frases sintetizadas pelo serviço e lidas do cache"""
+        with self._lock_latencias:
+            medidas = list(self.latencias_frases)
+        
+        resumo = {}
+        for origem, do_cache in (("tts", False), ("cache", True)):
+            valores = sorted(m["segundos"] * 1000 for m in medidas if m["do_cache"] == do_cache)
+            resumo[origem] = {
+                "frases": len(valores),
+                "media_ms": sum(valores) / len(valores) if valores else 0.0,
+                "p50_ms": valores[len(valores) // 2] if valores else 0.0,
+                "max_ms": valores[-1] if valores else 0.0
+            }
+        return resumo
+    
+    def gerar_audio_com_voz(self, texto, tipo_voz="feminina_adulta", velocidade_custom=None):
+        """Gera áudio com tipo de voz específico, codificado em MP3"""
+        buffer = self.gerar_buffer_voz(texto, tipo_voz, velocidade_custom)
+        if buffer is None:
+            return None
+        
+        try:
+            return buffer.codificar("mp3")
+        except Exception as e:
+            print(f"Erro ao codificar áudio com voz {tipo_voz}: {str(e)}")
+            return None
+    
+    def _aplicar_ajustes_voz(self, buffer, config_voz, velocidade_custom=None):
+        """Aplica ajustes de altura (semitons) e velocidade à voz, independentes entre si"""
         try:
-            audio_processado = audio
-            
-            # Ajustar velocidade
             velocidade = velocidade_custom if velocidade_custom else config_voz["speed_adjust"]
-            if velocidade != 1.0:
-                # Simular mudança de velocidade alterando frame rate
-                new_sample_rate = int(audio.frame_rate * velocidade)
-                audio_processado = audio_processado._spawn(
-                    audio_processado.raw_data,
-                    overrides={"frame_rate": new_sample_rate}
-                )
-                audio_processado = audio_processado.set_frame_rate(audio.frame_rate)
-            
-            # Ajustar pitch (simulação básica através de velocidade)
-            pitch_adjust = config_voz["pitch_adjust"]
-            if pitch_adjust != 0:
-                # Ajuste de pitch através de mudança de velocidade
-                pitch_factor = 1.0 + (pitch_adjust * 0.05)  # 5% por semitom
-                new_sample_rate = int(audio_processado.frame_rate * pitch_factor)
-                audio_processado = audio_processado._spawn(
-                    audio_processado.raw_data,
-                    overrides={"frame_rate": new_sample_rate}
-                )
-                audio_processado = audio_processado.set_frame_rate(audio.frame_rate)
-            
-            # Normalizar áudio
-            audio_processado = normalize(audio_processado)
-            
-            return audio_processado
+            amostras = transformar_voz(buffer.para_mono().amostras, config_voz["pitch_adjust"], velocidade)
+            return BufferAudio(normalizar_pico(amostras), buffer.taxa_amostragem)
             
         except Exception as e:
             print(f"Erro ao aplicar ajustes de voz: {str(e)}")
-            return audio
+            return buffer
     
-    def gerar_coro_virtual(self, texto, tipo_coro="coro_misto", delay_entre_vozes=500):
-        """Gera um coro virtual com múltiplas vozes"""
+    def gerar_buffer_coro(self, texto, tipo_coro="coro_misto", delay_entre_vozes=500, num_vozes=None, semente=None):
+        """Gera um coro virtual como BufferAudio, sintetizando o texto uma única vez.
+
+        Cada integrante é derivado localmente da mesma voz (altura do seu tipo
+        de voz, desafinação, timbre, entrada e ganho próprios), então coros
+        grandes custam pouco mais que uma voz.
+        delay_entre_vozes: entrada escalonada de cada naipe (ms)
+        num_vozes: integrantes, distribuídos pelos naipes (padrão: um por naipe)
+        semente: variações fixas, para um resultado idêntico a cada chamada
+        """
         try:
+            texto = texto_para_voz(texto)
             if tipo_coro not in self.configuracoes_coro:
                 tipo_coro = "coro_misto"
             
-            vozes_coro = self.configuracoes_coro[tipo_coro]
-            audios_vozes = []
-            
-            # Gerar áudio para cada voz
-            for i, tipo_voz in enumerate(vozes_coro):
-                # Adicionar pequenas variações para naturalidade
-                velocidade_variacao = 1.0 + random.uniform(-0.05, 0.05)
-                
-                audio_voz = self.gerar_audio_com_voz(
-                    texto, 
-                    tipo_voz, 
-                    velocidade_variacao
-                )
-                
-                if audio_voz:
-                    audio_seg = AudioSegment.from_file(io.BytesIO(audio_voz))
-                    
-                    # Adicionar delay entre vozes para efeito de coro
-                    if i > 0:
-                        silencio = AudioSegment.silent(duration=delay_entre_vozes * i)
-                        audio_seg = silencio + audio_seg
-                    
-                    audios_vozes.append(audio_seg)
-            
-            if not audios_vozes:
-                return None
-            
-            # Mixar todas as vozes
-            audio_final = audios_vozes[0]
-            for audio_voz in audios_vozes[1:]:
-                # Ajustar duração para mixagem
-                duracao_maxima = max(len(audio_final), len(audio_voz))
-                
-                # Estender áudios se necessário
-                if len(audio_final) < duracao_maxima:
-                    audio_final += AudioSegment.silent(duracao_maxima - len(audio_final))
-                if len(audio_voz) < duracao_maxima:
-                    audio_voz += AudioSegment.silent(duracao_maxima - len(audio_voz))
-                
-                # Mixar com volume reduzido para evitar distorção
-                audio_final = audio_final.overlay(audio_voz - 3)  # -3dB por voz adicional
-            
-            # Normalizar resultado final
-            audio_final = normalize(audio_final)
+            naipes = [self.tipos_voz[tipo_voz] for tipo_voz in self.configuracoes_coro[tipo_coro]]
             
-            # Converter para bytes
-            audio_bytes = io.BytesIO()
-            audio_final.export(audio_bytes, format="mp3")
-            audio_bytes.seek(0)
+            # Uma síntese para o coro todo, na leitura do primeiro naipe
+            voz = sintetizar_buffer_voz(
+                texto, naipes[0]["lang"], naipes[0]["slow"], self.cache_voz,
+                ao_medir_frase=self._registrar_latencia, backend_tts=self.backend_tts
+            ).para_mono()
             
-            return audio_bytes.getvalue()
+            integrantes = planejar_coro(
+                [naipe["pitch_adjust"] for naipe in naipes], num_vozes or len(naipes),
+                voz.taxa_amostragem, delay_entre_vozes / 1000, semente
+            )
+            return BufferAudio(renderizar_coro(voz.amostras, integrantes), voz.taxa_amostragem)
             
         except Exception as e:
             print(f"Erro ao gerar coro virtual: {str(e)}")
             return None
     
-    def gerar_audio_responsorial(self, texto_solista, texto_assembleia, 
-                                tipo_voz_solista="solene", tipo_coro="coro_misto"):
-        """Gera áudio responsorial (solista + assembleia)"""
+    def gerar_coro_virtual(self, texto, tipo_coro="coro_misto", delay_entre_vozes=500, num_vozes=None, semente=None):
+        """Gera um coro virtual com múltiplas vozes, codificado em MP3"""
+        buffer = self.gerar_buffer_coro(texto, tipo_coro, delay_entre_vozes, num_vozes, semente)
+        if buffer is None:
+            return None
+        
         try:
-            # Gerar áudio do solista
-            audio_solista = self.gerar_audio_com_voz(texto_solista, tipo_voz_solista)
-            if not audio_solista:
+            return buffer.codificar("mp3")
+        except Exception as e:
+            print(f"Erro ao codificar coro virtual: {str(e)}")
+            return None
+    
+    def gerar_buffer_responsorial(self, texto_solista, texto_assembleia, tipo_voz_solista="solene",
+                                  tipo_coro="coro_misto", pausa_ms=1000, resposta_inicial=False, semente=None):
+        """Gera o responsorial como BufferAudio: cada estrofe do solista seguida da resposta da assembleia.
+
+        texto_solista: estrofes separadas por linha em branco, ou lista de estrofes
+        (uma só estrofe é o responsorial simples, solista + assembleia).
+        A resposta (coro) é renderizada uma vez e repetida após cada estrofe;
+        estrofes e resposta são renderizadas ao mesmo tempo.
+        resposta_inicial: a assembleia canta a resposta também antes da primeira estrofe
+        semente: variações do coro fixas (como em gerar_buffer_coro)
+        """
+        try:
+            estrofes = _estrofes(texto_solista)
+            if not estrofes:
                 return None
-            
-            # Gerar áudio da assembleia (coro)
-            audio_assembleia = self.gerar_coro_virtual(texto_assembleia, tipo_coro)
-            if not audio_assembleia:
+
+            with ThreadPoolExecutor(max_workers=min(RENDERIZACOES_SIMULTANEAS, len(estrofes) + 1),
+                                    thread_name_prefix="responsorial") as executor:
+                futuro_resposta = executor.submit(self.gerar_buffer_coro, texto_assembleia, tipo_coro, semente=semente)
+                futuros_estrofes = [
+                    executor.submit(self.gerar_buffer_voz, estrofe, tipo_voz_solista) for estrofe in estrofes
+                ]
+                resposta = futuro_resposta.result()
+                solos = [futuro.result() for futuro in futuros_estrofes]
+            if resposta is None or any(solo is None for solo in solos):
                 return None
-            
-            # Converter para AudioSegment
-            seg_solista = AudioSegment.from_file(io.BytesIO(audio_solista))
-            seg_assembleia = AudioSegment.from_file(io.BytesIO(audio_assembleia))
-            
-            # Adicionar pausa entre solista e assembleia
-            pausa = AudioSegment.silent(duration=1000)  # 1 segundo
-            
-            # Combinar: solista + pausa + assembleia
-            audio_final = seg_solista + pausa + seg_assembleia
-            
-            # Converter para bytes
-            audio_bytes = io.BytesIO()
-            audio_final.export(audio_bytes, format="mp3")
-            audio_bytes.seek(0)
-            
-            return audio_bytes.getvalue()
-            
+
+            # Junta as partes no próprio float32, com a pausa entre cada uma
+            pausa = BufferAudio(np.zeros(int(resposta.taxa_amostragem * pausa_ms / 1000), np.float32),
+                                resposta.taxa_amostragem)
+            partes = [resposta, pausa] if resposta_inicial else []
+            for solo in solos:
+                partes.extend([solo, pausa, resposta, pausa])
+            return BufferAudio.concatenar(partes[:-1])
+
         except Exception as e:
             print(f"Erro ao gerar áudio responsorial: {str(e)}")
             return None
+
+    def gerar_audio_responsorial(self, texto_solista, texto_assembleia, 
+                                tipo_voz_solista="solene", tipo_coro="coro_misto", resposta_inicial=False):
+        """Gera áudio responsorial (estrofes do solista + resposta da assembleia), codificado em MP3"""
+        buffer = self.gerar_buffer_responsorial(
+            texto_solista, texto_assembleia, tipo_voz_solista, tipo_coro, resposta_inicial=resposta_inicial
+        )
+        if buffer is None:
+            return None
+
+        try:
+            return buffer.codificar("mp3")
+        except Exception as e:
+            print(f"Erro ao codificar áudio responsorial: {str(e)}")
+            return None
     
     def obter_tipos_voz_disponiveis(self):
         """Retorna lista de tipos de voz disponíveis"""
@@ -265,42 +284,23 @@ class SistemaVozes:
     
     def gerar_audio_com_instrumental(self, texto, tipo_voz, audio_instrumental_bytes, 
                                    volume_voz=5, volume_instrumental=-10):
-        """Combina voz com instrumental"""
+        """Combina voz com instrumental (bytes codificados, BufferAudio ou BaseInstrumental)"""
         try:
             # Gerar áudio da voz
-            audio_voz = self.gerar_audio_com_voz(texto, tipo_voz)
-            if not audio_voz:
+            buffer_voz = self.gerar_buffer_voz(texto, tipo_voz)
+            if buffer_voz is None:
                 return None
             
-            # Carregar áudios
-            seg_voz = AudioSegment.from_file(io.BytesIO(audio_voz))
-            seg_instrumental = AudioSegment.from_file(io.BytesIO(audio_instrumental_bytes))
-            
-            # Ajustar volumes
-            seg_voz = seg_voz + volume_voz
-            seg_instrumental = seg_instrumental + volume_instrumental
-            
-            # Ajustar durações
-            duracao_voz = len(seg_voz)
-            duracao_instrumental = len(seg_instrumental)
-            
-            # Repetir instrumental se necessário
-            if duracao_voz > duracao_instrumental:
-                repeticoes = (duracao_voz // duracao_instrumental) + 1
-                seg_instrumental = seg_instrumental * repeticoes
-            
-            # Cortar instrumental para duração da voz
-            seg_instrumental = seg_instrumental[:duracao_voz]
-            
-            # Mixar
-            audio_final = seg_instrumental.overlay(seg_voz)
-            
-            # Converter para bytes
-            audio_bytes = io.BytesIO()
-            audio_final.export(audio_bytes, format="mp3")
-            audio_bytes.seek(0)
+            # O instrumental já sai com a duração da voz (sintetizado sob medida,
+            # ou repetido se vier renderizado); volumes aplicados na própria soma
+            buffer_instrumental = instrumental_com_duracao(audio_instrumental_bytes, buffer_voz.duracao_segundos)
+            audio_final = mixar_buffers(
+                [buffer_instrumental, buffer_voz], ganhos_db=[volume_instrumental, volume_voz],
+                duracao_segundos=buffer_instrumental.duracao_segundos
+            )
             
-            return audio_bytes.getvalue()
+            # Saturar como o overlay do AudioSegment e converter para bytes
+            return BufferAudio(np.clip(audio_final.amostras, -1.0, 1.0), audio_final.taxa_amostragem).codificar("mp3")
             
         except Exception as e:
             print(f"Erro ao combinar voz com instrumental: {str(e)}")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Sistemas sob Demanda
+Registro de subsistemas construídos (e seus módulos importados) apenas no
+primeiro uso, para que a página seja exibida sem esperar dependências pesadas
+"""
+
+import importlib
+import threading
+import time
+
+def classe_sob_demanda(modulo, classe, *args, **kwargs):
+    """Retorna uma fábrica que importa o módulo e instancia a classe ao ser chamada"""
+    def fabrica():
+        return getattr(importlib.import_module(modulo), classe)(*args, **kwargs)
+
+    fabrica.__qualname__ = f"{modulo}.{classe}"
+    return fabrica
+
+class SistemasSobDemanda:
+    """Dicionário de subsistemas criados no primeiro acesso"""
+
+    def __init__(self, fabricas=None):
+        self._fabricas = dict(fabricas or {})
+        self._instancias = {}
+        self._tempos_carregamento = {}
+        self._lock = threading.RLock()
+
+    def registrar(self, nome, fabrica):
+        """Registra a fábrica de um subsistema"""
+        with self._lock:
+            self._fabricas[nome] = fabrica
+            self._instancias.pop(nome, None)
+
+    def __getitem__(self, nome):
+        """Retorna o subsistema, criando-o no primeiro acesso"""
+        instancia = self._instancias.get(nome)
+        if instancia is not None:
+            return instancia
+
+        with self._lock:
+            if nome not in self._instancias:
+                if nome not in self._fabricas:
+                    raise KeyError(nome)
+                inicio = time.perf_counter()
+                self._instancias[nome] = self._fabricas[nome]()
+                self._tempos_carregamento[nome] = time.perf_counter() - inicio
+            return self._instancias[nome]
+
+    def __contains__(self, nome):
+        return nome in self._fabricas
+
+    def carregado(self, nome):
+        """Verifica se o subsistema já foi criado"""
+        return nome in self._instancias
+
+    def obter_tempos_carregamento(self):
+        """Tempo (s) de criação de cada subsistema já carregado, incluindo importações"""
+        with self._lock:
+            return dict(self._tempos_carregamento)
+
+# Teste básico
+if __name__ == "__main__":
+    sistemas = SistemasSobDemanda({
+        "partituras": classe_sob_demanda("gerador_partituras", "GeradorPartituras")
+    })
+
+    print("💤 SISTEMAS SOB DEMANDA")
+    print("=" * 30)
+
+    print(f"Partituras carregado: {sistemas.carregado('partituras')}")
+    sistemas["partituras"]
+    print(f"Partituras carregado: {sistemas.carregado('partituras')}")
+    for nome, tempo in sistemas.obter_tempos_carregamento().items():
+        print(f"  - {nome}: {tempo * 1000:.0f}ms")
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Tarefas em Segundo Plano
+Executa composições e renderizações de áudio fora da execução do script
+Streamlit, com estado, progresso e resultado persistidos em disco
+"""
+
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TempoEsgotado
+from datetime import datetime, timedelta
+
+from armazenamento import escrever_atomico
+
+# Estados de uma tarefa
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+CANCELADA = "cancelada"
+INTERROMPIDA = "interrompida"
+
+ESTADOS_FINAIS = (CONCLUIDA, FALHOU, CANCELADA, INTERROMPIDA)
+
+class TarefaCancelada(Exception):
+    """Lançada dentro da tarefa quando o cancelamento é solicitado"""
+
+class GerenciadorTarefas:
+    """Classe para executar e acompanhar tarefas longas em um pool de threads"""
+
+    def __init__(self, diretorio="tarefas", max_workers=2, retencao_horas=24, intervalo_gravacao=0.5):
+        """
+        diretorio: onde ficam o estado (<id>.json) e o resultado (<id>.pkl)
+        max_workers: tarefas executadas ao mesmo tempo
+        retencao_horas: tarefas finalizadas mais antigas são removidas
+        intervalo_gravacao: intervalo mínimo entre gravações do progresso
+        """
+        self.diretorio = diretorio
+        self.retencao_horas = retencao_horas
+        self.intervalo_gravacao = intervalo_gravacao
+        self._lock = threading.Lock()
+        self._tarefas = {}
+        self._resultados = {}
+        self._futuros = {}
+        self._cancelamentos = set()
+        self._ultima_gravacao = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tarefa")
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._carregar_tarefas()
+        self.limpar_antigas()
+
+    def _caminho(self, id_tarefa, extensao):
+        """Retorna o caminho de um arquivo da tarefa"""
+        return os.path.join(self.diretorio, f"{id_tarefa}.{extensao}")
+
+    def _carregar_tarefas(self):
+        """Carrega as tarefas do disco; as que estavam em andamento são marcadas como interrompidas"""
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.diretorio, nome), 'r', encoding='utf-8') as f:
+                    tarefa = json.load(f)
+            except Exception as e:
+                print(f"Erro ao carregar tarefa {nome}: {str(e)}")
+                continue
+
+            self._tarefas[tarefa["id"]] = tarefa
+            if tarefa["estado"] not in ESTADOS_FINAIS:
+                tarefa["estado"] = INTERROMPIDA
+                tarefa["erro"] = "Tarefa interrompida pela reinicialização do aplicativo"
+                tarefa["data_fim"] = datetime.now().isoformat()
+                self._gravar_estado(tarefa["id"], forcar=True)
+
+    def _gravar_estado(self, id_tarefa, forcar=False):
+        """Grava o estado da tarefa, no máximo uma vez por intervalo_gravacao"""
+        agora = time.monotonic()
+        if not forcar and agora - self._ultima_gravacao.get(id_tarefa, 0.0) < self.intervalo_gravacao:
+            return
+        self._ultima_gravacao[id_tarefa] = agora
+
+        try:
+            conteudo = json.dumps(self._tarefas[id_tarefa], ensure_ascii=False, indent=2, default=str)
+            escrever_atomico(self._caminho(id_tarefa, "json"), conteudo.encode('utf-8'))
+        except Exception as e:
+            print(f"Erro ao salvar estado da tarefa: {str(e)}")
+
+    def submeter(self, tipo, funcao, *args, descricao="", chave=None, **kwargs):
+        """Submete uma tarefa e retorna seu ID.
+
+        A função é chamada como funcao(progresso, *args, **kwargs), onde
+        progresso(fracao=None, mensagem=None, parcial=None) informa o
+        andamento e lança TarefaCancelada se o cancelamento foi pedido.
+        Se chave for informada e houver tarefa ativa com a mesma chave, o
+        ID dela é retornado em vez de submeter outra.
+        """
+        with self._lock:
+            if chave:
+                for tarefa in self._tarefas.values():
+                    if tarefa.get("chave") == chave and tarefa["estado"] not in ESTADOS_FINAIS:
+                        return tarefa["id"]
+
+            id_tarefa = uuid.uuid4().hex[:12]
+            self._tarefas[id_tarefa] = {
+                "id": id_tarefa,
+                "tipo": tipo,
+                "descricao": descricao,
+                "chave": chave,
+                "estado": PENDENTE,
+                "progresso": 0.0,
+                "mensagem": "",
+                "parcial": None,
+                "erro": None,
+                "tem_resultado": False,
+                "data_criacao": datetime.now().isoformat(),
+                "data_inicio": None,
+                "data_fim": None
+            }
+            self._gravar_estado(id_tarefa, forcar=True)
+            self._futuros[id_tarefa] = self._executor.submit(self._executar, id_tarefa, funcao, args, kwargs)
+
+        return id_tarefa
+
+    def _executar(self, id_tarefa, funcao, args, kwargs):
+        """Executa a tarefa no pool, registrando estado e resultado"""
+        with self._lock:
+            tarefa = self._tarefas[id_tarefa]
+            if id_tarefa in self._cancelamentos:
+                self._finalizar(tarefa, CANCELADA)
+                return
+            tarefa["estado"] = EXECUTANDO
+            tarefa["data_inicio"] = datetime.now().isoformat()
+            self._gravar_estado(id_tarefa, forcar=True)
+
+        def progresso(fracao=None, mensagem=None, parcial=None):
+            self._informar_progresso(id_tarefa, fracao, mensagem, parcial)
+
+        try:
+            resultado = funcao(progresso, *args, **kwargs)
+        except TarefaCancelada:
+            with self._lock:
+                self._finalizar(tarefa, CANCELADA)
+            return
+        except Exception as e:
+            with self._lock:
+                tarefa["erro"] = str(e)
+                self._finalizar(tarefa, FALHOU)
+            return
+
+        try:
+            escrever_atomico(self._caminho(id_tarefa, "pkl"), pickle.dumps(resultado))
+        except Exception as e:
+            print(f"Erro ao salvar resultado da tarefa: {str(e)}")
+
+        with self._lock:
+            self._resultados[id_tarefa] = resultado
+            tarefa["tem_resultado"] = True
+            tarefa["progresso"] = 1.0
+            self._finalizar(tarefa, CONCLUIDA)
+
+    def _finalizar(self, tarefa, estado):
+        """Registra o estado final da tarefa (chamado com o lock adquirido)"""
+        tarefa["estado"] = estado
+        tarefa["data_fim"] = datetime.now().isoformat()
+        self._cancelamentos.discard(tarefa["id"])
+        self._futuros.pop(tarefa["id"], None)
+        self._gravar_estado(tarefa["id"], forcar=True)
+
+    def _informar_progresso(self, id_tarefa, fracao=None, mensagem=None, parcial=None):
+        """Atualiza o progresso da tarefa em execução"""
+        with self._lock:
+            if id_tarefa in self._cancelamentos:
+                raise TarefaCancelada(id_tarefa)
+
+            tarefa = self._tarefas[id_tarefa]
+            if fracao is not None:
+                tarefa["progresso"] = max(0.0, min(1.0, float(fracao)))
+            if mensagem is not None:
+                tarefa["mensagem"] = mensagem
+            if parcial is not None:
+                tarefa["parcial"] = parcial
+            self._gravar_estado(id_tarefa)
+
+    def obter(self, id_tarefa):
+        """Retorna uma cópia do estado da tarefa ou None"""
+        with self._lock:
+            tarefa = self._tarefas.get(id_tarefa)
+            return dict(tarefa) if tarefa else None
+
+    def resultado(self, id_tarefa):
+        """Retorna o resultado de uma tarefa concluída (da memória ou do disco)"""
+        with self._lock:
+            if id_tarefa in self._resultados:
+                return self._resultados[id_tarefa]
+            tarefa = self._tarefas.get(id_tarefa)
+            if not tarefa or not tarefa.get("tem_resultado"):
+                return None
+
+            try:
+                with open(self._caminho(id_tarefa, "pkl"), 'rb') as f:
+                    resultado = pickle.load(f)
+            except Exception as e:
+                print(f"Erro ao carregar resultado da tarefa: {str(e)}")
+                return None
+
+            self._resultados[id_tarefa] = resultado
+            return resultado
+
+    def aguardar(self, id_tarefa, timeout=None):
+        """Aguarda a tarefa terminar e retorna seu estado"""
+        with self._lock:
+            futuro = self._futuros.get(id_tarefa)
+        if futuro is not None:
+            try:
+                futuro.result(timeout=timeout)
+            except TempoEsgotado:
+                pass
+        return self.obter(id_tarefa)
+
+    def cancelar(self, id_tarefa):
+        """Solicita o cancelamento; tarefas em execução param no próximo progresso informado"""
+        with self._lock:
+            tarefa = self._tarefas.get(id_tarefa)
+            if not tarefa or tarefa["estado"] in ESTADOS_FINAIS:
+                return False
+
+            self._cancelamentos.add(id_tarefa)
+            futuro = self._futuros.get(id_tarefa)
+            if futuro is not None and futuro.cancel():
+                self._finalizar(tarefa, CANCELADA)
+            return True
+
+    def listar(self, tipo=None, limite=20):
+        """Lista as tarefas mais recentes"""
+        with self._lock:
+            tarefas = [dict(t) for t in self._tarefas.values() if tipo is None or t["tipo"] == tipo]
+        tarefas.sort(key=lambda t: t["data_criacao"], reverse=True)
+        return tarefas[:limite]
+
+    def limpar_antigas(self):
+        """Remove tarefas finalizadas há mais tempo que a retenção"""
+        limite = (datetime.now() - timedelta(hours=self.retencao_horas)).isoformat()
+        removidas = 0
+
+        with self._lock:
+            for id_tarefa, tarefa in list(self._tarefas.items()):
+                if tarefa["estado"] in ESTADOS_FINAIS and (tarefa["data_fim"] or tarefa["data_criacao"]) < limite:
+                    del self._tarefas[id_tarefa]
+                    self._resultados.pop(id_tarefa, None)
+                    self._ultima_gravacao.pop(id_tarefa, None)
+                    for extensao in ("json", "pkl"):
+                        try:
+                            os.unlink(self._caminho(id_tarefa, extensao))
+                        except OSError:
+                            pass
+                    removidas += 1
+
+        return removidas
+
+    def obter_estatisticas(self):
+        """Retorna a quantidade de tarefas por estado"""
+        with self._lock:
+            estatisticas = {estado: 0 for estado in (PENDENTE, EXECUTANDO) + ESTADOS_FINAIS}
+            for tarefa in self._tarefas.values():
+                estatisticas[tarefa["estado"]] += 1
+            return estatisticas
+
+    def encerrar(self, aguardar=False):
+        """Encerra o pool de threads"""
+        self._executor.shutdown(wait=aguardar, cancel_futures=True)
+
+# Função de conveniência
+def criar_gerenciador_tarefas():
+    """Retorna uma instância do gerenciador de tarefas"""
+    return GerenciadorTarefas()
+
+# Teste básico
+if __name__ == "__main__":
+    gerenciador = GerenciadorTarefas(tempfile.mkdtemp())
+
+    print("⚙️ TAREFAS EM SEGUNDO PLANO")
+    print("=" * 30)
+
+    def contar(progresso, total):
+        for i in range(total):
+            time.sleep(0.1)
+            progresso((i + 1) / total, f"Passo {i + 1}/{total}")
+        return total
+
+    id_tarefa = gerenciador.submeter("exemplo", contar, 5, descricao="Contagem")
+    tarefa = gerenciador.aguardar(id_tarefa)
+    print(f"Tarefa {id_tarefa}: {tarefa['estado']} - resultado {gerenciador.resultado(id_tarefa)}")
+    gerenciador.encerrar()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Testes da gravação atômica e do índice LRU compartilhados pelos caches
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from armazenamento import carregar_indice, escrever_atomico, remover_excedentes_lru, salvar_indice
+
+class TestArmazenamento(unittest.TestCase):
+    """Testes do armazenamento em disco"""
+
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.diretorio)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave)
+
+    def _entradas(self, quantidade, tamanho=100):
+        entradas = {}
+        for i in range(quantidade):
+            escrever_atomico(self._caminho(f"e{i}"), b"x" * tamanho)
+            entradas[f"e{i}"] = {"ultimo_acesso": f"2024-01-0{i + 1}", "tamanho_bytes": tamanho}
+        return entradas
+
+    def test_escrita_atomica_de_texto_e_bytes(self):
+        """Testa a gravação de texto em UTF-8 e de bytes, sem deixar temporários"""
+        escrever_atomico(self._caminho("texto"), "Glória")
+        escrever_atomico(self._caminho("dados"), b"\x00\x01")
+
+        with open(self._caminho("texto"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), "Glória")
+        with open(self._caminho("dados"), 'rb') as f:
+            self.assertEqual(f.read(), b"\x00\x01")
+        self.assertEqual(sorted(os.listdir(self.diretorio)), ["dados", "texto"])
+
+    def test_indice_de_outra_versao_descartado(self):
+        """Testa que o índice só é reaproveitado na mesma versão"""
+        caminho = self._caminho("indice.json")
+        salvar_indice(caminho, {"versao": "1", "entradas": {}})
+
+        self.assertEqual(carregar_indice(caminho, versao="1"), {"versao": "1", "entradas": {}})
+        self.assertIsNone(carregar_indice(caminho, versao="2"))
+        self.assertIsNone(carregar_indice(self._caminho("ausente.json")))
+
+    def test_remove_menos_usadas_acima_dos_limites(self):
+        """Testa a remoção LRU por bytes e por número de entradas"""
+        entradas = self._entradas(4)
+
+        self.assertEqual(remover_excedentes_lru(entradas, self._caminho, max_bytes=250), ["e0", "e1"])
+        self.assertEqual(remover_excedentes_lru(entradas, self._caminho, max_bytes=1000, max_entradas=1), ["e2"])
+        self.assertEqual(list(entradas), ["e3"])
+        self.assertEqual(os.listdir(self.diretorio), ["e3"])
+
+    def test_minimo_de_entradas_mantido(self):
+        """Testa que o mínimo de entradas é mantido mesmo acima do limite de bytes"""
+        entradas = self._entradas(2, tamanho=500)
+
+        remover_excedentes_lru(entradas, self._caminho, max_bytes=100, minimo_entradas=1)
+        self.assertEqual(list(entradas), ["e1"])
+
+if __name__ == "__main__":
+    unittest.main()
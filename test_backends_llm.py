@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Testes para os backends de LLM (gravação, replay e stub)
+"""
+
+import json
+import unittest
+import sys
+import os
+import time
+import tempfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backends_llm import (
+    BackendLLM, BackendGravacao, BackendReplay, BackendStub, BackendRoteado,
+    BackendCrewAI, chave_fixture, criar_backend_llm, percentil
+)
+from cache_composicoes import CacheComposicoes
+from compositor import Compositor, extrair_letra_musica
+
+class BackendFalso(BackendLLM):
+    """Backend "real" simulado que conta as chamadas"""
+
+    def __init__(self):
+        super().__init__(modelo="gpt-4", temperatura=0.8)
+        self.chamadas = 0
+
+    def compor(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        self.chamadas += 1
+        return f"**Refrão:**\nLouvado seja em {tom}\n"
+
+class BackendModelo(BackendLLM):
+    """Backend simulado de um modelo com latência e falha configuráveis"""
+
+    def __init__(self, modelo, latencia=0.0, erro=None):
+        super().__init__(modelo=modelo, temperatura=0.8)
+        self.latencia = latencia
+        self.erro = erro
+        self.chamadas = 0
+
+    def compor(self, sentimentos, tom, estilo, momento=None, ao_receber_trecho=None, modo=None):
+        self.chamadas += 1
+        if ao_receber_trecho:
+            ao_receber_trecho(f"{self.modelo}...")
+        time.sleep(self.latencia)
+        if self.erro:
+            raise self.erro
+        return f"composição de {self.modelo}"
+
+MODOS_TESTE = {
+    "rascunho": {
+        "modelos": [{"modelo": "rapido", "timeout": 0.5}, {"modelo": "principal", "timeout": 1.5}],
+        "preferir_mais_rapido": True
+    },
+    "final": {
+        "modelos": [{"modelo": "principal", "timeout": 1.5}, {"modelo": "rapido", "timeout": 0.5}],
+        "preferir_mais_rapido": False
+    }
+}
+
+class TestBackendsLLM(unittest.TestCase):
+    """Testes para os backends de composição offline"""
+
+    def setUp(self):
+        """Cria um diretório temporário para fixtures e cache"""
+        self.diretorio = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def test_stub_gera_letra_extraivel(self):
+        """Testa se a composição fixa passa pela extração de letra"""
+        texto = BackendStub().compor("paz", "G", "mariano")
+        self.assertIn("G - D - Em - C", texto)
+        self.assertIn("Ave Maria", extrair_letra_musica(texto))
+
+    def test_stub_latencia_e_streaming(self):
+        """Testa a latência artificial e a entrega em trechos"""
+        backend = BackendStub(latencia_segundos=0.2, tamanho_trecho=50)
+        trechos = []
+
+        inicio = time.monotonic()
+        texto = backend.compor("paz", "C", "tradicional", ao_receber_trecho=trechos.append)
+
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.2)
+        self.assertGreater(len(trechos), 1)
+        self.assertEqual(trechos[-1], texto)
+
+    def test_gravacao_e_replay(self):
+        """Testa se o replay devolve exatamente a resposta gravada"""
+        real = BackendFalso()
+        gravacao = BackendGravacao(real, self.diretorio)
+        texto_gravado = gravacao.compor("esperança", "D", "litúrgico", momento="Entrada")
+
+        replay = BackendReplay(self.diretorio, latencia_segundos=0.0, estrito=True)
+        self.assertEqual(replay.compor("Esperança ", "D", "litúrgico", momento="Entrada"), texto_gravado)
+        self.assertEqual(real.chamadas, 1)
+
+    def test_replay_simultaneo_com_duracoes_gravadas(self):
+        """Testa que cada replay simultâneo usa a duração da sua fixture"""
+        for tom, duracao in (("C", 0.05), ("D", 0.6)):
+            with open(os.path.join(self.diretorio, f"{chave_fixture('paz', tom, 'mariano')}.json"), 'w',
+                      encoding='utf-8') as f:
+                json.dump({"texto": f"composição em {tom}", "duracao_segundos": duracao}, f)
+
+        replay = BackendReplay(self.diretorio, estrito=True)
+
+        def cronometrar(tom):
+            inicio = time.monotonic()
+            replay.compor("paz", tom, "mariano", ao_receber_trecho=lambda t: None)
+            return time.monotonic() - inicio
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            lenta = executor.submit(cronometrar, "D")
+            time.sleep(0.1)
+            rapida = executor.submit(cronometrar, "C")
+            self.assertLess(rapida.result(timeout=5), 0.3)
+            self.assertGreaterEqual(lenta.result(timeout=5), 0.6)
+
+        self.assertEqual(replay.latencia_segundos, 0.0)
+
+    def test_replay_estrito_sem_fixture(self):
+        """Testa se o modo estrito falha sem fixture gravada"""
+        replay = BackendReplay(self.diretorio, estrito=True)
+        with self.assertRaises(KeyError):
+            replay.compor("paz", "C", "tradicional")
+
+    def test_criar_backend_por_tipo(self):
+        """Testa a seleção do backend pelo tipo"""
+        self.assertIsInstance(criar_backend_llm("stub"), BackendStub)
+        self.assertIsInstance(criar_backend_llm("replay"), BackendReplay)
+
+    def test_compositor_usa_cache(self):
+        """Testa se o compositor só chama o backend na primeira vez"""
+        real = BackendFalso()
+        compositor = Compositor(real, CacheComposicoes(self.diretorio))
+
+        primeiro = compositor.compor("paz", "C", "tradicional")
+        segundo = compositor.compor("paz", "C", "tradicional")
+        compositor.compor("paz", "C", "tradicional", forcar_nova=True)
+
+        self.assertEqual(primeiro, segundo)
+        self.assertEqual(real.chamadas, 2)
+
+class TestPercentil(unittest.TestCase):
+    """Testes do percentil pelo posto mais próximo"""
+
+    def test_posto_mais_proximo(self):
+        """Testa o posto ceil(p/100 * n), inclusive quando p/100 * n é inteiro"""
+        self.assertEqual(percentil([1, 2], 50), 1)
+        self.assertEqual(percentil(list(range(1, 11)), 50), 5)
+        self.assertEqual(percentil(list(range(1, 21)), 95), 19)
+        self.assertEqual(percentil(list(range(1, 101)), 95), 95)
+        self.assertEqual(percentil([3, 1, 2], 50), 2)
+        self.assertEqual(percentil(list(range(1, 11)), 95), 10)
+
+    def test_extremos(self):
+        """Testa lista vazia, p = 0 e p = 100"""
+        self.assertEqual(percentil([], 50), 0.0)
+        self.assertEqual(percentil([5, 7], 0), 5)
+        self.assertEqual(percentil([5, 7], 100), 7)
+
+class TestBackendRoteado(unittest.TestCase):
+    """Testes do roteamento entre modelos"""
+
+    def roteador(self, rapido=None, principal=None, **kwargs):
+        """Cria o roteador com os dois modelos simulados"""
+        self.rapido = rapido or BackendModelo("rapido")
+        self.principal = principal or BackendModelo("principal")
+        return BackendRoteado({"rapido": self.rapido, "principal": self.principal}, MODOS_TESTE, **kwargs)
+
+    def test_modo_escolhe_modelo(self):
+        """Testa que rascunho e versão final usam modelos diferentes"""
+        roteador = self.roteador()
+
+        self.assertEqual(roteador.compor("paz", "G", "mariano", modo="rascunho"), "composição de rapido")
+        self.assertEqual(roteador.compor("paz", "G", "mariano", modo="final"), "composição de principal")
+        self.assertEqual(roteador.compor("paz", "G", "mariano"), "composição de principal")
+        self.assertEqual(roteador.modelo_para("rascunho"), "rapido")
+        self.assertEqual(roteador.modelo, "principal")
+
+    def test_alternativa_em_erro_e_tempo_esgotado(self):
+        """Testa o uso do outro modelo quando o preferido falha ou demora"""
+        roteador = self.roteador(principal=BackendModelo("principal", erro=RuntimeError("503")))
+        self.assertEqual(roteador.compor("paz", "G", "mariano", modo="final"), "composição de rapido")
+
+        roteador = self.roteador(rapido=BackendModelo("rapido", latencia=2.0))
+        inicio = time.monotonic()
+        recebidos = []
+        texto = roteador.compor("paz", "G", "mariano", ao_receber_trecho=recebidos.append, modo="rascunho")
+
+        self.assertEqual(texto, "composição de principal")
+        self.assertLess(time.monotonic() - inicio, 1.5)
+        self.assertEqual(recebidos[-1], "principal...")
+
+        estatisticas = roteador.obter_estatisticas()
+        self.assertEqual(estatisticas["rapido"]["timeouts"], 1)
+        self.assertEqual(estatisticas["principal"]["fallbacks"], 1)
+
+    def test_alternativa_com_o_proprio_tempo_limite(self):
+        """Testa que a alternativa do rascunho não herda o tempo limite do modelo rápido"""
+        roteador = self.roteador(
+            rapido=BackendModelo("rapido", erro=RuntimeError("503")),
+            principal=BackendModelo("principal", latencia=1.0)
+        )
+        self.assertEqual(roteador.compor("paz", "G", "mariano", modo="rascunho"), "composição de principal")
+        self.assertEqual(roteador.timeouts("rascunho"), {"rapido": 0.5, "principal": 1.5})
+        self.assertEqual(roteador.obter_estatisticas()["principal"]["timeouts"], 0)
+
+    def test_alternativa_salva_com_o_modelo_que_respondeu(self):
+        """Testa que a resposta da alternativa não fica no cache sob a chave do modelo preferido"""
+        diretorio = tempfile.mkdtemp()
+        try:
+            roteador = self.roteador(principal=BackendModelo("principal", erro=RuntimeError("503")))
+            gravacao = BackendGravacao(roteador, diretorio)
+            compositor = Compositor(gravacao, CacheComposicoes(diretorio))
+
+            self.assertEqual(compositor.compor("paz", "G", "mariano", modo="final"), "composição de rapido")
+            self.assertFalse(compositor.esta_em_cache("paz", "G", "mariano", modo="final"))
+            self.assertTrue(compositor.esta_em_cache("paz", "G", "mariano", modo="rascunho"))
+
+            chave = compositor.chave("paz", "G", "mariano", modelo="rapido")
+            self.assertEqual(compositor.cache.indice["entradas"][chave]["metadados"]["modelo"], "rapido")
+            with open(os.path.join(diretorio, f"{chave_fixture('paz', 'G', 'mariano')}.json"), encoding='utf-8') as f:
+                self.assertEqual(json.load(f)["modelo"], "rapido")
+        finally:
+            shutil.rmtree(diretorio)
+
+    def test_todos_os_modelos_falham(self):
+        """Testa o erro quando nenhum modelo conclui"""
+        roteador = self.roteador(
+            rapido=BackendModelo("rapido", erro=ValueError("a")),
+            principal=BackendModelo("principal", erro=ValueError("b"))
+        )
+        with self.assertRaises(RuntimeError) as contexto:
+            roteador.compor("paz", "G", "mariano")
+        self.assertIsInstance(contexto.exception.__cause__, ValueError)
+
+    def test_erro_de_quem_recebe_trechos_nao_aciona_alternativa(self):
+        """Testa que o cancelamento vindo do callback é repassado sem trocar de modelo"""
+        roteador = self.roteador()
+
+        def cancelar(texto_parcial):
+            raise LookupError("cancelada")
+
+        with self.assertRaises(LookupError):
+            roteador.compor("paz", "G", "mariano", ao_receber_trecho=cancelar, modo="final")
+        self.assertEqual(self.rapido.chamadas, 0)
+
+    def test_rascunho_prefere_modelo_mais_rapido_medido(self):
+        """Testa a reordenação pela latência p50 registrada"""
+        diretorio = tempfile.mkdtemp()
+        try:
+            arquivo = os.path.join(diretorio, "latencias.json")
+            roteador = self.roteador(arquivo_latencias=arquivo)
+            roteador.latencias["rapido"].extend([3.0] * 5)
+            roteador.latencias["principal"].extend([1.0] * 5)
+
+            self.assertEqual(roteador.ordem_modelos("rascunho"), ["principal", "rapido"])
+            self.assertEqual(roteador.ordem_modelos("final"), ["principal", "rapido"])
+
+            roteador.compor("paz", "G", "mariano", modo="final")
+            novo = self.roteador(arquivo_latencias=arquivo)
+            estatisticas = novo.obter_estatisticas()
+            self.assertEqual(estatisticas["principal"]["amostras"], 6)
+            self.assertEqual(estatisticas["rapido"]["p95_segundos"], 3.0)
+        finally:
+            shutil.rmtree(diretorio)
+
+    def test_criar_backend_roteado(self):
+        """Testa a criação do backend roteado para o CrewAI"""
+        backend = criar_backend_llm("crewai", modelo="gpt-4", modelo_rascunho="gpt-4o-mini")
+        self.assertIsInstance(backend, BackendRoteado)
+        self.assertEqual(backend.modelo_para("rascunho"), "gpt-4o-mini")
+        self.assertEqual(backend.modelo_para("final"), "gpt-4")
+        self.assertEqual(backend.timeouts("rascunho"), {"gpt-4o-mini": 15, "gpt-4": 120})
+        self.assertEqual(backend.timeouts("final"), {"gpt-4": 120, "gpt-4o-mini": 30})
+        self.assertIsInstance(criar_backend_llm("crewai", modelo="gpt-4"), BackendCrewAI)
+
+    def test_compositor_separa_cache_por_modo(self):
+        """Testa que rascunho e versão final não compartilham a entrada de cache"""
+        diretorio = tempfile.mkdtemp()
+        try:
+            compositor = Compositor(self.roteador(), CacheComposicoes(diretorio))
+            rascunho = compositor.compor("paz", "G", "mariano", modo="rascunho")
+            final = compositor.compor("paz", "G", "mariano", modo="final")
+
+            self.assertNotEqual(rascunho, final)
+            self.assertTrue(compositor.esta_em_cache("paz", "G", "mariano", modo="rascunho"))
+        finally:
+            shutil.rmtree(diretorio)
+
+if __name__ == "__main__":
+    unittest.main()
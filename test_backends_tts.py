@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Testes dos backends de TTS (stub determinístico, espeak-ng local e escolha por implantação)
+"""
+
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import backends_tts
+import gerador_audio
+from backends_tts import BackendEspeak, BackendGTTS, BackendStubTTS, SintetizadorFrases, criar_backend_tts
+from buffer_audio import BufferAudio
+from cache_voz import CacheVoz
+from composicao_estruturada import ComposicaoEstruturada, SecaoMusica
+from cliente_tts import ErroTTS
+from sistema_vozes import SistemaVozes
+
+LETRA = "Cantai ao Senhor um canto novo\nAleluia, aleluia\nEle fez maravilhas\nAleluia, aleluia"
+
+# espeak-ng de mentira: WAV de 0,05 s por caractere lido da entrada padrão;
+# grava os argumentos recebidos em argumentos.json, ao lado do script
+ESPEAK_FALSO = textwrap.dedent('''\
+    #!{python}
+    import json, os, struct, sys, wave
+    texto = sys.stdin.buffer.read().decode("utf-8")
+    with open(os.path.join(os.path.dirname(__file__), "argumentos.json"), "w") as f:
+        json.dump(sys.argv[1:], f)
+    if "falhar" in texto:
+        sys.stderr.write("voz indisponível")
+        sys.exit(1)
+    saida = wave.open(sys.stdout.buffer, "wb")
+    saida.setnchannels(1)
+    saida.setsampwidth(2)
+    saida.setframerate(22050)
+    saida.writeframes(struct.pack("<h", 1000) * int(len(texto) * 0.05 * 22050))
+    saida.close()
+''')
+
+class TestBackendStubTTS(unittest.TestCase):
+    """Testes do backend stub usado em testes e benchmarks"""
+
+    def test_deterministico_e_proporcional_ao_texto(self):
+        """Testa que o mesmo texto gera os mesmos bytes e a duração segue o tamanho do texto"""
+        backend = BackendStubTTS()
+        dados = backend.sintetizar("Aleluia, aleluia")
+
+        self.assertEqual(dados, BackendStubTTS().sintetizar("Aleluia, aleluia"))
+        self.assertNotEqual(dados, backend.sintetizar("Cantai ao Senhor"))
+
+        buffer = BufferAudio.de_bytes(dados, backend.formato)
+        self.assertEqual(buffer.taxa_amostragem, 24000)
+        self.assertAlmostEqual(buffer.duracao_segundos, len("Aleluia, aleluia") * 0.06, delta=0.01)
+        self.assertGreater(float(np.abs(buffer.amostras).max()), 0.1)
+
+    def test_voz_da_letra_com_cache_por_backend(self):
+        """Testa a voz completa pelo stub e a separação das entradas do cache por backend"""
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio)
+        cache = CacheVoz(diretorio)
+        backend = BackendStubTTS()
+
+        voz = gerador_audio.sintetizar_buffer_voz(LETRA, cache_voz=cache, backend_tts=backend)
+        self.assertEqual(backend.frases_sintetizadas, 3)
+        self.assertAlmostEqual(voz.duracao_segundos, sum(len(l) for l in LETRA.splitlines()) * 0.06, delta=0.05)
+
+        de_novo = gerador_audio.sintetizar_buffer_voz(LETRA, cache_voz=cache, backend_tts=backend)
+        self.assertEqual(backend.frases_sintetizadas, 3)
+        np.testing.assert_array_equal(voz.amostras, de_novo.amostras)
+
+        chave_stub = cache.gerar_chave("Aleluia, aleluia", "pt-br", False, backend.perfil)
+        self.assertIsNotNone(cache.obter(chave_stub))
+        self.assertIsNone(cache.obter(cache.gerar_chave("Aleluia, aleluia", "pt-br", False, "gtts")))
+        self.assertTrue(os.path.exists(os.path.join(diretorio, f"{chave_stub}.{backend.formato}")))
+        self.assertFalse(any(nome.endswith(".mp3") for nome in os.listdir(diretorio)))
+
+    def test_voz_da_composicao_estruturada_por_linha(self):
+        """Testa que a composição estruturada é sintetizada verso a verso, com o refrão uma vez"""
+        composicao = ComposicaoEstruturada(titulo="Cantai", secoes=[
+            SecaoMusica("verso", ["Cantai ao Senhor um canto novo", "Ele fez maravilhas"]),
+            SecaoMusica("refrao", ["Aleluia, aleluia", "Louvai o Senhor"]),
+            SecaoMusica("verso", ["Os confins da terra viram", "A salvação do nosso Deus"]),
+            SecaoMusica("refrao", ["Aleluia, aleluia", "Louvai o Senhor"])
+        ])
+        backend = BackendStubTTS()
+
+        voz = gerador_audio.sintetizar_buffer_voz(composicao, backend_tts=backend)
+        self.assertEqual(backend.frases_sintetizadas, len(set(composicao.linhas_letra())))
+        self.assertAlmostEqual(voz.duracao_segundos, sum(len(l) for l in composicao.linhas_letra()) * 0.06, delta=0.05)
+
+    def test_sistema_vozes_sem_rede(self):
+        """Testa o SistemaVozes com o backend stub"""
+        vozes = SistemaVozes(backend_tts=BackendStubTTS())
+        buffer = vozes.gerar_buffer_voz(LETRA, "feminina_adulta")
+
+        self.assertIsNotNone(buffer)
+        self.assertGreater(buffer.duracao_segundos, 3.0)
+        self.assertEqual(vozes.obter_latencias_frases()["tts"]["frases"], 3)
+
+class TestBackendEspeak(unittest.TestCase):
+    """Testes do backend local contra um espeak-ng de mentira"""
+
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp()
+        self.executavel = os.path.join(self.diretorio, "espeak-ng")
+        with open(self.executavel, "w", encoding="utf-8") as f:
+            f.write(ESPEAK_FALSO.format(python=sys.executable))
+        os.chmod(self.executavel, os.stat(self.executavel).st_mode | stat.S_IEXEC)
+
+    def tearDown(self):
+        shutil.rmtree(self.diretorio)
+
+    def argumentos(self):
+        with open(os.path.join(self.diretorio, "argumentos.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_wav_pela_saida_padrao(self):
+        """Testa a voz, a velocidade e o texto pela entrada padrão"""
+        backend = BackendEspeak(executavel=self.executavel)
+        buffer = BufferAudio.de_bytes(backend.sintetizar("-- Aleluia", "pt-br", slow=True), backend.formato)
+
+        self.assertAlmostEqual(buffer.duracao_segundos, len("-- Aleluia") * 0.05, delta=0.01)
+        argumentos = self.argumentos()
+        self.assertEqual(argumentos[argumentos.index("-v") + 1], "pt-br")
+        self.assertEqual(argumentos[argumentos.index("-s") + 1], "110")
+        self.assertNotIn("-- Aleluia", argumentos)
+
+    def test_falha_do_sintetizador(self):
+        """Testa que a falha do espeak-ng vira ErroTTS com a mensagem dele"""
+        backend = BackendEspeak(executavel=self.executavel)
+        with self.assertRaisesRegex(ErroTTS, "voz indisponível"):
+            SintetizadorFrases(backend).sintetizar(["Aleluia", "falhar"])
+
+    def test_escolha_por_implantacao(self):
+        """Testa COMPOSITOR_TTS_BACKEND e o erro, sem cair na rede, quando falta o espeak-ng"""
+        with patch.dict(os.environ, {"COMPOSITOR_TTS_BACKEND": "stub", "COMPOSITOR_LATENCIA_TTS": "0.2"}):
+            backend = criar_backend_tts()
+            self.assertIsInstance(backend, BackendStubTTS)
+            self.assertEqual(backend.latencia_segundos, 0.2)
+
+        self.assertIsInstance(criar_backend_tts("gtts"), BackendGTTS)
+        with patch.object(backends_tts, "localizar_espeak", return_value=self.executavel):
+            self.assertIsInstance(criar_backend_tts("espeak"), BackendEspeak)
+        with patch.object(backends_tts, "localizar_espeak", return_value=None):
+            with self.assertRaisesRegex(ErroTTS, "espeak-ng não encontrado"):
+                criar_backend_tts("espeak")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Testes do banco de bases instrumentais pré-renderizadas
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import banco_instrumental
+from banco_instrumental import BancoInstrumental
+from formatos_entrega import FORMATOS_ENTREGA, FORMATO_DOWNLOAD_PADRAO, PERFIL_PREVIA, codificar_previa
+
+class TestBancoInstrumental(unittest.TestCase):
+    """Testes da renderização única e leitura do banco"""
+
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp()
+        self.banco = BancoInstrumental(self.diretorio, duracao_acorde=0.5, taxa_amostragem=8000)
+
+    def tearDown(self):
+        shutil.rmtree(self.diretorio)
+
+    def test_renderiza_uma_vez_e_depois_le_do_disco(self):
+        """Testa que o segundo pedido não sintetiza de novo"""
+        with patch.object(banco_instrumental, "sintetizar_progressao",
+                          wraps=banco_instrumental.sintetizar_progressao) as sintetizar:
+            primeiro = self.banco.obter_bytes("G", "tradicional", "wav")
+            segundo = self.banco.obter_bytes("G", "tradicional", "wav")
+
+        self.assertEqual(sintetizar.call_count, 1)
+        self.assertEqual(primeiro, segundo)
+        with wave.open(io.BytesIO(primeiro)) as arquivo:
+            self.assertEqual(arquivo.getframerate(), 8000)
+            self.assertEqual(arquivo.getnframes(), 4 * 4000)
+
+        estatisticas = self.banco.obter_estatisticas()
+        self.assertEqual(estatisticas["renderizacoes"], 1)
+        self.assertEqual(estatisticas["acertos"], 1)
+
+    def test_amostras_mapeadas_em_memoria(self):
+        """Testa a leitura float32 somente leitura por mmap"""
+        amostras = self.banco.obter_amostras("C", "tradicional")
+
+        self.assertIsInstance(amostras, np.memmap)
+        self.assertEqual(amostras.dtype, np.float32)
+        self.assertFalse(amostras.flags.writeable)
+        self.assertEqual(len(self.banco.obter_audio_segment("C", "tradicional")), 2000)
+
+    def test_base_sob_medida_usa_configuracao_do_banco(self):
+        """Testa que a base para durações exatas segue o banco e não grava no disco"""
+        base = self.banco.obter_base("G", "tradicional")
+
+        self.assertEqual((base.duracao_acorde, base.taxa_amostragem), (0.5, 8000))
+        self.assertEqual(len(base.para_duracao(3.3).amostras), 26400)
+        self.assertEqual(self.banco.obter_estatisticas()["renderizacoes"], 0)
+
+    def test_estilos_com_mesma_progressao_compartilham_arquivo(self):
+        """Testa que estilos com a mesma progressão não duplicam o áudio"""
+        self.assertEqual(
+            self.banco.chave("D", "mariano", "wav"),
+            self.banco.chave("D", "gregoriano", "wav")
+        )
+        self.assertNotEqual(
+            self.banco.chave("D", "tradicional", "wav"),
+            self.banco.chave("D", "mariano", "wav")
+        )
+
+    def test_pre_aquecimento_e_manifesto_persistente(self):
+        """Testa o pré-aquecimento de todas as combinações e a reabertura do banco"""
+        informados = []
+        criadas = self.banco.pre_aquecer(
+            tons=["C", "G"], formatos=["pcm"],
+            ao_informar=lambda indice, total, descricao: informados.append(indice)
+        )
+
+        # 2 tons x 2 progressões distintas entre os 5 estilos
+        self.assertEqual(criadas, 4)
+        self.assertEqual(len(informados), 2 * len(banco_instrumental.ESTILOS_BANCO))
+
+        reaberto = BancoInstrumental(self.diretorio, duracao_acorde=0.5, taxa_amostragem=8000)
+        self.assertEqual(reaberto.pre_aquecer(tons=["C", "G"], formatos=["pcm"]), 0)
+        self.assertEqual(reaberto.obter_estatisticas()["total_entradas"], 4)
+
+    def test_entrega_com_previa_e_download_do_banco(self):
+        """Testa que, pré-aquecido o banco, a entrega da base não codifica nada"""
+        self.banco.pre_aquecer(tons=["G"], estilos=["tradicional"])
+
+        with patch("codec_audio.codificar_amostras", side_effect=AssertionError("codificou de novo")):
+            entrega = self.banco.obter_entrega("G", "tradicional")
+            dados_previa, mime = entrega.previa()
+            download = entrega.arquivo()
+
+        self.assertEqual(mime, FORMATOS_ENTREGA[PERFIL_PREVIA["formato"]]["mime"])
+        self.assertEqual(dados_previa, codificar_previa(self.banco.obter_buffer("G", "tradicional"))[0])
+        self.assertEqual(download, self.banco.obter_buffer("G", "tradicional").codificar(FORMATO_DOWNLOAD_PADRAO))
+        self.assertEqual(entrega.nome_arquivo(), f"instrumental_G_tradicional.{FORMATO_DOWNLOAD_PADRAO}")
+
+    def test_arquivo_ausente_e_renderizado_novamente(self):
+        """Testa a recuperação quando o arquivo do manifesto foi apagado"""
+        self.banco.obter_bytes("A", "tradicional", "wav")
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith(".wav"):
+                os.unlink(os.path.join(self.diretorio, nome))
+
+        self.assertTrue(self.banco.obter_bytes("A", "tradicional", "wav"))
+        self.assertEqual(self.banco.obter_estatisticas()["renderizacoes"], 2)
+
+    def test_pedidos_simultaneos_renderizam_uma_vez(self):
+        """Testa pedidos concorrentes da mesma base"""
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            resultados = list(executor.map(lambda _: self.banco.obter_bytes("E", "litúrgico", "wav"), range(6)))
+
+        self.assertEqual(len(set(resultados)), 1)
+        self.assertEqual(self.banco.obter_estatisticas()["renderizacoes"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Testes do buffer de áudio e do pipeline de mixagem sem recodificação
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from buffer_audio import BufferAudio
+from mixer_audio import MixerAudio
+
+def senoide(frequencia, segundos, taxa, amplitude=0.5):
+    """Buffer mono com uma senoide"""
+    t = np.arange(int(segundos * taxa), dtype=np.float32) / taxa
+    return BufferAudio(amplitude * np.sin(2 * np.pi * frequencia * t), taxa)
+
+class TestBufferAudio(unittest.TestCase):
+    """Testes das conversões do buffer"""
+
+    def test_ida_e_volta_com_audio_segment(self):
+        """Testa a conversão sem perdas relevantes entre buffer e AudioSegment"""
+        segmento = Sine(440, sample_rate=22050).to_audio_segment(duration=500, volume=-6)
+        buffer = BufferAudio.de_audio_segment(segmento)
+
+        self.assertEqual(buffer.amostras.dtype, np.float32)
+        self.assertEqual(buffer.taxa_amostragem, 22050)
+        self.assertEqual(len(buffer), 500)
+        self.assertEqual(buffer.para_audio_segment().raw_data, segmento.raw_data)
+
+    def test_estereo(self):
+        """Testa o formato (n, canais) para áudio estéreo"""
+        segmento = AudioSegment.silent(duration=100, frame_rate=8000).set_channels(2)
+        buffer = BufferAudio.de_audio_segment(segmento)
+
+        self.assertEqual(buffer.amostras.shape, (800, 2))
+        self.assertEqual(buffer.canais, 2)
+        self.assertEqual(buffer.para_audio_segment().channels, 2)
+
+    def test_codificar_e_decodificar_wav(self):
+        """Testa a codificação de entrega e a leitura de bytes"""
+        buffer = senoide(440, 0.25, 16000)
+        wav = buffer.codificar("wav")
+
+        decodificado = BufferAudio.de_audio(wav)
+        self.assertEqual(decodificado.taxa_amostragem, 16000)
+        np.testing.assert_allclose(decodificado.amostras, buffer.amostras, atol=1e-4)
+        self.assertIs(BufferAudio.de_audio(buffer), buffer)
+
+class TestMixagemComBuffers(unittest.TestCase):
+    """Testes do mixer operando sobre buffers"""
+
+    def setUp(self):
+        self.mixer = MixerAudio()
+        self.voz = senoide(330, 1.0, 16000)
+        self.instrumental = senoide(110, 0.4, 16000)
+
+    def test_pipeline_nao_decodifica_entre_etapas(self):
+        """Testa mixagem, fade e análise sem nenhuma decodificação"""
+        with patch.object(AudioSegment, "from_file", side_effect=AssertionError("decodificação inesperada")):
+            mixado = self.mixer.mixar_buffers(self.voz, self.instrumental, reverb_amount=0.1)
+            com_fade = self.mixer.aplicar_fade(mixado, 200, 200)
+            analise = self.mixer.analisar_buffer(com_fade)
+
+        self.assertIsInstance(com_fade, BufferAudio)
+        self.assertGreaterEqual(len(mixado), len(self.voz))
+        self.assertEqual(analise["sample_rate"], 16000)
+        self.assertAlmostEqual(analise["duracao_segundos"], len(com_fade) / 1000)
+
+    def test_fade_zera_as_bordas(self):
+        """Testa as rampas de fade in e fade out"""
+        constante = BufferAudio(np.full(1000, 0.5, dtype=np.float32), 1000)
+        com_fade = self.mixer.aplicar_fade(constante, 100, 100)
+
+        self.assertEqual(com_fade.amostras[0], 0.0)
+        self.assertAlmostEqual(float(com_fade.amostras[500]), 0.5)
+        self.assertLess(float(com_fade.amostras[-1]), 0.01)
+
+    def test_analise_em_dbfs(self):
+        """Testa volume médio e pico calculados no buffer"""
+        analise = self.mixer.analisar_buffer(senoide(440, 1.0, 8000, amplitude=0.5))
+
+        self.assertAlmostEqual(analise["pico_db"], 20 * np.log10(0.5), places=2)
+        self.assertAlmostEqual(analise["volume_medio_db"], 20 * np.log10(0.5 / np.sqrt(2)), places=1)
+        self.assertEqual(analise["canais"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Testes para o cache de composições
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cache_composicoes import CacheComposicoes
+
+class TestCacheComposicoes(unittest.TestCase):
+    """Testes para o cache persistente de composições"""
+
+    def setUp(self):
+        """Cria um diretório temporário para cada teste"""
+        self.diretorio = tempfile.mkdtemp()
+        self.cache = CacheComposicoes(diretorio=self.diretorio, max_entradas=3)
+
+    def tearDown(self):
+        """Remove o diretório temporário"""
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def test_chave_normaliza_entradas(self):
+        """Testa se variações de espaço e caixa geram a mesma chave"""
+        chave1 = self.cache.gerar_chave("Gratidão,esperança", "G", "mariano", "gpt-4", 0.8)
+        chave2 = self.cache.gerar_chave("  gratidão ,  Esperança ", "g", "Mariano", "gpt-4", 0.80)
+        self.assertEqual(chave1, chave2)
+
+    def test_chave_depende_do_modelo(self):
+        """Testa se modelo e temperatura fazem parte da chave"""
+        chave_base = self.cache.gerar_chave("paz", "C", "tradicional", "gpt-4", 0.8)
+        self.assertNotEqual(chave_base, self.cache.gerar_chave("paz", "C", "tradicional", "gpt-4o-mini", 0.8))
+        self.assertNotEqual(chave_base, self.cache.gerar_chave("paz", "C", "tradicional", "gpt-4", 0.2))
+
+    def test_acerto_e_falha(self):
+        """Testa contadores de acertos e falhas"""
+        chave = self.cache.gerar_chave("paz", "C", "tradicional", "gpt-4", 0.8)
+        self.assertIsNone(self.cache.obter(chave))
+
+        self.cache.salvar(chave, "**Refrão:** Ave Maria")
+        self.assertEqual(self.cache.obter(chave), "**Refrão:** Ave Maria")
+
+        estatisticas = self.cache.obter_estatisticas()
+        self.assertEqual(estatisticas["acertos"], 1)
+        self.assertEqual(estatisticas["falhas"], 1)
+
+    def test_persistencia_em_disco(self):
+        """Testa se o cache sobrevive a uma nova instância"""
+        chave = self.cache.gerar_chave("fé", "D", "litúrgico", "gpt-4", 0.8)
+        self.cache.salvar(chave, "Composição")
+
+        novo_cache = CacheComposicoes(diretorio=self.diretorio)
+        self.assertEqual(novo_cache.obter(chave), "Composição")
+
+    def test_remove_menos_usada_recentemente(self):
+        """Testa a remoção LRU ao exceder o limite de entradas"""
+        chaves = [self.cache.gerar_chave(f"tema {i}", "C", "tradicional", "gpt-4", 0.8) for i in range(4)]
+
+        for chave in chaves[:3]:
+            self.cache.salvar(chave, f"texto {chave}")
+
+        # Acessar a primeira para torná-la a mais recente
+        self.cache.obter(chaves[0])
+        self.cache.salvar(chaves[3], "texto novo")
+
+        self.assertTrue(self.cache.contem(chaves[0]))
+        self.assertFalse(self.cache.contem(chaves[1]))
+        self.assertTrue(self.cache.contem(chaves[3]))
+        self.assertEqual(self.cache.obter_estatisticas()["total_entradas"], 3)
+
+    def test_limite_de_bytes(self):
+        """Testa a remoção ao exceder o tamanho máximo em disco"""
+        cache = CacheComposicoes(diretorio=self.diretorio, max_megabytes=0.001)
+        chave1 = cache.gerar_chave("a", "C", "tradicional", "gpt-4", 0.8)
+        chave2 = cache.gerar_chave("b", "C", "tradicional", "gpt-4", 0.8)
+
+        cache.salvar(chave1, "x" * 800)
+        cache.salvar(chave2, "y" * 800)
+
+        self.assertFalse(cache.contem(chave1))
+        self.assertTrue(cache.contem(chave2))
+
+if __name__ == "__main__":
+    unittest.main()
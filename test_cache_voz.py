@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Testes do cache de voz por frase
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gerador_audio
+from buffer_audio import BufferAudio
+from cache_voz import CacheVoz, frases_para_voz
+from backends_tts import BackendGTTS
+from cliente_tts import ClienteTTS
+from test_cliente_tts import ServidorTTSLocal
+
+LETRA = """Cantai ao Senhor um canto novo
+Aleluia, aleluia
+
+Ele fez maravilhas
+Aleluia, aleluia"""
+
+def mp3_de(segundos):
+    t = np.arange(int(segundos * 24000), dtype=np.float32) / 24000
+    return BufferAudio(0.3 * np.sin(2 * np.pi * 220 * t), 24000).codificar("mp3")
+
+class TestCacheVoz(unittest.TestCase):
+    """Testes da chave, da persistência e da síntese apenas das frases ausentes"""
+
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp()
+        self.cache = CacheVoz(self.diretorio)
+        # Serviço de TTS local: MP3 com 0,05 s por caractere
+        self.servidor = ServidorTTSLocal(audio_de=lambda texto: mp3_de(len(texto) * 0.05))
+        self.cliente = ClienteTTS(url=self.servidor.url)
+
+    def tearDown(self):
+        self.cliente.fechar()
+        self.servidor.encerrar()
+        shutil.rmtree(self.diretorio)
+
+    def test_chave_por_texto_idioma_leitura_e_perfil(self):
+        """Testa que só espaços extras não mudam a chave"""
+        chave = self.cache.gerar_chave("Aleluia, aleluia", "pt-br", False, "gtts")
+        self.assertEqual(chave, self.cache.gerar_chave("  Aleluia,   aleluia ", "PT-BR", False, "gtts"))
+        self.assertNotEqual(chave, self.cache.gerar_chave("aleluia, aleluia", "pt-br", False, "gtts"))
+        self.assertNotEqual(chave, self.cache.gerar_chave("Aleluia, aleluia", "pt", False, "gtts"))
+        self.assertNotEqual(chave, self.cache.gerar_chave("Aleluia, aleluia", "pt-br", True, "gtts"))
+        self.assertNotEqual(chave, self.cache.gerar_chave("Aleluia, aleluia", "pt-br", False, "espeak"))
+
+    def test_refrao_sintetizado_uma_vez_e_persistente(self):
+        """Testa que o refrão repetido e a nova renderização não chamam o TTS"""
+        self.assertEqual(len(frases_para_voz(LETRA)), 4)
+
+        with patch.object(gerador_audio, "obter_backend_tts", return_value=BackendGTTS(self.cliente)):
+            voz = gerador_audio.sintetizar_buffer_voz(LETRA, cache_voz=self.cache)
+            self.assertEqual(sorted(self.servidor.pedidos), sorted(set(frases_para_voz(LETRA))))
+
+            # Outra instância no mesmo diretório (novo processo): nenhuma chamada
+            self.servidor.pedidos = []
+            de_novo = gerador_audio.sintetizar_buffer_voz(LETRA, cache_voz=CacheVoz(self.diretorio))
+            self.assertEqual(self.servidor.pedidos, [])
+
+        np.testing.assert_array_equal(voz.amostras, de_novo.amostras)
+        self.assertAlmostEqual(voz.duracao_segundos, sum(len(f) for f in frases_para_voz(LETRA)) * 0.05, delta=0.5)
+        self.assertEqual(self.cache.obter_estatisticas()["sinteses"], 3)
+
+    def test_pedidos_simultaneos_sintetizam_uma_vez(self):
+        """Testa a coalescência de pedidos da mesma frase"""
+        chamadas = []
+        lock = threading.Lock()
+
+        def sintetizar():
+            with lock:
+                chamadas.append(1)
+            time.sleep(0.1)
+            return b"mp3"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            resultados = list(executor.map(
+                lambda _: self.cache.obter_ou_sintetizar("Amém", "pt-br", False, "gtts", sintetizar), range(4)
+            ))
+
+        self.assertEqual(resultados, [b"mp3"] * 4)
+        self.assertEqual(len(chamadas), 1)
+
+    def test_falha_na_sintese_libera_a_frase(self):
+        """Testa que uma síntese com erro não deixa lock pendente e pode ser repetida"""
+        def falhar():
+            raise ConnectionError("TTS indisponível")
+
+        with self.assertRaises(ConnectionError):
+            self.cache.obter_ou_sintetizar("Amém", "pt-br", False, "gtts", falhar)
+        self.assertEqual(self.cache._locks_sintese, {})
+
+        self.assertEqual(self.cache.obter_ou_sintetizar("Amém", "pt-br", False, "gtts", lambda: b"mp3"), b"mp3")
+        self.assertEqual(self.cache.obter_estatisticas()["total_entradas"], 1)
+
+    def test_remove_as_menos_usadas_acima_do_limite(self):
+        """Testa a política LRU por tamanho"""
+        cache = CacheVoz(self.diretorio, max_megabytes=2500 / 1024 / 1024)
+        for indice in range(3):
+            cache.obter_ou_sintetizar(f"frase {indice}", "pt-br", False, "gtts", lambda: b"x" * 1000)
+            time.sleep(0.01)
+
+        estatisticas = cache.obter_estatisticas()
+        self.assertEqual(estatisticas["total_entradas"], 2)
+        self.assertIsNone(cache.obter(cache.gerar_chave("frase 0")))
+        self.assertIsNotNone(cache.obter(cache.gerar_chave("frase 2")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Testes do cliente de TTS contra um serviço local que imita o do gTTS
+"""
+
+import base64
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backends_tts import BackendGTTS, SintetizadorFrases
+from cliente_tts import ClienteTTS, ErroTTS
+
+class ServidorTTSLocal:
+    """Serviço de TTS de mentira no protocolo batchexecute do Google Translate.
+
+    audio_de(texto) define os bytes devolvidos (padrão: o próprio texto);
+    falhas[texto] = n faz os n primeiros pedidos do texto responderem 503.
+    """
+
+    def __init__(self, audio_de=None, latencia=0.0):
+        self.audio_de = audio_de or (lambda texto: texto.encode("utf-8"))
+        self.latencia = latencia
+        self.falhas = {}
+        self.pedidos = []
+        self.portas = set()
+        self.simultaneos = 0
+        self.max_simultaneos = 0
+        self._lock = threading.Lock()
+
+        servidor = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                corpo = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+                status, resposta = servidor._responder(corpo, self.client_address[1])
+                dados = resposta.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), Manipulador)
+        self.http.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.http.server_address[1]}/batchexecute"
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+
+    def _responder(self, corpo, porta):
+        rpc = json.loads(urllib.parse.unquote(corpo.split("f.req=", 1)[1].rstrip("&")))
+        texto = json.loads(rpc[0][0][1])[0]
+
+        with self._lock:
+            self.pedidos.append(texto)
+            self.portas.add(porta)
+            self.simultaneos += 1
+            self.max_simultaneos = max(self.max_simultaneos, self.simultaneos)
+            falhar = self.falhas.get(texto, 0) > 0
+            if falhar:
+                self.falhas[texto] -= 1
+        try:
+            time.sleep(self.latencia)
+            if falhar:
+                return 503, "indisponível"
+            audio = base64.b64encode(self.audio_de(texto)).decode("ascii")
+            return 200, ')]}\'\n\n[["wrb.fr","jQ1olc","[\\"' + audio + '\\"]",null,null,null,"generic"]]\n'
+        finally:
+            with self._lock:
+                self.simultaneos -= 1
+
+    def encerrar(self):
+        self.http.shutdown()
+        self.http.server_close()
+
+class TestClienteTTS(unittest.TestCase):
+    """Testes do paralelismo, da ordem, das repetições e da reutilização de conexões"""
+
+    def setUp(self):
+        self.servidor = ServidorTTSLocal(latencia=0.1)
+        self.cliente = ClienteTTS(url=self.servidor.url, max_conexoes=3, espera_inicial=0.01, dormir=time.sleep)
+
+    def tearDown(self):
+        self.cliente.fechar()
+        self.servidor.encerrar()
+
+    def test_frases_em_paralelo_e_na_ordem(self):
+        """Testa que as frases chegam ao mesmo tempo ao serviço e voltam na ordem da letra"""
+        frases = [f"frase número {indice}" for indice in range(9)]
+        medidas = []
+
+        inicio = time.perf_counter()
+        audios = SintetizadorFrases(BackendGTTS(self.cliente)).sintetizar(frases, ao_medir_frase=medidas.append)
+        duracao = time.perf_counter() - inicio
+
+        self.assertEqual(audios, [frase.encode("utf-8") for frase in frases])
+        self.assertEqual(self.servidor.max_simultaneos, 3)
+        self.assertLess(duracao, 9 * 0.1 * 0.7)
+        self.assertEqual([medida["frase"] for medida in medidas], frases)
+        self.assertTrue(all(medida["segundos"] >= 0.1 and not medida["do_cache"] for medida in medidas))
+
+    def test_conexoes_reaproveitadas(self):
+        """Testa que os pedidos usam no máximo max_conexoes conexões"""
+        sintetizador = SintetizadorFrases(BackendGTTS(self.cliente))
+        for rodada in range(3):
+            sintetizador.sintetizar([f"rodada {rodada} frase {indice}" for indice in range(6)])
+
+        self.assertEqual(len(self.servidor.pedidos), 18)
+        self.assertLessEqual(len(self.servidor.portas), 3)
+
+    def test_repete_falhas_transitorias(self):
+        """Testa a nova tentativa após 503 e o erro quando as tentativas acabam"""
+        self.servidor.falhas = {"Aleluia": 2, "Amém": 5}
+
+        self.assertEqual(self.cliente.sintetizar_mp3("Aleluia"), "Aleluia".encode("utf-8"))
+        self.assertEqual(self.servidor.pedidos.count("Aleluia"), 3)
+
+        with self.assertRaises(ErroTTS):
+            self.cliente.sintetizar_mp3("Amém")
+        estatisticas = self.cliente.obter_estatisticas()
+        self.assertEqual(estatisticas["repeticoes"], 4)
+        self.assertEqual(estatisticas["falhas"], 1)
+
+    def test_frases_repetidas_pedidas_uma_vez(self):
+        """Testa que o refrão repetido na letra é pedido uma única vez"""
+        frases = ["Aleluia", "Cantai ao Senhor", "Aleluia"]
+        audios = SintetizadorFrases(BackendGTTS(self.cliente)).sintetizar(frases)
+
+        self.assertEqual(audios[0], audios[2])
+        self.assertEqual(sorted(self.servidor.pedidos), ["Aleluia", "Cantai ao Senhor"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Testes do codec de áudio no próprio processo
+"""
+
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+from pydub import AudioSegment
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import codec_audio
+from codec_audio import codificar_amostras, decodificar_bytes, suporta_soundfile
+
+def senoide(segundos=1.0, taxa=44100, frequencia=440.0):
+    t = np.arange(int(segundos * taxa), dtype=np.float32) / taxa
+    return (0.5 * np.sin(2 * np.pi * frequencia * t)).astype(np.float32)
+
+def falhar(*args, **kwargs):
+    raise AssertionError("pydub não deveria ser usado")
+
+def sem_pydub():
+    """Faz qualquer uso do pydub/ffmpeg falhar"""
+    return patch.multiple(AudioSegment, from_file=falhar, export=falhar)
+
+class TestCodecAudio(unittest.TestCase):
+    """Testes de codificação/decodificação e do pool de MP3"""
+
+    def test_formatos_sem_perdas_no_processo(self):
+        """Testa ida e volta de WAV e FLAC sem o pydub"""
+        amostras = senoide(0.5, 16000)
+        with sem_pydub():
+            for formato in ("wav", "flac"):
+                decodificadas, taxa = decodificar_bytes(codificar_amostras(amostras, 16000, formato))
+                self.assertEqual(taxa, 16000)
+                np.testing.assert_allclose(decodificadas, amostras, atol=1e-4, err_msg=formato)
+
+    def test_formatos_com_perdas_no_processo(self):
+        """Testa OGG e MP3 codificados e lidos sem o pydub"""
+        amostras = senoide(1.0, 44100)
+        with sem_pydub():
+            for formato in ("ogg", "mp3"):
+                if not suporta_soundfile(formato):
+                    continue
+                decodificadas, taxa = decodificar_bytes(codificar_amostras(amostras, 44100, formato))
+                self.assertEqual(taxa, 44100)
+                self.assertAlmostEqual(len(decodificadas) / 44100, 1.0, delta=0.1, msg=formato)
+                self.assertAlmostEqual(float(np.max(np.abs(decodificadas))), 0.5, delta=0.05, msg=formato)
+
+    @unittest.skipUnless(suporta_soundfile("mp3"), "libsndfile sem suporte a MP3")
+    def test_bitrate_mp3(self):
+        """Testa que o bitrate pedido define o tamanho do MP3"""
+        amostras = senoide(5.0, 44100)
+        tamanhos = {kbps: len(codificar_amostras(amostras, 44100, "mp3", kbps)) for kbps in (64, 128, 256)}
+
+        for kbps, tamanho in tamanhos.items():
+            self.assertAlmostEqual(tamanho * 8 / 5 / 1000, kbps, delta=kbps * 0.1)
+
+    @unittest.skipUnless(suporta_soundfile("opus"), "libsndfile sem suporte a Opus")
+    def test_opus_reamostra_e_respeita_bitrate(self):
+        """Testa que o Opus aceita 44,1 kHz (reamostrando para 48 kHz) e o bitrate pedido"""
+        amostras = senoide(5.0, 44100)
+        with sem_pydub():
+            tamanhos = {kbps: len(codificar_amostras(amostras, 44100, "opus", kbps)) for kbps in (32, 96)}
+            decodificadas, taxa = decodificar_bytes(codificar_amostras(amostras, 44100, "opus"))
+
+        self.assertEqual(taxa, 48000)
+        self.assertAlmostEqual(len(decodificadas) / 48000, 5.0, delta=0.1)
+        for kbps, tamanho in tamanhos.items():
+            self.assertAlmostEqual(tamanho * 8 / 5 / 1000, kbps, delta=kbps * 0.25)
+
+    @unittest.skipUnless(suporta_soundfile("ogg"), "libsndfile sem suporte a OGG")
+    def test_ogg_longo(self):
+        """Testa a codificação Vorbis de um áudio longo (escrita em blocos)"""
+        amostras = np.tile(senoide(1.0, 44100), 70)
+        decodificadas, _ = decodificar_bytes(codificar_amostras(amostras, 44100, "ogg"))
+        self.assertAlmostEqual(len(decodificadas) / 44100, 70.0, delta=0.1)
+
+    def test_reamostrar(self):
+        """Testa a reamostragem de mono e estéreo"""
+        mono = senoide(1.0, 44100)
+        self.assertEqual(len(codec_audio.reamostrar(mono, 44100, 22050)), 22050)
+        self.assertIs(codec_audio.reamostrar(mono, 44100, 44100), mono)
+
+        estereo = np.stack([mono, mono], axis=1)
+        self.assertEqual(codec_audio.reamostrar(estereo, 44100, 48000).shape, (48000, 2))
+
+    @unittest.skipUnless(suporta_soundfile("mp3"), "libsndfile sem suporte a MP3")
+    def test_mp3_simultaneos_no_processo(self):
+        """Testa codificações MP3 simultâneas, cada uma na thread de quem pede"""
+        antes = codec_audio.obter_estatisticas()["codificacoes_soundfile"]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            resultados = list(executor.map(lambda _: codificar_amostras(senoide(0.5), 44100, "mp3"), range(4)))
+
+        self.assertEqual(len(set(resultados)), 1)
+        self.assertEqual(codec_audio.obter_estatisticas()["codificacoes_soundfile"] - antes, 4)
+
+    def test_recorre_ao_pydub_quando_necessario(self):
+        """Testa o caminho do pydub para formatos que a libsndfile não trata"""
+        amostras = senoide(0.25, 8000)
+        with patch.object(codec_audio, "suporta_soundfile", return_value=False):
+            wav = codificar_amostras(amostras, 8000, "wav")
+        self.assertEqual(wav[:4], b"RIFF")
+
+        antes = codec_audio.obter_estatisticas()["decodificacoes_pydub"]
+        with patch.object(codec_audio.sf, "read", side_effect=RuntimeError("formato desconhecido")):
+            decodificadas, taxa = decodificar_bytes(wav, "wav")
+        self.assertEqual(taxa, 8000)
+        self.assertEqual(len(decodificadas), len(amostras))
+        self.assertEqual(codec_audio.obter_estatisticas()["decodificacoes_pydub"] - antes, 1)
+
+    def test_tts_sem_arquivo_temporario(self):
+        """Testa que a voz do serviço de TTS é recebida e decodificada sem passar pelo disco"""
+        import gerador_audio
+        from backends_tts import BackendGTTS
+        from cliente_tts import ClienteTTS
+        from test_cliente_tts import ServidorTTSLocal
+
+        mp3 = codificar_amostras(senoide(1.0, 24000), 24000, "mp3")
+        servidor = ServidorTTSLocal(audio_de=lambda texto: mp3)
+        self.addCleanup(servidor.encerrar)
+
+        with patch.object(gerador_audio, "obter_backend_tts",
+                          return_value=BackendGTTS(ClienteTTS(url=servidor.url))), \
+             patch("tempfile.NamedTemporaryFile", side_effect=AssertionError("arquivo temporário")):
+            buffer = gerador_audio.sintetizar_buffer_voz("Aleluia")
+
+        self.assertEqual(buffer.taxa_amostragem, 24000)
+        self.assertAlmostEqual(buffer.duracao_segundos, 1.0, delta=0.1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Testes da composição estruturada
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from composicao_estruturada import (
+    ComposicaoEstruturada, ErroComposicaoInvalida,
+    estruturar_composicao, texto_sem_estrutura, validar_composicao
+)
+
+MARKDOWN = """**Título:** Luz da Manhã
+
+**Verso 1:**
+Senhor, tu és a luz
+Que guia o meu caminho
+
+**Refrão:**
+Aleluia, aleluia
+G D Em C
+
+**Cifras:** G - D - Em - C
+**Tempo:** 90 BPM
+"""
+
+ESTRUTURA = {
+    "titulo": "Luz da Manhã",
+    "secoes": [
+        {"tipo": "verso", "rotulo": "Verso 1", "linhas": ["Senhor, tu és a luz", "Que guia o meu caminho"],
+         "cifras": ["G D", "Em C"]},
+        {"tipo": "Refrão", "linhas": ["Aleluia, aleluia"], "cifras": ["G D Em C"]}
+    ],
+    "bpm": 90,
+    "uso_liturgico": "Entrada"
+}
+
+def com_bloco_json(texto, estrutura):
+    """Acrescenta o bloco JSON ao markdown, como o LLM faz"""
+    return f"{texto}\n```json\n{json.dumps(estrutura, ensure_ascii=False)}\n```\n"
+
+class TestComposicaoEstruturada(unittest.TestCase):
+    """Testes da validação e da leitura da estrutura"""
+
+    def test_validacao_normaliza_tipos(self):
+        """Testa validação com tipos acentuados e campos opcionais"""
+        composicao = validar_composicao(ESTRUTURA, "G", "tradicional")
+
+        self.assertEqual(composicao.titulo, "Luz da Manhã")
+        self.assertEqual([s.tipo for s in composicao.secoes], ["verso", "refrao"])
+        self.assertEqual(composicao.secoes[1].nome, "Refrão")
+        self.assertEqual(composicao.bpm, 90)
+        self.assertEqual(composicao.linhas_letra()[0], "Senhor, tu és a luz")
+
+    def test_validacao_rejeita_estruturas_invalidas(self):
+        """Testa os erros de validação"""
+        invalidas = [
+            [],
+            {**ESTRUTURA, "titulo": ""},
+            {**ESTRUTURA, "secoes": []},
+            {**ESTRUTURA, "secoes": [{"tipo": "solo", "linhas": ["x"]}]},
+            {**ESTRUTURA, "secoes": [{"tipo": "verso", "linhas": "texto solto"}]},
+            {**ESTRUTURA, "bpm": 500}
+        ]
+        for dados in invalidas:
+            with self.assertRaises(ErroComposicaoInvalida):
+                validar_composicao(dados)
+
+    def test_bloco_json_tem_prioridade(self):
+        """Testa que o bloco JSON é usado e removido do markdown"""
+        texto = com_bloco_json(MARKDOWN, ESTRUTURA)
+        composicao = estruturar_composicao(texto, "G", "tradicional")
+
+        self.assertTrue(composicao.estruturada_pelo_llm)
+        self.assertEqual(composicao.uso_liturgico, "Entrada")
+        self.assertEqual(composicao.secoes[0].cifras, ["G D", "Em C"])
+        self.assertNotIn("```json", composicao.texto_markdown)
+        self.assertEqual(texto_sem_estrutura(texto), MARKDOWN.rstrip())
+
+    def test_markdown_quando_json_ausente_ou_invalido(self):
+        """Testa a leitura do markdown sem JSON ou com JSON inválido"""
+        for texto in [MARKDOWN, MARKDOWN + "\n```json\n{\"titulo\": \n```"]:
+            composicao = estruturar_composicao(texto, "G", "tradicional")
+
+            self.assertFalse(composicao.estruturada_pelo_llm)
+            self.assertEqual(composicao.titulo, "Luz da Manhã")
+            self.assertEqual(composicao.bpm, 90)
+            self.assertEqual(
+                composicao.letra_texto(),
+                "Senhor, tu és a luz Que guia o meu caminho Aleluia, aleluia"
+            )
+            self.assertEqual(composicao.secoes[1].cifras, ["G D Em C"])
+
+        with self.assertRaises(ErroComposicaoInvalida):
+            estruturar_composicao("Texto sem nenhuma seção de letra.")
+
+    def test_json_parcial_oculto_durante_streaming(self):
+        """Testa que o bloco JSON incompleto não aparece na exibição"""
+        parcial = MARKDOWN + "\n```json\n{\"titulo\": \"Luz"
+        self.assertEqual(texto_sem_estrutura(parcial), MARKDOWN.rstrip())
+
+    def test_ida_e_volta_e_favoritos(self):
+        """Testa serialização e gravação na biblioteca de músicas"""
+        from sistema_favoritos import SistemaFavoritos
+
+        composicao = validar_composicao(ESTRUTURA, "G", "tradicional")
+        self.assertEqual(ComposicaoEstruturada.de_dict(composicao.para_dict()), composicao)
+
+        diretorio = tempfile.mkdtemp()
+        try:
+            favoritos = SistemaFavoritos(os.path.join(diretorio, "favoritos.json"))
+            musica = favoritos.obter_musica(favoritos.salvar_composicao(composicao))
+
+            self.assertEqual(musica["titulo"], "Luz da Manhã")
+            self.assertEqual(musica["metadados"]["bpm"], 90)
+            self.assertEqual(musica["metadados"]["estrutura"]["secoes"][1]["tipo"], "refrao")
+            self.assertIn("Verso 1: G D | Em C", musica["cifras"])
+        finally:
+            shutil.rmtree(diretorio)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Testes para a composição em lote do repertório
+"""
+
+import unittest
+import sys
+import os
+import time
+import threading
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from composicao_lote import ComposicaoLote, MOMENTOS_MISSA
+
+class TestComposicaoLote(unittest.TestCase):
+    """Testes para a execução concorrente de composições"""
+
+    def test_itens_missa(self):
+        """Testa se os itens padrão cobrem todos os momentos da Missa"""
+        lote = ComposicaoLote(lambda *a, **k: "")
+        itens = lote.criar_itens_missa("G", "litúrgico")
+
+        self.assertEqual([i["momento"] for i in itens], list(MOMENTOS_MISSA.keys()))
+        self.assertTrue(all(i["tom"] == "G" for i in itens))
+
+    def test_execucao_concorrente(self):
+        """Testa se o tempo total se aproxima do item mais lento"""
+        def composicao(sentimentos, tom, estilo, momento=None):
+            time.sleep(0.3)
+            return momento
+
+        lote = ComposicaoLote(composicao, max_concorrencia=6)
+        itens = lote.criar_itens_missa("C", "tradicional")
+
+        inicio = time.monotonic()
+        resultados = lote.compor_tudo(itens)
+        duracao = time.monotonic() - inicio
+
+        self.assertLess(duracao, 1.0)
+        self.assertEqual([r["texto"] for r in resultados], list(MOMENTOS_MISSA.keys()))
+
+    def test_limite_de_concorrencia(self):
+        """Testa se nunca há mais composições simultâneas que o limite"""
+        ativos = [0]
+        maximo = [0]
+        lock = threading.Lock()
+
+        def composicao(sentimentos, tom, estilo, momento=None):
+            with lock:
+                ativos[0] += 1
+                maximo[0] = max(maximo[0], ativos[0])
+            time.sleep(0.1)
+            with lock:
+                ativos[0] -= 1
+            return "ok"
+
+        lote = ComposicaoLote(composicao, max_concorrencia=2)
+        lote.compor_tudo(lote.criar_itens_missa("C", "tradicional"))
+
+        self.assertEqual(maximo[0], 2)
+
+    def test_erro_e_timeout_por_item(self):
+        """Testa se erros e tempo limite afetam apenas o próprio item"""
+        def composicao(sentimentos, tom, estilo, momento=None):
+            if momento == "Glória":
+                raise RuntimeError("falha no LLM")
+            if momento == "Final":
+                time.sleep(3)
+            return momento
+
+        lote = ComposicaoLote(composicao, max_concorrencia=6, timeout_item=1)
+        resultados = {r["momento"]: r for r in lote.compor_tudo(lote.criar_itens_missa("C", "tradicional"))}
+
+        self.assertFalse(resultados["Glória"]["sucesso"])
+        self.assertIn("falha no LLM", resultados["Glória"]["erro"])
+        self.assertFalse(resultados["Final"]["sucesso"])
+        self.assertIn("Tempo limite", resultados["Final"]["erro"])
+        self.assertTrue(resultados["Entrada"]["sucesso"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -62,35 +62,25 @@ class TestCompositorCatolico(unittest.TestCase):
                     msg=f"Frequência do tom {tom} incorreta"
                 )
     
-    @patch('AgentCompose.AudioSegment')
-    @patch('AgentCompose.Sine')
-    def test_geracao_audio_simples(self, mock_sine, mock_audio_segment):
+    @patch('gerador_audio.exportar_audio')
+    def test_geracao_audio_simples(self, mock_exportar):
         """Testa a geração de áudio simples"""
-        # Mock dos objetos de áudio
-        mock_audio = MagicMock()
-        mock_audio.fade_in.return_value = mock_audio
-        mock_audio.fade_out.return_value = mock_audio
-        mock_sine.return_value.to_audio_segment.return_value = mock_audio
-        
-        mock_audio_final = MagicMock()
-        mock_audio_final.__add__ = MagicMock(return_value=mock_audio_final)
-        mock_audio_segment.empty.return_value = mock_audio_final
-        
-        # Mock do export
-        mock_audio_final.export = MagicMock()
+        mock_exportar.return_value = b"audio"
         
         try:
-            from AgentCompose import gerar_audio_simples
+            from gerador_audio import gerar_audio_simples
             
             # Testa geração com parâmetros válidos
             resultado = gerar_audio_simples("C", "tradicional")
             
-            # Verifica se as funções foram chamadas
-            mock_sine.assert_called()
-            mock_audio_segment.empty.assert_called()
+            # Verifica a progressão sintetizada entregue ao exportador (4 acordes de 2s)
+            self.assertEqual(resultado, b"audio")
+            audio = mock_exportar.call_args[0][0]
+            self.assertEqual(len(audio), 8000)
+            self.assertEqual(audio.frame_rate, 44100)
             
         except ImportError:
-            self.skipTest("Módulo AgentCompose não disponível para teste")
+            self.skipTest("Módulo gerador_audio não disponível para teste")
     
     def test_parametros_invalidos(self):
         """Testa comportamento com parâmetros inválidos"""
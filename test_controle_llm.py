@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Testes do controle de chamadas ao LLM (coalescência, semáforo e espera exponencial)
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controle_llm import ControleChamadasLLM, eh_limite_taxa
+
+class RateLimitError(Exception):
+    """Imita o erro de limite de taxa dos clientes de LLM"""
+
+class TestControleChamadasLLM(unittest.TestCase):
+    """Testes do controle de chamadas"""
+
+    def test_pedidos_identicos_compartilham_chamada(self):
+        """Testa que 20 pedidos simultâneos iguais geram uma só chamada"""
+        controle = ControleChamadasLLM()
+        chamadas = []
+
+        def compor(ao_receber_trecho):
+            chamadas.append(1)
+            time.sleep(0.3)
+            return "composição"
+
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            resultados = list(executor.map(lambda _: controle.executar("mesma", compor), range(20)))
+
+        estatisticas = controle.obter_estatisticas()
+        self.assertEqual(resultados, ["composição"] * 20)
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(estatisticas["executadas"], 1)
+        self.assertEqual(estatisticas["coalescidas"], 19)
+        self.assertAlmostEqual(estatisticas["taxa_coalescencia"], 0.95)
+
+    def test_semaforo_limita_concorrencia(self):
+        """Testa que chaves diferentes respeitam o limite de chamadas simultâneas"""
+        controle = ControleChamadasLLM(max_concorrentes=2)
+        lock = threading.Lock()
+        ativas = [0]
+        pico = [0]
+
+        def compor(ao_receber_trecho):
+            with lock:
+                ativas[0] += 1
+                pico[0] = max(pico[0], ativas[0])
+            time.sleep(0.1)
+            with lock:
+                ativas[0] -= 1
+            return "ok"
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda i: controle.executar(f"chave {i}", compor), range(6)))
+
+        self.assertEqual(pico[0], 2)
+        self.assertEqual(controle.obter_estatisticas()["executadas"], 6)
+
+    def test_espera_exponencial_em_limite_de_taxa(self):
+        """Testa as novas tentativas com espera crescente"""
+        esperas = []
+        controle = ControleChamadasLLM(max_tentativas=4, espera_inicial=1.0, dormir=esperas.append)
+        tentativas = []
+
+        def compor(ao_receber_trecho):
+            tentativas.append(1)
+            if len(tentativas) < 3:
+                raise RateLimitError("429 Too Many Requests")
+            return "ok"
+
+        self.assertEqual(controle.executar("chave", compor), "ok")
+        self.assertEqual(len(tentativas), 3)
+        self.assertEqual(len(esperas), 2)
+        self.assertTrue(0.5 <= esperas[0] <= 1.0)
+        self.assertTrue(1.0 <= esperas[1] <= 2.0)
+        self.assertEqual(controle.obter_estatisticas()["repeticoes_limite_taxa"], 2)
+
+    def test_erro_comum_nao_repete_e_chega_a_todos(self):
+        """Testa que outros erros não são repetidos e são repassados aos pedidos em espera"""
+        controle = ControleChamadasLLM(dormir=lambda s: self.fail("não deveria aguardar"))
+        liberar = threading.Event()
+
+        def compor(ao_receber_trecho):
+            liberar.wait(5)
+            raise ValueError("resposta inválida")
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futuros = [executor.submit(controle.executar, "chave", compor) for _ in range(3)]
+            time.sleep(0.1)
+            liberar.set()
+            for futuro in futuros:
+                with self.assertRaises(ValueError):
+                    futuro.result(timeout=5)
+
+        estatisticas = controle.obter_estatisticas()
+        self.assertEqual(estatisticas["executadas"], 1)
+        self.assertEqual(estatisticas["falhas"], 1)
+
+    def test_trechos_repassados_a_quem_entra_depois(self):
+        """Testa o streaming compartilhado com um pedido coalescido"""
+        controle = ControleChamadasLLM()
+        primeiro_trecho = threading.Event()
+        liberar = threading.Event()
+        recebidos = []
+
+        def compor(ao_receber_trecho):
+            ao_receber_trecho("Título")
+            primeiro_trecho.set()
+            liberar.wait(5)
+            ao_receber_trecho("Título e verso")
+            return "Título e verso"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            lider = executor.submit(controle.executar, "chave", compor, lambda t: None)
+            primeiro_trecho.wait(5)
+            seguidor = executor.submit(controle.executar, "chave", compor, recebidos.append)
+            time.sleep(0.1)
+            liberar.set()
+            self.assertEqual(lider.result(timeout=5), seguidor.result(timeout=5))
+
+        self.assertEqual(recebidos, ["Título", "Título e verso"])
+
+    def test_seguidor_recebe_trechos_sem_callback_do_lider(self):
+        """Testa o streaming para o pedido coalescido quando o primeiro não pediu trechos"""
+        controle = ControleChamadasLLM()
+        entrou = threading.Event()
+        recebidos = []
+
+        def compor(ao_receber_trecho):
+            entrou.wait(5)
+            ao_receber_trecho("Título")
+            return "Título"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            lider = executor.submit(controle.executar, "chave", compor)
+            time.sleep(0.1)
+            seguidor = executor.submit(controle.executar, "chave", compor, recebidos.append)
+            time.sleep(0.1)
+            entrou.set()
+            self.assertEqual(lider.result(timeout=5), seguidor.result(timeout=5))
+
+        self.assertEqual(recebidos, ["Título"])
+
+    def test_cancelamento_do_lider_nao_afeta_seguidor(self):
+        """Testa que o cancelamento no callback do primeiro pedido só chega a ele"""
+        controle = ControleChamadasLLM()
+        seguidor_entrou = threading.Event()
+        recebidos = []
+
+        def compor(ao_receber_trecho):
+            ao_receber_trecho("Título")
+            seguidor_entrou.wait(5)
+            ao_receber_trecho("Título e verso")
+            ao_receber_trecho("Título, verso e refrão")
+            return "Título, verso e refrão"
+
+        def cancelar_no_segundo_trecho(texto_parcial):
+            if texto_parcial != "Título":
+                raise LookupError("cancelada")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            lider = executor.submit(controle.executar, "chave", compor, cancelar_no_segundo_trecho)
+            time.sleep(0.1)
+            seguidor = executor.submit(controle.executar, "chave", compor, recebidos.append)
+            time.sleep(0.1)
+            seguidor_entrou.set()
+
+            with self.assertRaises(LookupError):
+                lider.result(timeout=5)
+            self.assertEqual(seguidor.result(timeout=5), "Título, verso e refrão")
+
+        self.assertEqual(recebidos, ["Título", "Título e verso", "Título, verso e refrão"])
+        self.assertEqual(controle.obter_estatisticas()["falhas"], 0)
+
+    def test_cancelamento_sem_outros_pedidos_interrompe_chamada(self):
+        """Testa que a chamada é interrompida quando o único pedido cancela"""
+        controle = ControleChamadasLLM()
+        trechos = []
+
+        def compor(ao_receber_trecho):
+            for trecho in ("Título", "Título e verso"):
+                trechos.append(trecho)
+                ao_receber_trecho(trecho)
+            return "Título e verso"
+
+        def cancelar(texto_parcial):
+            raise LookupError("cancelada")
+
+        with self.assertRaises(LookupError):
+            controle.executar("chave", compor, cancelar)
+        self.assertEqual(trechos, ["Título"])
+        self.assertEqual(controle.executar("chave", compor), "Título e verso")
+
+    def test_deteccao_de_limite_de_taxa(self):
+        """Testa a identificação de erros de limite de taxa, inclusive encadeados"""
+        self.assertTrue(eh_limite_taxa(RateLimitError("quota")))
+        self.assertTrue(eh_limite_taxa(Exception("Error code: 429")))
+        try:
+            try:
+                raise RateLimitError("quota")
+            except RateLimitError as e:
+                raise RuntimeError("falha no agente") from e
+        except RuntimeError as erro:
+            self.assertTrue(eh_limite_taxa(erro))
+        self.assertFalse(eh_limite_taxa(ValueError("resposta inválida")))
+
+    def test_compositor_agrupa_pedidos_e_usa_cache(self):
+        """Testa o compositor com pedidos iguais simultâneos"""
+        from backends_llm import BackendStub
+        from cache_composicoes import CacheComposicoes
+        from compositor import Compositor
+
+        diretorio = tempfile.mkdtemp()
+        try:
+            backend = BackendStub(latencia_segundos=0.3)
+            compositor = Compositor(backend, CacheComposicoes(diretorio))
+
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                textos = list(executor.map(lambda _: compositor.compor("paz", "G", "mariano"), range(5)))
+
+            self.assertEqual(len(set(textos)), 1)
+            self.assertEqual(compositor.controle.obter_estatisticas()["executadas"], 1)
+            self.assertTrue(compositor.esta_em_cache("paz", "G", "mariano"))
+        finally:
+            shutil.rmtree(diretorio)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Testes do coro virtual derivado de uma única síntese
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backends_tts import BackendStubTTS
+from coro_virtual import IntegranteCoro, derivar_voz, planejar_coro, renderizar_coro, vozes_dos_naipes
+from sistema_vozes import SistemaVozes
+
+TAXA = 24000
+LETRA = "Cantai ao Senhor um canto novo\nAleluia, aleluia\nEle fez maravilhas\nAleluia, aleluia"
+
+def frequencia_dominante(amostras, taxa):
+    espectro = np.abs(np.fft.rfft(amostras * np.hanning(len(amostras))))
+    return np.fft.rfftfreq(len(amostras), 1 / taxa)[np.argmax(espectro)]
+
+class TestCoroVirtual(unittest.TestCase):
+    """Testes do planejamento, da derivação das vozes e do coro no SistemaVozes"""
+
+    def test_naipes_com_a_mesma_duracao(self):
+        """Testa que o naipe três semitons abaixo soa três semitons abaixo, com a mesma duração"""
+        t = np.arange(TAXA, dtype=np.float32) / TAXA
+        voz = np.sin(2 * np.pi * 220 * t).astype(np.float32)
+        agudo = IntegranteCoro(semitons_naipe=0.0, fator_altura=1.0, timbre=0.0, atraso_amostras=0, ganho=1.0)
+        grave = IntegranteCoro(semitons_naipe=-3.0, fator_altura=1.0, timbre=0.0, atraso_amostras=0, ganho=1.0)
+
+        naipes = vozes_dos_naipes(voz, [agudo, grave])
+        voz_grave = derivar_voz(naipes[-3.0], grave)
+        self.assertAlmostEqual(frequencia_dominante(voz_grave, TAXA), 220 * 2 ** (-3 / 12), delta=2)
+        self.assertEqual(len(voz_grave), len(derivar_voz(naipes[0.0], agudo)))
+        self.assertEqual(len(voz_grave), TAXA)
+
+    def test_desafinacao_em_cents(self):
+        """Testa a desafinação do integrante, que muda a duração só na mesma proporção (< 1%)"""
+        t = np.arange(TAXA, dtype=np.float32) / TAXA
+        voz = np.sin(2 * np.pi * 220 * t).astype(np.float32)
+        integrante = IntegranteCoro(semitons_naipe=0.0, fator_altura=2 ** (10 / 1200), timbre=0.0,
+                                    atraso_amostras=0, ganho=1.0)
+
+        desafinada = derivar_voz(voz, integrante)
+        self.assertAlmostEqual(frequencia_dominante(desafinada, TAXA), 220 * 2 ** (10 / 1200), delta=0.5)
+        self.assertAlmostEqual(len(desafinada), TAXA / 2 ** (10 / 1200), delta=2)
+
+    def test_naipes_em_rodizio_com_variacoes(self):
+        """Testa a distribuição pelos naipes, a entrada escalonada e a desafinação limitada"""
+        integrantes = planejar_coro([0, -3], 16, TAXA, atraso_naipe_segundos=0.5, semente=1)
+
+        self.assertEqual(len(integrantes), 16)
+        for indice, integrante in enumerate(integrantes):
+            self.assertEqual(integrante.semitons_naipe, [0, -3][indice % 2])
+            self.assertLess(abs(1200 * np.log2(integrante.fator_altura)), 12.01)
+            self.assertGreaterEqual(integrante.atraso_amostras, (indice % 2) * 0.5 * TAXA)
+            self.assertLess(integrante.atraso_amostras, ((indice % 2) * 0.5 + 0.04) * TAXA)
+        self.assertGreater(len({integrante.fator_altura for integrante in integrantes}), 8)
+
+    def test_coro_termina_junto(self):
+        """Testa que o coro misto de uma linha de 20 s não se estende além da desafinação e das entradas"""
+        t = np.arange(20 * TAXA, dtype=np.float32) / TAXA
+        voz = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        coro = renderizar_coro(voz, planejar_coro([0, -3], 8, TAXA, semente=5))
+        self.assertLess(len(coro) / TAXA, 20 * 2 ** (12 / 1200) + 0.04)
+
+    def test_semente_torna_o_coro_deterministico(self):
+        """Testa que a mesma semente gera o mesmo coro e outra semente, outro"""
+        voz = np.random.default_rng(0).uniform(-0.5, 0.5, TAXA).astype(np.float32)
+        coro = renderizar_coro(voz, planejar_coro([0, -3], 8, TAXA, semente=42))
+
+        np.testing.assert_array_equal(coro, renderizar_coro(voz, planejar_coro([0, -3], 8, TAXA, semente=42)))
+        outro = renderizar_coro(voz, planejar_coro([0, -3], 8, TAXA, semente=43))
+        self.assertFalse(np.array_equal(coro[:TAXA // 2], outro[:TAXA // 2]))
+        self.assertAlmostEqual(float(np.abs(coro).max()), 10 ** (-0.1 / 20), places=4)
+
+    def test_coro_grande_sintetiza_o_texto_uma_vez(self):
+        """Testa que 16 vozes fazem uma única síntese de cada linha"""
+        backend = BackendStubTTS()
+        vozes = SistemaVozes(backend_tts=backend)
+
+        coro = vozes.gerar_buffer_coro(LETRA, "coro_misto", num_vozes=16, semente=3)
+        self.assertIsNotNone(coro)
+        self.assertEqual(backend.frases_sintetizadas, 3)
+        self.assertGreater(coro.duracao_segundos, 0.5 + sum(len(l) for l in LETRA.splitlines()) * 0.06)
+
+        de_novo = vozes.gerar_buffer_coro(LETRA, "coro_misto", num_vozes=16, semente=3)
+        np.testing.assert_array_equal(coro.amostras, de_novo.amostras)
+
+if __name__ == "__main__":
+    unittest.main()
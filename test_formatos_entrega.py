@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Testes dos formatos de entrega (prévia e downloads)
+"""
+
+import json
+import os
+import pickle
+import sys
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import codec_audio
+from buffer_audio import BufferAudio
+from codec_audio import suporta_soundfile
+from formatos_entrega import AudioEntrega, PreviaProgressiva, FORMATOS_ENTREGA, PERFIL_PREVIA, normalizar_bitrate
+
+def buffer_estereo(segundos=2.0, taxa=44100):
+    t = np.arange(int(segundos * taxa), dtype=np.float32) / taxa
+    canal = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    return BufferAudio(np.stack([canal, canal], axis=1), taxa)
+
+class TestFormatosEntrega(unittest.TestCase):
+    """Testes da prévia leve e dos arquivos codificados sob demanda"""
+
+    @unittest.skipUnless(suporta_soundfile("mp3"), "libsndfile sem suporte a MP3")
+    def test_previa_leve(self):
+        """Testa que a prévia é mono, reamostrada e bem menor que o download"""
+        entrega = AudioEntrega(buffer_estereo(), "teste")
+        dados, mime = entrega.previa()
+
+        self.assertEqual(mime, FORMATOS_ENTREGA[PERFIL_PREVIA["formato"]]["mime"])
+        previa = BufferAudio.de_bytes(dados)
+        self.assertEqual(previa.canais, 1)
+        self.assertEqual(previa.taxa_amostragem, PERFIL_PREVIA["taxa_amostragem"])
+        self.assertLess(len(dados) * 3, len(entrega.arquivo("mp3")))
+
+    def test_downloads_codificados_sob_demanda(self):
+        """Testa que cada formato é codificado só quando pedido, e uma única vez"""
+        entrega = AudioEntrega(buffer_estereo(0.5), "teste")
+        with patch.object(codec_audio, "codificar_amostras", wraps=codec_audio.codificar_amostras) as codificar:
+            self.assertEqual(codificar.call_count, 0)
+            wav = entrega.arquivo("wav")
+            self.assertIs(entrega.arquivo("wav"), wav)
+            entrega.arquivo("flac")
+            self.assertEqual(codificar.call_count, 2)
+
+        self.assertEqual(wav[:4], b"RIFF")
+        self.assertEqual(entrega.nome_arquivo("flac"), "teste.flac")
+        self.assertEqual(entrega.mime("wav"), "audio/wav")
+
+    def test_normalizar_bitrate(self):
+        """Testa o bitrate padrão e a ausência de bitrate nos formatos sem perdas"""
+        self.assertEqual(normalizar_bitrate("mp3"), FORMATOS_ENTREGA["mp3"]["bitrate_padrao"])
+        self.assertEqual(normalizar_bitrate("mp3", 320), 320)
+        self.assertIsNone(normalizar_bitrate("flac", 320))
+
+    def test_resultado_serializavel(self):
+        """Testa que a entrega sobrevive ao pickle do gerenciador de tarefas com o que já foi codificado"""
+        entrega = AudioEntrega(buffer_estereo(0.5), "teste")
+        wav = entrega.arquivo("wav")
+
+        restaurada = pickle.loads(pickle.dumps(entrega))
+        with patch.object(codec_audio, "codificar_amostras", side_effect=AssertionError("recodificou")):
+            self.assertEqual(restaurada.arquivo("wav"), wav)
+        self.assertEqual(restaurada.nome_arquivo("wav"), "teste.wav")
+
+    @unittest.skipUnless(suporta_soundfile("mp3"), "libsndfile sem suporte a MP3")
+    def test_previa_progressiva(self):
+        """Testa os segmentos acumulados e o resumo gravado no estado da tarefa"""
+        previa = PreviaProgressiva()
+        self.assertFalse(previa)
+
+        previa.adicionar(buffer_estereo(1.0))
+        previa.adicionar(buffer_estereo(0.5))
+
+        segmentos = previa.obter_segmentos()
+        self.assertEqual([segmento["inicio_segundos"] for segmento in segmentos], [0.0, 1.0])
+        self.assertAlmostEqual(previa.duracao_segundos, 1.5)
+        self.assertEqual(BufferAudio.de_bytes(segmentos[1]["dados"]).canais, 1)
+        self.assertEqual(json.loads(json.dumps({"parcial": previa}, default=str))["parcial"], str(previa))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Testes das partituras com o BPM da composição
+"""
+
+import os
+import sys
+import unittest
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from composicao_estruturada import ComposicaoEstruturada, SecaoMusica
+from gerador_partituras import GeradorPartituras
+from music21 import tempo
+
+def bpm_da_partitura(partitura):
+    return partitura.recurse().getElementsByClass(tempo.MetronomeMark).first().number
+
+class TestGeradorPartituras(unittest.TestCase):
+    """Testes da partitura básica e da partitura SATB"""
+
+    def setUp(self):
+        self.gerador = GeradorPartituras()
+
+    def test_partitura_satb(self):
+        """Testa as quatro vozes do SATB e o andamento padrão e informado"""
+        partitura = self.gerador.criar_partitura_coral_satb("G", "mariano", "Salve Rainha")
+
+        self.assertEqual([parte.partName for parte in partitura.parts], ["Soprano", "Alto", "Tenor", "Baixo"])
+        self.assertEqual(partitura.metadata.title, "Salve Rainha (SATB)")
+        self.assertEqual(bpm_da_partitura(partitura), 80)
+        self.assertEqual(bpm_da_partitura(self.gerador.criar_partitura_coral_satb("G", "mariano", bpm=66)), 66)
+
+    def test_satb_com_bpm_da_composicao(self):
+        """Testa que a partitura SATB da composição usa o BPM dela"""
+        composicao = ComposicaoEstruturada(
+            titulo="Cantai ao Senhor", secoes=[SecaoMusica("refrao", ["Cantai ao Senhor"])],
+            bpm=72, tom="D", estilo="litúrgico"
+        )
+        partitura = self.gerador.criar_partitura_satb_da_composicao(composicao)
+
+        self.assertEqual(bpm_da_partitura(partitura), 72)
+        self.assertEqual(partitura.metadata.title, "Cantai ao Senhor (SATB)")
+
+    def test_partitura_basica_com_bpm(self):
+        """Testa o andamento da partitura básica"""
+        partitura = self.gerador.criar_partitura_basica("C", "tradicional", bpm=96)
+        self.assertEqual(bpm_da_partitura(partitura), 96)
+
+if __name__ == "__main__":
+    unittest.main()
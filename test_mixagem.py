@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Testes da mixagem de N vozes em um único array
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from buffer_audio import BufferAudio
+from mixagem import ganho_linear, mixar_amostras, mixar_buffers
+from mixer_audio import MixerAudio
+
+TAXA = 24000
+
+class TestMixagem(unittest.TestCase):
+    """Testes das posições, ganhos, canais e normalização da mixagem"""
+
+    def test_posicoes_e_ganhos(self):
+        """Testa cada voz somada no seu trecho, com o seu ganho"""
+        vozes = [np.ones(4, np.float32), np.full(3, 2.0, np.float32), np.ones(2, np.float32)]
+        mixagem = mixar_amostras(vozes, inicios=[0, 2, 6], ganhos=[1.0, 0.5, -1.0])
+        np.testing.assert_allclose(mixagem, [1, 1, 2, 2, 1, 0, -1, -1])
+
+    def test_comprimento_e_vozes_sob_demanda(self):
+        """Testa o corte no comprimento pedido e as vozes geradas uma a uma"""
+        vozes = (np.ones(5, np.float32) * indice for indice in range(1, 4))
+        mixagem = mixar_amostras(vozes, inicios=[0, 3, 9], comprimento=6)
+        np.testing.assert_allclose(mixagem, [1, 1, 1, 3, 3, 2])
+
+    def test_mono_em_mixagem_estereo(self):
+        """Testa a voz mono entrando nos dois canais"""
+        estereo = np.stack([np.ones(3, np.float32), -np.ones(3, np.float32)], axis=1)
+        mixagem = mixar_amostras([estereo, np.full(3, 0.5, np.float32)])
+        self.assertEqual(mixagem.shape, (3, 2))
+        np.testing.assert_allclose(mixagem[:, 0], 1.5)
+        np.testing.assert_allclose(mixagem[:, 1], -0.5)
+
+    def test_normalizacao_unica(self):
+        """Testa o pico da mixagem normalizada e o silêncio intacto"""
+        vozes = [np.full(10, 0.8, np.float32)] * 16
+        self.assertAlmostEqual(float(np.abs(mixar_amostras(vozes, pico=0.5)).max()), 0.5, places=6)
+        np.testing.assert_array_equal(mixar_amostras([np.zeros(4, np.float32)], pico=0.5), 0)
+
+    def test_buffers_em_segundos_e_db(self):
+        """Testa a mixagem de buffers em taxas diferentes, com início em segundos e ganho em dB"""
+        voz = BufferAudio(np.full(TAXA, 0.5, np.float32), TAXA)
+        base = BufferAudio(np.full(2 * 48000, 0.1, np.float32), 48000)
+        mixagem = mixar_buffers([base, voz], inicios_segundos=[0, 0.5], ganhos_db=[0, -6])
+
+        self.assertEqual(mixagem.taxa_amostragem, 48000)
+        self.assertAlmostEqual(mixagem.duracao_segundos, 2.0, places=3)
+        self.assertAlmostEqual(float(mixagem.amostras[48000]), 0.1 + 0.5 * ganho_linear(-6), places=3)
+        self.assertAlmostEqual(float(mixagem.amostras[1000]), 0.1, places=5)
+
+    def test_reverb_do_mixer(self):
+        """Testa o reverb do MixerAudio: original mais a cópia atrasada e atenuada"""
+        voz = BufferAudio(np.full(TAXA, 0.25, np.float32), TAXA).para_audio_segment()
+        com_reverb = BufferAudio.de_audio_segment(MixerAudio()._aplicar_reverb_personalizado(voz, 0.2))
+
+        # delay de 90 ms, 17 dB abaixo
+        self.assertAlmostEqual(com_reverb.duracao_segundos, 1.09, places=3)
+        self.assertAlmostEqual(float(com_reverb.amostras[TAXA // 2]), 0.25 * (1 + ganho_linear(-17)), places=3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Testes da renderização progressiva (voz + instrumental em blocos)
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gerador_audio
+from buffer_audio import BufferAudio
+from composicao_estruturada import ComposicaoEstruturada, SecaoMusica
+from renderizacao_progressiva import RenderizadorProgressivo, trechos_para_voz
+from sintetizador_acordes import BaseInstrumental
+from tarefas_segundo_plano import TarefaCancelada
+
+TAXA = 8000
+
+def senoide(frequencia, segundos, taxa=TAXA, amplitude=0.3):
+    t = np.arange(int(segundos * taxa), dtype=np.float32) / taxa
+    return BufferAudio(amplitude * np.sin(2 * np.pi * frequencia * t), taxa)
+
+def voz_por_caracteres(texto, cache_voz=None):
+    """Voz simulada: 0,1 s por caractere, na mesma taxa do instrumental"""
+    return senoide(220, len(texto) / 10)
+
+class TestRenderizacaoProgressiva(unittest.TestCase):
+    """Testes dos blocos, da montagem final e da entrega antecipada"""
+
+    def setUp(self):
+        self.instrumental = BaseInstrumental(392.0, ("I", "IV", "V", "I"), duracao_acorde=0.4, taxa_amostragem=TAXA)
+
+    def test_blocos_de_tamanho_fixo(self):
+        """Testa que só o último bloco de um trecho contínuo é menor que o tamanho fixo"""
+        renderizador = RenderizadorProgressivo(self.instrumental, voz_por_caracteres, segundos_bloco=1.0)
+        blocos = list(renderizador.blocos(["x" * 45]))
+
+        self.assertEqual([len(bloco.amostras) for bloco in blocos], [TAXA] * 4 + [TAXA // 2])
+        self.assertEqual(renderizador.estatisticas["blocos"], 5)
+
+    def test_montagem_igual_a_renderizacao_inteira(self):
+        """Testa que os blocos concatenados equivalem a mixar a música de uma vez"""
+        trechos = ["a" * 23, "b" * 31, "c" * 17]
+        em_blocos = RenderizadorProgressivo(self.instrumental, voz_por_caracteres, segundos_bloco=0.7)
+        inteira = RenderizadorProgressivo(self.instrumental, voz_por_caracteres, segundos_bloco=60.0)
+
+        recebidos = []
+        audio = em_blocos.renderizar(trechos, ao_receber_bloco=lambda indice, bloco: recebidos.append(indice))
+        referencia = inteira.renderizar(trechos)
+
+        self.assertEqual(recebidos, list(range(len(recebidos))))
+        self.assertGreater(len(recebidos), 3)
+        self.assertAlmostEqual(audio.duracao_segundos, 7.1, places=3)
+        np.testing.assert_allclose(audio.amostras, referencia.amostras, atol=1e-6)
+
+    def test_fades_e_ganhos(self):
+        """Testa o fade no início e no fim e o ganho da voz sobre o instrumental"""
+        renderizador = RenderizadorProgressivo(self.instrumental, voz_por_caracteres, segundos_bloco=0.5)
+        audio = renderizador.renderizar(["x" * 30])
+
+        self.assertEqual(audio.amostras[0], 0.0)
+        self.assertLess(abs(audio.amostras[-1]), 0.01)
+        meio = audio.amostras[TAXA: 2 * TAXA]
+        self.assertGreater(np.max(np.abs(meio)), 0.3 * 10 ** (5 / 20))
+
+    def test_primeiro_trecho_nao_espera_o_seguinte(self):
+        """Testa que o primeiro bloco é entregue enquanto o próximo trecho ainda é sintetizado"""
+        primeiro_entregue = threading.Event()
+
+        def sintetizar(texto):
+            if texto == "segundo":
+                self.assertTrue(primeiro_entregue.wait(timeout=5), "o primeiro bloco esperou o segundo trecho")
+            return voz_por_caracteres(texto)
+
+        renderizador = RenderizadorProgressivo(self.instrumental, sintetizar, segundos_bloco=10.0)
+        audio = renderizador.renderizar(
+            ["primeiro", "segundo"], ao_receber_bloco=lambda indice, bloco: primeiro_entregue.set()
+        )
+
+        self.assertEqual(renderizador.estatisticas["blocos"], 2)
+        self.assertAlmostEqual(audio.duracao_segundos, 1.5, places=3)
+
+    def test_velocidade_e_taxa_da_voz(self):
+        """Testa a voz em outra taxa de amostragem e com velocidade alterada"""
+        def voz_24k(texto):
+            return senoide(220, 2.0, taxa=24000)
+
+        renderizador = RenderizadorProgressivo(self.instrumental, voz_24k, velocidade=2.0)
+        audio = renderizador.renderizar(["qualquer"])
+
+        self.assertEqual(audio.taxa_amostragem, TAXA)
+        self.assertAlmostEqual(audio.duracao_segundos, 1.0, places=2)
+
+    def test_trechos_para_voz(self):
+        """Testa a divisão da letra por seção, por estrofe e por linha"""
+        composicao = ComposicaoEstruturada("Hino", [
+            SecaoMusica("verso", ["Senhor, tende piedade", "de nós"]),
+            SecaoMusica("refrao", ["Aleluia"])
+        ])
+        self.assertEqual(trechos_para_voz(composicao), ["Senhor, tende piedade de nós", "Aleluia"])
+        self.assertEqual(trechos_para_voz("linha 1\nlinha 2\n\n\nlinha 3\n"), ["linha 1 linha 2", "linha 3"])
+        self.assertEqual(trechos_para_voz("linha 1\n  \nlinha 2"), ["linha 1", "linha 2"])
+        self.assertEqual(trechos_para_voz("uma\nduas"), ["uma", "duas"])
+
+    def test_gerar_buffer_com_voz_progressivo(self):
+        """Testa o modo progressivo do gerador e a propagação do cancelamento"""
+        blocos = []
+        with patch.object(gerador_audio, "sintetizar_buffer_voz", side_effect=voz_por_caracteres):
+            audio = gerador_audio.gerar_buffer_com_voz(
+                "primeira estrofe\n\nsegunda estrofe", "G", "tradicional",
+                ao_receber_bloco=lambda indice, bloco: blocos.append(bloco)
+            )
+
+            self.assertGreaterEqual(len(blocos), 1)
+            self.assertEqual(len(audio.amostras), sum(len(bloco.amostras) for bloco in blocos))
+
+            def cancelar(indice, bloco):
+                raise TarefaCancelada("teste")
+
+            with self.assertRaises(TarefaCancelada):
+                gerador_audio.gerar_buffer_com_voz("estrofe", "G", "tradicional", ao_receber_bloco=cancelar)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Testes do salmo responsorial (estrofes do solista e resposta da assembleia)
+"""
+
+import os
+import sys
+import time
+import unittest
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backends_tts import BackendStubTTS
+from sistema_vozes import SistemaVozes
+
+ESTROFES = [
+    "O Senhor é o pastor que me conduz",
+    "Pelos prados e campinas verdejantes",
+    "Preparais à minha frente uma mesa",
+    "Felicidade e todo bem hão de seguir-me"
+]
+RESPOSTA = "O Senhor é o pastor que me conduz, não me falta coisa alguma"
+
+class TestResponsorial(unittest.TestCase):
+    """Testes da montagem, da resposta reutilizada e da renderização simultânea"""
+
+    def setUp(self):
+        self.backend = BackendStubTTS(latencia_segundos=0.3)
+        self.vozes = SistemaVozes(backend_tts=self.backend)
+
+    def test_resposta_apos_cada_estrofe(self):
+        """Testa a duração do salmo e a resposta sintetizada uma única vez"""
+        salmo = self.vozes.gerar_buffer_responsorial(
+            "\n\n".join(ESTROFES), RESPOSTA, resposta_inicial=True, semente=7
+        )
+        self.assertIsNotNone(salmo)
+        self.assertEqual(self.backend.frases_sintetizadas, len(ESTROFES) + 1)
+
+        resposta = self.vozes.gerar_buffer_coro(RESPOSTA, semente=7)
+        solos = [self.vozes.gerar_buffer_voz(estrofe, "solene") for estrofe in ESTROFES]
+        # Resposta inicial, cada estrofe com a sua resposta e 1 s de pausa entre as partes
+        esperado = (sum(solo.duracao_segundos for solo in solos) + (len(ESTROFES) + 1) * resposta.duracao_segundos
+                    + 2 * len(ESTROFES))
+        self.assertAlmostEqual(salmo.duracao_segundos, esperado, delta=0.01)
+
+    def test_partes_renderizadas_ao_mesmo_tempo(self):
+        """Testa que estrofes e resposta não esperam umas pelas outras"""
+        inicio = time.perf_counter()
+        self.vozes.gerar_buffer_coro(RESPOSTA)
+        for estrofe in ESTROFES:
+            self.vozes.gerar_buffer_voz(estrofe, "solene")
+        em_sequencia = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        salmo = self.vozes.gerar_buffer_responsorial(ESTROFES, RESPOSTA)
+        simultaneo = time.perf_counter() - inicio
+
+        self.assertIsNotNone(salmo)
+        # Em sequência são ao menos 5 x 0,3 s de TTS; juntas, pouco mais que uma
+        self.assertLess(simultaneo, em_sequencia / 2)
+
+    def test_responsorial_simples_em_mp3(self):
+        """Testa o responsorial de uma estrofe, codificado"""
+        audio = self.vozes.gerar_audio_responsorial(ESTROFES[0], RESPOSTA)
+        self.assertIsInstance(audio, bytes)
+        self.assertGreater(len(audio), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Testes do sintetizador de acordes vetorizado
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from buffer_audio import BufferAudio
+from sintetizador_acordes import (
+    frequencias_acorde, envelope_acorde, sintetizar_progressao, progressao_do_estilo, para_audio_segment,
+    planejar_acordes, BaseInstrumental, instrumental_com_duracao
+)
+
+def picos_espectrais(sinal, taxa_amostragem, quantidade):
+    """Frequências (Hz) dos maiores picos do espectro"""
+    espectro = np.abs(np.fft.rfft(sinal * np.hanning(len(sinal))))
+    frequencias = np.fft.rfftfreq(len(sinal), 1 / taxa_amostragem)
+    # Máximos locais apenas, para não contar a mesma raia duas vezes
+    locais = np.where((espectro[1:-1] > espectro[:-2]) & (espectro[1:-1] >= espectro[2:]))[0] + 1
+    maiores = locais[np.argsort(espectro[locais])[::-1][:quantidade]]
+    return sorted(frequencias[maiores])
+
+class TestSintetizadorAcordes(unittest.TestCase):
+    """Testes da síntese das progressões"""
+
+    def test_triades_em_temperamento_igual(self):
+        """Testa baixo, fundamental, terça e quinta dos acordes maior e menor"""
+        baixo, fundamental, terca, quinta = frequencias_acorde(261.63, "I")
+        self.assertAlmostEqual(baixo, 130.815, places=2)
+        self.assertAlmostEqual(terca, 329.63, places=1)
+        self.assertAlmostEqual(quinta, 392.00, places=1)
+
+        # vi de Dó maior = Lá menor: Lá, Dó, Mi
+        _, fundamental, terca, quinta = frequencias_acorde(261.63, "vi")
+        self.assertAlmostEqual(fundamental, 440.00, places=1)
+        self.assertAlmostEqual(terca, 523.26, places=1)
+        self.assertAlmostEqual(quinta, 659.26, places=1)
+
+    def test_buffer_float32_com_duracao_configuravel(self):
+        """Testa tipo, duração, taxa de amostragem e volume do buffer"""
+        graus = progressao_do_estilo("tradicional")
+        sinal = sintetizar_progressao(261.63, graus, duracao_acorde=1.5, taxa_amostragem=22050, volume=0.5)
+
+        self.assertEqual(sinal.dtype, np.float32)
+        self.assertEqual(len(sinal), int(1.5 * 22050) * len(graus))
+        self.assertAlmostEqual(float(np.max(np.abs(sinal))), 0.5, places=4)
+
+    def test_espectro_contem_as_notas_do_acorde(self):
+        """Testa que o acorde renderizado soa nas frequências da tríade"""
+        taxa = 16000
+        sinal = sintetizar_progressao(261.63, ["I"], duracao_acorde=2.0, taxa_amostragem=taxa)
+        picos = picos_espectrais(sinal, taxa, 4)
+
+        for esperado, obtido in zip(frequencias_acorde(261.63, "I"), picos):
+            self.assertAlmostEqual(obtido, esperado, delta=2.0)
+
+    def test_envelope_sem_estalos_nas_bordas(self):
+        """Testa que cada acorde começa e termina em silêncio"""
+        envelope = envelope_acorde(44100, 44100)
+        self.assertEqual(envelope[0], 0.0)
+        self.assertLess(envelope[-1], 1e-3)
+        self.assertAlmostEqual(float(envelope.max()), 1.0, places=2)
+
+        sinal = sintetizar_progressao(261.63, ["I", "V"], duracao_acorde=1.0, taxa_amostragem=8000)
+        self.assertLess(abs(float(sinal[7999])), 1e-2)
+        self.assertLess(abs(float(sinal[8000])), 1e-2)
+
+    def test_estilo_desconhecido_e_conversao(self):
+        """Testa a progressão padrão e a conversão para AudioSegment"""
+        self.assertEqual(progressao_do_estilo("inexistente"), progressao_do_estilo("contemporâneo"))
+
+        audio = para_audio_segment(sintetizar_progressao(440.0, ["I"], 0.5, 8000), 8000)
+        self.assertEqual(len(audio), 500)
+        self.assertEqual(audio.sample_width, 2)
+        self.assertEqual(sintetizar_progressao(440.0, []).size, 0)
+
+class TestDuracaoExata(unittest.TestCase):
+    """Testes da base renderizada sob medida, com cadência no fim"""
+
+    def test_plano_cobre_a_duracao_e_termina_em_cadencia(self):
+        """Testa acordes contíguos, cadência perfeita no fim e meia cadência nas seções"""
+        graus = ["I", "V", "vi", "IV"]
+        plano = planejar_acordes(graus, 10300, 1000, limites_secoes=[4100])
+
+        self.assertEqual(plano[0][1], 0)
+        for (_, inicio, amostras), (_, seguinte, _) in zip(plano, plano[1:]):
+            self.assertEqual(inicio + amostras, seguinte)
+        self.assertEqual(plano[-1][1] + plano[-1][2], 10300)
+
+        secao_1 = [acorde for acorde in plano if acorde[1] < 4100]
+        secao_2 = [acorde for acorde in plano if acorde[1] >= 4100]
+        self.assertEqual(secao_1[-1][1] + secao_1[-1][2], 4100)
+        self.assertEqual([grau for grau, _, _ in secao_1], ["I", "V", "vi", "V"])
+        self.assertEqual([grau for grau, _, _ in secao_2][:2], ["I", "V"])
+        self.assertEqual([grau for grau, _, _ in secao_2][-2:], ["V", "I"])
+        self.assertEqual(planejar_acordes(graus, 300, 1000), [("I", 0, 300)])
+
+    def test_base_com_numero_exato_de_amostras(self):
+        """Testa durações que não são múltiplas do acorde e o final que se extingue"""
+        base = BaseInstrumental(261.63, ("I", "V", "vi", "IV"), duracao_acorde=0.5, taxa_amostragem=8000)
+        for total in (1, 3999, 12345, 40001):
+            sinal = base.renderizar(total)
+            self.assertEqual(len(sinal), total)
+            self.assertEqual(sinal.dtype, np.float32)
+
+        sinal = base.renderizar(40001)
+        self.assertAlmostEqual(float(np.max(np.abs(sinal))), 0.5, places=4)
+        cauda = np.abs(sinal[-400:]).max()
+        self.assertLess(cauda, 0.01)
+
+        buffer = base.para_duracao(2.5, limites_secoes=[1.2])
+        self.assertEqual(len(buffer.amostras), 20000)
+        self.assertEqual(buffer.taxa_amostragem, 8000)
+
+    def test_instrumental_com_duracao_repete_audio_renderizado(self):
+        """Testa a repetição cíclica de áudio pronto e a síntese sob medida da base"""
+        buffer = BufferAudio(np.arange(5, dtype=np.float32) / 10, 1000)
+        resultado = instrumental_com_duracao(buffer, 0.012)
+        np.testing.assert_allclose(resultado.amostras, np.tile(buffer.amostras, 3)[:12])
+
+        base = BaseInstrumental(440.0, ("I",), duracao_acorde=0.5, taxa_amostragem=8000)
+        self.assertEqual(len(instrumental_com_duracao(base, 1.25).amostras), 10000)
+
+if __name__ == "__main__":
+    unittest.main()
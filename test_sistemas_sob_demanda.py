@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Testes do registro de sistemas sob demanda
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sistemas_sob_demanda import SistemasSobDemanda, classe_sob_demanda
+
+class TestSistemasSobDemanda(unittest.TestCase):
+    """Testes da criação preguiçosa dos subsistemas"""
+
+    def test_criado_apenas_no_primeiro_acesso(self):
+        """Testa que a fábrica só é chamada quando o sistema é usado"""
+        chamadas = []
+        sistemas = SistemasSobDemanda({"lista": lambda: chamadas.append(1) or ["sistema"]})
+
+        self.assertIn("lista", sistemas)
+        self.assertFalse(sistemas.carregado("lista"))
+        self.assertEqual(chamadas, [])
+
+        primeiro = sistemas["lista"]
+        self.assertIs(sistemas["lista"], primeiro)
+        self.assertTrue(sistemas.carregado("lista"))
+        self.assertEqual(len(chamadas), 1)
+        self.assertIn("lista", sistemas.obter_tempos_carregamento())
+
+    def test_criacao_unica_com_acessos_simultaneos(self):
+        """Testa que acessos concorrentes compartilham a mesma instância"""
+        chamadas = []
+
+        def fabrica_lenta():
+            chamadas.append(1)
+            time.sleep(0.1)
+            return object()
+
+        sistemas = SistemasSobDemanda({"lento": fabrica_lenta})
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            instancias = list(executor.map(lambda _: sistemas["lento"], range(8)))
+
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(len({id(instancia) for instancia in instancias}), 1)
+
+    def test_sistema_desconhecido(self):
+        """Testa o erro para nomes não registrados"""
+        with self.assertRaises(KeyError):
+            SistemasSobDemanda()["inexistente"]
+
+    def test_fabrica_pode_usar_outros_sistemas(self):
+        """Testa dependência entre sistemas, como o compositor que usa o cache"""
+        sistemas = SistemasSobDemanda({"cache": dict})
+        sistemas.registrar("compositor", lambda: ("compositor", sistemas["cache"]))
+
+        self.assertIs(sistemas["compositor"][1], sistemas["cache"])
+
+    def test_classe_sob_demanda_importa_no_uso(self):
+        """Testa a fábrica que importa o módulo só ao ser chamada"""
+        fabrica = classe_sob_demanda("threading", "Event")
+        self.assertIsInstance(fabrica(), threading.Event)
+
+if __name__ == "__main__":
+    unittest.main()
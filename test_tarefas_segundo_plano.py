@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Testes do gerenciador de tarefas em segundo plano
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tarefas_segundo_plano import (
+    GerenciadorTarefas, CONCLUIDA, FALHOU, CANCELADA, INTERROMPIDA, EXECUTANDO
+)
+
+def somar(progresso, a, b):
+    """Tarefa simples que informa progresso e retorna bytes"""
+    progresso(0.5, "Somando...", parcial="parcial")
+    return {"soma": a + b, "audio": b"\x00\x01"}
+
+def falhar(progresso):
+    """Tarefa que sempre falha"""
+    raise RuntimeError("falha proposital")
+
+class TestTarefasSegundoPlano(unittest.TestCase):
+    """Testes do ciclo de vida das tarefas"""
+
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp()
+        self.gerenciador = GerenciadorTarefas(self.diretorio, max_workers=2, intervalo_gravacao=0.0)
+
+    def tearDown(self):
+        self.gerenciador.encerrar(aguardar=True)
+        shutil.rmtree(self.diretorio)
+
+    def test_tarefa_concluida_com_resultado(self):
+        """Testa execução, progresso e resultado"""
+        id_tarefa = self.gerenciador.submeter("soma", somar, 2, 3, descricao="Soma")
+        tarefa = self.gerenciador.aguardar(id_tarefa, timeout=5)
+
+        self.assertEqual(tarefa["estado"], CONCLUIDA)
+        self.assertEqual(tarefa["progresso"], 1.0)
+        self.assertEqual(tarefa["mensagem"], "Somando...")
+        self.assertEqual(tarefa["parcial"], "parcial")
+        self.assertEqual(self.gerenciador.resultado(id_tarefa), {"soma": 5, "audio": b"\x00\x01"})
+
+    def test_tarefa_com_falha(self):
+        """Testa que a exceção da tarefa é registrada como falha"""
+        id_tarefa = self.gerenciador.submeter("falha", falhar)
+        tarefa = self.gerenciador.aguardar(id_tarefa, timeout=5)
+
+        self.assertEqual(tarefa["estado"], FALHOU)
+        self.assertEqual(tarefa["erro"], "falha proposital")
+        self.assertIsNone(self.gerenciador.resultado(id_tarefa))
+
+    def test_cancelamento_durante_execucao(self):
+        """Testa o cancelamento cooperativo no próximo progresso"""
+        iniciada = threading.Event()
+        liberar = threading.Event()
+
+        def longa(progresso):
+            iniciada.set()
+            liberar.wait(5)
+            progresso(0.5, "continuando")
+            return "não deveria concluir"
+
+        id_tarefa = self.gerenciador.submeter("longa", longa)
+        iniciada.wait(5)
+        self.assertEqual(self.gerenciador.obter(id_tarefa)["estado"], EXECUTANDO)
+
+        self.assertTrue(self.gerenciador.cancelar(id_tarefa))
+        liberar.set()
+        tarefa = self.gerenciador.aguardar(id_tarefa, timeout=5)
+
+        self.assertEqual(tarefa["estado"], CANCELADA)
+        self.assertFalse(self.gerenciador.cancelar(id_tarefa))
+
+    def test_chave_reaproveita_tarefa_ativa(self):
+        """Testa que a mesma chave não submete outra tarefa enquanto a primeira executa"""
+        liberar = threading.Event()
+
+        def esperar(progresso):
+            liberar.wait(5)
+            return "ok"
+
+        primeira = self.gerenciador.submeter("espera", esperar, chave="mesma")
+        segunda = self.gerenciador.submeter("espera", esperar, chave="mesma")
+        self.assertEqual(primeira, segunda)
+
+        liberar.set()
+        self.gerenciador.aguardar(primeira, timeout=5)
+        terceira = self.gerenciador.submeter("espera", esperar, chave="mesma")
+        self.assertNotEqual(primeira, terceira)
+        self.gerenciador.aguardar(terceira, timeout=5)
+
+    def test_persistencia_entre_instancias(self):
+        """Testa que estado e resultado sobrevivem a um novo gerenciador"""
+        id_tarefa = self.gerenciador.submeter("soma", somar, 1, 1)
+        self.gerenciador.aguardar(id_tarefa, timeout=5)
+
+        novo = GerenciadorTarefas(self.diretorio)
+        try:
+            self.assertEqual(novo.obter(id_tarefa)["estado"], CONCLUIDA)
+            self.assertEqual(novo.resultado(id_tarefa)["soma"], 2)
+            self.assertEqual(novo.listar()[0]["id"], id_tarefa)
+        finally:
+            novo.encerrar()
+
+    def test_tarefa_em_andamento_interrompida_ao_reiniciar(self):
+        """Testa que tarefas ativas de um processo anterior viram interrompidas"""
+        liberar = threading.Event()
+        id_tarefa = self.gerenciador.submeter("espera", lambda progresso: liberar.wait(5))
+
+        novo = GerenciadorTarefas(self.diretorio)
+        try:
+            tarefa = novo.obter(id_tarefa)
+            self.assertEqual(tarefa["estado"], INTERROMPIDA)
+            self.assertEqual(novo.obter_estatisticas()[INTERROMPIDA], 1)
+        finally:
+            liberar.set()
+            novo.encerrar()
+
+if __name__ == "__main__":
+    unittest.main()
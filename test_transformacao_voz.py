@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Testes da transformação de voz (altura e velocidade independentes)
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backends_tts import BackendStubTTS
+from buffer_audio import BufferAudio
+from sistema_vozes import SistemaVozes
+from transformacao_voz import razao_altura, transformar_voz
+
+TAXA = 24000
+
+def seno(frequencia, segundos=2.0):
+    t = np.arange(int(segundos * TAXA), dtype=np.float32) / TAXA
+    return (0.5 * np.sin(2 * np.pi * frequencia * t)).astype(np.float32)
+
+def frequencia_dominante(amostras):
+    trecho = amostras[2048:-2048]
+    espectro = np.abs(np.fft.rfft(trecho * np.hanning(len(trecho))))
+    return np.fft.rfftfreq(len(trecho), 1 / TAXA)[np.argmax(espectro)]
+
+class TestTransformacaoVoz(unittest.TestCase):
+    """Testes da altura em semitons, da duração pela velocidade e do SistemaVozes"""
+
+    def test_altura_sem_mudar_a_duracao(self):
+        """Testa o deslocamento exato em semitons mantendo a duração"""
+        for semitons in (-3, 4):
+            saida = transformar_voz(seno(220), semitons=semitons)
+            self.assertEqual(len(saida), 2 * TAXA)
+            self.assertAlmostEqual(frequencia_dominante(saida), 220 * 2 ** (semitons / 12), delta=1.5)
+
+    def test_velocidade_sem_mudar_a_altura(self):
+        """Testa que a velocidade muda só a duração"""
+        saida = transformar_voz(seno(220), velocidade=0.8)
+        self.assertAlmostEqual(len(saida), 2.5 * TAXA, delta=2)
+        self.assertAlmostEqual(frequencia_dominante(saida), 220, delta=1.5)
+
+    def test_altura_e_velocidade_juntas(self):
+        """Testa os ajustes da voz masculina em uma passada de cada operação"""
+        saida = transformar_voz(seno(220), semitons=-3, velocidade=0.9)
+        self.assertAlmostEqual(len(saida), 2 * TAXA / 0.9, delta=3)
+        self.assertAlmostEqual(frequencia_dominante(saida), 220 * 2 ** (-3 / 12), delta=1.5)
+        self.assertLess(abs(1200 * np.log2(float(razao_altura(-3)) / 2 ** (-3 / 12))), 1.0)
+
+    def test_sem_ajustes_devolve_a_voz(self):
+        """Testa que a voz sem ajustes não é processada"""
+        voz = seno(220)
+        np.testing.assert_array_equal(transformar_voz(voz), voz)
+
+    def test_tipos_de_voz_no_sistema(self):
+        """Testa que cada tipo de voz sai com a duração da sua velocidade"""
+        backend = BackendStubTTS()
+        vozes = SistemaVozes(backend_tts=backend)
+        bruta = BufferAudio.de_bytes(backend.sintetizar("Ave Maria, cheia de graça"), backend.formato)
+
+        for tipo_voz in ("feminina_adulta", "masculina_adulta", "infantil"):
+            buffer = vozes.gerar_buffer_voz("Ave Maria, cheia de graça", tipo_voz)
+            velocidade = vozes.tipos_voz[tipo_voz]["speed_adjust"]
+            self.assertAlmostEqual(buffer.duracao_segundos, bruta.duracao_segundos / velocidade, delta=0.01)
+            self.assertAlmostEqual(float(np.abs(buffer.amostras).max()), 10 ** (-0.1 / 20), places=3)
+
+if __name__ == "__main__":
+    unittest.main()
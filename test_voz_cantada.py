@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Testes da voz cantada na melodia do GeradorPartituras
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Adicionar o diretório atual ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gerador_audio
+from backends_tts import BackendStubTTS
+from buffer_audio import BufferAudio
+from composicao_estruturada import ComposicaoEstruturada, SecaoMusica
+from voz_cantada import MULTIPLO_FIM_DE_LINHA, cantar, notas_da_melodia, silabas
+
+LINHA = "Cantai ao Senhor um canto novo"
+
+def frequencia_dominante(amostras, taxa_amostragem):
+    espectro = np.abs(np.fft.rfft(amostras * np.hanning(len(amostras)), n=1 << 16))
+    frequencias = np.fft.rfftfreq(1 << 16, 1 / taxa_amostragem)
+    faixa = (frequencias > 60) & (frequencias < 500)
+    return frequencias[faixa][np.argmax(espectro[faixa])]
+
+class TestVozCantada(unittest.TestCase):
+    """Testes das sílabas, do alinhamento às notas e do modo cantado da mixagem"""
+
+    def setUp(self):
+        self.backend = BackendStubTTS()
+
+    def test_silabas(self):
+        """Testa a divisão em sílabas com ditongos e acentos"""
+        self.assertEqual(silabas("Cantai ao Senhor"), ["Ca", "ntai", "ao", "Se", "nhor"])
+        self.assertEqual(len(silabas("Santo Senhor, salvação")), 7)
+        self.assertEqual(silabas(""), [])
+
+    def test_melodia_do_tom(self):
+        """Testa que as notas vêm da melodia do tom, um tempo do BPM cada"""
+        frequencias, duracoes = notas_da_melodia("G", "mariano", 120.0)
+        self.assertAlmostEqual(frequencias[0], 392.0, delta=0.1)
+        np.testing.assert_allclose(duracoes, 0.5)
+
+    def test_silabas_nas_notas(self):
+        """Testa a duração das notas e a altura de cada sílaba cantada"""
+        buffer = BufferAudio.de_bytes(self.backend.sintetizar(LINHA), self.backend.formato)
+        taxa = buffer.taxa_amostragem
+        frequencias, duracoes = notas_da_melodia("G", "mariano", 80.0)
+        num_silabas = len(silabas(LINHA))
+        voz = cantar([buffer.amostras], taxa, frequencias, duracoes, [num_silabas])
+
+        duracoes_silabas = duracoes[np.arange(num_silabas) % len(duracoes)].copy()
+        duracoes_silabas[-1] *= MULTIPLO_FIM_DE_LINHA
+        self.assertAlmostEqual(len(voz) / taxa, duracoes_silabas.sum(), delta=0.01)
+
+        # A voz do stub fica duas oitavas abaixo da melodia em G4
+        inicio = 0.0
+        for indice, duracao in enumerate(duracoes_silabas):
+            trecho = voz[int((inicio + 0.1) * taxa):int((inicio + duracao - 0.05) * taxa)]
+            nota = frequencias[indice % len(frequencias)] / 4
+            cents = 1200 * np.log2(frequencia_dominante(trecho, taxa) / nota)
+            self.assertLess(abs(cents), 60, f"sílaba {indice}")
+            inicio += duracao
+
+    def test_modo_cantado_na_mixagem(self):
+        """Testa o áudio com voz cantada no andamento escalado pela velocidade"""
+        letra = f"{LINHA}\nAleluia, aleluia"
+        with patch.object(gerador_audio, "obter_backend_tts", return_value=self.backend):
+            voz = gerador_audio.cantar_buffer_voz(letra, "G", "mariano", 160.0)
+            buffer = gerador_audio.gerar_buffer_com_voz(letra, "G", "mariano", velocidade=2.0, modo_voz="cantada")
+
+        self.assertIsNotNone(buffer)
+        self.assertAlmostEqual(buffer.duracao_segundos, voz.duracao_segundos, delta=0.01)
+        # 10 + 6 sílabas de 0,375 s, com a última de cada linha dobrada
+        self.assertAlmostEqual(voz.duracao_segundos, 18 * 0.375, delta=0.01)
+
+    def test_composicao_cantada_linha_a_linha(self):
+        """Testa que cada verso da composição estruturada fecha com a sua nota alongada"""
+        composicao = ComposicaoEstruturada(titulo="Cantai", tom="G", estilo="mariano", bpm=120, secoes=[
+            SecaoMusica("verso", [LINHA, "Ele fez maravilhas"]),
+            SecaoMusica("refrao", ["Aleluia, aleluia"])
+        ])
+        with patch.object(gerador_audio, "obter_backend_tts", return_value=self.backend):
+            voz = gerador_audio.cantar_buffer_voz(composicao, "G", "mariano", 120.0)
+
+        _, duracoes = notas_da_melodia("G", "mariano", 120.0)
+        por_linha = [len(silabas(linha)) for linha in composicao.linhas_letra()]
+        duracoes_silabas = duracoes[np.arange(sum(por_linha)) % len(duracoes)].copy()
+        duracoes_silabas[np.cumsum(por_linha) - 1] *= MULTIPLO_FIM_DE_LINHA
+        self.assertEqual(len(por_linha), 3)
+        self.assertAlmostEqual(voz.duracao_segundos, duracoes_silabas.sum(), delta=0.01)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Transformação de Voz
+Muda a altura (em semitons exatos) e a velocidade da voz de forma
+independente sobre um buffer float32: um vocoder de fase estica o tempo
+pela razão entre altura e velocidade e uma única reamostragem desloca a
+altura, devolvendo a duração pedida. Quadros, fases e sobreposição são
+calculados de uma vez em NumPy.
+"""
+
+from fractions import Fraction
+
+import numpy as np
+
+import codec_audio
+
+# Janela da análise (~43 ms a 24 kHz, boa para fala) e sobreposição de 75%
+TAMANHO_JANELA_PADRAO = 1024
+SOBREPOSICAO = 4
+
+# Maior denominador da razão de reamostragem (erro de altura < 1 cent)
+DENOMINADOR_MAXIMO = 64
+
+# Pico da voz normalizada (-0,1 dBFS, como o normalize do pydub)
+PICO_VOZ = 10 ** (-0.1 / 20)
+
+def razao_altura(semitons):
+    """Razão de frequências do deslocamento, como fração para a reamostragem polifásica"""
+    return Fraction(2 ** (semitons / 12)).limit_denominator(DENOMINADOR_MAXIMO)
+
+def analisar(amostras, tamanho_janela=TAMANHO_JANELA_PADRAO):
+    """STFT com janela de Hann: quadro t centrado na amostra t * salto; retorna (espectro, salto)"""
+    salto = tamanho_janela // SOBREPOSICAO
+    janela = np.hanning(tamanho_janela + 1)[:-1].astype(np.float32)
+    borda = tamanho_janela // 2
+    sinal = np.concatenate([np.zeros(borda, np.float32), amostras, np.zeros(tamanho_janela, np.float32)])
+    num_quadros = 1 + (len(sinal) - tamanho_janela) // salto
+    quadros = np.lib.stride_tricks.sliding_window_view(sinal, tamanho_janela)[::salto][:num_quadros]
+    return np.fft.rfft(quadros * janela, axis=1), salto
+
+def vocoder_de_fase(espectro, salto, posicoes, razoes=None, comprimento=None):
+    """Ressintetiza o espectro lendo o quadro de saída j na posição (fracionária) posicoes[j]
+    da análise, com o espectro escalado em frequência por razoes[j] (altura; 1 = igual).
+
+    Posições com passo menor que 1 esticam o tempo; a altura de cada quadro
+    muda sem mudar a duração. Tudo em uma passada vetorizada.
+    """
+    tamanho_janela = (espectro.shape[1] - 1) * 2
+    num_quadros, num_canais = espectro.shape
+    posicoes = np.clip(np.asarray(posicoes, dtype=np.float64), 0, num_quadros - 1.001)
+    anterior = posicoes.astype(np.int64)
+    alfa = (posicoes - anterior).astype(np.float32)[:, None]
+    modulo = np.abs(espectro)
+    angulo = np.angle(espectro)
+    magnitude = modulo[anterior]
+    magnitude += alfa * (modulo[anterior + 1] - magnitude)
+
+    # Avanço de fase por salto na frequência real de cada canal (desvio em relação ao canal, dobrado em ±pi),
+    # calculado uma vez por quadro da análise
+    avanco = (2 * np.pi * salto * np.arange(num_canais) / tamanho_janela).astype(np.float32)
+    incremento = np.diff(angulo, axis=0) - avanco
+    incremento -= np.float32(2 * np.pi) * np.round(incremento * np.float32(1 / (2 * np.pi)))
+    incremento += avanco
+    incremento = incremento[anterior]
+
+    if razoes is not None:
+        # Canal k da saída vem do canal k / razão da análise, com a frequência multiplicada pela razão;
+        # acima do último canal, dois canais de silêncio (índices planos em int32)
+        razoes = np.asarray(razoes, dtype=np.float32)[:, None]
+        origem = np.minimum(np.arange(num_canais, dtype=np.float32)[None, :] / razoes, np.float32(num_canais))
+        base = np.floor(origem)
+        fracao = origem - base
+        largura = num_canais + 2
+        indices = base.astype(np.int32) + (np.arange(len(posicoes), dtype=np.int32) * np.int32(largura))[:, None]
+        estendida = np.zeros((len(posicoes), largura), dtype=np.float32)
+        estendida[:, :num_canais] = magnitude
+        estendida = estendida.reshape(-1)
+        magnitude = estendida[indices]
+        magnitude += fracao * (estendida[1:][indices] - magnitude)
+        # Incremento do canal mais próximo (o último canal no lugar dos de silêncio)
+        indices += fracao >= 0.5
+        estendida[:] = 0
+        estendida.reshape(len(posicoes), largura)[:, :num_canais] = incremento
+        estendida.reshape(len(posicoes), largura)[:, num_canais:] = incremento[:, -1:]
+        incremento = estendida[indices]
+        incremento *= razoes
+
+    # Fases acumuladas mantidas em [0, 2pi): precisão do float32 e cos/sin rápidos
+    volta = np.float32(2 * np.pi)
+    incremento -= volta * np.floor(incremento * np.float32(1 / (2 * np.pi)))
+    fase = np.empty_like(magnitude)
+    fase[0] = angulo[anterior[0]]
+    np.cumsum(incremento[:-1], axis=0, out=fase[1:])
+    fase[1:] += fase[0]
+    fase -= volta * np.floor(fase * np.float32(1 / (2 * np.pi)))
+
+    sintese = np.empty(magnitude.shape, dtype=np.complex64)
+    sintese.real = magnitude * np.cos(fase)
+    sintese.imag = magnitude * np.sin(fase)
+    return sobrepor(np.fft.irfft(sintese, n=tamanho_janela, axis=1).astype(np.float32), salto, comprimento)
+
+def sobrepor(quadros, salto, comprimento=None):
+    """Sobreposição-soma dos quadros (janela de Hann na síntese), sem a borda da análise"""
+    tamanho_janela = quadros.shape[1]
+    quadros *= np.hanning(tamanho_janela + 1)[:-1].astype(np.float32)
+
+    # Cada quarto de quadro cai em um bloco de salto amostras
+    num_quadros = len(quadros)
+    partes = quadros.reshape(num_quadros, SOBREPOSICAO, salto)
+    blocos = np.zeros((num_quadros + SOBREPOSICAO - 1, salto), dtype=np.float32)
+    for parte in range(SOBREPOSICAO):
+        blocos[parte:parte + num_quadros] += partes[:, parte]
+
+    # Soma das janelas de Hann ao quadrado com 75% de sobreposição: 1,5
+    borda = tamanho_janela // 2
+    comprimento = len(blocos) * salto - borda if comprimento is None else comprimento
+    saida = blocos.reshape(-1)[borda:borda + comprimento] / np.float32(1.5)
+    if len(saida) < comprimento:
+        saida = np.concatenate([saida, np.zeros(comprimento - len(saida), np.float32)])
+    return saida
+
+def esticar_tempo(amostras, fator, tamanho_janela=TAMANHO_JANELA_PADRAO):
+    """Vocoder de fase: duração multiplicada por fator, mesma altura"""
+    amostras = np.asarray(amostras, dtype=np.float32)
+    comprimento = int(round(len(amostras) * fator))
+    if abs(fator - 1.0) < 1e-6 or len(amostras) == 0:
+        return amostras
+    if len(amostras) < tamanho_janela:
+        # Curto demais para uma janela: interpolação linear
+        posicoes = np.linspace(0, max(0, len(amostras) - 1), comprimento)
+        return np.interp(posicoes, np.arange(len(amostras)), amostras).astype(np.float32)
+
+    espectro, salto = analisar(amostras, tamanho_janela)
+    # Quadros de saída em posições fracionárias da análise (passo 1/fator)
+    posicoes = np.arange(0, len(espectro) - 1, 1.0 / fator)
+    return vocoder_de_fase(espectro, salto, posicoes, comprimento=comprimento)
+
+def transformar_voz(amostras, semitons=0.0, velocidade=1.0, tamanho_janela=TAMANHO_JANELA_PADRAO):
+    """Voz mono com altura deslocada em semitons e duração dividida pela velocidade.
+
+    Altura e velocidade são independentes: o vocoder de fase estica a voz
+    pela razão altura/velocidade e a reamostragem pela razão de altura a
+    traz de volta à duração pedida, uma passada de cada.
+    """
+    amostras = np.asarray(amostras, dtype=np.float32)
+    razao = razao_altura(semitons)
+    saida = esticar_tempo(amostras, float(razao) / velocidade, tamanho_janela)
+    if razao == 1:
+        return saida
+
+    # Os arredondamentos das duas etapas podem sobrar ou faltar uma amostra
+    saida = codec_audio.reamostrar(saida, razao.numerator, razao.denominator)
+    comprimento = int(round(len(amostras) / velocidade))
+    if len(saida) < comprimento:
+        return np.concatenate([saida, np.zeros(comprimento - len(saida), np.float32)])
+    return saida[:comprimento]
+
+def normalizar_pico(amostras, pico=PICO_VOZ):
+    """Amostras com o pico no nível indicado (silêncio fica como está)"""
+    maximo = float(np.max(np.abs(amostras))) if len(amostras) else 0.0
+    if maximo > 0:
+        amostras = amostras * np.float32(pico / maximo)
+    return amostras.astype(np.float32, copy=False)
+
+# Teste básico
+if __name__ == "__main__":
+    import time
+
+    print("🎚️ TRANSFORMAÇÃO DE VOZ")
+    print("=" * 30)
+
+    taxa = 24000
+    t = np.arange(30 * taxa, dtype=np.float32) / taxa
+    voz = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    for semitons, velocidade in ((0, 1.0), (-3, 0.9), (4, 1.1), (-1, 0.8)):
+        inicio = time.perf_counter()
+        saida = transformar_voz(voz, semitons, velocidade)
+        print(f"  {semitons:+d} st, x{velocidade}: {(time.perf_counter() - inicio) * 1000:6.1f}ms, "
+              f"{len(saida) / taxa:.2f}s")
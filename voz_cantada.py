@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Voz Cantada
+Faz a voz do TTS cantar a melodia de GeradorPartituras._gerar_melodia: as
+sílabas de cada linha são distribuídas pelas notas, e cada trecho silábico
+da voz é esticado até a duração da nota e levado à altura dela. Todas as
+linhas passam juntas por uma única análise e ressíntese do vocoder de fase
+(transformacao_voz), com o mapa de tempo e a altura de cada quadro
+calculados em NumPy, sem processar sílaba por sílaba.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from composicao_estruturada import BPM_PADRAO
+from transformacao_voz import analisar, vocoder_de_fase, normalizar_pico
+
+# A última sílaba de cada linha dura este múltiplo da sua nota
+MULTIPLO_FIM_DE_LINHA = 2.0
+
+# Início de cada sílaba (consoante de ataque) mantido na velocidade da fala
+SEGUNDOS_ATAQUE = 0.06
+
+# Faixa da fundamental da fala e correlação mínima de um quadro vozeado
+F0_MINIMA = 70.0
+F0_MAXIMA = 400.0
+CORRELACAO_VOZEADA = 0.4
+
+# Limite da altura de um quadro em relação à mediana da sílaba (erros de oitava)
+SEMITONS_MAXIMOS_NA_SILABA = 3.0
+
+_VOGAIS = "aeiouáéíóúâêôãõàüy"
+_SILABA = re.compile(rf"[^{_VOGAIS}]*[{_VOGAIS}]+(?:[^{_VOGAIS}]+$)?", re.IGNORECASE)
+_PALAVRA = re.compile(r"[^\W\d_]+")
+
+def silabas(linha):
+    """Sílabas aproximadas da linha: um núcleo vocálico por sílaba (ditongos juntos)"""
+    resultado = []
+    for palavra in _PALAVRA.findall(str(linha)):
+        resultado.extend(_SILABA.findall(palavra) or [palavra])
+    return resultado
+
+@lru_cache(maxsize=64)
+def notas_da_melodia(tom, estilo, bpm=BPM_PADRAO):
+    """Frequências (Hz) e durações (s) das notas da melodia do tom e estilo"""
+    from music21 import pitch
+    from gerador_partituras import GeradorPartituras
+
+    melodia = GeradorPartituras()._gerar_melodia(tom, estilo)
+    frequencias = np.array([pitch.Pitch(nota['pitch']).frequency for nota in melodia])
+    duracoes = np.array([nota['duration'] * 60.0 / bpm for nota in melodia])
+    return frequencias, duracoes
+
+def _recortar_silencio(amostras, limiar=0.02):
+    """Trecho entre a primeira e a última amostra acima de limiar * pico"""
+    amostras = np.asarray(amostras, dtype=np.float32)
+    pico = float(np.max(np.abs(amostras))) if len(amostras) else 0.0
+    if pico == 0:
+        return amostras[:0]
+    acima = np.flatnonzero(np.abs(amostras) > limiar * pico)
+    return amostras[acima[0]:acima[-1] + 1]
+
+def _fundamentais(espectro, taxa_amostragem):
+    """Fundamental (Hz) e se o quadro é vozeado, pela autocorrelação de cada quadro"""
+    tamanho_janela = (espectro.shape[1] - 1) * 2
+    potencia = np.abs(espectro) ** 2
+    autocorrelacao = np.fft.irfft(potencia, n=tamanho_janela, axis=1)
+    menor = int(taxa_amostragem / F0_MAXIMA)
+    maior = min(int(taxa_amostragem / F0_MINIMA), tamanho_janela // 2)
+    atraso = menor + np.argmax(autocorrelacao[:, menor:maior], axis=1)
+    linhas = np.arange(len(espectro))
+    correlacao = autocorrelacao[linhas, atraso] / np.maximum(autocorrelacao[:, 0], 1e-12)
+
+    energia = potencia.sum(axis=1)
+    vozeado = (correlacao > CORRELACAO_VOZEADA) & (energia > 0.02 * energia.max())
+    return taxa_amostragem / atraso, vozeado
+
+def _fronteiras_silabas(energia, inicio, fim, num_silabas):
+    """Quadros que dividem [inicio, fim) em num_silabas: pontos proporcionais levados
+    ao vale de energia mais próximo (dentro de 40% de uma sílaba)"""
+    passo = (fim - inicio) / num_silabas
+    alvos = inicio + passo * np.arange(1, num_silabas)
+    if not len(alvos):
+        return np.array([inicio, fim], dtype=np.float64)
+
+    raio = max(1, int(passo * 0.4))
+    candidatos = np.clip(np.rint(alvos).astype(np.int64)[:, None] + np.arange(-raio, raio + 1)[None, :],
+                         inicio + 1, fim - 1)
+    escolhidos = candidatos[np.arange(len(alvos)), np.argmin(energia[candidatos], axis=1)].astype(np.float64)
+    # Crescentes, com ao menos um quadro por sílaba
+    escolhidos = np.maximum.accumulate(np.maximum(escolhidos, inicio + np.arange(1, num_silabas)))
+    escolhidos = np.minimum(escolhidos, fim - np.arange(num_silabas - 1, 0, -1))
+    return np.concatenate([[inicio], escolhidos, [fim]])
+
+def cantar(linhas, taxa_amostragem, frequencias, duracoes, silabas_por_linha):
+    """Canta as linhas (amostras float32 mono, uma por linha) na melodia.
+
+    As sílabas seguem as notas em ciclo desde o início da melodia, e a
+    melodia é posta na oitava mais próxima da voz. Retorna float32 mono.
+    """
+    trechos = [_recortar_silencio(linha) for linha in linhas]
+    pares = [(trecho, max(1, n)) for trecho, n in zip(trechos, silabas_por_linha) if len(trecho)]
+    if not pares:
+        return np.zeros(0, dtype=np.float32)
+
+    entrada = np.concatenate([trecho for trecho, _ in pares])
+    espectro, salto = analisar(entrada)
+    energia = (np.abs(espectro) ** 2).sum(axis=1)
+    energia = np.convolve(energia, np.ones(5, np.float32) / 5, mode="same")
+    fundamental, vozeado = _fundamentais(espectro, taxa_amostragem)
+
+    # Sílabas (em quadros da análise) de todas as linhas e se cada uma fecha a linha
+    fronteiras, fim_de_linha = [], []
+    inicio = 0
+    for trecho, num_silabas in pares:
+        fim = inicio + len(trecho) / salto
+        num_silabas = int(min(num_silabas, max(1, (fim - inicio) // 2)))
+        limites = _fronteiras_silabas(energia, int(inicio), max(int(inicio) + num_silabas, int(fim)), num_silabas)
+        fronteiras.append(np.stack([limites[:-1], limites[1:]], axis=1))
+        fim_de_linha.extend([False] * (num_silabas - 1) + [True])
+        inicio = fim
+    silabas_quadros = np.concatenate(fronteiras)
+    fim_de_linha = np.array(fim_de_linha)
+    num_silabas = len(silabas_quadros)
+
+    # Fundamental mediana de cada sílaba (quadros vozeados; senão a mediana geral)
+    quadros = np.arange(len(espectro))
+    silaba_do_quadro = np.clip(np.searchsorted(silabas_quadros[:, 0], quadros, side="right") - 1, 0, num_silabas - 1)
+    geral = float(np.median(fundamental[vozeado])) if vozeado.any() else 150.0
+    medianas = np.full(num_silabas, geral)
+    for indice in np.unique(silaba_do_quadro[vozeado]):
+        medianas[indice] = np.median(fundamental[vozeado & (silaba_do_quadro == indice)])
+    limite = 2 ** (SEMITONS_MAXIMOS_NA_SILABA / 12)
+    mediana_do_quadro = medianas[silaba_do_quadro]
+    f0_quadro = np.where(vozeado, np.clip(fundamental, mediana_do_quadro / limite, mediana_do_quadro * limite),
+                         mediana_do_quadro)
+
+    # Notas das sílabas, na oitava da voz
+    indices_notas = np.arange(num_silabas) % len(frequencias)
+    oitava = np.round(np.log2(geral / np.median(frequencias)))
+    notas = frequencias[indices_notas] * 2.0 ** oitava
+    duracoes_saida = duracoes[indices_notas] * np.where(fim_de_linha, MULTIPLO_FIM_DE_LINHA, 1.0)
+
+    # Mapa de tempo: cada quadro de saída lê a sua sílaba, com o ataque na velocidade original
+    inicio_saida = np.concatenate([[0.0], np.cumsum(duracoes_saida)]) * taxa_amostragem / salto
+    comprimento = int(round(inicio_saida[-1] * salto))
+    saida_quadros = np.arange(int(np.ceil(inicio_saida[-1])) + 1, dtype=np.float64)
+    silaba = np.clip(np.searchsorted(inicio_saida, saida_quadros, side="right") - 1, 0, num_silabas - 1)
+    decorrido = saida_quadros - inicio_saida[silaba]
+    duracao_entrada = silabas_quadros[silaba, 1] - silabas_quadros[silaba, 0]
+    duracao_nota = inicio_saida[silaba + 1] - inicio_saida[silaba]
+    ataque = np.minimum(SEGUNDOS_ATAQUE * taxa_amostragem / salto, np.minimum(duracao_entrada, duracao_nota) / 2)
+    esticado = ataque + (decorrido - ataque) * (duracao_entrada - ataque) / np.maximum(duracao_nota - ataque, 1e-9)
+    posicoes = silabas_quadros[silaba, 0] + np.where(decorrido < ataque, decorrido, esticado)
+
+    # Altura: a fundamental lida em cada posição vai para a nota da sílaba
+    razoes = notas[silaba] / f0_quadro[np.clip(np.rint(posicoes).astype(np.int64), 0, len(espectro) - 1)]
+    voz = vocoder_de_fase(espectro, salto, posicoes, razoes, comprimento)
+    return normalizar_pico(voz)
+
+# Teste básico
+if __name__ == "__main__":
+    import time
+
+    from backends_tts import BackendStubTTS
+    from buffer_audio import BufferAudio
+
+    print("🎶 VOZ CANTADA")
+    print("=" * 30)
+
+    backend = BackendStubTTS()
+    letra = ["Cantai ao Senhor um canto novo", "Aleluia, aleluia", "Ele fez maravilhas", "Aleluia, aleluia"]
+    linhas = [BufferAudio.de_bytes(backend.sintetizar(linha), backend.formato) for linha in letra]
+    frequencias, duracoes = notas_da_melodia("G", "mariano")
+
+    inicio = time.perf_counter()
+    voz = cantar([linha.amostras for linha in linhas], linhas[0].taxa_amostragem, frequencias, duracoes,
+                 [len(silabas(linha)) for linha in letra])
+    print(f"✅ {len(voz) / linhas[0].taxa_amostragem:.1f}s cantados em {(time.perf_counter() - inicio) * 1000:.0f}ms")
+    for linha in letra:
+        print(f"  {'-'.join(silabas(linha))}")